@@ -4,23 +4,65 @@ Provides a simple HTTP API for Electron (or any client) to drive conversions.
 
 Endpoints:
 - GET /health -> { status: "ok" }
-- GET /formats -> returns supported output formats for a given input file or extension
-- POST /convert -> starts a background job and returns { job_id }
-- GET /jobs/{job_id} -> progress and status
+- GET /formats -> returns supported output formats for a given input file or extension (all formats without one);
+  for an existing file, also the predicted conversion time per format (learned from history, null when unknown)
+- POST /convert -> queues the files on the worker process pool and returns { job_id }; files are
+  scheduled by priority class (interactive > normal > bulk, derived from the converter unless
+  "priority" is given) and round-robin between clients (X-Client-Id header, else client address);
+  "ops" chains image operations applied in a single decode, e.g. "resize:1600x1600,crop:800x600+0+0,
+  rotate:90,strip,convert:gray" (then the conversion.image settings: max_image_size, preserve_metadata);
+  "tiled": true writes TIFF outputs as 256x256 tiles (huge TIFF / PNG inputs are always read in bands);
+  multi-page TIFFs and animations keep every frame in pdf / tiff / gif / webp outputs, "extract_frames": true
+  writes one file per frame instead
+- GET /jobs/{job_id} -> progress and status, with queue position and ETA while files are waiting
+  (jobs are persisted and resumed after a restart)
+- DELETE /jobs/{job_id} -> cancels a job: queued files are dropped, running ones are killed
+- POST /convert/upload -> multipart upload (fields: files..., output_format, ops, tiled, extract_frames) streamed to the
+  spool directory, then converted like /convert; outputs are fetched with the two routes below
+- GET /jobs/{job_id}/outputs -> output files of an uploaded job
+- GET /jobs/{job_id}/outputs/{name} -> download an output (HTTP range requests supported)
+- GET /jobs/{job_id}/trace -> per-stage timings (decode / transform / encode) of a job submitted
+  with "trace": true, as Chrome trace-event JSON with a per-stage summary in otherData
+- GET /jobs/{job_id}/events -> Server-Sent Events stream: a job-status snapshot, then
+  file-started / file-progress / file-finished / file-error events and a final job-done
 - GET /history/recent -> recent conversions from SQLite history
+- GET /cache/stats -> result cache hit/miss counters and size
+- GET /metrics -> Prometheus text exposition (conversion and request latency histograms,
+  queue depth, active workers, cache hit ratio)
+
+PTITCONVERT_PROFILE=1 (or a directory) runs every conversion under cProfile and a stack sampler;
+<dir>/<job_id>/ receives one .pstats and one .collapsed file per file, and the history row of the
+conversion records the .pstats path (default dir: ~/.ptitconvert/profiles).
+
+Job state and history rows of finished files are written to SQLite by a dedicated thread, in
+order, off the worker pool's supervisor.
+
+Logs (converters, workers, this module) go through a queue drained by a background thread;
+PTITCONVERT_LOG_LEVEL sets the level (default WARNING). Failed files carry the error message and
+its class (error_type) in the job results and events, converter warnings in "warnings".
 """
 
 from __future__ import annotations
 
+import asyncio
+import json
+import logging
+import multiprocessing
 import os
 import platform
+import queue
+import shutil
 import threading
+import time
 import uuid
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
 # Ensure project root is in path for imports
@@ -29,13 +71,22 @@ import sys
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from converters.image_converter import ImageConverter
-from converters.document_converter import DocumentConverter
-from converters.spreadsheet_converter import SpreadsheetConverter
-from converters.advanced_document_converter import AdvancedDocumentConverter
-from converters.archive_converter import ArchiveConverter
-from converters.media_converter import MediaConverter
+from converters import image_ops, registry
+from converters.result import CANCELLED, ConversionResult
+from utils import logs, metrics, tracing
+from utils.cache import create_cache
+from utils.config import ConfigManager
+from utils.cost_model import get_cost_model
+from utils.events import JobEventBroker
+from utils.executor import ConversionExecutor
 from utils.history import ConversionHistory
+from utils.job_store import PENDING, JobStore
+from utils.scheduler import PRIORITIES
+from utils.uploads import MultipartSpooler, UploadError, UploadTooLarge
+
+logger = logging.getLogger(__name__)
+logs.setup_logging(os.environ.get("PTITCONVERT_LOG_LEVEL", "WARNING").upper(),
+                   fmt="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 
 app = FastAPI(title="PtitConvert API", version="1.0")
@@ -49,10 +100,66 @@ app.add_middleware(
 )
 
 
+HTTP_SECONDS = metrics.histogram(
+    "ptitconvert_http_request_duration_seconds",
+    "Durée des requêtes HTTP par méthode, route et statut",
+    ("method", "route", "status"),
+)
+
+
+class MetricsMiddleware:
+    """Times every HTTP request, labelled by route template (not raw path: ids would explode cardinality)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_SECONDS.observe((scope["method"], route, str(status[0])), time.perf_counter() - start)
+
+
+app.add_middleware(MetricsMiddleware)
+
+
 class ConvertRequest(BaseModel):
     files: List[str]
     output_format: str
     output_dir: str
+    priority: Optional[str] = None
+    # Record per-stage spans in the workers (GET /jobs/{job_id}/trace); trace_memory adds allocations
+    trace: bool = False
+    trace_memory: bool = False
+    # Image operations, comma-separated (see converters.image_ops)
+    ops: Optional[str] = None
+    # Write TIFF outputs as tiles
+    tiled: bool = False
+    # One output file per frame of multi-page / animated images
+    extract_frames: bool = False
+
+
+class FileResult(BaseModel):
+    file: str
+    success: bool
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+    warnings: List[str] = []
+    outputs: List[str] = []
+    bytes_written: int = 0
+    elapsed: Optional[float] = None
 
 
 class JobStatus(BaseModel):
@@ -64,50 +171,155 @@ class JobStatus(BaseModel):
     current_file: Optional[str] = None
     message: Optional[str] = None
     done: bool = False
+    cancelled: bool = False
+    results: List[FileResult] = []
+    # Queued files of other jobs served before this job's next file (None: nothing queued)
+    queue_position: Optional[int] = None
+    eta_seconds: Optional[float] = None
+
+
 class OpenFolderRequest(BaseModel):
     path: str
 
 
 
-# Simple in-memory job registry
+# In-memory view of active and recently finished jobs; JOB_STORE is the durable copy
 JOBS: Dict[str, JobStatus] = {}
 JOBS_LOCK = threading.Lock()
+JOB_STORE = JobStore()
+
+# Finished jobs leave memory after this many seconds (still readable from JOB_STORE)
+JOB_TTL = float(os.environ.get("PTITCONVERT_JOB_TTL", "3600"))
+JOB_SWEEP_INTERVAL = 60.0
+JOB_FINISHED_AT: Dict[str, float] = {}
+_last_sweep = 0.0
+
+
+CONFIG = ConfigManager()
+# Uploaded inputs and their outputs live in SPOOL_ROOT/<job_id>/{in,out}
+SPOOL_ROOT = Path(
+    os.environ.get("PTITCONVERT_SPOOL") or Path.home() / ".ptitconvert" / "spool"
+).resolve()
+
+# Seconds between SSE keep-alive comments when a job is idle
+SSE_KEEPALIVE = 15.0
+
+# Live job events, published under JOBS_LOCK: worker events (listener thread) and
+# results (supervisor thread) reach subscribers in the order they happened
+EVENTS = JobEventBroker()
+# Files of running jobs whose result is published, by position: later progress is dropped
+FINISHED_FILES: Dict[str, Set[int]] = {}
+
+# Spans of traced jobs, filled as their files finish (guarded by JOBS_LOCK)
+TRACES: Dict[str, List[dict]] = {}
+
+
+def _profile_dir() -> Optional[Path]:
+    value = os.environ.get("PTITCONVERT_PROFILE", "").strip()
+    if value.lower() in ("", "0", "false", "no", "off"):
+        return None
+    if value.lower() in ("1", "true", "yes", "on"):
+        return Path.home() / ".ptitconvert" / "profiles"
+    return Path(value).expanduser().resolve()
+
+
+# Opt-in profiling of every conversion; profile paths wait here for the history row
+PROFILE_DIR = _profile_dir()
+PROFILES: Dict[Tuple[str, int, str], str] = {}
+
+
+def _on_worker_event(task_id: Tuple[str, int, str], kind: str, value: Optional[float]):
+    job_id, position, file_path = task_id
+    with JOBS_LOCK:
+        status = JOBS.get(job_id)
+        if status is None or status.done or position in FINISHED_FILES.get(job_id, ()):
+            return
+        if kind == 'started':
+            status.current_file = os.path.basename(file_path)
+            status.message = f"Conversion de {status.current_file} ({status.processed}/{status.total})"
+        event = {
+            "type": kind,
+            "file": file_path,
+            "progress": 0.0 if kind == 'started' else value,
+        }
+        EVENTS.publish(job_id, event)
+
+
+def _on_worker_trace(task_id: Tuple[str, int, str], events: List[dict]):
+    with JOBS_LOCK:
+        spans = TRACES.get(task_id[0])
+        if spans is not None:
+            spans.extend(events)
+
+
+def _on_worker_profile(task_id: Tuple[str, int, str], report: dict):
+    with JOBS_LOCK:
+        PROFILES[task_id] = report.get("pstats") or report.get("collapsed")
 
 
-# Converters (singletons for the process)
-IMG = ImageConverter()
-DOC = DocumentConverter()
-SHEET = SpreadsheetConverter()
-ADVDOC = AdvancedDocumentConverter()
-ARCH = ArchiveConverter()
-MEDIA = MediaConverter()
 HISTORY = ConversionHistory()
+# SQLite writes of finished files (JOB_STORE, HISTORY), applied in order by a dedicated
+# thread so that the executor's supervisor never waits on the database
+STORE_WRITES: "queue.SimpleQueue" = queue.SimpleQueue()
+
+
+def _store_writer():
+    """Apply queued (function, args) writes in order; None stops the thread."""
+    while True:
+        item = STORE_WRITES.get()
+        if item is None:
+            break
+        write, args = item
+        try:
+            write(*args)
+        except Exception as e:
+            logger.error("Écriture en base impossible: %s", e)
+
+
+STORE_WRITER = threading.Thread(target=_store_writer, name="ptitconvert-store", daemon=True)
+STORE_WRITER.start()
+# Trained from past conversions, then updated by the executor as files finish
+COST_MODEL = get_cost_model(HISTORY.db_path)
+# Worker process pool shared by every job (sized from advanced.concurrent_conversions)
+EXECUTOR = ConversionExecutor(on_event=_on_worker_event, cost_model=COST_MODEL,
+                              on_trace=_on_worker_trace, on_profile=_on_worker_profile)
+# Same on-disk index as the workers' caches: counters cover every process
+CACHE = create_cache()
+
+
+def _cache_stats() -> Optional[dict]:
+    return CACHE.get_stats() if CACHE is not None else None
+
+
+def _cache_lookups() -> Optional[dict]:
+    stats = _cache_stats()
+    if stats is None:
+        return None
+    return {("hit",): stats["hits"], ("miss",): stats["misses"]}
+
+
+metrics.gauge("ptitconvert_queue_depth", "Conversions en attente d'un processus",
+              lambda: EXECUTOR.stats()["queued"])
+metrics.gauge(
+    "ptitconvert_queue_depth_by_priority", "Conversions en attente par classe de priorité",
+    lambda: {(priority,): n for priority, n in EXECUTOR.stats()["queued_by_priority"].items()},
+    labelnames=("priority",),
+)
+metrics.gauge("ptitconvert_active_workers", "Processus en train de convertir",
+              lambda: EXECUTOR.stats()["active"])
+metrics.gauge("ptitconvert_worker_processes", "Processus de conversion lancés",
+              lambda: EXECUTOR.stats()["workers"])
+metrics.gauge("ptitconvert_jobs_in_memory", "Jobs gardés en mémoire", lambda: len(JOBS))
+metrics.gauge("ptitconvert_cache_hit_ratio", "Part des conversions servies par le cache",
+              lambda: (_cache_stats() or {}).get("hit_ratio"))
+metrics.gauge(
+    "ptitconvert_cache_lookups_total", "Consultations du cache de résultats",
+    _cache_lookups, labelnames=("result",), metric_type="counter",
+)
 
 
 def _supported_formats_for_extension(ext: str) -> List[str]:
-    ext = ext.lower()
-    # Images
-    if ext in ['.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.webp']:
-        return ['PNG', 'JPG', 'JPEG', 'BMP', 'GIF', 'TIFF', 'PDF']
-    # Documents standards
-    if ext in ['.pdf', '.docx', '.txt']:
-        return ['PDF', 'DOCX', 'TXT']
-    # Documents avancés
-    if ext in ['.epub', '.odt', '.rtf']:
-        return ['PDF', 'DOCX', 'TXT', 'EPUB', 'ODT', 'RTF']
-    # Feuilles de calcul
-    if ext in ['.xlsx', '.csv', '.ods']:
-        return ['XLSX', 'CSV', 'ODS', 'PDF']
-    # Archives
-    if ext in ['.zip', '.tar', '.rar', '.7z']:
-        return ['ZIP', 'TAR', '7Z']
-    # Média audio
-    if ext in ['.mp3', '.wav', '.flac']:
-        return ['MP3', 'WAV', 'FLAC', 'OGG']
-    # Média vidéo
-    if ext in ['.mp4', '.avi']:
-        return ['MP4', 'AVI', 'MKV', 'MOV']
-    return []
+    return [fmt.upper() for fmt in registry.get_output_formats(ext)]
 
 
 @app.get("/health")
@@ -121,104 +333,462 @@ def get_formats(file_path: Optional[str] = None, file_ext: Optional[str] = None)
     if file_ext:
         ext = file_ext if file_ext.startswith('.') else f'.{file_ext}'
     elif file_path:
-        ext = Path(file_path).suffix
+        ext = registry.get_extension(file_path)
+    else:
+        # Sans fichier : tous les formats de sortie connus
+        return {"formats": [fmt.upper() for fmt in registry.get_all_output_formats()]}
+    formats = _supported_formats_for_extension(ext)
+    if file_path and not file_ext and os.path.isfile(file_path):
+        estimates = {}
+        for fmt in formats:
+            seconds = COST_MODEL.estimate_file(file_path, fmt)
+            estimates[fmt] = round(seconds, 2) if seconds is not None else None
+        return {"formats": formats, "estimates": estimates}
+    return {"formats": formats}
+
+
+def _status_from_record(record: dict) -> JobStatus:
+    """Rebuild a JobStatus from a JOB_STORE record."""
+    files = record["files"]
+    results = [
+        FileResult(file=f["file"], success=f["state"] != "failed", error=f["error"],
+                   error_type=f["error_type"])
+        for f in files if f["state"] != PENDING
+    ]
+    success = sum(1 for r in results if r.success)
+    done = record["finished"] is not None
+    cancelled = record["cancelled"]
+    if done:
+        message = "Conversion annulée" if cancelled else "Conversion terminée"
     else:
-        raise HTTPException(status_code=400, detail="Provide file_path or file_ext")
-    return {"formats": _supported_formats_for_extension(ext)}
+        message = "Annulation en cours" if cancelled else "Reprise de la conversion"
+    return JobStatus(
+        job_id=record["job_id"],
+        total=len(files),
+        processed=len(results),
+        success=success,
+        failed=len(results) - success,
+        message=message,
+        done=done,
+        cancelled=cancelled,
+        results=results,
+    )
+
+
+def _find_stored_job(job_id: str) -> Optional[JobStatus]:
+    """Status of a job no longer held in memory, read back from the durable store."""
+    record = JOB_STORE.get_job(job_id)
+    return _status_from_record(record) if record else None
+
+
+def _evict_finished_jobs():
+    """Drop finished jobs older than JOB_TTL from memory (at most once per sweep interval)."""
+    global _last_sweep
+    now = time.monotonic()
+    if now - _last_sweep < JOB_SWEEP_INTERVAL:
+        return
+    _last_sweep = now
+    with JOBS_LOCK:
+        expired = [jid for jid, at in JOB_FINISHED_AT.items() if now - at >= JOB_TTL]
+        for jid in expired:
+            JOBS.pop(jid, None)
+            TRACES.pop(jid, None)
+            del JOB_FINISHED_AT[jid]
 
 
-def _convert_one(file_path: str, output_format: str, output_dir: str) -> Tuple[bool, Optional[str]]:
+def _record_file(job_id: str, position: int, file_path: str, output_format: str, output_dir: str,
+                 result: ConversionResult, profile_path: Optional[str]):
+    """Persist a finished file: job state, then history row (store writer thread)."""
+    ok, err = result.success, result.error
     try:
-        ext = Path(file_path).suffix.lower()
-        # Images
-        if ext in ['.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.webp']:
-            ok = IMG.convert(file_path, output_dir, output_format.lower())
-        # Documents standards
-        elif ext in ['.pdf', '.docx', '.txt']:
-            ok = DOC.convert(file_path, output_dir, output_format.lower())
-        # Documents avancés
-        elif ext in ['.epub', '.odt', '.rtf']:
-            ok = ADVDOC.convert(file_path, output_dir, output_format.lower())
-        # Feuilles de calcul
-        elif ext in ['.xlsx', '.csv', '.ods']:
-            ok = SHEET.convert(file_path, output_dir, output_format.lower())
-        # Archives
-        elif ext in ['.zip', '.tar', '.rar', '.7z']:
-            try:
-                ok = ARCH.convert(file_path, output_dir, output_format.lower())
-            except AttributeError:
-                ok = ARCH.extract_archive(file_path, output_dir)
-        # Média
-        elif ext in ['.mp3', '.mp4', '.avi', '.wav', '.flac']:
-            ok = MEDIA.convert(file_path, output_dir, output_format.lower())
-        else:
-            return False, f"Format non supporté: {ext}"
-        return (True, None) if ok else (False, None)
+        JOB_STORE.mark_file(job_id, position, ok, err, result.error_type)
     except Exception as e:
-        return False, str(e)
+        logger.error("Impossible d'enregistrer l'état du job %s: %s", job_id, e)
+    try:
+        out_file = result.output or os.path.join(output_dir, f"{Path(file_path).stem}.{output_format.lower()}")
+        HISTORY.add_conversion(
+            input_file=file_path,
+            input_format=registry.get_extension(file_path).lstrip('.'),
+            output_file=out_file,
+            output_format=output_format.lower(),
+            file_size=os.path.getsize(file_path) if os.path.exists(file_path) else 0,
+            conversion_time=result.elapsed,
+            success=ok,
+            error_message=err,
+            profile_path=profile_path,
+            output_bytes=result.bytes_written,
+            peak_memory_mb=result.peak_memory_mb,
+            stage_timings=result.stages,
+            cached=result.cached,
+        )
+    except Exception as e:
+        logger.warning("Historique non mis à jour pour %s: %s", file_path, e)
+
 
+def _finish_job(job_id: str):
+    """Mark a job finished once its files are recorded (store writer thread)."""
+    JOB_STORE.finish_job(job_id)
+    # Uploaded inputs are no longer needed once every file is processed (and its size recorded)
+    shutil.rmtree(SPOOL_ROOT / job_id / "in", ignore_errors=True)
 
-def _run_job(job_id: str, files: List[str], output_format: str, output_dir: str):
-    status = JOBS[job_id]
+
+def _on_file_done(job_id: str, position: int, file_path: str, output_format: str, output_dir: str,
+                  future: Future):
+    try:
+        result = future.result()
+    except Exception as e:
+        result = ConversionResult.from_exception(e)
+    ok, err = result.success, result.error
+    with JOBS_LOCK:
+        profile_path = PROFILES.pop((job_id, position, file_path), None)
+    STORE_WRITES.put((_record_file, (job_id, position, file_path, output_format, output_dir, result,
+                                     profile_path)))
+    with JOBS_LOCK:
+        status = JOBS[job_id]
+        status.processed += 1
+        if ok:
+            status.success += 1
+        else:
+            status.failed += 1
+        status.results.append(FileResult(file=file_path, success=ok, error=err, error_type=result.error_type,
+                                         warnings=result.warnings, outputs=result.outputs,
+                                         bytes_written=result.bytes_written, elapsed=result.elapsed))
+        status.current_file = os.path.basename(file_path)
+        if status.processed >= status.total:
+            status.done = True
+            status.message = "Conversion annulée" if status.cancelled else "Conversion terminée"
+        else:
+            status.message = f"Conversion de {status.current_file} ({status.processed}/{status.total})"
+        event = {
+            "type": "finished" if ok else "error",
+            "file": file_path,
+            "progress": 1.0,
+            "error": err,
+            "error_type": result.error_type,
+            "processed": status.processed,
+            "success": status.success,
+            "failed": status.failed,
+            "total": status.total,
+        }
+        final = status.model_dump() if status.done else None
+        if status.done:
+            JOB_FINISHED_AT[job_id] = time.monotonic()
+            FINISHED_FILES.pop(job_id, None)
+        else:
+            FINISHED_FILES.setdefault(job_id, set()).add(position)
+        EVENTS.publish(job_id, event)
+        if final is not None:
+            EVENTS.publish(job_id, {"type": "done", **final})
+    if final is not None:
+        STORE_WRITES.put((_finish_job, (job_id,)))
+
+
+def _run_job(job_id: str, files: List[Tuple[int, str]], output_format: str, output_dir: str,
+             priority: Optional[str] = None, client: Optional[str] = None, trace: Optional[str] = None,
+             options: Optional[dict] = None):
+    """Submit (position, path) pairs of a job to the worker pool."""
     Path(output_dir).mkdir(parents=True, exist_ok=True)
-    for i, f in enumerate(files):
-        with JOBS_LOCK:
-            status.current_file = os.path.basename(f)
-            status.message = f"Conversion de {status.current_file} ({i+1}/{status.total})"
-        ok, err = _convert_one(f, output_format, output_dir)
-        # Add to history
-        try:
-            input_name = Path(f).stem
-            out_file = os.path.join(output_dir, f"{input_name}.{output_format.lower()}")
-            HISTORY.add_conversion(
-                input_file=f,
-                input_format=Path(f).suffix.lower().lstrip('.'),
-                output_file=out_file,
-                output_format=output_format.lower(),
-                file_size=os.path.getsize(f) if os.path.exists(f) else 0,
-                conversion_time=0,
-                success=ok,
-                error_message=err,
-            )
-        except Exception:
-            pass
+    for position, f in files:
+        future = EXECUTOR.submit(f, output_format, output_dir, task_id=(job_id, position, f),
+                                 priority=priority, client=client, trace=trace,
+                                 profile_dir=str(PROFILE_DIR / job_id) if PROFILE_DIR else None,
+                                 options=options)
+        future.add_done_callback(
+            lambda fut, position=position, f=f:
+                _on_file_done(job_id, position, f, output_format, output_dir, fut)
+        )
+
+
+def _client_id(request: Request) -> str:
+    """Fair-share key: explicit X-Client-Id header, else the peer address."""
+    client = request.headers.get("x-client-id")
+    if not client and request.client is not None:
+        client = request.client.host
+    return client or "anonymous"
+
+
+def _check_priority(priority: Optional[str]):
+    if priority is not None and priority not in PRIORITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Priorité inconnue: {priority} (attendu: {', '.join(PRIORITIES)})",
+        )
+
+
+def _conversion_options(ops: Optional[str], tiled: bool = False, extract_frames: bool = False) -> Optional[dict]:
+    """Converter options of a job: requested image ops, then those of the image settings."""
+    try:
+        requested = [repr(op) for op in image_ops.parse_ops(ops)]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    ops = requested + image_ops.config_ops(CONFIG)
+    options = {"ops": ",".join(ops)} if ops else {}
+    if tiled:
+        options["tiled"] = True
+    if extract_frames:
+        options["extract_frames"] = True
+    return options or None
+
+
+def _trace_mode(trace: bool, trace_memory: bool) -> Optional[str]:
+    if trace_memory:
+        return "memory"
+    return "time" if trace else None
+
+
+def _start_job(job_id: str, files: List[str], output_format: str, output_dir: str,
+               priority: Optional[str] = None, client: Optional[str] = None, trace: Optional[str] = None,
+               options: Optional[dict] = None):
+    status = JobStatus(job_id=job_id, total=len(files), processed=0, success=0, failed=0)
+    status.message = "En attente d'un processus de conversion"
+    _evict_finished_jobs()
+    try:
+        JOB_STORE.create_job(job_id, files, output_format, output_dir, priority, client, options)
         with JOBS_LOCK:
-            status.processed += 1
-            if ok:
-                status.success += 1
-            else:
-                status.failed += 1
-    with JOBS_LOCK:
-        status.done = True
-        status.message = "Conversion terminée"
+            JOBS[job_id] = status
+            if trace:
+                TRACES[job_id] = []
+        _run_job(job_id, list(enumerate(files)), output_format, output_dir, priority, client, trace, options)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _with_queue_info(status: JobStatus) -> JobStatus:
+    """Fill in queue position and ETA of a running job (computed on demand)."""
+    if not status.done:
+        info = EXECUTOR.queue_info(lambda task_id: task_id[0] == status.job_id)
+        status.queue_position = info["position"]
+        status.eta_seconds = round(info["eta"], 1) if info["eta"] is not None else None
+    return status
 
 
 @app.post("/convert")
-def convert(req: ConvertRequest):
+def convert(req: ConvertRequest, request: Request):
     if not req.files:
         raise HTTPException(status_code=400, detail="Aucun fichier fourni")
+    _check_priority(req.priority)
+    options = _conversion_options(req.ops, req.tiled, req.extract_frames)
     job_id = str(uuid.uuid4())
-    status = JobStatus(job_id=job_id, total=len(req.files), processed=0, success=0, failed=0)
-    with JOBS_LOCK:
-        JOBS[job_id] = status
-    t = threading.Thread(target=_run_job, args=(job_id, req.files, req.output_format, req.output_dir), daemon=True)
-    t.start()
+    _start_job(job_id, req.files, req.output_format, req.output_dir, req.priority, _client_id(request),
+               _trace_mode(req.trace, req.trace_memory), options)
     return {"job_id": job_id}
 
 
+@app.post("/convert/upload")
+async def convert_upload(request: Request, output_format: Optional[str] = Query(None),
+                         priority: Optional[str] = Query(None), trace: bool = Query(False),
+                         trace_memory: bool = Query(False), ops: Optional[str] = Query(None),
+                         tiled: bool = Query(False), extract_frames: bool = Query(False)):
+    _check_priority(priority)
+    if ops is not None:
+        # Checked before receiving the files
+        _conversion_options(ops)
+    job_id = str(uuid.uuid4())
+    job_dir = SPOOL_ROOT / job_id
+    max_mb = CONFIG.get("advanced.max_file_size_mb", 500)
+    try:
+        spooler = MultipartSpooler(
+            request.headers.get("content-type"),
+            job_dir / "in",
+            max_file_size=int(max_mb * 1024 * 1024) if max_mb else None,
+        )
+        try:
+            # Disk writes run off the event loop, one received chunk at a time
+            async for chunk in request.stream():
+                await run_in_threadpool(spooler.feed, chunk)
+            spooler.finish()
+        finally:
+            spooler.close()
+        output_format = output_format or spooler.fields.get("output_format")
+        ops = ops or spooler.fields.get("ops")
+        tiled = tiled or spooler.fields.get("tiled", "").lower() in ("1", "true", "yes", "on")
+        extract_frames = (extract_frames
+                          or spooler.fields.get("extract_frames", "").lower() in ("1", "true", "yes", "on"))
+        if not spooler.files:
+            raise UploadError("Aucun fichier fourni")
+        if not output_format:
+            raise UploadError("Format de sortie manquant")
+    except UploadTooLarge as e:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise HTTPException(status_code=400, detail=str(e))
+    except BaseException:
+        # Client gone mid-upload (or server shutting down): drop the partial spool
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise
+
+    try:
+        options = _conversion_options(ops, tiled, extract_frames)
+    except HTTPException:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise
+    # The job store insert (SQLite) and the submission block: kept off the event loop
+    await run_in_threadpool(_start_job, job_id, [str(p) for p in spooler.files], output_format,
+                            str(job_dir / "out"), priority, _client_id(request),
+                            _trace_mode(trace, trace_memory), options)
+    return {"job_id": job_id, "files": [p.name for p in spooler.files]}
+
+
+def _job_outputs_dir(job_id: str) -> Path:
+    """Output directory of an uploaded job (path-based jobs write to client directories)."""
+    record = JOB_STORE.get_job(job_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="Job introuvable")
+    out_dir = Path(record["output_dir"]).resolve()
+    if out_dir.parent.parent != SPOOL_ROOT or not out_dir.is_dir():
+        raise HTTPException(status_code=404, detail="Aucune sortie téléchargeable pour ce job")
+    return out_dir
+
+
+@app.get("/jobs/{job_id}/outputs")
+def list_outputs(job_id: str):
+    out_dir = _job_outputs_dir(job_id)
+    with os.scandir(out_dir) as entries:
+        items = [
+            {"name": e.name, "size": e.stat().st_size}
+            for e in entries if e.is_file() and not e.name.startswith(".")
+        ]
+    return {"outputs": sorted(items, key=lambda item: item["name"])}
+
+
+@app.get("/jobs/{job_id}/outputs/{name}")
+def download_output(job_id: str, name: str):
+    out_dir = _job_outputs_dir(job_id)
+    path = out_dir / name
+    if Path(name).name != name or name.startswith(".") or not path.is_file():
+        raise HTTPException(status_code=404, detail="Fichier introuvable")
+    # FileResponse streams in chunks (or hands the path to the server via
+    # the ASGI pathsend extension) and answers Range / If-Range requests
+    return FileResponse(path, filename=name)
+
+
 @app.get("/jobs/{job_id}")
 def get_job(job_id: str):
-    st = JOBS.get(job_id)
+    _evict_finished_jobs()
+    with JOBS_LOCK:
+        st = JOBS.get(job_id)
+        if st is not None:
+            st = st.model_copy(deep=True)
+    if st is not None:
+        return _with_queue_info(st)
+    st = _find_stored_job(job_id)
     if not st:
         raise HTTPException(status_code=404, detail="Job introuvable")
     return st
 
 
+@app.get("/jobs/{job_id}/trace")
+def get_job_trace(job_id: str):
+    with JOBS_LOCK:
+        spans = TRACES.get(job_id)
+        spans = list(spans) if spans is not None else None
+        status = JOBS.get(job_id)
+        done = status.done if status is not None else None
+    if spans is None:
+        if status is None and JOB_STORE.get_job(job_id) is None:
+            raise HTTPException(status_code=404, detail="Job introuvable")
+        raise HTTPException(status_code=404, detail="Aucune mesure pour ce job (soumettre avec \"trace\": true)")
+    return tracing.chrome_trace(spans, {"job_id": job_id, "done": done})
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    with JOBS_LOCK:
+        st = JOBS.get(job_id)
+        if st is not None and not st.done:
+            st.cancelled = True
+            st.message = "Annulation en cours"
+    if st is None:
+        st = _find_stored_job(job_id)
+        if not st:
+            raise HTTPException(status_code=404, detail="Job introuvable")
+        if not st.done:
+            # Interrupted job that is not running in this process
+            JOB_STORE.cancel_pending(job_id, error_type=CANCELLED)
+            JOB_STORE.finish_job(job_id)
+            st = _find_stored_job(job_id)
+        return st
+    if st.cancelled:
+        # Kept once the job leaves memory; written before the cancelled files are recorded
+        STORE_WRITES.put((JOB_STORE.mark_cancelled, (job_id,)))
+    # Results arrive through _on_file_done like any other failure
+    EXECUTOR.cancel(lambda task_id: task_id[0] == job_id)
+    return get_job(job_id)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _subscribe_snapshot(job_id: str, loop: asyncio.AbstractEventLoop):
+    """Snapshot of a job and its event queue (None once nothing more will be published)."""
+    # Snapshot and subscription under the same lock: no event can slip in between
+    with JOBS_LOCK:
+        st = JOBS.get(job_id)
+        if st is not None:
+            snapshot = st.model_copy(deep=True)
+            events = EVENTS.subscribe(job_id, loop) if not st.done else None
+    if st is not None:
+        return _with_queue_info(snapshot).model_dump(), events
+    st = _find_stored_job(job_id)
+    if not st:
+        raise HTTPException(status_code=404, detail="Job introuvable")
+    # Not running in this process: nothing more will be published
+    return st.model_dump(), None
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    # JOBS_LOCK, queue info and the stored job are blocking: kept off the event loop
+    snapshot, events = await run_in_threadpool(_subscribe_snapshot, job_id, asyncio.get_running_loop())
+
+    async def stream():
+        try:
+            yield _sse("job-status", snapshot)
+            if events is None:
+                if snapshot["done"]:
+                    yield _sse("job-done", snapshot)
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(events.get(), timeout=SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                name = "job-done" if event["type"] == "done" else f"file-{event['type']}"
+                yield _sse(name, event)
+                if event["type"] == "done":
+                    return
+        finally:
+            if events is not None:
+                EVENTS.unsubscribe(job_id, events)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/history/recent")
 def history_recent(limit: int = Query(100, ge=1, le=1000)):
     return {"items": HISTORY.get_recent_conversions(limit=limit)}
 
 
+@app.get("/metrics")
+def get_metrics():
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    if CACHE is None:
+        return {"enabled": False}
+    return {"enabled": True, **CACHE.get_stats()}
+
+
 @app.post("/open_folder")
 def open_folder(req: OpenFolderRequest):
     try:
@@ -238,6 +808,60 @@ def open_folder(req: OpenFolderRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _cleanup_spool():
+    """Remove spool directories of jobs purged from the store (or never registered)."""
+    if not SPOOL_ROOT.is_dir():
+        return
+    with os.scandir(SPOOL_ROOT) as entries:
+        for entry in entries:
+            if entry.is_dir() and JOB_STORE.get_job(entry.name) is None:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+
+@app.on_event("startup")
+def resume_jobs():
+    """Resume jobs interrupted by a restart, skipping files already converted."""
+    try:
+        JOB_STORE.purge_finished()
+        records = JOB_STORE.get_unfinished_jobs()
+    except Exception as e:
+        logger.error("Impossible de lire les jobs interrompus: %s", e)
+        return
+    _cleanup_spool()
+    for record in records:
+        job_id = record["job_id"]
+        status = _status_from_record(record)
+        pending = [(f["position"], f["file"]) for f in record["files"] if f["state"] == PENDING]
+        if pending and record["cancelled"]:
+            # Cancelled just before the restart: the remaining files are not converted
+            JOB_STORE.cancel_pending(job_id, error_type=CANCELLED)
+            status = _status_from_record(JOB_STORE.get_job(job_id))
+            pending = []
+        if not pending:
+            # Every file finished just before the restart
+            status.done = True
+            status.message = "Conversion annulée" if status.cancelled else "Conversion terminée"
+            JOB_STORE.finish_job(job_id)
+        with JOBS_LOCK:
+            JOBS[job_id] = status
+            if status.done:
+                JOB_FINISHED_AT[job_id] = time.monotonic()
+        if pending:
+            try:
+                _run_job(job_id, pending, record["output_format"], record["output_dir"],
+                         record["priority"], record["client"], options=record["options"])
+            except Exception as e:
+                logger.error("Impossible de reprendre le job %s: %s", job_id, e)
+
+
+@app.on_event("shutdown")
+def shutdown_executor():
+    EXECUTOR.shutdown(wait=False)
+    # Cancelled files are recorded too: let the writer drain the queue
+    STORE_WRITES.put(None)
+    STORE_WRITER.join(10)
+
+
 def run():
     import uvicorn
     port = int(os.environ.get("PTITCONVERT_PORT", "8787"))
@@ -245,4 +869,6 @@ def run():
 
 
 if __name__ == "__main__":
+    # Required for the worker pool in PyInstaller builds
+    multiprocessing.freeze_support()
     run()
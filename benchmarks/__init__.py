@@ -0,0 +1,3 @@
+"""
+Mesures de performance de PtitConvert
+"""
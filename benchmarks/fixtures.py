@@ -0,0 +1,277 @@
+"""
+Fichiers de test synthétiques pour les mesures de performance
+Chaque générateur produit un fichier déterministe (même contenu d'une
+exécution à l'autre) ; les générateurs dont la bibliothèque manque sont
+ignorés. Les fichiers existants sont réutilisés.
+"""
+
+import io
+import math
+import random
+import struct
+import tarfile
+import wave
+import zipfile
+from pathlib import Path
+
+from utils.lazy import is_available, lazy_import
+
+Image = lazy_import('PIL.Image')
+
+# Tailles d'images (largeur, hauteur) ; 'large' est ignorée en mode rapide
+IMAGE_SIZES = {'small': (256, 256), 'medium': (1024, 768), 'large': (4000, 3000)}
+IMAGE_FORMATS = {'png': 'PNG', 'jpg': 'JPEG', 'bmp': 'BMP', 'gif': 'GIF', 'tiff': 'TIFF', 'webp': 'WEBP'}
+# Formats générés en grande taille (les autres coûtent du temps sans rien apprendre de plus)
+LARGE_IMAGE_FORMATS = ('png', 'jpg', 'tiff')
+
+WORDS = ('conversion fichier rapide mesure document image archive tableau texte page '
+         'format sortie entrée qualité taille mémoire débit processus résultat').split()
+
+
+def _text(paragraphs, words_per_paragraph=80, seed=0):
+    rng = random.Random(seed)
+    return [
+        ' '.join(rng.choice(WORDS) for _ in range(words_per_paragraph)).capitalize() + '.'
+        for _ in range(paragraphs)
+    ]
+
+
+def _image(size):
+    """Image RGB à la fois lisse (dégradés) et bruitée : compression réaliste"""
+    width, height = size
+    red = Image.linear_gradient('L').resize(size)
+    green = Image.radial_gradient('L').resize(size)
+    blue = Image.effect_noise(size, 48)
+    return Image.merge('RGB', (red, green, blue))
+
+
+def make_images(directory, quick=False):
+    if Image is None:
+        return []
+    made = []
+    for size_name, size in IMAGE_SIZES.items():
+        if size_name == 'large' and quick:
+            continue
+        picture = None
+        for ext, pil_format in IMAGE_FORMATS.items():
+            if size_name == 'large' and ext not in LARGE_IMAGE_FORMATS:
+                continue
+            path = directory / f"image_{size_name}.{ext}"
+            if not path.exists():
+                if picture is None:
+                    picture = _image(size)
+                frame = picture.convert('P', palette=Image.ADAPTIVE) if ext == 'gif' else picture
+                frame.save(path, pil_format)
+            made.append(path)
+    return made
+
+
+def make_text(directory, quick=False):
+    path = directory / 'document.txt'
+    if not path.exists():
+        path.write_text('\n\n'.join(_text(200 if quick else 2000)), encoding='utf-8')
+    return [path]
+
+
+def make_rtf(directory, quick=False):
+    path = directory / 'document.rtf'
+    if not path.exists():
+        body = '\n'.join(f"{p}\\par" for p in _text(100 if quick else 500, seed=1))
+        path.write_text('{\\rtf1\\ansi\\deff0 {\\fonttbl {\\f0 Helvetica;}}\n' + body + '\n}', encoding='utf-8')
+    return [path]
+
+
+def make_pdf(directory, quick=False):
+    if not is_available('reportlab'):
+        return []
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    path = directory / 'document.pdf'
+    if not path.exists():
+        pdf = canvas.Canvas(str(path), pagesize=A4)
+        paragraphs = _text(10 if quick else 50, words_per_paragraph=12, seed=2)
+        for page in range(5 if quick else 30):
+            y = 800
+            for line in paragraphs[:50]:
+                pdf.drawString(40, y, f"{page + 1}. {line}")
+                y -= 15
+            pdf.showPage()
+        pdf.save()
+    return [path]
+
+
+def make_csv(directory, quick=False):
+    path = directory / 'table.csv'
+    if not path.exists():
+        rng = random.Random(3)
+        rows = 5000 if quick else 200000
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write('id,nom,categorie,quantite,prix,total,date,commentaire\n')
+            for i in range(rows):
+                quantity = rng.randint(1, 100)
+                price = round(rng.uniform(1, 500), 2)
+                f.write(f"{i},article{i},{rng.choice(WORDS)},{quantity},{price},"
+                        f"{round(quantity * price, 2)},2024-{1 + i % 12:02d}-{1 + i % 28:02d},"
+                        f"{rng.choice(WORDS)} {rng.choice(WORDS)}\n")
+    return [path]
+
+
+def make_xlsx(directory, quick=False):
+    if not is_available('openpyxl'):
+        return []
+    import openpyxl
+
+    path = directory / 'table.xlsx'
+    if not path.exists():
+        rng = random.Random(4)
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet('Données')
+        sheet.append(['id', 'nom', 'quantite', 'prix'])
+        for i in range(1000 if quick else 20000):
+            sheet.append([i, f"article{i}", rng.randint(1, 100), round(rng.uniform(1, 500), 2)])
+        workbook.save(path)
+    return [path]
+
+
+def make_docx(directory, quick=False):
+    if not is_available('docx'):
+        return []
+    import docx
+
+    path = directory / 'document.docx'
+    if not path.exists():
+        document = docx.Document()
+        document.add_heading('Document de mesure', 0)
+        for paragraph in _text(50 if quick else 400, seed=5):
+            document.add_paragraph(paragraph)
+        document.save(path)
+    return [path]
+
+
+def make_epub(directory, quick=False):
+    if not is_available('ebooklib'):
+        return []
+    from ebooklib import epub
+
+    path = directory / 'livre.epub'
+    if not path.exists():
+        book = epub.EpubBook()
+        book.set_identifier('ptitconvert-bench')
+        book.set_title('Livre de mesure')
+        book.set_language('fr')
+        chapters = []
+        for index in range(3 if quick else 20):
+            chapter = epub.EpubHtml(title=f"Chapitre {index + 1}", file_name=f"chap_{index}.xhtml", lang='fr')
+            body = ''.join(f"<p>{p}</p>" for p in _text(30, seed=index))
+            chapter.content = f"<h1>Chapitre {index + 1}</h1>{body}"
+            book.add_item(chapter)
+            chapters.append(chapter)
+        book.toc = chapters
+        book.spine = ['nav'] + chapters
+        book.add_item(epub.EpubNcx())
+        book.add_item(epub.EpubNav())
+        epub.write_epub(str(path), book)
+    return [path]
+
+
+def make_odt(directory, quick=False):
+    if not is_available('odf'):
+        return []
+    from odf.opendocument import OpenDocumentText
+    from odf.text import P
+
+    path = directory / 'document.odt'
+    if not path.exists():
+        document = OpenDocumentText()
+        for paragraph in _text(50 if quick else 400, seed=6):
+            document.text.addElement(P(text=paragraph))
+        document.save(str(path))
+    return [path]
+
+
+def _archive_members(quick):
+    """Contenu des archives : textes compressibles et données peu compressibles"""
+    rng = random.Random(7)
+    members = []
+    for index in range(5 if quick else 40):
+        members.append((f"docs/texte_{index}.txt", '\n'.join(_text(40, seed=index)).encode('utf-8')))
+        members.append((f"data/bloc_{index}.bin", rng.getrandbits(8 * 65536).to_bytes(65536, 'little')))
+    return members
+
+
+def make_archives(directory, quick=False):
+    members = None
+    made = []
+    targets = {'archive.zip': 'zip', 'archive.tar': 'tar', 'archive.tar.gz': 'tar.gz'}
+    if is_available('py7zr'):
+        targets['archive.7z'] = '7z'
+    for name, kind in targets.items():
+        path = directory / name
+        made.append(path)
+        if path.exists():
+            continue
+        if members is None:
+            members = _archive_members(quick)
+        if kind == 'zip':
+            with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+                for member, data in members:
+                    archive.writestr(member, data)
+        elif kind == '7z':
+            import py7zr
+            with py7zr.SevenZipFile(path, 'w') as archive:
+                for member, data in members:
+                    archive.writef(io.BytesIO(data), member)
+        else:
+            with tarfile.open(path, 'w:gz' if kind == 'tar.gz' else 'w') as archive:
+                for member, data in members:
+                    info = tarfile.TarInfo(member)
+                    info.size = len(data)
+                    # Date fixe postérieure à 1980 (sinon la conversion en ZIP échoue)
+                    info.mtime = 1700000000
+                    archive.addfile(info, io.BytesIO(data))
+    return made
+
+
+def make_wav(directory, quick=False):
+    path = directory / 'tone.wav'
+    if not path.exists():
+        rate = 44100
+        seconds = 3 if quick else 30
+        with wave.open(str(path), 'wb') as output:
+            output.setnchannels(1)
+            output.setsampwidth(2)
+            output.setframerate(rate)
+            step = 2 * math.pi * 440 / rate
+            output.writeframes(b''.join(
+                struct.pack('<h', int(12000 * math.sin(step * i))) for i in range(rate * seconds)
+            ))
+    return [path]
+
+
+GENERATORS = (
+    make_images, make_text, make_rtf, make_pdf, make_csv, make_xlsx,
+    make_docx, make_epub, make_odt, make_archives, make_wav,
+)
+
+
+def generate(directory, quick=False):
+    """
+    Générer (ou réutiliser) tous les fichiers de test
+
+    Args:
+        directory (str): Dossier des fichiers de test
+        quick (bool): Fichiers réduits, sans les grandes images
+
+    Returns:
+        list: Chemins des fichiers disponibles
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for generator in GENERATORS:
+        try:
+            paths.extend(generator(directory, quick))
+        except Exception as e:
+            print(f"Fichiers de test {generator.__name__} ignorés: {e}")
+    return paths
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Mesure du temps d'import des points d'entrée de PtitConvert
+
+Lance `python -X importtime -c "import <module>"` plusieurs fois par module,
+garde le meilleur temps cumulé et le compare au budget de
+benchmarks/import_time_budget.json. Échoue aussi si une bibliothèque lourde
+(pandas, reportlab, ...) est importée au démarrage.
+
+Usage:
+  python benchmarks/import_time.py [--runs 5] [--top 10] [--json resultats.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BUDGET_FILE = Path(__file__).resolve().with_name('import_time_budget.json')
+
+
+def measure(module, runs):
+    """
+    Mesurer l'import d'un module dans des interpréteurs neufs
+
+    Args:
+        module (str): Module à importer
+        runs (int): Nombre de mesures (la plus rapide est retenue)
+
+    Returns:
+        dict: Temps cumulé (ms), modules importés et temps propres du meilleur essai
+    """
+    env = dict(os.environ, PYTHONPATH=str(ROOT), PYTHONDONTWRITEBYTECODE='')
+    best = None
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=ROOT, env=env, capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"Import de {module} impossible:\n{completed.stderr}")
+        run = parse_importtime(completed.stderr, module)
+        if best is None or run['cumulative_ms'] < best['cumulative_ms']:
+            best = run
+    return best
+
+
+def parse_importtime(output, module):
+    """
+    Analyser la sortie de -X importtime
+
+    Returns:
+        dict: cumulative_ms (module visé), modules (noms importés), self_us (temps propres)
+    """
+    cumulative_ms = None
+    self_us = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        try:
+            own, cumulative, name = line[len('import time:'):].split('|')
+            own, cumulative = int(own), int(cumulative)
+        except ValueError:
+            continue
+        name = name.strip()
+        self_us[name] = self_us.get(name, 0) + own
+        if name == module:
+            cumulative_ms = cumulative / 1000
+    return {'cumulative_ms': cumulative_ms, 'modules': sorted(self_us), 'self_us': self_us}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps d'import des points d'entrée de PtitConvert")
+    parser.add_argument('--runs', type=int, default=5, help='Mesures par module (défaut: 5)')
+    parser.add_argument('--top', type=int, default=10, help='Modules les plus coûteux à afficher')
+    parser.add_argument('--json', help='Écrire les résultats dans ce fichier JSON')
+    parser.add_argument('--budget', default=str(BUDGET_FILE), help='Fichier de budget')
+    args = parser.parse_args()
+
+    budget = json.loads(Path(args.budget).read_text(encoding='utf-8'))
+    forbidden = set(budget.get('forbidden', ()))
+    results = {}
+    failures = []
+
+    for module, limits in budget['modules'].items():
+        run = measure(module, args.runs)
+        loaded = {name.split('.')[0] for name in run['modules']}
+        heavy = sorted(loaded & forbidden)
+        max_ms = limits.get('max_ms')
+        results[module] = {'cumulative_ms': run['cumulative_ms'], 'max_ms': max_ms, 'heavy_imports': heavy}
+
+        status = 'OK'
+        if max_ms is not None and run['cumulative_ms'] > max_ms:
+            status = 'TROP LENT'
+            failures.append(f"{module}: {run['cumulative_ms']:.1f} ms > {max_ms} ms")
+        if heavy:
+            status = 'IMPORTS LOURDS'
+            failures.append(f"{module}: importe {', '.join(heavy)} au démarrage")
+        print(f"{module:<24} {run['cumulative_ms']:>9.1f} ms  (budget {max_ms} ms)  {status}")
+
+        slowest = sorted(run['self_us'].items(), key=lambda item: item[1], reverse=True)[:args.top]
+        for name, own in slowest:
+            print(f"    {own / 1000:>8.1f} ms  {name}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding='utf-8')
+    if failures:
+        print('\nÉchecs:')
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
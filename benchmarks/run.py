@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Mesures de performance de toutes les conversions de PtitConvert
+
+Génère des fichiers de test synthétiques (benchmarks/fixtures.py), puis
+mesure chaque conversion supportée dans un processus neuf : durée (à froid
+et meilleure/médiane à chaud), débit, pic de mémoire résidente et pic
+d'allocations Python. Les résultats sont écrits en JSON et peuvent être
+comparés à une référence.
+
+Usage:
+  python benchmarks/run.py [--quick] [--only png] [--repeats 3] [--output resultats.json]
+                           [--baseline reference.json] [--threshold 0.25]
+  python ptitconvert_cli.py bench [mêmes options]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks import fixtures
+from converters import registry
+from utils.memory import peak_rss_mb
+
+DEFAULT_FIXTURES_DIR = Path(tempfile.gettempdir()) / 'ptitconvert-bench'
+# Délai maximal d'une conversion mesurée (secondes)
+CASE_TIMEOUT = 600
+# En deçà, un écart de durée est considéré comme du bruit de mesure (secondes)
+NOISE_FLOOR = 0.005
+
+
+def _convert_once(input_path, output_format, output_dir):
+    """Convertir dans un dossier vide ; retourne (succès, durée, erreur, pic mémoire en Mo)"""
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.makedirs(output_dir)
+    start = time.perf_counter()
+    try:
+        result = registry.convert(input_path, output_dir, output_format)
+        ok, error, peak = result.success, result.error, result.peak_memory_mb
+    except Exception as e:
+        ok, error, peak = False, f"{type(e).__name__}: {e}", None
+    elapsed = time.perf_counter() - start
+    # Sans remise à zéro du pic par le registre, pic du processus depuis son démarrage
+    return ok, elapsed, error, peak if peak is not None else peak_rss_mb()
+
+
+def _measure_case(conn, input_path, output_format, repeats, work_dir):
+    """Mesurer une conversion (exécuté dans un processus dédié)"""
+    baseline_rss = peak_rss_mb()
+    output_dir = os.path.join(work_dir, 'out')
+    ok, cold, error, peak_rss = _convert_once(input_path, output_format, output_dir)
+    result = {'ok': ok, 'cold_s': cold, 'baseline_rss_mb': baseline_rss}
+    if not ok:
+        result['error'] = error or 'échec sans message'
+        conn.send(result)
+        return
+
+    times = []
+    for _ in range(repeats):
+        _, elapsed, _, peak = _convert_once(input_path, output_format, output_dir)
+        times.append(elapsed)
+        if peak is not None and (peak_rss is None or peak > peak_rss):
+            peak_rss = peak
+    output_bytes = sum(f.stat().st_size for f in Path(output_dir).rglob('*') if f.is_file())
+
+    # Allocations mesurées à part : tracemalloc ralentit la conversion
+    tracemalloc.start()
+    _convert_once(input_path, output_format, output_dir)
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result.update({
+        'min_s': min(times),
+        'median_s': statistics.median(times),
+        'output_bytes': output_bytes,
+        'alloc_peak_mb': alloc_peak / (1024 * 1024),
+        'peak_rss_mb': peak_rss,
+    })
+    conn.send(result)
+
+
+def run_case(input_path, output_format, repeats):
+    """
+    Mesurer une conversion dans un processus neuf (pic mémoire propre à la conversion)
+
+    Returns:
+        dict: Mesures, ou 'ok': False et 'error'
+    """
+    context = multiprocessing.get_context('spawn')
+    work_dir = tempfile.mkdtemp(prefix='ptitconvert-bench-')
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_measure_case, args=(child_conn, str(input_path), output_format, repeats, work_dir)
+    )
+    try:
+        process.start()
+        child_conn.close()
+        if parent_conn.poll(CASE_TIMEOUT):
+            try:
+                result = parent_conn.recv()
+            except EOFError:
+                result = {'ok': False, 'error': f"processus arrêté (code {process.exitcode})"}
+        else:
+            process.kill()
+            result = {'ok': False, 'error': f"délai dépassé ({CASE_TIMEOUT} s)"}
+        process.join(5)
+        if process.is_alive():
+            process.kill()
+        return result
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def build_cases(paths, only=None):
+    """
+    Lister les conversions à mesurer : chaque fichier de test vers chacun de ses formats
+
+    Returns:
+        list: Tuples (nom du cas, chemin, format de sortie, convertisseur)
+    """
+    cases = []
+    for path in sorted(paths):
+        for output_format in registry.get_output_formats(registry.get_extension(str(path))):
+            name = f"{path.name}->{output_format}"
+            converter = registry.get_converter_name(str(path), output_format)
+            if only and not any(term in name or term == converter for term in only):
+                continue
+            cases.append((name, path, output_format, converter))
+    return cases
+
+
+def compare(results, baseline, threshold):
+    """
+    Comparer des résultats à une référence
+
+    Args:
+        results (dict): {nom du cas: mesures}
+        baseline (dict): Résultats de référence (même format)
+        threshold (float): Hausse relative tolérée (0.25 = +25 %)
+
+    Returns:
+        list: Lignes décrivant les régressions (vide si aucune)
+    """
+    regressions = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if not reference or not reference.get('ok'):
+            continue
+        if not current.get('ok'):
+            regressions.append(f"{name}: échoue désormais ({current.get('error')})")
+            continue
+        before, after = reference['median_s'], current['median_s']
+        if after > before * (1 + threshold) and after - before > NOISE_FLOOR:
+            regressions.append(f"{name}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms "
+                               f"(+{(after / before - 1) * 100:.0f} %)")
+        for key, label in (('peak_rss_mb', 'mémoire résidente'), ('alloc_peak_mb', 'allocations')):
+            before, after = reference.get(key), current.get(key)
+            if before and after and after > before * (1 + threshold) and after - before > 1:
+                regressions.append(f"{name}: {label} {before:.1f} Mo -> {after:.1f} Mo")
+    return regressions
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(
+        prog='bench', description='Mesures de performance de toutes les conversions de PtitConvert'
+    )
+    parser.add_argument('--quick', action='store_true',
+                        help='Fichiers de test réduits (sans les grandes images)')
+    parser.add_argument('--only', action='append',
+                        help='Ne mesurer que les cas contenant ce texte ou ce convertisseur (répétable)')
+    parser.add_argument('--repeats', type=int, default=3, help='Mesures à chaud par cas (défaut: 3)')
+    parser.add_argument('--fixtures', default=str(DEFAULT_FIXTURES_DIR),
+                        help=f'Dossier des fichiers de test (défaut: {DEFAULT_FIXTURES_DIR})')
+    parser.add_argument('--output', '-o', help='Écrire les résultats dans ce fichier JSON')
+    parser.add_argument('--baseline', help='Résultats JSON de référence à comparer')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Hausse tolérée par rapport à la référence (défaut: 0.25 = +25 %%)')
+    return parser
+
+
+def main(argv=None):
+    args = create_parser().parse_args(argv)
+    fixtures_dir = Path(args.fixtures) / ('quick' if args.quick else 'full')
+    print(f"Fichiers de test: {fixtures_dir}")
+    paths = fixtures.generate(fixtures_dir, quick=args.quick)
+    cases = build_cases(paths, args.only)
+    print(f"{len(cases)} conversion(s) à mesurer\n")
+
+    results = {}
+    for index, (name, path, output_format, converter) in enumerate(cases, 1):
+        measure = run_case(path, output_format, max(args.repeats, 1))
+        size = path.stat().st_size
+        measure.update({
+            'converter': converter,
+            'input': path.name,
+            'output_format': output_format,
+            'input_bytes': size,
+        })
+        if measure['ok']:
+            measure['throughput_mb_s'] = size / (1024 * 1024) / measure['median_s'] if measure['median_s'] else None
+            rss = measure['peak_rss_mb']
+            print(f"[{index}/{len(cases)}] {name:<32} {measure['median_s'] * 1000:>9.1f} ms  "
+                  f"{measure['throughput_mb_s'] or 0:>8.2f} Mo/s  "
+                  f"RSS {rss if rss is not None else 0:>7.1f} Mo  alloc {measure['alloc_peak_mb']:>7.1f} Mo")
+        else:
+            print(f"[{index}/{len(cases)}] {name:<32} ÉCHEC: {measure.get('error')}")
+        results[name] = measure
+
+    report = {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'quick': args.quick,
+            'repeats': args.repeats,
+        },
+        'results': results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(f"\nRésultats écrits dans {args.output}")
+
+    failed = sum(1 for r in results.values() if not r['ok'])
+    print(f"\n{len(results) - failed} cas mesuré(s), {failed} en échec")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRégressions par rapport à {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"Aucune régression par rapport à {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,32 +3,38 @@ Convertisseur de nouveaux formats pour PtitConvert
 Gère EPUB, ODT, RTF et autres formats avancés
 """
 
+import logging
 import os
 from pathlib import Path
-try:
-    import ebooklib
-    from ebooklib import epub
-    EPUB_AVAILABLE = True
-except ImportError:
-    EPUB_AVAILABLE = False
-
-try:
-    from odf.opendocument import OpenDocumentText
-    from odf.text import P
-    from odf import text, teletype
-    ODT_AVAILABLE = True
-except ImportError:
-    ODT_AVAILABLE = False
-
-from docx import Document
 import zipfile
 import xml.etree.ElementTree as ET
 
+from converters.result import UNSUPPORTED_FORMAT, ConversionResult
+from utils import tracing
+from utils.lazy import LazyModule, lazy_import
+
+logger = logging.getLogger(__name__)
+
+# Chargés au premier usage ; None si la bibliothèque n'est pas installée
+ebooklib = lazy_import('ebooklib')
+epub = lazy_import('ebooklib.epub')
+EPUB_AVAILABLE = epub is not None
+
+odf_opendocument = lazy_import('odf.opendocument')
+odf_text = lazy_import('odf.text')
+ODT_AVAILABLE = odf_opendocument is not None
+
+docx = LazyModule('docx')
+
 class AdvancedDocumentConverter:
     """Convertisseur pour les formats de documents avancés"""
     
+    # À incrémenter quand le rendu change (invalide le cache de résultats)
+    VERSION = '1.0'
     SUPPORTED_INPUT_FORMATS = {'.epub', '.odt', '.rtf'}
-    SUPPORTED_OUTPUT_FORMATS = {'pdf', 'docx', 'txt', 'epub', 'odt'}
+    # Le PDF est obtenu via DocumentConverter (texte en mémoire, voir converters/planner.py)
+    SUPPORTED_OUTPUT_FORMATS = {'docx', 'txt', 'epub', 'odt'}
+    PAYLOAD_TYPE = 'text'
     
     def __init__(self):
         """Initialiser le convertisseur de documents avancés"""
@@ -44,7 +50,7 @@ class AdvancedDocumentConverter:
             output_format (str): Format de sortie
             
         Returns:
-            bool: True si la conversion a réussi
+            ConversionResult: Fichiers produits (évalué à False en cas d'échec)
         """
         try:
             input_path = Path(input_path)
@@ -52,37 +58,56 @@ class AdvancedDocumentConverter:
             
             # Vérifier les formats
             if input_path.suffix.lower() not in self.SUPPORTED_INPUT_FORMATS:
-                print(f"Format d'entrée non supporté: {input_path.suffix}")
-                return False
+                error = f"Format d'entrée non supporté: {input_path.suffix}"
+                logger.error(error)
+                return ConversionResult(False, error=error, error_type=UNSUPPORTED_FORMAT)
                 
             if output_format not in self.SUPPORTED_OUTPUT_FORMATS:
-                print(f"Format de sortie non supporté: {output_format}")
-                return False
+                error = f"Format de sortie non supporté: {output_format}"
+                logger.error(error)
+                return ConversionResult(False, error=error, error_type=UNSUPPORTED_FORMAT)
                 
             # Créer le nom de fichier de sortie
             output_name = f"{input_path.stem}.{output_format}"
             output_path = Path(output_dir) / output_name
             
             # Extraire le texte du document source
-            text_content = self._extract_text(input_path)
+            text_content = self.decode(input_path)
             if text_content is None:
-                return False
+                return ConversionResult(False)
                 
             # Convertir selon le format de sortie
+            ok = self.encode(text_content, output_path, output_format)
+            return ConversionResult.of(ok, output_path)
+                
+        except Exception as e:
+            logger.error("Erreur lors de la conversion: %s", e)
+            return ConversionResult.from_exception(e)
+            
+    def decode(self, input_path):
+        """Lire le texte d'un document sans écrire de fichier"""
+        input_path = Path(input_path)
+        with tracing.span('AdvancedDocumentConverter.decode', tracing.DECODE,
+                          format=input_path.suffix.lower().lstrip('.')) as decode_span:
+            text_content = self._extract_text(input_path)
+            decode_span.set(chars=len(text_content) if text_content is not None else 0)
+        return text_content
+        
+    def encode(self, text_content, output_path, output_format):
+        """Écrire un texte au format demandé (le titre EPUB reprend le nom du fichier)"""
+        output_path = Path(output_path)
+        output_format = output_format.lower()
+        with tracing.span('AdvancedDocumentConverter.encode', tracing.ENCODE, format=output_format):
             if output_format == 'txt':
                 return self._create_txt(text_content, output_path)
             elif output_format == 'docx':
                 return self._create_docx(text_content, output_path)
             elif output_format == 'epub':
-                return self._create_epub(text_content, output_path, input_path.stem)
+                return self._create_epub(text_content, output_path, output_path.stem)
             elif output_format == 'odt':
                 return self._create_odt(text_content, output_path)
             else:
                 return False
-                
-        except Exception as e:
-            print(f"Erreur lors de la conversion: {e}")
-            return False
             
     def _extract_text(self, input_path):
         """Extraire le texte selon le format d'entrée"""
@@ -100,7 +125,7 @@ class AdvancedDocumentConverter:
     def _extract_epub_text(self, epub_path):
         """Extraire le texte d'un fichier EPUB"""
         if not EPUB_AVAILABLE:
-            print("ebooklib n'est pas installé pour le support EPUB")
+            logger.error("ebooklib n'est pas installé pour le support EPUB")
             return None
             
         try:
@@ -120,7 +145,7 @@ class AdvancedDocumentConverter:
             return '\n\n'.join(text_content)
             
         except Exception as e:
-            print(f"Erreur lors de l'extraction EPUB: {e}")
+            logger.error("Erreur lors de l'extraction EPUB: %s", e)
             return None
             
     def _extract_odt_text(self, odt_path):
@@ -142,7 +167,7 @@ class AdvancedDocumentConverter:
             return '\n'.join([t for t in text_content if t])
             
         except Exception as e:
-            print(f"Erreur lors de l'extraction ODT: {e}")
+            logger.error("Erreur lors de l'extraction ODT: %s", e)
             return None
             
     def _extract_rtf_text(self, rtf_path):
@@ -161,7 +186,7 @@ class AdvancedDocumentConverter:
             return text.strip()
             
         except Exception as e:
-            print(f"Erreur lors de l'extraction RTF: {e}")
+            logger.error("Erreur lors de l'extraction RTF: %s", e)
             return None
             
     def _create_txt(self, text_content, output_path):
@@ -169,16 +194,16 @@ class AdvancedDocumentConverter:
         try:
             with open(output_path, 'w', encoding='utf-8') as file:
                 file.write(text_content)
-            print(f"TXT créé: {output_path}")
+            logger.info("TXT créé: %s", output_path)
             return True
         except Exception as e:
-            print(f"Erreur création TXT: {e}")
+            logger.error("Erreur création TXT: %s", e)
             return False
             
     def _create_docx(self, text_content, output_path):
         """Créer un document Word"""
         try:
-            doc = Document()
+            doc = docx.Document()
             
             paragraphs = text_content.split('\n\n')
             for para_text in paragraphs:
@@ -186,16 +211,16 @@ class AdvancedDocumentConverter:
                     doc.add_paragraph(para_text)
                     
             doc.save(str(output_path))
-            print(f"DOCX créé: {output_path}")
+            logger.info("DOCX créé: %s", output_path)
             return True
         except Exception as e:
-            print(f"Erreur création DOCX: {e}")
+            logger.error("Erreur création DOCX: %s", e)
             return False
             
     def _create_epub(self, text_content, output_path, title):
         """Créer un fichier EPUB"""
         if not EPUB_AVAILABLE:
-            print("ebooklib n'est pas installé pour créer des EPUB")
+            logger.error("ebooklib n'est pas installé pour créer des EPUB")
             return False
             
         try:
@@ -240,35 +265,35 @@ class AdvancedDocumentConverter:
             # Écrire le fichier
             epub.write_epub(str(output_path), book, {})
             
-            print(f"EPUB créé: {output_path}")
+            logger.info("EPUB créé: %s", output_path)
             return True
             
         except Exception as e:
-            print(f"Erreur création EPUB: {e}")
+            logger.error("Erreur création EPUB: %s", e)
             return False
             
     def _create_odt(self, text_content, output_path):
         """Créer un document ODT"""
         if not ODT_AVAILABLE:
-            print("odfpy n'est pas installé pour créer des ODT")
+            logger.error("odfpy n'est pas installé pour créer des ODT")
             return False
             
         try:
-            doc = OpenDocumentText()
+            doc = odf_opendocument.OpenDocumentText()
             
             paragraphs = text_content.split('\n\n')
             for para_text in paragraphs:
                 if para_text.strip():
-                    p = P()
+                    p = odf_text.P()
                     p.addText(para_text)
                     doc.text.addElement(p)
                     
             doc.save(str(output_path))
-            print(f"ODT créé: {output_path}")
+            logger.info("ODT créé: %s", output_path)
             return True
             
         except Exception as e:
-            print(f"Erreur création ODT: {e}")
+            logger.error("Erreur création ODT: %s", e)
             return False
             
     def get_supported_formats(self):
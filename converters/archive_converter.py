@@ -3,27 +3,34 @@ Convertisseur d'archives pour PtitConvert
 Gère la compression et décompression de ZIP, RAR, 7Z, TAR
 """
 
+import logging
 import os
 import zipfile
 import tarfile
 import shutil
 from pathlib import Path
-try:
-    import rarfile
-    RAR_AVAILABLE = True
-except ImportError:
-    RAR_AVAILABLE = False
 
-try:
-    import py7zr
-    SEVENZ_AVAILABLE = True
-except ImportError:
-    SEVENZ_AVAILABLE = False
+from converters.result import ConversionResult
+from utils import tracing
+from utils.lazy import lazy_import
+
+logger = logging.getLogger(__name__)
+
+# Chargés au premier usage ; None si la bibliothèque n'est pas installée
+rarfile = lazy_import('rarfile')
+RAR_AVAILABLE = rarfile is not None
+
+py7zr = lazy_import('py7zr')
+SEVENZ_AVAILABLE = py7zr is not None
 
 class ArchiveConverter:
     """Convertisseur pour les archives"""
     
+    # À incrémenter quand le rendu change (invalide le cache de résultats)
+    VERSION = '1.0'
     SUPPORTED_FORMATS = {'.zip', '.tar', '.tar.gz', '.tar.bz2', '.rar', '.7z'}
+    SUPPORTED_INPUT_FORMATS = SUPPORTED_FORMATS
+    SUPPORTED_OUTPUT_FORMATS = {'zip', 'tar', 'tar.gz', 'tar.bz2', '7z', 'extract'}
     
     def __init__(self):
         """Initialiser le convertisseur d'archives"""
@@ -46,23 +53,24 @@ class ArchiveConverter:
             output_path = Path(output_path)
             
             if not folder_path.exists() or not folder_path.is_dir():
-                print(f"Le dossier {folder_path} n'existe pas")
+                logger.error("Le dossier %s n'existe pas", folder_path)
                 return False
                 
             archive_format = archive_format.lower()
             
-            if archive_format == 'zip':
-                return self._create_zip(folder_path, output_path)
-            elif archive_format.startswith('tar'):
-                return self._create_tar(folder_path, output_path, archive_format)
-            elif archive_format == '7z':
-                return self._create_7z(folder_path, output_path)
-            else:
-                print(f"Format d'archive non supporté: {archive_format}")
-                return False
+            with tracing.span('ArchiveConverter.compress', tracing.ENCODE, format=archive_format):
+                if archive_format == 'zip':
+                    return self._create_zip(folder_path, output_path)
+                elif archive_format.startswith('tar'):
+                    return self._create_tar(folder_path, output_path, archive_format)
+                elif archive_format == '7z':
+                    return self._create_7z(folder_path, output_path)
+                else:
+                    logger.error("Format d'archive non supporté: %s", archive_format)
+                    return False
                 
         except Exception as e:
-            print(f"Erreur lors de la compression: {e}")
+            logger.error("Erreur lors de la compression: %s", e)
             return False
             
     def extract_archive(self, archive_path, output_dir):
@@ -81,7 +89,7 @@ class ArchiveConverter:
             output_dir = Path(output_dir)
             
             if not archive_path.exists():
-                print(f"L'archive {archive_path} n'existe pas")
+                logger.error("L'archive %s n'existe pas", archive_path)
                 return False
                 
             # Créer le répertoire de sortie
@@ -89,20 +97,21 @@ class ArchiveConverter:
             
             file_ext = archive_path.suffix.lower()
             
-            if file_ext == '.zip':
-                return self._extract_zip(archive_path, output_dir)
-            elif file_ext in ['.tar', '.gz', '.bz2'] or '.tar.' in archive_path.name:
-                return self._extract_tar(archive_path, output_dir)
-            elif file_ext == '.rar':
-                return self._extract_rar(archive_path, output_dir)
-            elif file_ext == '.7z':
-                return self._extract_7z(archive_path, output_dir)
-            else:
-                print(f"Format d'archive non supporté: {file_ext}")
-                return False
+            with tracing.span('ArchiveConverter.extract', tracing.DECODE, format=file_ext.lstrip('.')):
+                if file_ext == '.zip':
+                    return self._extract_zip(archive_path, output_dir)
+                elif file_ext in ['.tar', '.gz', '.bz2'] or '.tar.' in archive_path.name:
+                    return self._extract_tar(archive_path, output_dir)
+                elif file_ext == '.rar':
+                    return self._extract_rar(archive_path, output_dir)
+                elif file_ext == '.7z':
+                    return self._extract_7z(archive_path, output_dir)
+                else:
+                    logger.error("Format d'archive non supporté: %s", file_ext)
+                    return False
                 
         except Exception as e:
-            print(f"Erreur lors de l'extraction: {e}")
+            logger.error("Erreur lors de l'extraction: %s", e)
             return False
             
     def _create_zip(self, folder_path, output_path):
@@ -115,11 +124,11 @@ class ArchiveConverter:
                         arcname = file_path.relative_to(folder_path)
                         zipf.write(file_path, arcname)
                         
-            print(f"Archive ZIP créée: {output_path}")
+            logger.info("Archive ZIP créée: %s", output_path)
             return True
             
         except Exception as e:
-            print(f"Erreur création ZIP: {e}")
+            logger.error("Erreur création ZIP: %s", e)
             return False
             
     def _create_tar(self, folder_path, output_path, archive_format):
@@ -134,28 +143,28 @@ class ArchiveConverter:
             with tarfile.open(output_path, mode) as tar:
                 tar.add(folder_path, arcname=folder_path.name)
                 
-            print(f"Archive TAR créée: {output_path}")
+            logger.info("Archive TAR créée: %s", output_path)
             return True
             
         except Exception as e:
-            print(f"Erreur création TAR: {e}")
+            logger.error("Erreur création TAR: %s", e)
             return False
             
     def _create_7z(self, folder_path, output_path):
         """Créer une archive 7Z"""
         if not SEVENZ_AVAILABLE:
-            print("py7zr n'est pas installé pour le support 7Z")
+            logger.error("py7zr n'est pas installé pour le support 7Z")
             return False
             
         try:
             with py7zr.SevenZipFile(output_path, 'w') as archive:
                 archive.writeall(folder_path, folder_path.name)
                 
-            print(f"Archive 7Z créée: {output_path}")
+            logger.info("Archive 7Z créée: %s", output_path)
             return True
             
         except Exception as e:
-            print(f"Erreur création 7Z: {e}")
+            logger.error("Erreur création 7Z: %s", e)
             return False
             
     def _extract_zip(self, archive_path, output_dir):
@@ -164,11 +173,11 @@ class ArchiveConverter:
             with zipfile.ZipFile(archive_path, 'r') as zipf:
                 zipf.extractall(output_dir)
                 
-            print(f"Archive ZIP extraite vers: {output_dir}")
+            logger.info("Archive ZIP extraite vers: %s", output_dir)
             return True
             
         except Exception as e:
-            print(f"Erreur extraction ZIP: {e}")
+            logger.error("Erreur extraction ZIP: %s", e)
             return False
             
     def _extract_tar(self, archive_path, output_dir):
@@ -177,45 +186,45 @@ class ArchiveConverter:
             with tarfile.open(archive_path, 'r:*') as tar:
                 tar.extractall(output_dir)
                 
-            print(f"Archive TAR extraite vers: {output_dir}")
+            logger.info("Archive TAR extraite vers: %s", output_dir)
             return True
             
         except Exception as e:
-            print(f"Erreur extraction TAR: {e}")
+            logger.error("Erreur extraction TAR: %s", e)
             return False
             
     def _extract_rar(self, archive_path, output_dir):
         """Extraire une archive RAR"""
         if not RAR_AVAILABLE:
-            print("rarfile n'est pas installé pour le support RAR")
+            logger.error("rarfile n'est pas installé pour le support RAR")
             return False
             
         try:
             with rarfile.RarFile(archive_path) as rf:
                 rf.extractall(output_dir)
                 
-            print(f"Archive RAR extraite vers: {output_dir}")
+            logger.info("Archive RAR extraite vers: %s", output_dir)
             return True
             
         except Exception as e:
-            print(f"Erreur extraction RAR: {e}")
+            logger.error("Erreur extraction RAR: %s", e)
             return False
             
     def _extract_7z(self, archive_path, output_dir):
         """Extraire une archive 7Z"""
         if not SEVENZ_AVAILABLE:
-            print("py7zr n'est pas installé pour le support 7Z")
+            logger.error("py7zr n'est pas installé pour le support 7Z")
             return False
             
         try:
             with py7zr.SevenZipFile(archive_path, 'r') as archive:
                 archive.extractall(output_dir)
                 
-            print(f"Archive 7Z extraite vers: {output_dir}")
+            logger.info("Archive 7Z extraite vers: %s", output_dir)
             return True
             
         except Exception as e:
-            print(f"Erreur extraction 7Z: {e}")
+            logger.error("Erreur extraction 7Z: %s", e)
             return False
     
     def get_archive_info(self, archive_path):
@@ -261,7 +270,7 @@ class ArchiveConverter:
             return info
             
         except Exception as e:
-            print(f"Erreur lors de la lecture des informations: {e}")
+            logger.error("Erreur lors de la lecture des informations: %s", e)
             return None
             
     def get_supported_formats(self):
@@ -286,7 +295,7 @@ class ArchiveConverter:
             output_format (str): Format de sortie ('zip', 'tar', '7z', 'extract')
             
         Returns:
-            bool: True si la conversion a réussi
+            ConversionResult: Fichiers produits (évalué à False en cas d'échec)
         """
         try:
             input_path = Path(input_file)
@@ -295,13 +304,14 @@ class ArchiveConverter:
             # Si le format de sortie est 'extract', extraire l'archive
             if output_format.lower() == 'extract':
                 extract_dir = output_dir / input_path.stem
-                return self.extract_archive(input_path, extract_dir)
+                ok = self.extract_archive(input_path, extract_dir)
+                return ConversionResult.of(ok, extract_dir)
             
             # Sinon, convertir vers un autre format d'archive
             # D'abord extraire dans un dossier temporaire
             temp_dir = output_dir / f"temp_{input_path.stem}"
             if not self.extract_archive(input_path, temp_dir):
-                return False
+                return ConversionResult(False)
             
             # Ensuite recompresser au nouveau format
             output_name = f"{input_path.stem}.{output_format.lower()}"
@@ -311,12 +321,13 @@ class ArchiveConverter:
             
             # Nettoyer le dossier temporaire
             try:
-                shutil.rmtree(temp_dir)
+                with tracing.span('ArchiveConverter.cleanup', tracing.TRANSFORM):
+                    shutil.rmtree(temp_dir)
             except Exception as e:
-                print(f"Erreur lors du nettoyage: {e}")
+                logger.warning("Erreur lors du nettoyage: %s", e)
             
-            return success
+            return ConversionResult.of(success, output_path)
             
         except Exception as e:
-            print(f"Erreur lors de la conversion: {e}")
-            return False
+            logger.error("Erreur lors de la conversion: %s", e)
+            return ConversionResult.from_exception(e)
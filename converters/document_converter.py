@@ -3,22 +3,33 @@ Convertisseur de documents pour PtitConvert
 Gère la conversion entre PDF, DOCX et TXT
 """
 
-import PyPDF2
-from docx import Document
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.utils import ImageReader
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
+import logging
 import os
 from pathlib import Path
 import io
 
+from converters.result import UNSUPPORTED_FORMAT, ConversionResult
+from utils import tracing
+from utils.lazy import LazyModule
+
+logger = logging.getLogger(__name__)
+
+# Chargés au premier usage
+PyPDF2 = LazyModule('PyPDF2')
+docx = LazyModule('docx')
+pagesizes = LazyModule('reportlab.lib.pagesizes')
+platypus = LazyModule('reportlab.platypus')
+reportlab_styles = LazyModule('reportlab.lib.styles')
+
 class DocumentConverter:
     """Convertisseur pour les documents"""
     
+    # À incrémenter quand le rendu change (invalide le cache de résultats)
+    VERSION = '1.0'
     SUPPORTED_INPUT_FORMATS = {'.pdf', '.docx', '.txt'}
     SUPPORTED_OUTPUT_FORMATS = {'pdf', 'docx', 'txt'}
+    # Contenu intermédiaire échangé en mémoire (voir converters/planner.py)
+    PAYLOAD_TYPE = 'text'
     
     def __init__(self):
         """Initialiser le convertisseur de documents"""
@@ -34,7 +45,7 @@ class DocumentConverter:
             output_format (str): Format de sortie ('pdf', 'docx', 'txt')
             
         Returns:
-            bool: True si la conversion a réussi, False sinon
+            ConversionResult: Fichiers produits (évalué à False en cas d'échec)
         """
         try:
             input_path = Path(input_path)
@@ -42,24 +53,64 @@ class DocumentConverter:
             
             # Vérifier que le format d'entrée est supporté
             if input_path.suffix.lower() not in self.SUPPORTED_INPUT_FORMATS:
-                print(f"Format d'entrée non supporté: {input_path.suffix}")
-                return False
+                error = f"Format d'entrée non supporté: {input_path.suffix}"
+                logger.error(error)
+                return ConversionResult(False, error=error, error_type=UNSUPPORTED_FORMAT)
                 
             # Vérifier que le format de sortie est supporté
             if output_format not in self.SUPPORTED_OUTPUT_FORMATS:
-                print(f"Format de sortie non supporté: {output_format}")
-                return False
+                error = f"Format de sortie non supporté: {output_format}"
+                logger.error(error)
+                return ConversionResult(False, error=error, error_type=UNSUPPORTED_FORMAT)
                 
             # Créer le nom de fichier de sortie
             output_name = f"{input_path.stem}.{output_format}"
             output_path = Path(output_dir) / output_name
             
             # Extraire le texte du document source
-            text_content = self._extract_text(input_path)
+            text_content = self.decode(input_path)
             if text_content is None:
-                return False
+                return ConversionResult(False)
                 
             # Convertir selon le format de sortie
+            ok = self.encode(text_content, output_path, output_format)
+            return ConversionResult.of(ok, output_path)
+                
+        except Exception as e:
+            logger.error("Erreur lors de la conversion de document: %s", e)
+            return ConversionResult.from_exception(e)
+            
+    def decode(self, input_path):
+        """
+        Lire le texte d'un document sans écrire de fichier
+        
+        Args:
+            input_path (str): Chemin du fichier d'entrée
+            
+        Returns:
+            str: Texte extrait ou None en cas d'erreur
+        """
+        input_path = Path(input_path)
+        with tracing.span('DocumentConverter.decode', tracing.DECODE,
+                          format=input_path.suffix.lower().lstrip('.')) as decode_span:
+            text_content = self._extract_text(input_path)
+            decode_span.set(chars=len(text_content) if text_content is not None else 0)
+        return text_content
+        
+    def encode(self, text_content, output_path, output_format):
+        """
+        Écrire un texte au format demandé
+        
+        Args:
+            text_content (str): Texte à écrire
+            output_path (str): Chemin du fichier de sortie
+            output_format (str): Format de sortie ('pdf', 'docx', 'txt')
+            
+        Returns:
+            bool: True si l'écriture a réussi
+        """
+        output_format = output_format.lower()
+        with tracing.span('DocumentConverter.encode', tracing.ENCODE, format=output_format):
             if output_format == 'pdf':
                 return self._create_pdf(text_content, output_path)
             elif output_format == 'docx':
@@ -68,10 +119,6 @@ class DocumentConverter:
                 return self._create_txt(text_content, output_path)
             else:
                 return False
-                
-        except Exception as e:
-            print(f"Erreur lors de la conversion de document: {e}")
-            return False
             
     def _extract_text(self, input_path):
         """
@@ -96,7 +143,7 @@ class DocumentConverter:
                 return None
                 
         except Exception as e:
-            print(f"Erreur lors de l'extraction du texte: {e}")
+            logger.error("Erreur lors de l'extraction du texte: %s", e)
             return None
             
     def _extract_pdf_text(self, pdf_path):
@@ -113,13 +160,13 @@ class DocumentConverter:
             return '\n\n'.join(text_content)
             
         except Exception as e:
-            print(f"Erreur lors de l'extraction du PDF: {e}")
+            logger.error("Erreur lors de l'extraction du PDF: %s", e)
             return None
             
     def _extract_docx_text(self, docx_path):
         """Extraire le texte d'un document Word"""
         try:
-            doc = Document(docx_path)
+            doc = docx.Document(docx_path)
             text_content = []
             
             for paragraph in doc.paragraphs:
@@ -129,7 +176,7 @@ class DocumentConverter:
             return '\n\n'.join(text_content)
             
         except Exception as e:
-            print(f"Erreur lors de l'extraction du DOCX: {e}")
+            logger.error("Erreur lors de l'extraction du DOCX: %s", e)
             return None
             
     def _extract_txt_text(self, txt_path):
@@ -150,39 +197,41 @@ class DocumentConverter:
             return None
             
         except Exception as e:
-            print(f"Erreur lors de l'extraction du TXT: {e}")
+            logger.error("Erreur lors de l'extraction du TXT: %s", e)
             return None
             
     def _create_pdf(self, text_content, output_path):
         """Créer un PDF à partir du texte"""
         try:
-            doc = SimpleDocTemplate(str(output_path), pagesize=letter)
-            styles = getSampleStyleSheet()
+            doc = platypus.SimpleDocTemplate(str(output_path), pagesize=pagesizes.letter)
+            styles = reportlab_styles.getSampleStyleSheet()
             story = []
             
             # Diviser le texte en paragraphes
             paragraphs = text_content.split('\n\n')
             
-            for para_text in paragraphs:
-                if para_text.strip():
-                    # Créer un paragraphe avec style normal
-                    para = Paragraph(para_text.replace('\n', '<br/>'), styles['Normal'])
-                    story.append(para)
-                    story.append(Spacer(1, 12))
-                    
-            doc.build(story)
+            with tracing.span('reportlab.paragraphs', tracing.TRANSFORM):
+                for para_text in paragraphs:
+                    if para_text.strip():
+                        # Créer un paragraphe avec style normal
+                        para = platypus.Paragraph(para_text.replace('\n', '<br/>'), styles['Normal'])
+                        story.append(para)
+                        story.append(platypus.Spacer(1, 12))
+                        
+            with tracing.span('reportlab.build', tracing.ENCODE):
+                doc.build(story)
             
-            print(f"PDF créé: {output_path}")
+            logger.info("PDF créé: %s", output_path)
             return True
             
         except Exception as e:
-            print(f"Erreur lors de la création du PDF: {e}")
+            logger.error("Erreur lors de la création du PDF: %s", e)
             return False
             
     def _create_docx(self, text_content, output_path):
         """Créer un document Word à partir du texte"""
         try:
-            doc = Document()
+            doc = docx.Document()
             
             # Diviser le texte en paragraphes
             paragraphs = text_content.split('\n\n')
@@ -193,11 +242,11 @@ class DocumentConverter:
                     
             doc.save(str(output_path))
             
-            print(f"DOCX créé: {output_path}")
+            logger.info("DOCX créé: %s", output_path)
             return True
             
         except Exception as e:
-            print(f"Erreur lors de la création du DOCX: {e}")
+            logger.error("Erreur lors de la création du DOCX: %s", e)
             return False
             
     def _create_txt(self, text_content, output_path):
@@ -206,11 +255,11 @@ class DocumentConverter:
             with open(output_path, 'w', encoding='utf-8') as file:
                 file.write(text_content)
                 
-            print(f"TXT créé: {output_path}")
+            logger.info("TXT créé: %s", output_path)
             return True
             
         except Exception as e:
-            print(f"Erreur lors de la création du TXT: {e}")
+            logger.error("Erreur lors de la création du TXT: %s", e)
             return False
             
     def get_document_info(self, document_path):
@@ -238,7 +287,7 @@ class DocumentConverter:
                     info['page_count'] = len(pdf_reader.pages)
                     
             elif file_ext == '.docx':
-                doc = Document(document_path)
+                doc = docx.Document(document_path)
                 info['paragraph_count'] = len(doc.paragraphs)
                 
             elif file_ext == '.txt':
@@ -250,5 +299,5 @@ class DocumentConverter:
             return info
             
         except Exception as e:
-            print(f"Erreur lors de la lecture des informations du document: {e}")
+            logger.error("Erreur lors de la lecture des informations du document: %s", e)
             return None
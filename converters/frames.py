@@ -0,0 +1,105 @@
+"""
+Images à plusieurs vues pour PtitConvert
+Pages d'un TIFF, images d'une animation GIF ou WebP : les vues sont décodées une
+à une par un itérateur, dans l'ordre (le décodage d'une animation dépend de la
+vue précédente). Le travail fait ensuite sur chaque vue (opérations,
+compression, écriture d'un fichier) peut être réparti entre plusieurs threads.
+"""
+
+from collections import deque
+
+from utils import tracing
+from utils.lazy import LazyModule
+
+Image = LazyModule('PIL.Image')
+
+# Formats de sortie animés
+ANIMATED_FORMATS = ('gif', 'webp')
+# Formats de sortie qui gardent toutes les vues (pages ou animation)
+MULTIFRAME_FORMATS = ('pdf', 'tiff') + ANIMATED_FORMATS
+# Durée d'une vue qui n'en déclare pas (millisecondes)
+DEFAULT_DURATION = 100
+
+
+def is_multiframe(img):
+    """Vérifier qu'une image ouverte a plusieurs vues (sans les décoder quand c'est possible)"""
+    return bool(getattr(img, 'is_animated', False))
+
+
+def frame_count(img):
+    """
+    Nombre de vues d'une image ouverte, quand il est connu sans la décoder
+
+    Returns:
+        int: Nombre de vues (None pour un GIF : il faudrait en décoder toutes les images)
+    """
+    if img.format == 'GIF':
+        return None
+    return getattr(img, 'n_frames', 1)
+
+
+def iter_frames(img):
+    """
+    Parcourir les vues d'une image ouverte, une seule étant décodée à la fois
+
+    Args:
+        img (Image): Image ouverte (TIFF, GIF, WebP...)
+
+    Yields:
+        tuple: (index, Image) ; chaque vue est une copie indépendante du fichier,
+            avec sa durée dans info['duration'] pour une animation
+    """
+    index = 0
+    while True:
+        try:
+            img.seek(index)
+        except EOFError:
+            return
+        if img.mode not in ('P', 'PA'):
+            # Pillow garde la palette de la dernière page en couleurs indexées d'un TIFF
+            # (après n_frames ou en avançant) : elle transformerait cette page en 'P'
+            img.palette = None
+        with tracing.span('frames.decode', tracing.DECODE, frame=index):
+            frame = img.copy()
+        yield index, frame
+        index += 1
+
+
+def apply(pipeline, frame):
+    """Appliquer des opérations à une vue en gardant sa durée"""
+    if not pipeline:
+        return frame
+    duration = frame.info.get('duration')
+    frame = pipeline.apply(frame)
+    if duration is not None:
+        frame.info['duration'] = duration
+    return frame
+
+
+def map_ordered(pool, function, items, window):
+    """
+    Appliquer une fonction aux éléments dans un pool de threads, résultats dans l'ordre
+
+    Au plus window éléments sont en cours : la lecture des éléments (un
+    itérateur de vues) n'avance pas plus vite que la consommation des résultats.
+
+    Args:
+        pool (Executor): Pool de threads
+        function (callable): Fonction appliquée à chaque élément
+        items (iterable): Éléments, lus au fur et à mesure
+        window (int): Nombre maximal d'éléments en cours
+
+    Yields:
+        Résultats, dans l'ordre des éléments
+    """
+    pending = deque()
+    try:
+        for item in items:
+            pending.append(pool.submit(function, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
@@ -3,22 +3,46 @@ Convertisseur d'images pour PtitConvert
 Gère la conversion entre différents formats d'images
 """
 
-from PIL import Image
-import img2pdf
+import logging
 import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
+from converters import frames, image_ops, tiled_image
+from converters.pdf_writer import PdfImage, StreamingPdfWriter
+from converters.result import UNSUPPORTED_FORMAT, ConversionResult
+from utils import progress, threads, tracing
+from utils.lazy import LazyModule
+
+logger = logging.getLogger(__name__)
+
+# Chargés au premier usage
+Image = LazyModule('PIL.Image')
+TiffImagePlugin = LazyModule('PIL.TiffImagePlugin')
+img2pdf = LazyModule('img2pdf')
+
+# Étiquette EXIF d'orientation
+EXIF_ORIENTATION = 0x0112
+# Compressions TIFF recopiées telles quelles d'une page à l'autre (sans perte, tous modes)
+TIFF_LOSSLESS = {'raw', 'packbits', 'tiff_lzw', 'tiff_deflate', 'tiff_adobe_deflate'}
+
 class ImageConverter:
     """Convertisseur pour les fichiers images"""
     
+    # À incrémenter quand le rendu change (invalide le cache de résultats)
+    VERSION = '1.2'
     SUPPORTED_INPUT_FORMATS = {'.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.webp'}
-    SUPPORTED_OUTPUT_FORMATS = {'png', 'jpg', 'jpeg', 'bmp', 'gif', 'tiff', 'pdf'}
+    SUPPORTED_OUTPUT_FORMATS = {'png', 'jpg', 'jpeg', 'bmp', 'gif', 'tiff', 'webp', 'pdf'}
     
     def __init__(self):
         """Initialiser le convertisseur d'images"""
         pass
         
-    def convert(self, input_path, output_dir, output_format):
+    def convert(self, input_path, output_dir, output_format, ops=None, max_size=None, tiled=False,
+                extract_frames=False):
         """
         Convertir une image vers le format spécifié
         
@@ -26,9 +50,17 @@ class ImageConverter:
             input_path (str): Chemin du fichier d'entrée
             output_dir (str): Répertoire de sortie
             output_format (str): Format de sortie ('png', 'jpg', 'pdf', etc.)
+            ops (str | list): Opérations appliquées avant l'écriture, dans l'ordre
+                ('resize:2048x2048,strip', voir converters.image_ops)
+            max_size (tuple): Taille maximale (largeur, hauteur) de l'image produite,
+                ratio conservé (équivaut à une dernière opération resize)
+            tiled (bool): Écrire un TIFF en tuiles (sortie TIFF ; une image de plusieurs vues
+                seulement avec extract_frames, un TIFF en tuiles n'ayant qu'une page)
+            extract_frames (bool): Écrire chaque vue (page d'un TIFF, image d'une animation)
+                dans son propre fichier : nom_0001.png, nom_0002.png...
             
         Returns:
-            bool: True si la conversion a réussi, False sinon
+            ConversionResult: Fichiers produits (évalué à False en cas d'échec)
         """
         try:
             input_path = Path(input_path)
@@ -36,67 +68,374 @@ class ImageConverter:
             
             # Vérifier que le format d'entrée est supporté
             if input_path.suffix.lower() not in self.SUPPORTED_INPUT_FORMATS:
-                print(f"Format d'entrée non supporté: {input_path.suffix}")
-                return False
+                error = f"Format d'entrée non supporté: {input_path.suffix}"
+                logger.error(error)
+                return ConversionResult(False, error=error, error_type=UNSUPPORTED_FORMAT)
                 
             # Vérifier que le format de sortie est supporté
             if output_format not in self.SUPPORTED_OUTPUT_FORMATS:
-                print(f"Format de sortie non supporté: {output_format}")
-                return False
+                error = f"Format de sortie non supporté: {output_format}"
+                logger.error(error)
+                return ConversionResult(False, error=error, error_type=UNSUPPORTED_FORMAT)
+
+            ops = image_ops.parse_ops(ops)
+            if max_size:
+                ops.append(image_ops.Resize(*max_size))
+            pipeline = image_ops.ImagePipeline(ops)
                 
             # Créer le nom de fichier de sortie
             output_name = f"{input_path.stem}.{output_format}"
             output_path = Path(output_dir) / output_name
             
-            # Cas spécial pour la conversion en PDF
-            if output_format == 'pdf':
-                return self._convert_to_pdf(input_path, output_path)
-            else:
-                return self._convert_image(input_path, output_path, output_format)
+            tiled = tiled and output_format == 'tiff'
+            
+            # Très grande image TIFF ou PNG : traitée par bandes, sans être décodée entière
+            if tiled_image.needs_bands(input_path):
+                ok = self._convert_large(input_path, output_path, output_format, pipeline, tiled)
+                return ConversionResult.of(ok, output_path)
+
+            # Image ouverte une seule fois : nombre de vues, décodage et écriture
+            with Image.open(input_path) as img:
+                # Plusieurs vues : pages d'un TIFF, animation, ou un fichier par vue
+                if extract_frames or self._keeps_frames(img, input_path, output_format):
+                    if tiled and not extract_frames:
+                        error = ("Le TIFF en tuiles n'a qu'une page : utiliser extract_frames "
+                                 "pour écrire chaque vue dans son propre fichier")
+                        logger.error("%s: %s", input_path.name, error)
+                        return ConversionResult(False, error=error, error_type=UNSUPPORTED_FORMAT)
+                    outputs = self._convert_frames(img, input_path, output_dir, output_format, pipeline,
+                                                   extract_frames, tiled)
+                    return ConversionResult.of(outputs is not None, *(outputs or ()))
+                # Cas spécial pour la conversion en PDF : sans opération, l'image est recopiée telle quelle
+                if output_format == 'pdf' and not pipeline:
+                    ok = self._convert_to_pdf(input_path, output_path)
+                else:
+                    ok = self._convert_image(img, input_path, output_path, output_format, pipeline, tiled)
+            return ConversionResult.of(ok, output_path)
                 
         except Exception as e:
-            print(f"Erreur lors de la conversion d'image: {e}")
-            return False
+            logger.error("Erreur lors de la conversion d'image: %s", e)
+            return ConversionResult.from_exception(e)
+        
+    def _load(self, img, target=None):
+        """
+        Décoder une image ouverte, directement à taille réduite quand c'est possible
+
+        Pour un JPEG, libjpeg décode à 1/2, 1/4 ou 1/8 de la résolution dans le
+        domaine DCT (Image.draft) : la plus petite échelle qui reste au moins aussi
+        grande que la cible. Le reste de la réduction se fait après décodage.
+
+        Args:
+            img (Image): Image ouverte et pas encore décodée
+            target (tuple): Taille finale (largeur, hauteur), None = taille d'origine
+
+        Returns:
+            Image: Image décodée, à la taille cible si elle est donnée
+        """
+        ops = [image_ops.Resize(*target, exact=True)] if target else []
+        return image_ops.ImagePipeline(ops).apply(img)
+
+    @staticmethod
+    def _metadata(img, pipeline):
+        """
+        Métadonnées à recopier dans la sortie (EXIF, profil ICC)
+
+        Args:
+            img (Image): Image transformée
+            pipeline (ImagePipeline): Opérations appliquées
+
+        Returns:
+            dict: Options d'écriture de Pillow
+        """
+        if pipeline.strip:
+            return {}
+        metadata = {}
+        if img.info.get('exif'):
+            if pipeline.rotated:
+                # Les pixels sont déjà tournés : l'orientation EXIF ne doit plus s'appliquer
+                exif = img.getexif()
+                exif[EXIF_ORIENTATION] = 1
+                metadata['exif'] = exif.tobytes()
+            else:
+                metadata['exif'] = img.info['exif']
+        if img.info.get('icc_profile'):
+            metadata['icc_profile'] = img.info['icc_profile']
+        return metadata
             
-    def _convert_image(self, input_path, output_path, output_format):
+    def _convert_image(self, img, input_path, output_path, output_format, pipeline=None, tiled=False):
         """
-        Convertir une image vers un autre format d'image
+        Convertir une image vers un autre format d'image (ou un PDF décodé)
         
         Args:
+            img (Image): Image ouverte (pas encore décodée)
             input_path (Path): Chemin du fichier d'entrée
             output_path (Path): Chemin du fichier de sortie
             output_format (str): Format de sortie
+            pipeline (ImagePipeline): Opérations appliquées au décodage (None = aucune)
+            tiled (bool): Écrire un TIFF en tuiles
             
         Returns:
             bool: True si la conversion a réussi
         """
         try:
-            with Image.open(input_path) as img:
-                # Gestion spéciale pour JPEG (pas de transparence)
-                if output_format in ['jpg', 'jpeg']:
-                    if img.mode in ('RGBA', 'LA', 'P'):
-                        # Créer un fond blanc pour remplacer la transparence
-                        background = Image.new('RGB', img.size, (255, 255, 255))
-                        if img.mode == 'P':
-                            img = img.convert('RGBA')
-                        background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                        img = background
-                    else:
-                        img = img.convert('RGB')
-                        
-                # Optimiser la qualité pour JPEG
-                save_kwargs = {}
-                if output_format in ['jpg', 'jpeg']:
-                    save_kwargs['quality'] = 95
-                    save_kwargs['optimize'] = True
-                    
-                img.save(output_path, format='JPEG' if output_format.lower() in ['jpg', 'jpeg'] else output_format.upper(), **save_kwargs)
+            pipeline = pipeline or image_ops.ImagePipeline()
+            self._save(pipeline.apply(img), output_path, output_format, pipeline, tiled)
                 
-            print(f"Image convertie: {input_path} -> {output_path}")
+            logger.info("Image convertie: %s -> %s", input_path, output_path)
             return True
             
         except Exception as e:
-            print(f"Erreur lors de la conversion d'image: {e}")
+            logger.error("Erreur lors de la conversion d'image: %s", e)
+            return False
+
+    def _save(self, img, output_path, output_format, pipeline, tiled=False):
+        """
+        Écrire une image décodée et transformée
+
+        Args:
+            img (Image): Image à écrire
+            output_path (Path): Chemin du fichier de sortie
+            output_format (str): Format de sortie
+            pipeline (ImagePipeline): Opérations appliquées (métadonnées à recopier)
+            tiled (bool): Écrire un TIFF en tuiles
+        """
+        if tiled:
+            # Pillow n'écrit pas de TIFF en tuiles : l'image en mémoire est découpée par l'écrivain par bandes
+            with tracing.span('ImageConverter.encode', tracing.ENCODE, format=output_format, tiled=True):
+                tiled_image.convert(tiled_image.ImageBandReader(img), output_path, output_format, tiled=True)
+            return
+
+        save_kwargs = self._metadata(img, pipeline)
+            
+        # Gestion spéciale pour JPEG et PDF (pas de transparence)
+        if output_format in ['jpg', 'jpeg', 'pdf']:
+            with tracing.span('ImageConverter.to_rgb', tracing.TRANSFORM, mode=img.mode):
+                if img.mode in ('RGBA', 'LA', 'P'):
+                    # Créer un fond blanc pour remplacer la transparence
+                    background = Image.new('RGB', img.size, (255, 255, 255))
+                    if img.mode in ('P', 'LA'):
+                        img = img.convert('RGBA')
+                    background.paste(img, mask=img.split()[-1])
+                    img = background
+                elif img.mode not in ('RGB', 'L', 'CMYK'):
+                    img = img.convert('RGB')
+                
+        # Optimiser la qualité pour JPEG
+        if output_format in ['jpg', 'jpeg']:
+            save_kwargs['quality'] = 95
+            save_kwargs['optimize'] = True
+        elif output_format == 'webp':
+            save_kwargs['quality'] = 90
+            
+        with tracing.span('ImageConverter.encode', tracing.ENCODE, format=output_format):
+            img.save(output_path, format='JPEG' if output_format.lower() in ['jpg', 'jpeg'] else output_format.upper(), **save_kwargs)
+
+    def _keeps_frames(self, img, input_path, output_format):
+        """
+        Vérifier qu'une image ouverte a plusieurs vues et que le format de sortie les garde toutes
+
+        Vers un format d'une seule image, seule la première vue est convertie (avec un avertissement).
+        """
+        if not frames.is_multiframe(img):
+            return False
+        if output_format in frames.MULTIFRAME_FORMATS:
+            return True
+        logger.warning("%s a plusieurs vues : seule la première est convertie en %s "
+                       "(option extract_frames pour les extraire toutes)", input_path.name, output_format)
+        return False
+
+    def _convert_frames(self, img, input_path, output_dir, output_format, pipeline, extract=False, tiled=False):
+        """
+        Convertir toutes les vues d'une image (pages d'un TIFF, images d'une animation)
+
+        Les vues sont décodées une à une ; les opérations, la compression des
+        pages d'un PDF et l'écriture des fichiers extraits se font en parallèle.
+        Vers un PDF : une page par vue ; vers un TIFF : un TIFF multipage ; vers
+        un GIF ou un WebP : une animation (durées et boucle conservées).
+
+        Args:
+            img (Image): Image ouverte (première vue)
+            input_path (Path): Chemin du fichier d'entrée
+            output_dir (str): Répertoire de sortie
+            output_format (str): Format de sortie
+            pipeline (ImagePipeline): Opérations appliquées à chaque vue
+            extract (bool): Écrire chaque vue dans son propre fichier (nom_0001.png...)
+            tiled (bool): Écrire des TIFF en tuiles (vues extraites)
+
+        Returns:
+            list: Fichiers produits (None en cas d'échec ; rien n'est laissé sur le disque)
+        """
+        written = []
+        workers = threads.thread_count()
+        try:
+            with tracing.span('ImageConverter.convert_frames', tracing.CONVERT, format=output_format,
+                              extract=extract), \
+                    ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ptitconvert-frames') as pool:
+                total = frames.frame_count(img)
+                transform = partial(frames.apply, pipeline)
+                window = 2 * workers
+
+                if extract:
+                    def write(item):
+                        index, frame = item
+                        path = Path(output_dir) / f"{input_path.stem}_{index + 1:04d}.{output_format}"
+                        self._save(frames.apply(pipeline, frame), path, output_format, pipeline, tiled)
+                        return path
+
+                    for path in frames.map_ordered(pool, write, frames.iter_frames(img), window):
+                        written.append(path)
+                        self._report_frames(len(written), total)
+                    count = len(written)
+                else:
+                    output_path = Path(output_dir) / f"{input_path.stem}.{output_format}"
+                    written.append(output_path)
+                    views = (frame for _, frame in frames.iter_frames(img))
+                    if output_format == 'pdf':
+                        jpeg = img.format in ('JPEG', 'MPO')
+                        pages = frames.map_ordered(pool, partial(PdfImage.from_image, pipeline=pipeline, jpeg=jpeg),
+                                                   views, window)
+                        count = self._frames_to_pdf(pages, output_path, total)
+                    elif output_format == 'tiff':
+                        count = self._frames_to_tiff(frames.map_ordered(pool, transform, views, window),
+                                                     output_path, pipeline, total)
+                    else:
+                        # Les encodeurs d'animation de Pillow prennent la suite complète des vues
+                        kept = list(frames.map_ordered(pool, transform, views, window))
+                        count = self._save_animation(kept, output_path, output_format, img)
+
+            logger.info("%d vue(s) convertie(s): %s -> %s", count, input_path,
+                        output_dir if extract else written[0])
+            return written
+
+        except Exception as e:
+            logger.error("Erreur lors de la conversion des vues: %s", e)
+            for path in written:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            return None
+
+    @staticmethod
+    def _report_frames(done, total):
+        if total:
+            progress.report(min(done / total, 1.0))
+
+    def _frames_to_pdf(self, pages, output_path, total=None):
+        """Écrire les pages préparées (PdfImage), dans l'ordre ; renvoie le nombre de pages"""
+        with StreamingPdfWriter(output_path) as writer:
+            for page in pages:
+                with tracing.span('StreamingPdfWriter.add_image_page', tracing.ENCODE):
+                    writer.add_image_page(page)
+                self._report_frames(writer.page_count, total)
+        return writer.page_count
+
+    def _frames_to_tiff(self, views, output_path, pipeline, total=None):
+        """Écrire les vues dans un TIFF multipage, une page après l'autre ; renvoie le nombre de pages"""
+        count = 0
+        with TiffImagePlugin.AppendingTiffWriter(str(output_path), True) as tiff:
+            for frame in views:
+                save_kwargs = self._metadata(frame, pipeline)
+                if frame.info.get('dpi'):
+                    save_kwargs['dpi'] = frame.info['dpi']
+                compression = frame.info.get('compression')
+                if compression not in TIFF_LOSSLESS and not (compression == 'group4' and frame.mode == '1'):
+                    # JPEG, CCITT (ou aucune compression connue) : sans perte, valable pour tous les modes
+                    compression = 'tiff_adobe_deflate'
+                with tracing.span('ImageConverter.encode', tracing.ENCODE, format='tiff', frame=count):
+                    frame.save(tiff, format='TIFF', compression=compression, **save_kwargs)
+                    tiff.newFrame()
+                count += 1
+                self._report_frames(count, total)
+        return count
+
+    def _save_animation(self, views, output_path, output_format, source):
+        """
+        Écrire une animation GIF ou WebP
+
+        Args:
+            views (list): Vues transformées, dans l'ordre
+            output_path (Path): Chemin du fichier de sortie
+            output_format (str): 'gif' ou 'webp'
+            source (Image): Animation d'origine (boucle, format)
+
+        Returns:
+            int: Nombre de vues écrites
+        """
+        save_kwargs = {
+            'save_all': True,
+            'append_images': views[1:],
+            'duration': [view.info.get('duration') or frames.DEFAULT_DURATION for view in views],
+        }
+        if 'loop' in source.info:
+            save_kwargs['loop'] = source.info['loop']
+        elif output_format == 'webp':
+            # Un GIF sans boucle déclarée n'est joué qu'une fois
+            save_kwargs['loop'] = 1
+        if output_format == 'webp':
+            # Les GIF sont en couleurs indexées : sans perte, le WebP reste plus petit
+            if source.format == 'GIF':
+                save_kwargs['lossless'] = True
+            else:
+                save_kwargs['quality'] = 90
+        elif any(view.mode in ('RGBA', 'LA', 'PA') for view in views):
+            # Vues complètes : chacune remplace la précédente (sinon la transparence laisse voir l'ancienne)
+            save_kwargs['disposal'] = 2
+        with tracing.span('ImageConverter.encode', tracing.ENCODE, format=output_format, frames=len(views)):
+            views[0].save(output_path, format=output_format.upper(), **save_kwargs)
+        return len(views)
+
+    def _convert_large(self, input_path, output_path, output_format, pipeline, tiled=False):
+        """
+        Convertir une très grande image TIFF ou PNG par bandes
+
+        Sans opération, l'image est recopiée bande par bande vers un TIFF ou un
+        PNG. Quand la première opération est un resize, l'image est d'abord
+        réduite bande par bande d'un facteur entier, puis les opérations sont
+        appliquées à l'image réduite : tous les formats de sortie sont alors
+        possibles.
+
+        Args:
+            input_path (Path): Chemin du fichier d'entrée
+            output_path (Path): Chemin du fichier de sortie
+            output_format (str): Format de sortie
+            pipeline (ImagePipeline): Opérations demandées
+            tiled (bool): Écrire un TIFF en tuiles
+
+        Returns:
+            bool: True si la conversion a réussi
+        """
+        try:
+            with tracing.span('ImageConverter.convert_large', tracing.CONVERT, format=output_format):
+                reader = tiled_image.open_reader(input_path)
+                size = reader.size
+                for op in pipeline.ops:
+                    size = op.output_size(size)
+                unchanged = size == reader.size and all(isinstance(op, image_ops.Resize) for op in pipeline.ops)
+
+                if pipeline.ops and not unchanged:
+                    first = pipeline.ops[0]
+                    if not isinstance(first, image_ops.Resize):
+                        raise ValueError("Image trop grande pour être décodée entière : "
+                                         "les opérations doivent commencer par un resize")
+                    target = first.output_size(reader.size)
+                    # Réduction entière par bandes, le reste (Lanczos) sur l'image réduite
+                    factor = max(1, min(reader.size[0] // target[0], reader.size[1] // target[1]))
+                    img = tiled_image.reduce(reader, factor)
+                    self._save(pipeline.apply(img), output_path, output_format, pipeline, tiled)
+                elif output_format in tiled_image.STREAM_FORMATS:
+                    if pipeline.strip:
+                        reader.info.pop('icc_profile', None)
+                    tiled_image.convert(reader, output_path, output_format, tiled=tiled)
+                else:
+                    raise ValueError("Image trop grande pour être décodée entière : convertir en "
+                                     f"{' ou '.join(tiled_image.STREAM_FORMATS)}, ou la réduire (resize)")
+
+            logger.info("Image convertie par bandes: %s -> %s", input_path, output_path)
+            return True
+
+        except Exception as e:
+            logger.error("Erreur lors de la conversion d'image: %s", e)
             return False
             
     def _convert_to_pdf(self, input_path, output_path):
@@ -111,16 +450,92 @@ class ImageConverter:
             bool: True si la conversion a réussi
         """
         try:
+            # img2pdf recopie les données compressées sans décoder l'image
+            with tracing.span('img2pdf.convert', tracing.ENCODE):
+                pdf_bytes = img2pdf.convert(str(input_path))
             with open(output_path, "wb") as f:
-                f.write(img2pdf.convert(str(input_path)))
+                f.write(pdf_bytes)
                 
-            print(f"Image convertie en PDF: {input_path} -> {output_path}")
+            logger.info("Image convertie en PDF: %s -> %s", input_path, output_path)
             return True
             
         except Exception as e:
-            print(f"Erreur lors de la conversion en PDF: {e}")
+            logger.error("Erreur lors de la conversion en PDF: %s", e)
             return False
             
+    def merge_to_pdf(self, input_paths, output_path, ops=None, workers=None):
+        """
+        Assembler des images, dans l'ordre, en un seul PDF (une page par image)
+
+        Les pages sont écrites au fil de l'eau : seules les quelques pages en
+        préparation sont en mémoire. Les JPEG sont recopiés sans décodage ; les
+        autres images (ou toutes, avec des opérations) sont préparées en parallèle.
+
+        Args:
+            input_paths (list): Images, dans l'ordre des pages
+            output_path (str): PDF à écrire
+            ops (str | list): Opérations appliquées à chaque image (voir converters.image_ops)
+            workers (int): Threads de préparation des pages (None = part des cœurs du processus)
+
+        Returns:
+            ConversionResult: PDF produit (évalué à False en cas d'échec ; rien n'est
+                laissé sur le disque)
+        """
+        start = time.perf_counter()
+        input_paths = [str(path) for path in input_paths]
+        path = None
+        try:
+            unsupported = [path for path in input_paths
+                           if Path(path).suffix.lower() not in self.SUPPORTED_INPUT_FORMATS]
+            if unsupported:
+                error = f"Format d'entrée non supporté: {unsupported[0]}"
+                logger.error(error)
+                return ConversionResult(False, error=error, error_type=UNSUPPORTED_FORMAT)
+            if not input_paths:
+                raise ValueError("Aucune image à assembler")
+            pipeline = image_ops.ImagePipeline(ops)
+            workers = max(1, workers or threads.thread_count())
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+
+            with tracing.span('ImageConverter.merge_to_pdf', tracing.CONVERT, pages=len(input_paths)), \
+                    ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ptitconvert-pdf') as pool, \
+                    StreamingPdfWriter(output_path) as writer:
+                # Fenêtre bornée : la préparation n'avance pas plus vite que l'écriture
+                pending = deque()
+                paths = iter(input_paths)
+                for path in paths:
+                    pending.append((path, pool.submit(self._prepare_page, path, pipeline)))
+                    if len(pending) >= 2 * workers:
+                        break
+                while pending:
+                    path, future = pending.popleft()
+                    page = future.result()
+                    with tracing.span('StreamingPdfWriter.add_image_page', tracing.ENCODE,
+                                      passthrough=page.path is not None):
+                        writer.add_image_page(page)
+                    progress.report(writer.page_count / len(input_paths))
+                    next_path = next(paths, None)
+                    if next_path is not None:
+                        pending.append((next_path, pool.submit(self._prepare_page, next_path, pipeline)))
+
+            logger.info("%d image(s) assemblée(s) en PDF: %s", len(input_paths), output_path)
+            result = ConversionResult(True, [output_path])
+        except Exception as e:
+            # path : page en cours d'écriture au moment de l'erreur
+            error = f"{path}: {e}" if path else str(e)
+            logger.error("Erreur lors de l'assemblage en PDF: %s", error)
+            result = ConversionResult.from_exception(e)
+            result.error = error
+        result.elapsed = time.perf_counter() - start
+        result.measure_outputs()
+        return result
+
+    @staticmethod
+    def _prepare_page(path, pipeline):
+        """Préparer une page (dans un thread de préparation)"""
+        with tracing.span('PdfImage.from_file', tracing.DECODE, file=os.path.basename(path)):
+            return PdfImage.from_file(path, pipeline)
+
     def get_image_info(self, image_path):
         """
         Obtenir les informations d'une image
@@ -140,7 +555,7 @@ class ImageConverter:
                     'has_transparency': img.mode in ('RGBA', 'LA') or 'transparency' in img.info
                 }
         except Exception as e:
-            print(f"Erreur lors de la lecture des informations d'image: {e}")
+            logger.error("Erreur lors de la lecture des informations d'image: %s", e)
             return None
             
     def resize_image(self, input_path, output_path, size, maintain_aspect=True):
@@ -158,16 +573,14 @@ class ImageConverter:
         """
         try:
             with Image.open(input_path) as img:
-                if maintain_aspect:
-                    img.thumbnail(size, Image.Resampling.LANCZOS)
-                else:
-                    img = img.resize(size, Image.Resampling.LANCZOS)
-                    
+                # Comme thumbnail() : une image déjà assez petite n'est pas agrandie
+                target = image_ops.fit_size(img.size, size) if maintain_aspect else tuple(size)
+                img = self._load(img, target)
                 img.save(output_path)
                 
-            print(f"Image redimensionnée: {input_path} -> {output_path}")
+            logger.info("Image redimensionnée: %s -> %s", input_path, output_path)
             return True
             
         except Exception as e:
-            print(f"Erreur lors du redimensionnement: {e}")
+            logger.error("Erreur lors du redimensionnement: %s", e)
             return False
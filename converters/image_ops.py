@@ -0,0 +1,400 @@
+"""
+Opérations sur les images pour PtitConvert
+Une suite d'opérations (redimensionner, recadrer, pivoter, retirer les
+métadonnées, changer de mode) s'applique en un seul décodage : les opérations
+compatibles sont fusionnées, et une réduction de taille est reportée sur le
+décodage (JPEG décodé à 1/2, 1/4 ou 1/8 par libjpeg).
+
+Syntaxe d'une opération (liste séparée par des virgules) :
+    resize:800x600     tenir dans 800x600, ratio conservé, sans agrandir
+    resize:800x        largeur 800 au plus (x600 : hauteur 600 au plus)
+    resize:800x600!    taille exacte, ratio non conservé
+    crop:400x300+10+20 rectangle 400x300 à partir de (10, 20)
+    rotate:90          rotation dans le sens horaire (degrés)
+    strip              sans métadonnées (EXIF, profil ICC, commentaires)
+    convert:gray       mode de couleur (gray, rgb, rgba, cmyk, bw)
+"""
+
+import math
+import re
+
+from utils import tracing
+from utils.lazy import LazyModule
+
+Image = LazyModule('PIL.Image')
+
+# Réduction finale en deux temps (voir Image.resize) : réduction entière rapide
+# jusqu'à ce facteur de la taille cible, puis rééchantillonnage LANCZOS
+REDUCING_GAP = 2.0
+
+# Modes de couleur acceptés par convert:
+MODES = {'gray': 'L', 'grey': 'L', 'l': 'L', 'rgb': 'RGB', 'rgba': 'RGBA', 'cmyk': 'CMYK',
+         'bw': '1', '1': '1', 'la': 'LA'}
+
+# Clés de Image.info retirées par strip (la transparence et la résolution restent)
+METADATA_KEYS = ('exif', 'icc_profile', 'xmp', 'XML:com.adobe.xmp', 'photoshop', 'comment')
+
+_SIZE = re.compile(r'^(\d*)x(\d*)(!?)$')
+_GEOMETRY = re.compile(r'^(\d+)x(\d+)\+(\d+)\+(\d+)$')
+
+
+def fit_size(size, bound):
+    """
+    Taille réduite pour tenir dans un cadre, ratio conservé
+
+    Args:
+        size (tuple): Taille d'origine (largeur, hauteur)
+        bound (tuple): Taille maximale (largeur, hauteur) ; None pour une dimension libre
+
+    Returns:
+        tuple: Nouvelle taille, ou None si l'image tient déjà dans le cadre
+    """
+    width, height = size
+    max_width, max_height = bound
+    scale = min(max_width / width if max_width else 1.0, max_height / height if max_height else 1.0)
+    if scale >= 1:
+        return None
+    return (max(1, round(width * scale)), max(1, round(height * scale)))
+
+
+class Resize:
+    """Redimensionner : tenir dans un cadre (ratio conservé, sans agrandir) ou taille exacte"""
+
+    name = 'resize'
+
+    def __init__(self, width=None, height=None, exact=False):
+        if not width and not height:
+            raise ValueError("resize: largeur ou hauteur requise")
+        if exact and not (width and height):
+            raise ValueError("resize: une taille exacte demande largeur et hauteur")
+        self.width = width
+        self.height = height
+        self.exact = exact
+
+    def output_size(self, size):
+        if self.exact:
+            return (self.width, self.height)
+        return fit_size(size, (self.width, self.height)) or tuple(size)
+
+    def __repr__(self):
+        return f"resize:{self.width or ''}x{self.height or ''}{'!' if self.exact else ''}"
+
+
+class Crop:
+    """Recadrer sur un rectangle (coordonnées de l'image à ce stade)"""
+
+    name = 'crop'
+
+    def __init__(self, width, height, left=0, top=0):
+        if width <= 0 or height <= 0:
+            raise ValueError("crop: taille nulle")
+        self.width = width
+        self.height = height
+        self.left = left
+        self.top = top
+
+    def box(self, size, scale=1.0):
+        """Rectangle (gauche, haut, droite, bas) limité à l'image, à l'échelle donnée"""
+        width, height = size
+        left = min(round(self.left * scale), width - 1)
+        top = min(round(self.top * scale), height - 1)
+        right = min(max(round((self.left + self.width) * scale), left + 1), width)
+        bottom = min(max(round((self.top + self.height) * scale), top + 1), height)
+        return (left, top, right, bottom)
+
+    def output_size(self, size):
+        left, top, right, bottom = self.box(size)
+        return (right - left, bottom - top)
+
+    def __repr__(self):
+        return f"crop:{self.width}x{self.height}+{self.left}+{self.top}"
+
+
+class Rotate:
+    """Pivoter dans le sens horaire ; les quarts de tour sont exacts et sans perte"""
+
+    name = 'rotate'
+
+    def __init__(self, degrees):
+        self.degrees = degrees % 360
+
+    def output_size(self, size):
+        if self.degrees in (90, 270):
+            return (size[1], size[0])
+        if self.degrees % 180 == 0:
+            return tuple(size)
+        angle = math.radians(self.degrees)
+        cos, sin = abs(math.cos(angle)), abs(math.sin(angle))
+        width, height = size
+        return (math.ceil(width * cos + height * sin), math.ceil(width * sin + height * cos))
+
+    def __repr__(self):
+        return f"rotate:{self.degrees:g}"
+
+
+class Convert:
+    """Changer de mode de couleur"""
+
+    name = 'convert'
+
+    def __init__(self, mode):
+        key = mode.lower()
+        if key not in MODES:
+            raise ValueError(f"convert: mode inconnu '{mode}' ({', '.join(sorted(MODES))})")
+        self.mode = MODES[key]
+
+    def output_size(self, size):
+        return tuple(size)
+
+    def __repr__(self):
+        return f"convert:{self.mode}"
+
+
+class Strip:
+    """Ne pas recopier les métadonnées (EXIF, profil ICC, commentaires) dans la sortie"""
+
+    name = 'strip'
+
+    def output_size(self, size):
+        return tuple(size)
+
+    def __repr__(self):
+        return 'strip'
+
+
+def parse_op(text):
+    """
+    Lire une opération ('resize:800x600', 'rotate:90', 'strip'...)
+
+    Raises:
+        ValueError: Si l'opération ou ses paramètres sont invalides
+    """
+    name, _, value = text.strip().partition(':')
+    name = name.lower()
+    if name == 'resize':
+        match = _SIZE.match(value)
+        if not match:
+            raise ValueError(f"resize: taille invalide '{value}' (ex. 800x600, 800x, 800x600!)")
+        width, height, exact = match.groups()
+        return Resize(int(width) if width else None, int(height) if height else None, bool(exact))
+    if name == 'crop':
+        match = _GEOMETRY.match(value)
+        if not match:
+            raise ValueError(f"crop: rectangle invalide '{value}' (ex. 400x300+10+20)")
+        return Crop(*map(int, match.groups()))
+    if name == 'rotate':
+        try:
+            return Rotate(float(value))
+        except ValueError:
+            raise ValueError(f"rotate: angle invalide '{value}'") from None
+    if name == 'convert':
+        return Convert(value)
+    if name == 'strip' and not value:
+        return Strip()
+    raise ValueError(f"Opération d'image inconnue: '{text}'")
+
+
+def parse_ops(spec):
+    """
+    Lire une suite d'opérations
+
+    Args:
+        spec (str | list): 'resize:800x600,strip' ou liste de textes / d'opérations
+
+    Returns:
+        list: Opérations, dans l'ordre d'application
+    """
+    if not spec:
+        return []
+    if isinstance(spec, str):
+        spec = spec.split(',')
+    ops = []
+    for item in spec:
+        if isinstance(item, str):
+            if item.strip():
+                ops.append(parse_op(item))
+        else:
+            ops.append(item)
+    return ops
+
+
+def config_ops(config_manager=None):
+    """
+    Opérations imposées par la configuration des images
+
+    'conversion.image.resize_large_images' limite la taille à 'max_image_size' ;
+    'preserve_metadata' à False retire les métadonnées.
+
+    Args:
+        config_manager (ConfigManager): Gestionnaire de configuration (optionnel)
+
+    Returns:
+        list: Opérations au format texte (à ajouter après celles demandées)
+    """
+    try:
+        if config_manager is None:
+            from utils.config import ConfigManager
+            config_manager = ConfigManager()
+        settings = config_manager.get('conversion.image', {}) or {}
+    except Exception:
+        return []
+    ops = []
+    if settings.get('resize_large_images'):
+        width, height = settings.get('max_image_size') or (4096, 4096)
+        ops.append(f"resize:{int(width)}x{int(height)}")
+    if settings.get('preserve_metadata') is False:
+        ops.append('strip')
+    return ops
+
+
+def fuse(ops):
+    """
+    Simplifier une suite d'opérations sans changer le résultat
+
+    Les rotations successives s'additionnent, un changement de mode répété
+    disparaît et des cadres successifs se réduisent à leur intersection ;
+    strip est une option d'écriture, sans position.
+
+    Returns:
+        tuple: (opérations restantes, strip demandé)
+    """
+    fused = []
+    strip = False
+    for op in ops:
+        if isinstance(op, Strip):
+            strip = True
+            continue
+        previous = fused[-1] if fused else None
+        if isinstance(op, Rotate) and isinstance(previous, Rotate):
+            fused[-1] = Rotate(previous.degrees + op.degrees)
+        elif isinstance(op, Convert) and isinstance(previous, Convert) and op.mode == previous.mode:
+            continue
+        elif (isinstance(op, Resize) and isinstance(previous, Resize)
+              and not op.exact and not previous.exact):
+            # Tenir dans A puis dans B = tenir dans l'intersection des deux cadres
+            fused[-1] = Resize(min(filter(None, (previous.width, op.width)), default=None),
+                               min(filter(None, (previous.height, op.height)), default=None))
+        else:
+            fused.append(op)
+        if isinstance(fused[-1], Rotate) and fused[-1].degrees == 0:
+            fused.pop()
+    return fused, strip
+
+
+class ImagePipeline:
+    """Suite d'opérations appliquée à une image en un seul décodage"""
+
+    def __init__(self, ops=None):
+        """
+        Initialiser la suite d'opérations
+
+        Args:
+            ops (str | list): Opérations (voir parse_ops)
+
+        Raises:
+            ValueError: Si une opération est invalide
+        """
+        self.ops, self.strip = fuse(parse_ops(ops))
+
+    def __bool__(self):
+        return bool(self.ops) or self.strip
+
+    def __repr__(self):
+        return ','.join([repr(op) for op in self.ops] + (['strip'] if self.strip else []))
+
+    @property
+    def rotated(self):
+        """Une rotation est appliquée (l'orientation EXIF d'origine ne vaut plus)"""
+        return any(isinstance(op, Rotate) for op in self.ops)
+
+    def _plan(self, size):
+        """
+        Tailles prévues et échelle de décodage suffisante
+
+        Returns:
+            tuple: (liste de (opération, taille en entrée, taille en sortie),
+                échelle de décodage (1 = pleine résolution))
+        """
+        steps = []
+        scale = 1.0
+        resized = False
+        for op in self.ops:
+            output = op.output_size(size)
+            if isinstance(op, Resize) and not resized:
+                # Seul ce qui précède le premier redimensionnement profite d'un décodage réduit
+                resized = True
+                scale = min(1.0, max(output[0] / size[0], output[1] / size[1]))
+            steps.append((op, size, output))
+            size = output
+        return steps, scale
+
+    def _decode_mode(self, img):
+        """Mode demandé au décodeur JPEG : gris quand la première conversion de mode y mène"""
+        for op in self.ops:
+            if isinstance(op, Convert):
+                return 'L' if op.mode in ('L', '1') and img.mode in ('RGB', 'L') else None
+        return None
+
+    def apply(self, img):
+        """
+        Décoder une image ouverte et lui appliquer les opérations
+
+        Args:
+            img (Image): Image ouverte et pas encore décodée
+
+        Returns:
+            Image: Image transformée (sans métadonnées si strip est demandé)
+        """
+        source_size = img.size
+        steps, scale = self._plan(source_size)
+        # Décodage explicite : sinon il serait compté dans l'étape suivante
+        with tracing.span('ImageConverter.decode', tracing.DECODE, format=(img.format or '').lower(),
+                          width=img.width, height=img.height) as decode_span:
+            mode = self._decode_mode(img) if img.format == 'JPEG' else None
+            if img.format == 'JPEG' and (scale < 1 or mode):
+                request = (math.ceil(source_size[0] * scale), math.ceil(source_size[1] * scale))
+                img.draft(mode, request)
+                decode_span.set(decoded_width=img.width, decoded_height=img.height)
+            img.load()
+        # Échelle du décodage réel : les recadrages antérieurs au redimensionnement s'y adaptent
+        decoded_scale = img.width / source_size[0]
+        resized = False
+        for op, _, output in steps:
+            with tracing.span(f"ImageConverter.{op.name}", tracing.TRANSFORM, op=repr(op)):
+                if isinstance(op, Resize):
+                    resized = True
+                    if img.size != output:
+                        if img.mode in ('1', 'P'):
+                            # Image.resize ne rééchantillonne pas les palettes (plus proche voisin)
+                            img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+                        img = img.resize(output, Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+                elif isinstance(op, Crop):
+                    img = img.crop(op.box(img.size, 1.0 if resized else decoded_scale))
+                elif isinstance(op, Rotate):
+                    img = _rotate(img, op.degrees)
+                elif isinstance(op, Convert):
+                    if img.mode != op.mode:
+                        img = img.convert(op.mode)
+                        # Le profil ICC décrit l'espace de couleur d'origine
+                        img.info.pop('icc_profile', None)
+        if self.strip:
+            for key in METADATA_KEYS:
+                img.info.pop(key, None)
+        return img
+
+
+def _rotate(img, degrees):
+    """Rotation horaire ; les quarts de tour passent par transpose (sans rééchantillonnage)"""
+    if degrees == 90:
+        return img.transpose(Image.Transpose.ROTATE_270)
+    if degrees == 180:
+        return img.transpose(Image.Transpose.ROTATE_180)
+    if degrees == 270:
+        return img.transpose(Image.Transpose.ROTATE_90)
+    if img.mode in ('1', 'P'):
+        img = img.convert('RGBA')
+    fill = (255, 255, 255, 0) if 'A' in img.mode else None
+    if fill is None and img.mode in ('RGB', 'L', 'CMYK'):
+        fill = {'RGB': (255, 255, 255), 'L': 255, 'CMYK': (0, 0, 0, 0)}[img.mode]
+    # Image.rotate tourne dans le sens antihoraire
+    return img.rotate(-degrees, Image.Resampling.BICUBIC, expand=True, fillcolor=fill)
@@ -3,25 +3,41 @@ Convertisseur audio/vidéo pour PtitConvert
 Gère la conversion de fichiers multimédia
 """
 
+import logging
 import os
 from pathlib import Path
-try:
-    from moviepy.editor import VideoFileClip, AudioFileClip
-    MOVIEPY_AVAILABLE = True
-except ImportError:
-    MOVIEPY_AVAILABLE = False
 
-try:
-    from pydub import AudioSegment
-    PYDUB_AVAILABLE = True
-except ImportError:
-    PYDUB_AVAILABLE = False
+from converters.result import UNSUPPORTED_FORMAT, ConversionResult
+from utils import tracing
+from utils.lazy import lazy_import
+
+logger = logging.getLogger(__name__)
+
+# Chargés au premier usage ; None si la bibliothèque n'est pas installée
+moviepy_editor = lazy_import('moviepy.editor')
+MOVIEPY_AVAILABLE = moviepy_editor is not None
+
+pydub = lazy_import('pydub')
+PYDUB_AVAILABLE = pydub is not None
 
 class MediaConverter:
     """Convertisseur pour les fichiers audio et vidéo"""
     
+    # À incrémenter quand le rendu change (invalide le cache de résultats)
+    VERSION = '1.0'
     AUDIO_FORMATS = {'.mp3', '.wav', '.flac', '.aac', '.ogg', '.m4a'}
     VIDEO_FORMATS = {'.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm'}
+    AUDIO_OUTPUT_FORMATS = {'mp3', 'wav', 'flac', 'aac', 'ogg'}
+    VIDEO_OUTPUT_FORMATS = {'mp4', 'avi', 'mkv', 'mov', 'webm'}
+    VIDEO_AUDIO_OUTPUT_FORMATS = {'mp3', 'wav', 'flac'}
+    
+    SUPPORTED_INPUT_FORMATS = AUDIO_FORMATS | VIDEO_FORMATS
+    SUPPORTED_OUTPUT_FORMATS = AUDIO_OUTPUT_FORMATS | VIDEO_OUTPUT_FORMATS
+    # Les sorties possibles dépendent du type d'entrée (audio ou vidéo)
+    CAPABILITIES = (
+        (AUDIO_FORMATS, AUDIO_OUTPUT_FORMATS),
+        (VIDEO_FORMATS, VIDEO_OUTPUT_FORMATS | VIDEO_AUDIO_OUTPUT_FORMATS),
+    )
     
     def __init__(self):
         """Initialiser le convertisseur multimédia"""
@@ -41,7 +57,7 @@ class MediaConverter:
             bool: True si la conversion a réussi
         """
         if not PYDUB_AVAILABLE:
-            print("pydub n'est pas installé pour la conversion audio")
+            logger.error("pydub n'est pas installé pour la conversion audio")
             return False
             
         try:
@@ -53,7 +69,9 @@ class MediaConverter:
             output_path = Path(output_dir) / output_name
             
             # Charger l'audio
-            audio = AudioSegment.from_file(str(input_path))
+            with tracing.span('MediaConverter.decode_audio', tracing.DECODE,
+                              format=input_path.suffix.lower().lstrip('.')):
+                audio = pydub.AudioSegment.from_file(str(input_path))
             
             # Configurer la qualité
             export_params = {}
@@ -74,13 +92,14 @@ class MediaConverter:
                     export_params['parameters'] = ['-ar', '48000']
                     
             # Exporter
-            audio.export(str(output_path), format=output_format, **export_params)
+            with tracing.span('MediaConverter.encode_audio', tracing.ENCODE, format=output_format):
+                audio.export(str(output_path), format=output_format, **export_params)
             
-            print(f"Audio converti: {input_path} -> {output_path}")
+            logger.info("Audio converti: %s -> %s", input_path, output_path)
             return True
             
         except Exception as e:
-            print(f"Erreur lors de la conversion audio: {e}")
+            logger.error("Erreur lors de la conversion audio: %s", e)
             return False
             
     def convert_video(self, input_path, output_dir, output_format, quality='medium'):
@@ -97,7 +116,7 @@ class MediaConverter:
             bool: True si la conversion a réussi
         """
         if not MOVIEPY_AVAILABLE:
-            print("moviepy n'est pas installé pour la conversion vidéo")
+            logger.error("moviepy n'est pas installé pour la conversion vidéo")
             return False
             
         try:
@@ -109,7 +128,9 @@ class MediaConverter:
             output_path = Path(output_dir) / output_name
             
             # Charger la vidéo
-            video = VideoFileClip(str(input_path))
+            with tracing.span('MediaConverter.open_video', tracing.DECODE,
+                              format=input_path.suffix.lower().lstrip('.')):
+                video = moviepy_editor.VideoFileClip(str(input_path))
             
             # Configurer la qualité
             codec = 'libx264'
@@ -125,25 +146,26 @@ class MediaConverter:
                 bitrate = '3000k'
                 audio_bitrate = '320k'
                 
-            # Exporter
-            video.write_videofile(
-                str(output_path),
-                codec=codec,
-                audio_codec=audio_codec,
-                bitrate=bitrate,
-                audio_bitrate=audio_bitrate,
-                verbose=False,
-                logger=None
-            )
+            # Exporter (décodage et encodage des images sont entremêlés)
+            with tracing.span('MediaConverter.transcode_video', tracing.ENCODE, format=output_format):
+                video.write_videofile(
+                    str(output_path),
+                    codec=codec,
+                    audio_codec=audio_codec,
+                    bitrate=bitrate,
+                    audio_bitrate=audio_bitrate,
+                    verbose=False,
+                    logger=None
+                )
             
             # Libérer la mémoire
             video.close()
             
-            print(f"Vidéo convertie: {input_path} -> {output_path}")
+            logger.info("Vidéo convertie: %s -> %s", input_path, output_path)
             return True
             
         except Exception as e:
-            print(f"Erreur lors de la conversion vidéo: {e}")
+            logger.error("Erreur lors de la conversion vidéo: %s", e)
             return False
             
     def extract_audio_from_video(self, video_path, output_dir, audio_format='mp3'):
@@ -159,7 +181,7 @@ class MediaConverter:
             bool: True si l'extraction a réussi
         """
         if not MOVIEPY_AVAILABLE:
-            print("moviepy n'est pas installé pour l'extraction audio")
+            logger.error("moviepy n'est pas installé pour l'extraction audio")
             return False
             
         try:
@@ -170,26 +192,29 @@ class MediaConverter:
             output_path = Path(output_dir) / output_name
             
             # Charger la vidéo et extraire l'audio
-            video = VideoFileClip(str(video_path))
+            with tracing.span('MediaConverter.open_video', tracing.DECODE,
+                              format=video_path.suffix.lower().lstrip('.')):
+                video = moviepy_editor.VideoFileClip(str(video_path))
             audio = video.audio
             
             if audio is None:
-                print("Aucun audio trouvé dans la vidéo")
+                logger.error("Aucun audio trouvé dans la vidéo")
                 video.close()
                 return False
                 
             # Exporter l'audio
-            audio.write_audiofile(str(output_path), verbose=False, logger=None)
+            with tracing.span('MediaConverter.encode_audio', tracing.ENCODE, format=audio_format):
+                audio.write_audiofile(str(output_path), verbose=False, logger=None)
             
             # Libérer la mémoire
             audio.close()
             video.close()
             
-            print(f"Audio extrait: {video_path} -> {output_path}")
+            logger.info("Audio extrait: %s -> %s", video_path, output_path)
             return True
             
         except Exception as e:
-            print(f"Erreur lors de l'extraction audio: {e}")
+            logger.error("Erreur lors de l'extraction audio: %s", e)
             return False
             
     def get_media_info(self, media_path):
@@ -216,7 +241,7 @@ class MediaConverter:
                 info['type'] = 'audio'
                 if PYDUB_AVAILABLE:
                     try:
-                        audio = AudioSegment.from_file(str(media_path))
+                        audio = pydub.AudioSegment.from_file(str(media_path))
                         info['duration'] = len(audio) / 1000  # en secondes
                         info['channels'] = audio.channels
                         info['frame_rate'] = audio.frame_rate
@@ -227,7 +252,7 @@ class MediaConverter:
                 info['type'] = 'video'
                 if MOVIEPY_AVAILABLE:
                     try:
-                        video = VideoFileClip(str(media_path))
+                        video = moviepy_editor.VideoFileClip(str(media_path))
                         info['duration'] = video.duration
                         info['fps'] = video.fps
                         info['size'] = video.size
@@ -239,7 +264,7 @@ class MediaConverter:
             return info
             
         except Exception as e:
-            print(f"Erreur lors de la lecture des informations: {e}")
+            logger.error("Erreur lors de la lecture des informations: %s", e)
             return None
             
     def convert(self, input_path, output_dir, output_format, quality='medium'):
@@ -253,38 +278,45 @@ class MediaConverter:
             quality (str): Qualité de conversion
             
         Returns:
-            bool: True si la conversion a réussi
+            ConversionResult: Fichiers produits (évalué à False en cas d'échec)
         """
         try:
             input_path = Path(input_path)
             file_ext = input_path.suffix.lower()
             output_format = output_format.lower()
+            output_path = Path(output_dir) / f"{input_path.stem}.{output_format}"
             
             # Déterminer le type de conversion
             if file_ext in self.AUDIO_FORMATS:
-                if output_format in ['mp3', 'wav', 'flac', 'aac', 'ogg']:
-                    return self.convert_audio(input_path, output_dir, output_format, quality)
+                if output_format in self.AUDIO_OUTPUT_FORMATS:
+                    ok = self.convert_audio(input_path, output_dir, output_format, quality)
+                    return ConversionResult.of(ok, output_path)
                 else:
-                    print(f"Format de sortie audio non supporté: {output_format}")
-                    return False
+                    error = f"Format de sortie audio non supporté: {output_format}"
+                    logger.error(error)
+                    return ConversionResult(False, error=error, error_type=UNSUPPORTED_FORMAT)
                     
             elif file_ext in self.VIDEO_FORMATS:
-                if output_format in ['mp4', 'avi', 'mkv', 'mov', 'webm']:
-                    return self.convert_video(input_path, output_dir, output_format, quality)
-                elif output_format in ['mp3', 'wav', 'flac']:
+                if output_format in self.VIDEO_OUTPUT_FORMATS:
+                    ok = self.convert_video(input_path, output_dir, output_format, quality)
+                    return ConversionResult.of(ok, output_path)
+                elif output_format in self.VIDEO_AUDIO_OUTPUT_FORMATS:
                     # Extraction audio depuis vidéo
-                    return self.extract_audio_from_video(input_path, output_dir, output_format)
+                    ok = self.extract_audio_from_video(input_path, output_dir, output_format)
+                    return ConversionResult.of(ok, output_path)
                 else:
-                    print(f"Format de sortie vidéo non supporté: {output_format}")
-                    return False
+                    error = f"Format de sortie vidéo non supporté: {output_format}"
+                    logger.error(error)
+                    return ConversionResult(False, error=error, error_type=UNSUPPORTED_FORMAT)
                     
             else:
-                print(f"Format de fichier multimédia non supporté: {file_ext}")
-                return False
+                error = f"Format de fichier multimédia non supporté: {file_ext}"
+                logger.error(error)
+                return ConversionResult(False, error=error, error_type=UNSUPPORTED_FORMAT)
                 
         except Exception as e:
-            print(f"Erreur lors de la conversion multimédia: {e}")
-            return False
+            logger.error("Erreur lors de la conversion multimédia: %s", e)
+            return ConversionResult.from_exception(e)
             
     def get_supported_formats(self):
         """Retourner les formats supportés selon les bibliothèques disponibles"""
@@ -297,10 +329,10 @@ class MediaConverter:
         
         if PYDUB_AVAILABLE:
             formats['audio_input'] = list(self.AUDIO_FORMATS)
-            formats['audio_output'] = ['mp3', 'wav', 'flac', 'aac', 'ogg']
+            formats['audio_output'] = sorted(self.AUDIO_OUTPUT_FORMATS)
             
         if MOVIEPY_AVAILABLE:
             formats['video_input'] = list(self.VIDEO_FORMATS)
-            formats['video_output'] = ['mp4', 'avi', 'mkv', 'mov', 'webm']
+            formats['video_output'] = sorted(self.VIDEO_OUTPUT_FORMATS)
             
         return formats
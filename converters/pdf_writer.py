@@ -0,0 +1,269 @@
+"""
+Écriture de PDF d'images pour PtitConvert
+Assemble des images en un seul PDF, page après page : chaque page est écrite
+sur le disque dès qu'elle est prête, la mémoire ne dépend donc pas du nombre de
+pages. Les JPEG sont recopiés sans décodage (filtre DCTDecode) ; les autres
+images sont décodées et compressées sans perte (FlateDecode). Une image
+transformée (voir image_ops) est ré-encodée : en JPEG si elle en était un.
+"""
+
+import io
+import os
+import shutil
+import zlib
+
+from utils.lazy import LazyModule
+
+Image = LazyModule('PIL.Image')
+
+# Résolution supposée des images qui n'en déclarent pas (comme img2pdf)
+DEFAULT_DPI = 96
+# Niveau de compression zlib des images décodées
+FLATE_LEVEL = 6
+# Qualité des JPEG ré-encodés après une transformation (un JPEG reste un JPEG)
+JPEG_QUALITY = 95
+
+# Mode Pillow -> (espace de couleur PDF, bits par composante)
+_COLORSPACES = {
+    '1': ('/DeviceGray', 1),
+    'L': ('/DeviceGray', 8),
+    'RGB': ('/DeviceRGB', 8),
+    'CMYK': ('/DeviceCMYK', 8),
+}
+# Orientation EXIF -> rotation de la page (degrés, sens horaire)
+_EXIF_ROTATION = {3: 180, 6: 90, 8: 270}
+_EXIF_ORIENTATION = 0x0112
+
+
+class PdfImage:
+    """Image prête à être écrite dans une page : données compressées ou fichier JPEG à recopier"""
+
+    __slots__ = ('width', 'height', 'colorspace', 'bits', 'filter', 'data', 'path', 'length',
+                 'decode', 'dpi', 'rotate')
+
+    def __init__(self, width, height, colorspace, bits=8, filter='/FlateDecode', data=None,
+                 path=None, decode=None, dpi=None, rotate=0):
+        """
+        Initialiser l'image
+
+        Args:
+            width (int): Largeur en pixels
+            height (int): Hauteur en pixels
+            colorspace (str): Espace de couleur PDF ('/DeviceRGB'...)
+            bits (int): Bits par composante
+            filter (str): Filtre PDF des données ('/FlateDecode', '/DCTDecode')
+            data (bytes): Données compressées (None si path est donné)
+            path (str): Fichier dont le contenu est recopié tel quel (JPEG)
+            decode (str): Tableau /Decode éventuel (CMYK Adobe inversé)
+            dpi (tuple): Résolution (horizontale, verticale)
+            rotate (int): Rotation de la page (degrés, sens horaire)
+        """
+        self.width = width
+        self.height = height
+        self.colorspace = colorspace
+        self.bits = bits
+        self.filter = filter
+        self.data = data
+        self.path = path
+        self.length = len(data) if data is not None else os.path.getsize(path)
+        self.decode = decode
+        self.dpi = dpi or (DEFAULT_DPI, DEFAULT_DPI)
+        self.rotate = rotate
+
+    @classmethod
+    def from_file(cls, path, pipeline=None):
+        """
+        Préparer une image pour le PDF
+
+        Args:
+            path (str): Fichier image
+            pipeline (ImagePipeline): Opérations appliquées au décodage ; sans opération,
+                un JPEG est recopié sans être décodé
+
+        Returns:
+            PdfImage: Image prête à être écrite
+        """
+        with Image.open(path) as img:
+            dpi = _dpi(img)
+            if not pipeline and img.format == 'JPEG' and img.mode in _COLORSPACES:
+                orientation = img.getexif().get(_EXIF_ORIENTATION)
+                # Photoshop écrit les JPEG CMYK inversés (marqueur Adobe)
+                decode = '[1 0 1 0 1 0 1 0]' if img.mode == 'CMYK' and 'adobe' in img.info else None
+                return cls(img.width, img.height, _COLORSPACES[img.mode][0], 8, '/DCTDecode',
+                           path=str(path), decode=decode, dpi=dpi,
+                           rotate=_EXIF_ROTATION.get(orientation, 0))
+            return cls.from_image(img, pipeline, jpeg=img.format == 'JPEG')
+
+    @classmethod
+    def from_image(cls, img, pipeline=None, jpeg=False):
+        """
+        Préparer une image ouverte ou décodée (une page d'un TIFF, une vue d'une animation)
+
+        Args:
+            img (Image): Image
+            pipeline (ImagePipeline): Opérations appliquées avant l'écriture
+            jpeg (bool): Compresser en JPEG (source JPEG) plutôt que sans perte
+
+        Returns:
+            PdfImage: Image prête à être écrite
+        """
+        dpi, source_width = _dpi(img), img.width
+        if pipeline:
+            img = pipeline.apply(img)
+            if dpi is not None and img.width != source_width:
+                # Même taille de page après un redimensionnement
+                scale = img.width / source_width
+                dpi = (dpi[0] * scale, dpi[1] * scale)
+        else:
+            img.load()
+        img = _flatten(img)
+        colorspace, bits = _COLORSPACES[img.mode]
+        if jpeg and img.mode != '1':
+            buffer = io.BytesIO()
+            img.save(buffer, format='JPEG', quality=JPEG_QUALITY)
+            return cls(img.width, img.height, colorspace, 8, '/DCTDecode', data=buffer.getvalue(), dpi=dpi)
+        data = zlib.compress(img.tobytes(), FLATE_LEVEL)
+        return cls(img.width, img.height, colorspace, bits, data=data, dpi=dpi)
+
+
+def _dpi(img):
+    """Résolution déclarée par l'image (None si absente ou invalide)"""
+    dpi = img.info.get('dpi')
+    try:
+        x, y = (float(value) for value in dpi)
+    except (TypeError, ValueError):
+        return None
+    return (x, y) if x > 1 and y > 1 else None
+
+
+def _flatten(img):
+    """Convertir vers un mode représentable dans le PDF (transparence sur fond blanc)"""
+    if img.mode in _COLORSPACES:
+        return img
+    if img.mode == 'P':
+        img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+    elif img.mode == 'PA':
+        img = img.convert('RGBA')
+    if img.mode in ('RGBA', 'LA'):
+        background = Image.new('RGB' if img.mode == 'RGBA' else 'L', img.size, 'white')
+        background.paste(img, mask=img.split()[-1])
+        return background
+    if img.mode in _COLORSPACES:
+        return img
+    # Modes 16 bits et flottants
+    return img.convert('L' if img.mode.startswith(('I', 'F')) else 'RGB')
+
+
+class StreamingPdfWriter:
+    """Écrit un PDF page après page ; les objets communs sont écrits à la fermeture"""
+
+    def __init__(self, output_path):
+        """
+        Ouvrir le fichier de sortie
+
+        Args:
+            output_path (str): Chemin du PDF à écrire
+        """
+        self.output_path = str(output_path)
+        self._file = open(self.output_path, 'wb')
+        self._offsets = {}
+        self._pages = []
+        # 1 : catalogue, 2 : arbre des pages (écrits à la fin)
+        self._next_number = 3
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    @property
+    def page_count(self):
+        return len(self._pages)
+
+    def _write(self, data):
+        self._file.write(data)
+
+    def _reserve(self):
+        number = self._next_number
+        self._next_number += 1
+        return number
+
+    def _begin(self, number):
+        self._offsets[number] = self._file.tell()
+        self._write(f"{number} 0 obj\n".encode('ascii'))
+
+    def _object(self, number, body):
+        self._begin(number)
+        self._write(body.encode('ascii') + b'\nendobj\n')
+
+    def _stream(self, number, dictionary, data=None, path=None, length=None):
+        """Écrire un objet flux, à partir de données en mémoire ou d'un fichier recopié par blocs"""
+        self._begin(number)
+        self._write(f"<< {dictionary} /Length {length if length is not None else len(data)} >>\nstream\n"
+                    .encode('ascii'))
+        if path is not None:
+            with open(path, 'rb') as source:
+                shutil.copyfileobj(source, self._file)
+        else:
+            self._write(data)
+        self._write(b'\nendstream\nendobj\n')
+
+    def add_image_page(self, image):
+        """
+        Ajouter une page occupée entièrement par une image
+
+        Args:
+            image (PdfImage): Image de la page (taille de page déduite de sa résolution)
+        """
+        image_number, content_number, page_number = self._reserve(), self._reserve(), self._reserve()
+        dictionary = (f"/Type /XObject /Subtype /Image /Width {image.width} /Height {image.height} "
+                      f"/ColorSpace {image.colorspace} /BitsPerComponent {image.bits} /Filter {image.filter}")
+        if image.decode:
+            dictionary += f" /Decode {image.decode}"
+        self._stream(image_number, dictionary, image.data, image.path, image.length)
+
+        width = image.width * 72.0 / image.dpi[0]
+        height = image.height * 72.0 / image.dpi[1]
+        content = f"q {width:.4f} 0 0 {height:.4f} 0 0 cm /Im0 Do Q".encode('ascii')
+        self._stream(content_number, '', content)
+
+        rotate = f" /Rotate {image.rotate}" if image.rotate else ''
+        self._object(page_number, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width:.4f} {height:.4f}]{rotate} "
+            f"/Resources << /XObject << /Im0 {image_number} 0 R >> >> /Contents {content_number} 0 R >>"
+        ))
+        self._pages.append(page_number)
+
+    def close(self):
+        """Écrire l'arbre des pages, le catalogue et la table des objets, puis fermer le fichier"""
+        if self._file is None:
+            return
+        kids = ' '.join(f"{number} 0 R" for number in self._pages)
+        self._object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} >>")
+        self._object(1, "<< /Type /Catalog /Pages 2 0 R >>")
+        xref = self._file.tell()
+        count = self._next_number
+        lines = [f"xref\n0 {count}\n", "0000000000 65535 f \n"]
+        for number in range(1, count):
+            lines.append(f"{self._offsets[number]:010d} 00000 n \n")
+        self._write(''.join(lines).encode('ascii'))
+        self._write(f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('ascii'))
+        self._file.close()
+        self._file = None
+
+    def abort(self):
+        """Fermer et supprimer un PDF inachevé"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        try:
+            os.remove(self.output_path)
+        except OSError:
+            pass
@@ -0,0 +1,251 @@
+"""
+Planificateur de conversions en plusieurs étapes pour PtitConvert
+Construit un graphe des formats à partir des capacités des convertisseurs et
+cherche le chemin le moins coûteux quand aucun convertisseur ne gère seul
+le couple (entrée, sortie). Les étapes intermédiaires restent en mémoire.
+"""
+
+import csv
+import heapq
+import threading
+import time
+from pathlib import Path
+
+from converters.result import ConversionResult
+from utils import progress, tracing
+
+# Formats intermédiaires manipulés en mémoire et type de contenu associé
+PAYLOAD_FORMATS = {'txt': 'text', 'csv': 'table'}
+
+
+def _text_to_table(text_content):
+    """Découper un texte en lignes de tableau (délimiteur détecté si possible)"""
+    lines = [line for line in text_content.splitlines() if line.strip()]
+    if not lines:
+        return []
+    try:
+        dialect = csv.Sniffer().sniff('\n'.join(lines[:20]), delimiters=',;\t|')
+        return [row for row in csv.reader(lines, dialect)]
+    except csv.Error:
+        # Texte libre : une cellule par ligne
+        return [[line] for line in lines]
+
+
+def _table_to_text(data):
+    """Aplatir des lignes de tableau en texte (cellules séparées par des tabulations)"""
+    return '\n'.join('\t'.join(str(cell) for cell in row) for row in data)
+
+
+# Passerelles en mémoire entre types de contenu : (source, cible) -> fonction
+ADAPTERS = {
+    ('txt', 'csv'): _text_to_table,
+    ('csv', 'txt'): _table_to_text,
+}
+
+
+class PlanStep:
+    """Une étape d'un plan de conversion"""
+
+    __slots__ = ('source', 'target', 'converter_class')
+
+    def __init__(self, source, target, converter_class=None):
+        self.source = source
+        self.target = target
+        self.converter_class = converter_class  # None pour une passerelle en mémoire
+
+    @property
+    def key(self):
+        """Identifiant de l'étape pour les mesures de durée"""
+        name = self.converter_class.__name__ if self.converter_class else 'adapter'
+        return (name, self.source, self.target)
+
+    def __repr__(self):
+        name = self.converter_class.__name__ if self.converter_class else 'adapter'
+        return f"{self.source}->{self.target} ({name})"
+
+
+class ConversionPlanner:
+    """Recherche et exécution de chemins de conversion à moindre coût"""
+
+    # Coûts initiaux (secondes estimées) tant qu'aucune mesure n'est disponible
+    DEFAULT_STEP_COST = 1.0
+    ADAPTER_COST = 0.05
+    # Poids des nouvelles mesures dans la moyenne mobile exponentielle
+    SMOOTHING = 0.3
+    # Écart (rapport) entre le coût d'une étape et celui retenu par les plans en cache
+    # au-delà duquel ces plans sont recalculés
+    REPLAN_RATIO = 1.5
+
+    def __init__(self, routes, get_converter):
+        """
+        Initialiser le planificateur
+
+        Args:
+            routes (dict): (extension, format) -> classe de convertisseur
+            get_converter (callable): Fournit l'instance d'une classe de convertisseur
+        """
+        self.get_converter = get_converter
+        self._edges = {}
+        # Convertisseurs capables de lire directement un format intermédiaire ('txt', 'csv')
+        self._decoders = {}
+        for (ext, fmt), converter_class in routes.items():
+            source = ext.lstrip('.')
+            if source != fmt:
+                self._edges.setdefault(source, []).append(PlanStep(source, fmt, converter_class))
+            elif PAYLOAD_FORMATS.get(source) == getattr(converter_class, 'PAYLOAD_TYPE', None):
+                self._decoders.setdefault(source, converter_class)
+        for source, target in ADAPTERS:
+            self._edges.setdefault(source, []).append(PlanStep(source, target))
+
+        self._costs = {}
+        self._plans = {}
+        # Coûts mesurés au moment où les plans en cache ont commencé à être calculés
+        self._planned_costs = {}
+        self._lock = threading.Lock()
+
+    def _can_chain(self, step, is_first):
+        """Vérifier qu'une étape peut échanger son contenu en mémoire"""
+        if step.converter_class is None:
+            return not is_first or step.source in self._decoders
+        payload_type = getattr(step.converter_class, 'PAYLOAD_TYPE', None)
+        if payload_type is None:
+            return False
+        # En sortie de première étape, le contenu décodé doit correspondre au format intermédiaire
+        if is_first:
+            return PAYLOAD_FORMATS.get(step.target) == payload_type
+        return PAYLOAD_FORMATS.get(step.source) == payload_type
+
+    def step_cost(self, step):
+        """Coût estimé d'une étape (moyenne des durées mesurées)"""
+        return self._cost_of(self._costs, step.key)
+
+    def _cost_of(self, costs, key):
+        """Coût d'une étape d'après des mesures (coût initial sans mesure)"""
+        cost = costs.get(key)
+        if cost is not None:
+            return cost
+        return self.ADAPTER_COST if key[0] == 'adapter' else self.DEFAULT_STEP_COST
+
+    def record_timing(self, key, seconds):
+        """
+        Enregistrer la durée mesurée d'une étape
+
+        Args:
+            key (tuple): (nom du convertisseur, format source, format cible)
+            seconds (float): Durée mesurée
+        """
+        with self._lock:
+            previous = self._costs.get(key)
+            if previous is None:
+                self._costs[key] = seconds
+            else:
+                self._costs[key] = previous + self.SMOOTHING * (seconds - previous)
+            # Une conversion enregistre une mesure à chaque fois : les plans en cache ne sont
+            # recalculés que si le coût de l'étape s'est nettement écarté de celui qu'ils ont retenu
+            planned, cost = self._cost_of(self._planned_costs, key), self._costs[key]
+            if max(planned, cost) > self.REPLAN_RATIO * min(planned, cost):
+                self._plans.clear()
+                self._planned_costs = dict(self._costs)
+
+    def plan(self, input_ext, output_format):
+        """
+        Trouver le chemin le moins coûteux entre deux formats
+
+        Args:
+            input_ext (str): Extension d'entrée (avec ou sans point)
+            output_format (str): Format de sortie
+
+        Returns:
+            list: Étapes (PlanStep) ou None si aucun chemin n'existe
+        """
+        source = input_ext.lower().lstrip('.')
+        target = output_format.lower()
+        cache_key = (source, target)
+        with self._lock:
+            if cache_key in self._plans:
+                return self._plans[cache_key]
+
+        # Dijkstra : seuls la source et les formats intermédiaires en mémoire sont développés
+        best = {source: 0.0}
+        queue = [(0.0, 0, source, [])]
+        counter = 1
+        found = None
+        while queue:
+            cost, _, node, path = heapq.heappop(queue)
+            if node == target:
+                found = path
+                break
+            if cost > best.get(node, float('inf')):
+                continue
+            if node != source and node not in PAYLOAD_FORMATS:
+                continue
+            for step in self._edges.get(node, ()):
+                is_first = not path
+                # Étape directe vers la cible : toujours possible depuis la source
+                if not (is_first and step.target == target) and not self._can_chain(step, is_first):
+                    continue
+                new_cost = cost + self.step_cost(step)
+                if new_cost < best.get(step.target, float('inf')):
+                    best[step.target] = new_cost
+                    heapq.heappush(queue, (new_cost, counter, step.target, path + [step]))
+                    counter += 1
+
+        with self._lock:
+            self._plans[cache_key] = found
+        return found
+
+    def reachable_formats(self, input_ext):
+        """Lister les formats atteignables depuis une extension, directement ou en plusieurs étapes"""
+        source = input_ext.lower().lstrip('.')
+        targets = set()
+        for step in self._edges.get(source, ()):
+            targets.add(step.target)
+        for fmt in list(targets) + list(PAYLOAD_FORMATS):
+            for step in self._edges.get(fmt, ()):
+                targets.add(step.target)
+        return {fmt for fmt in targets if fmt != source and self.plan(source, fmt)}
+
+    def converters_for(self, steps):
+        """Lister les classes de convertisseurs utilisées par un plan"""
+        classes = set()
+        for index, step in enumerate(steps):
+            if step.converter_class is not None:
+                classes.add(step.converter_class)
+            elif index == 0:
+                classes.add(self._decoders[step.source])
+        return classes
+
+    def execute(self, steps, input_path, output_dir):
+        """
+        Exécuter un plan : décodage, passerelles en mémoire puis écriture finale
+
+        Args:
+            steps (list): Étapes retournées par plan()
+            input_path (str): Chemin du fichier source
+            output_dir (str): Répertoire de sortie
+
+        Returns:
+            ConversionResult: Fichier produit (évalué à False en cas d'échec)
+        """
+        input_path = Path(input_path)
+        last = steps[-1]
+        output_path = Path(output_dir) / f"{input_path.stem}.{last.target}"
+
+        payload = None
+        for index, step in enumerate(steps):
+            start = time.perf_counter()
+            if index == 0:
+                decoder_class = step.converter_class or self._decoders[step.source]
+                payload = self.get_converter(decoder_class).decode(input_path)
+                if payload is None:
+                    return ConversionResult(False)
+            if step.converter_class is None:
+                with tracing.span(f"adapter {step.source}->{step.target}", tracing.TRANSFORM):
+                    payload = ADAPTERS[(step.source, step.target)](payload)
+            elif step is last:
+                converter = self.get_converter(step.converter_class)
+                if not converter.encode(payload, output_path, last.target):
+                    return ConversionResult(False)
+            self.record_timing(step.key, time.perf_counter() - start)
+            progress.report((index + 1) / len(steps))
+        return ConversionResult(True, [output_path])
@@ -0,0 +1,307 @@
+"""
+Registre des convertisseurs pour PtitConvert
+Associe chaque couple (extension d'entrée, format de sortie) au convertisseur
+qui le prend en charge. Les tables sont construites une seule fois à l'import
+à partir des capacités déclarées par chaque classe de convertisseur ; les
+couples sans convertisseur direct passent par le planificateur multi-étapes.
+"""
+
+import inspect
+import logging
+import threading
+import time
+from pathlib import Path
+
+from converters.image_converter import ImageConverter
+from converters.document_converter import DocumentConverter
+from converters.advanced_document_converter import AdvancedDocumentConverter
+from converters.spreadsheet_converter import SpreadsheetConverter
+from converters.archive_converter import ArchiveConverter
+from converters.media_converter import MediaConverter
+from converters.planner import ConversionPlanner
+from converters.result import ConversionResult
+from utils import logs, memory, tracing
+
+logger = logging.getLogger(__name__)
+
+# Ordre de priorité : pour une même route, le premier convertisseur déclaré l'emporte
+CONVERTER_CLASSES = (
+    ImageConverter,
+    DocumentConverter,
+    AdvancedDocumentConverter,
+    SpreadsheetConverter,
+    ArchiveConverter,
+    MediaConverter,
+)
+
+# Extensions composées reconnues avant le simple suffixe
+COMPOUND_EXTENSIONS = ('.tar.gz', '.tar.bz2')
+
+
+def get_capabilities(converter_class):
+    """
+    Obtenir les capacités déclarées par une classe de convertisseur
+
+    Args:
+        converter_class (type): Classe de convertisseur
+
+    Returns:
+        tuple: Couples (extensions d'entrée, formats de sortie)
+    """
+    capabilities = getattr(converter_class, 'CAPABILITIES', None)
+    if capabilities:
+        return capabilities
+    return ((converter_class.SUPPORTED_INPUT_FORMATS, converter_class.SUPPORTED_OUTPUT_FORMATS),)
+
+
+def _build_tables():
+    """Construire les tables de routage à partir des capacités des convertisseurs"""
+    routes = {}
+    outputs = {}
+    for converter_class in CONVERTER_CLASSES:
+        for input_formats, output_formats in get_capabilities(converter_class):
+            for ext in input_formats:
+                ext = ext.lower()
+                for fmt in output_formats:
+                    fmt = fmt.lower()
+                    routes.setdefault((ext, fmt), converter_class)
+                    outputs.setdefault(ext, set()).add(fmt)
+    return routes, {ext: tuple(sorted(fmts)) for ext, fmts in outputs.items()}
+
+
+# (extension, format) -> classe de convertisseur ; extension -> formats de sortie directs
+_ROUTES, _DIRECT_OUTPUTS = _build_tables()
+_ACCEPTS_QUALITY = {
+    cls: 'quality' in inspect.signature(cls.convert).parameters for cls in CONVERTER_CLASSES
+}
+# Options propres à chaque convertisseur : paramètres de convert() après le format de sortie
+_OPTIONS = {
+    cls: frozenset(list(inspect.signature(cls.convert).parameters)[4:]) - {'quality'}
+    for cls in CONVERTER_CLASSES
+}
+
+# Une instance par classe et par processus, créée au premier usage
+_INSTANCES = {}
+_INSTANCES_LOCK = threading.Lock()
+
+
+def get_converter(converter_class):
+    """Obtenir l'instance partagée d'une classe de convertisseur"""
+    converter = _INSTANCES.get(converter_class)
+    if converter is None:
+        with _INSTANCES_LOCK:
+            converter = _INSTANCES.get(converter_class)
+            if converter is None:
+                converter = converter_class()
+                _INSTANCES[converter_class] = converter
+    return converter
+
+
+PLANNER = ConversionPlanner(_ROUTES, get_converter)
+
+# Formats atteignables par extension, conversions en plusieurs étapes comprises
+_OUTPUTS = {
+    ext: tuple(sorted(set(fmts) | PLANNER.reachable_formats(ext)))
+    for ext, fmts in _DIRECT_OUTPUTS.items()
+}
+_ALL_OUTPUTS = tuple(sorted({fmt for fmts in _OUTPUTS.values() for fmt in fmts}))
+
+
+def get_extension(file_path):
+    """
+    Obtenir l'extension normalisée d'un fichier ('.png', '.tar.gz', ...)
+
+    Args:
+        file_path (str): Chemin ou nom du fichier
+
+    Returns:
+        str: Extension en minuscules, point compris
+    """
+    name = Path(str(file_path)).name.lower()
+    for compound in COMPOUND_EXTENSIONS:
+        if name.endswith(compound):
+            return compound
+    return Path(name).suffix
+
+
+def normalize_extension(value):
+    """Normaliser une extension fournie avec ou sans point ('png' -> '.png')"""
+    value = str(value).lower()
+    return value if value.startswith('.') else f'.{value}'
+
+
+def get_supported_extensions():
+    """Retourner l'ensemble des extensions d'entrée prises en charge"""
+    return frozenset(_OUTPUTS)
+
+
+def is_supported(file_path):
+    """Vérifier qu'au moins une conversion existe pour ce fichier"""
+    return get_extension(file_path) in _OUTPUTS
+
+
+def get_output_formats(ext):
+    """
+    Obtenir les formats de sortie possibles pour une extension
+
+    Args:
+        ext (str): Extension d'entrée (avec ou sans point)
+
+    Returns:
+        list: Formats de sortie en minuscules, triés
+    """
+    return list(_OUTPUTS.get(normalize_extension(ext), ()))
+
+
+def get_all_output_formats():
+    """Retourner tous les formats de sortie connus"""
+    return list(_ALL_OUTPUTS)
+
+
+def get_converter_class(file_path, output_format):
+    """
+    Trouver la classe de convertisseur pour un fichier et un format de sortie
+
+    Returns:
+        type: Classe de convertisseur ou None si la conversion n'est pas prise en charge
+    """
+    return _ROUTES.get((get_extension(file_path), output_format.lower()))
+
+
+def can_convert(file_path, output_format):
+    """Vérifier qu'une conversion est possible, directement ou en plusieurs étapes"""
+    return output_format.lower() in _OUTPUTS.get(get_extension(file_path), ())
+
+
+def get_route_converters(file_path, output_format):
+    """
+    Lister les classes de convertisseurs qui réalisent une conversion
+
+    Returns:
+        list: Classes triées par nom (vide si la conversion est impossible)
+    """
+    output_format = output_format.lower()
+    ext = get_extension(file_path)
+    converter_class = _ROUTES.get((ext, output_format))
+    if converter_class is not None:
+        return [converter_class]
+    steps = PLANNER.plan(ext, output_format)
+    if not steps:
+        return []
+    # Un plan en plusieurs étapes dépend de chaque convertisseur traversé
+    return sorted(PLANNER.converters_for(steps), key=lambda cls: cls.__name__)
+
+
+def get_converter_name(file_path, output_format):
+    """Nom du ou des convertisseurs d'une conversion ('none' si impossible)"""
+    classes = get_route_converters(file_path, output_format)
+    return '+'.join(cls.__name__ for cls in classes) or 'none'
+
+
+def get_converter_version(file_path, output_format):
+    """
+    Obtenir la version du code qui produit une conversion
+
+    Sert à invalider les résultats en cache quand un convertisseur évolue.
+
+    Returns:
+        str: Versions des convertisseurs impliqués ou None si la conversion est impossible
+    """
+    classes = get_route_converters(file_path, output_format)
+    if not classes:
+        return None
+    return '+'.join(f"{cls.__name__}={cls.VERSION}" for cls in classes)
+
+
+def route_options(file_path, output_format, options):
+    """
+    Garder les options prises en charge par le convertisseur d'une conversion
+
+    Les options sont des paramètres de convert() propres à un convertisseur
+    ('ops' des images...) ; une conversion en plusieurs étapes n'en prend aucune.
+
+    Args:
+        file_path (str): Fichier à convertir
+        output_format (str): Format de sortie
+        options (dict): Options demandées
+
+    Returns:
+        dict: Options retenues (vide si aucune ne s'applique)
+    """
+    if not options:
+        return {}
+    converter_class = get_converter_class(file_path, output_format)
+    accepted = _OPTIONS.get(converter_class, frozenset())
+    kept = {name: value for name, value in options.items() if name in accepted and value is not None}
+    ignored = sorted(name for name, value in options.items() if name not in kept and value is not None)
+    if ignored:
+        logger.debug("Options ignorées pour %s -> %s: %s", get_extension(file_path), output_format,
+                     ', '.join(ignored))
+    return kept
+
+
+def convert(input_path, output_dir, output_format, quality='medium', options=None):
+    """
+    Convertir un fichier avec le convertisseur adapté
+
+    Args:
+        input_path (str): Chemin du fichier source
+        output_dir (str): Répertoire de sortie
+        output_format (str): Format de sortie
+        quality (str): Qualité de conversion (si le convertisseur la gère)
+        options (dict): Options propres au convertisseur, ignorées par les autres
+            (ex. {'ops': 'resize:2048x2048,strip'} pour les images)
+
+    Returns:
+        ConversionResult: Fichiers produits, durée, temps par étape, octets écrits,
+            pic de mémoire, avertissements et erreur (évalué à False en cas d'échec)
+
+    Raises:
+        ValueError: Si aucune conversion n'est possible pour ce couple de formats
+    """
+    output_format = output_format.lower()
+    ext = get_extension(input_path)
+    converter_class = _ROUTES.get((ext, output_format))
+    steps = None
+    if converter_class is None:
+        # Pas de convertisseur direct : chemin le moins coûteux en plusieurs étapes
+        steps = PLANNER.plan(ext, output_format)
+        if not steps:
+            if ext not in _OUTPUTS:
+                raise ValueError(f"Format non supporté: {ext}")
+            raise ValueError(f"Conversion non supportée: {ext} -> {output_format}")
+
+    measured = memory.reset_peak_rss()
+    start = time.perf_counter()
+    with logs.capture() as messages, tracing.recording() as recorded:
+        if steps is not None:
+            with tracing.span('ConversionPlanner.execute', tracing.CONVERT,
+                              route=' -> '.join(repr(step) for step in steps)) as convert_span:
+                result = PLANNER.execute(steps, input_path, output_dir)
+                convert_span.set(success=result.success)
+        else:
+            converter = get_converter(converter_class)
+            kwargs = route_options(input_path, output_format, options)
+            with tracing.span(f"{converter_class.__name__}.convert", tracing.CONVERT,
+                              route=f"{ext.lstrip('.')}->{output_format}") as convert_span:
+                if _ACCEPTS_QUALITY[converter_class]:
+                    kwargs['quality'] = quality
+                result = converter.convert(str(input_path), output_dir, output_format, **kwargs)
+                if not isinstance(result, ConversionResult):
+                    # Convertisseur externe qui renvoie encore un booléen
+                    result = ConversionResult(result)
+                convert_span.set(success=result.success)
+    result.elapsed = time.perf_counter() - start
+    # Erreur et avertissements journalisés par le convertisseur
+    result.add_messages(messages)
+    if not result.success and result.error is None:
+        result.error = f"Échec de la conversion {ext.lstrip('.')} -> {output_format}"
+    result.stages = tracing.stage_times(recorded.events)
+    # Sans remise à zéro, le pic est celui du processus depuis son démarrage
+    result.peak_memory_mb = memory.peak_rss_mb() if measured else None
+    result.measure_outputs()
+    if result and steps is None:
+        # Les durées mesurées alimentent les coûts du planificateur
+        step_key = (converter_class.__name__, ext.lstrip('.'), output_format)
+        PLANNER.record_timing(step_key, result.elapsed)
+    return result
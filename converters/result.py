@@ -0,0 +1,118 @@
+"""
+Résultat d'une conversion pour PtitConvert
+Les convertisseurs indiquent les fichiers réellement produits ; le registre
+complète le résultat avec la durée, le temps passé par étape (décodage,
+transformation, encodage), les octets écrits et le pic de mémoire. Un
+résultat s'évalue comme un booléen (succès), comme l'ancien retour des
+convertisseurs.
+"""
+
+import logging
+import os
+
+# Classes d'erreur qui ne proviennent pas d'une exception Python
+UNSUPPORTED_FORMAT = 'UnsupportedFormat'
+CANCELLED = 'Cancelled'
+TIMEOUT = 'Timeout'
+MEMORY_LIMIT = 'MemoryLimit'
+WORKER_CRASHED = 'WorkerCrashed'
+
+
+class ConversionResult:
+    """Issue d'une conversion et fichiers produits"""
+
+    __slots__ = ('success', 'outputs', 'error', 'error_type', 'warnings', 'elapsed', 'stages',
+                 'bytes_written', 'peak_memory_mb', 'cached')
+
+    def __init__(self, success, outputs=None, error=None, error_type=None, warnings=None,
+                 elapsed=0.0, stages=None, bytes_written=0, peak_memory_mb=None, cached=False):
+        """
+        Initialiser le résultat
+
+        Args:
+            success (bool): La conversion a réussi
+            outputs (list): Fichiers (ou dossiers, pour une extraction) produits
+            error (str): Message d'erreur en cas d'échec
+            error_type (str): Classe de l'erreur (nom de l'exception ou UNSUPPORTED_FORMAT,
+                TIMEOUT...)
+            warnings (list): Avertissements émis pendant la conversion
+            elapsed (float): Durée totale en secondes
+            stages (dict): Secondes passées par catégorie d'étape ('decode', 'encode'...)
+            bytes_written (int): Taille totale des sorties
+            peak_memory_mb (float): Pic de mémoire résidente du processus pendant la conversion
+            cached (bool): Résultat servi par le cache sans relancer la conversion
+        """
+        self.success = bool(success)
+        self.outputs = [str(path) for path in outputs or ()]
+        self.error = error
+        self.error_type = error_type
+        self.warnings = list(warnings or ())
+        self.elapsed = elapsed
+        self.stages = stages or {}
+        self.bytes_written = bytes_written
+        self.peak_memory_mb = peak_memory_mb
+        self.cached = cached
+
+    @classmethod
+    def of(cls, success, *outputs):
+        """Résultat d'un convertisseur : les sorties ne comptent qu'en cas de succès"""
+        return cls(success, outputs if success else ())
+
+    @classmethod
+    def from_exception(cls, exc):
+        """Échec causé par une exception"""
+        return cls(False, error=str(exc) or type(exc).__name__, error_type=type(exc).__name__)
+
+    def add_messages(self, messages):
+        """
+        Joindre les messages recueillis pendant la conversion (voir utils.logs.capture)
+
+        Les avertissements s'ajoutent à warnings ; en cas d'échec sans message,
+        la dernière erreur journalisée devient l'erreur du résultat.
+        """
+        errors = []
+        for level, message, exc_type in messages:
+            if level >= logging.ERROR:
+                errors.append((message, exc_type))
+            else:
+                self.warnings.append(message)
+        if not self.success and errors:
+            message, exc_type = errors[-1]
+            if self.error is None:
+                self.error = message
+            if self.error_type is None and exc_type is not None:
+                self.error_type = exc_type.__name__
+
+    def __bool__(self):
+        return self.success
+
+    def __repr__(self):
+        state = 'ok' if self.success else f"échec: {self.error}"
+        return f"ConversionResult({state}, outputs={self.outputs}, elapsed={self.elapsed:.3f})"
+
+    @property
+    def output(self):
+        """Sortie principale (None si rien n'a été produit)"""
+        return self.outputs[0] if self.outputs else None
+
+    def measure_outputs(self):
+        """Calculer bytes_written à partir des sorties présentes sur le disque"""
+        total = 0
+        for path in self.outputs:
+            if os.path.isdir(path):
+                for root, _, files in os.walk(path):
+                    for name in files:
+                        try:
+                            total += os.path.getsize(os.path.join(root, name))
+                        except OSError:
+                            pass
+            else:
+                try:
+                    total += os.path.getsize(path)
+                except OSError:
+                    pass
+        self.bytes_written = total
+        return total
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
@@ -3,21 +3,33 @@ Convertisseur de feuilles de calcul pour PtitConvert
 Gère la conversion entre XLSX, CSV et PDF
 """
 
-import openpyxl
 import csv
-import pandas as pd
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
+import logging
 import os
 from pathlib import Path
 
+from converters.result import UNSUPPORTED_FORMAT, ConversionResult
+from utils import tracing
+from utils.lazy import LazyModule
+
+logger = logging.getLogger(__name__)
+
+# Chargés au premier usage
+openpyxl = LazyModule('openpyxl')
+pd = LazyModule('pandas')
+pagesizes = LazyModule('reportlab.lib.pagesizes')
+platypus = LazyModule('reportlab.platypus')
+colors = LazyModule('reportlab.lib.colors')
+
 class SpreadsheetConverter:
     """Convertisseur pour les feuilles de calcul"""
     
+    # À incrémenter quand le rendu change (invalide le cache de résultats)
+    VERSION = '1.0'
     SUPPORTED_INPUT_FORMATS = {'.xlsx', '.csv'}
     SUPPORTED_OUTPUT_FORMATS = {'xlsx', 'csv', 'pdf'}
+    # Contenu intermédiaire échangé en mémoire (voir converters/planner.py)
+    PAYLOAD_TYPE = 'table'
     
     def __init__(self):
         """Initialiser le convertisseur de feuilles de calcul"""
@@ -33,7 +45,7 @@ class SpreadsheetConverter:
             output_format (str): Format de sortie ('xlsx', 'csv', 'pdf')
             
         Returns:
-            bool: True si la conversion a réussi, False sinon
+            ConversionResult: Fichiers produits (évalué à False en cas d'échec)
         """
         try:
             input_path = Path(input_path)
@@ -41,24 +53,64 @@ class SpreadsheetConverter:
             
             # Vérifier que le format d'entrée est supporté
             if input_path.suffix.lower() not in self.SUPPORTED_INPUT_FORMATS:
-                print(f"Format d'entrée non supporté: {input_path.suffix}")
-                return False
+                error = f"Format d'entrée non supporté: {input_path.suffix}"
+                logger.error(error)
+                return ConversionResult(False, error=error, error_type=UNSUPPORTED_FORMAT)
                 
             # Vérifier que le format de sortie est supporté
             if output_format not in self.SUPPORTED_OUTPUT_FORMATS:
-                print(f"Format de sortie non supporté: {output_format}")
-                return False
+                error = f"Format de sortie non supporté: {output_format}"
+                logger.error(error)
+                return ConversionResult(False, error=error, error_type=UNSUPPORTED_FORMAT)
                 
             # Créer le nom de fichier de sortie
             output_name = f"{input_path.stem}.{output_format}"
             output_path = Path(output_dir) / output_name
             
             # Lire les données du fichier source
-            data = self._read_data(input_path)
+            data = self.decode(input_path)
             if data is None:
-                return False
+                return ConversionResult(False)
                 
             # Convertir selon le format de sortie
+            ok = self.encode(data, output_path, output_format)
+            return ConversionResult.of(ok, output_path)
+                
+        except Exception as e:
+            logger.error("Erreur lors de la conversion de feuille de calcul: %s", e)
+            return ConversionResult.from_exception(e)
+            
+    def decode(self, input_path):
+        """
+        Lire les lignes d'une feuille de calcul sans écrire de fichier
+        
+        Args:
+            input_path (str): Chemin du fichier d'entrée
+            
+        Returns:
+            list: Données sous forme de liste de listes ou None en cas d'erreur
+        """
+        input_path = Path(input_path)
+        with tracing.span('SpreadsheetConverter.decode', tracing.DECODE,
+                          format=input_path.suffix.lower().lstrip('.')) as decode_span:
+            data = self._read_data(input_path)
+            decode_span.set(rows=len(data) if data is not None else 0)
+        return data
+        
+    def encode(self, data, output_path, output_format):
+        """
+        Écrire des lignes au format demandé
+        
+        Args:
+            data (list): Données sous forme de liste de listes
+            output_path (str): Chemin du fichier de sortie
+            output_format (str): Format de sortie ('xlsx', 'csv', 'pdf')
+            
+        Returns:
+            bool: True si l'écriture a réussi
+        """
+        output_format = output_format.lower()
+        with tracing.span('SpreadsheetConverter.encode', tracing.ENCODE, format=output_format):
             if output_format == 'xlsx':
                 return self._create_xlsx(data, output_path)
             elif output_format == 'csv':
@@ -67,10 +119,6 @@ class SpreadsheetConverter:
                 return self._create_pdf(data, output_path)
             else:
                 return False
-                
-        except Exception as e:
-            print(f"Erreur lors de la conversion de feuille de calcul: {e}")
-            return False
             
     def _read_data(self, input_path):
         """
@@ -93,7 +141,7 @@ class SpreadsheetConverter:
                 return None
                 
         except Exception as e:
-            print(f"Erreur lors de la lecture des données: {e}")
+            logger.error("Erreur lors de la lecture des données: %s", e)
             return None
             
     def _read_xlsx(self, xlsx_path):
@@ -111,7 +159,7 @@ class SpreadsheetConverter:
             return data
             
         except Exception as e:
-            print(f"Erreur lors de la lecture du XLSX: {e}")
+            logger.error("Erreur lors de la lecture du XLSX: %s", e)
             return None
             
     def _read_csv(self, csv_path):
@@ -141,11 +189,11 @@ class SpreadsheetConverter:
                 except UnicodeDecodeError:
                     continue
                     
-            print(f"Impossible de lire le fichier CSV avec les encodages supportés")
+            logger.error("Impossible de lire le fichier CSV avec les encodages supportés")
             return None
             
         except Exception as e:
-            print(f"Erreur lors de la lecture du CSV: {e}")
+            logger.error("Erreur lors de la lecture du CSV: %s", e)
             return None
             
     def _create_xlsx(self, data, output_path):
@@ -160,11 +208,11 @@ class SpreadsheetConverter:
                     
             workbook.save(str(output_path))
             
-            print(f"XLSX créé: {output_path}")
+            logger.info("XLSX créé: %s", output_path)
             return True
             
         except Exception as e:
-            print(f"Erreur lors de la création du XLSX: {e}")
+            logger.error("Erreur lors de la création du XLSX: %s", e)
             return False
             
     def _create_csv(self, data, output_path):
@@ -175,17 +223,17 @@ class SpreadsheetConverter:
                 for row in data:
                     writer.writerow(row)
                     
-            print(f"CSV créé: {output_path}")
+            logger.info("CSV créé: %s", output_path)
             return True
             
         except Exception as e:
-            print(f"Erreur lors de la création du CSV: {e}")
+            logger.error("Erreur lors de la création du CSV: %s", e)
             return False
             
     def _create_pdf(self, data, output_path):
         """Créer un PDF à partir des données"""
         try:
-            doc = SimpleDocTemplate(str(output_path), pagesize=A4)
+            doc = platypus.SimpleDocTemplate(str(output_path), pagesize=pagesizes.A4)
             
             # Limiter le nombre de colonnes et de lignes pour l'affichage
             max_cols = 8
@@ -212,10 +260,10 @@ class SpreadsheetConverter:
                 display_data.append(['...'] * len(display_data[0]))
                 
             # Créer le tableau
-            table = Table(display_data)
+            table = platypus.Table(display_data)
             
             # Style du tableau
-            table.setStyle(TableStyle([
+            table.setStyle(platypus.TableStyle([
                 ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
                 ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
                 ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -232,11 +280,11 @@ class SpreadsheetConverter:
             elements = [table]
             doc.build(elements)
             
-            print(f"PDF créé: {output_path}")
+            logger.info("PDF créé: %s", output_path)
             return True
             
         except Exception as e:
-            print(f"Erreur lors de la création du PDF: {e}")
+            logger.error("Erreur lors de la création du PDF: %s", e)
             return False
             
     def get_spreadsheet_info(self, spreadsheet_path):
@@ -275,7 +323,7 @@ class SpreadsheetConverter:
             return info
             
         except Exception as e:
-            print(f"Erreur lors de la lecture des informations de la feuille de calcul: {e}")
+            logger.error("Erreur lors de la lecture des informations de la feuille de calcul: %s", e)
             return None
             
     def convert_to_dataframe(self, file_path):
@@ -300,5 +348,5 @@ class SpreadsheetConverter:
                 return None
                 
         except Exception as e:
-            print(f"Erreur lors de la conversion en DataFrame: {e}")
+            logger.error("Erreur lors de la conversion en DataFrame: %s", e)
             return None
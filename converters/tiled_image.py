@@ -0,0 +1,791 @@
+"""
+Traitement par bandes des très grandes images pour PtitConvert
+Une carte ou un scan d'archive de plusieurs gigapixels ne tient pas en mémoire
+une fois décodé. Les lecteurs de ce module décodent une image TIFF ou PNG par
+bandes de lignes successives, les écrivains produisent un TIFF (en tuiles ou en
+bandes) ou un PNG au fil de l'eau : la mémoire utilisée dépend de la largeur
+de l'image, pas de sa hauteur.
+
+Chaque bloc d'un TIFF (bande ou rangée de tuiles) est décodé par libtiff à
+partir d'un petit TIFF construit en mémoire autour de ses seules données. Pour
+un PNG, le flux zlib est décompressé progressivement ; chaque bande est
+décodée par Pillow, précédée de la dernière ligne de la bande précédente (les
+filtres PNG dépendent de la ligne du dessus).
+"""
+
+import io
+import logging
+import math
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import progress, threads, tracing
+from utils.lazy import LazyModule
+
+logger = logging.getLogger(__name__)
+
+Image = LazyModule('PIL.Image')
+PngImagePlugin = LazyModule('PIL.PngImagePlugin')
+TiffImagePlugin = LazyModule('PIL.TiffImagePlugin')
+
+# Au-delà (en pixels), une image TIFF ou PNG est traitée par bandes plutôt que décodée entière
+BAND_THRESHOLD_PIXELS = 64 * 1024 * 1024
+# Formats de sortie écrits au fil de l'eau
+STREAM_FORMATS = ('tiff', 'png')
+# Taille des tuiles d'un TIFF en tuiles (multiple de 16)
+DEFAULT_TILE_SIZE = 256
+# Lignes par bande d'un TIFF en bandes
+ROWS_PER_STRIP = 64
+# Lignes minimales d'un bloc TIFF décodé en une fois (bandes d'origine regroupées)
+MIN_BLOCK_ROWS = 64
+# Au-delà de cette taille de données, le TIFF écrit est un BigTIFF (décalages sur 64 bits)
+BIGTIFF_THRESHOLD = 2 ** 32 - 2 ** 28
+# Taille des segments IDAT d'un PNG écrit
+PNG_CHUNK_SIZE = 1024 * 1024
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Type de couleur PNG -> nombre de composantes
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+# Octets par pixel -> (mode, type de couleur) d'un PNG 8 bits de même pas de filtre
+_PNG_BYTE_LAYOUT = {1: ('L', 0), 2: ('LA', 4), 3: ('RGB', 2), 4: ('RGBA', 6)}
+
+# Étiquettes TIFF
+_WIDTH, _LENGTH, _BITS, _COMPRESSION, _PHOTOMETRIC = 256, 257, 258, 259, 262
+_STRIP_OFFSETS, _SAMPLES, _ROWS_PER_STRIP, _STRIP_COUNTS = 273, 277, 278, 279
+_X_RESOLUTION, _Y_RESOLUTION, _PLANAR, _RESOLUTION_UNIT = 282, 283, 284, 296
+_COLORMAP, _TILE_WIDTH, _TILE_LENGTH, _TILE_OFFSETS, _TILE_COUNTS = 320, 322, 323, 324, 325
+_EXTRA_SAMPLES = 338
+_ICC_PROFILE = 34675
+# Étiquettes recopiées dans le TIFF construit autour d'un bloc (décodage)
+_BLOCK_TAGS = (_BITS, _COMPRESSION, _PHOTOMETRIC, 266, _SAMPLES, _PLANAR, 292, 293, 317,
+               _COLORMAP, _EXTRA_SAMPLES, 339, 347, 530, 531, 532)
+# Type TIFF -> (format struct d'une valeur, taille)
+_TIFF_TYPES = {1: ('B', 1), 2: ('B', 1), 3: ('H', 2), 4: ('I', 4), 5: ('II', 8), 6: ('b', 1),
+               7: ('B', 1), 8: ('h', 2), 9: ('i', 4), 10: ('ii', 8), 11: ('f', 4), 12: ('d', 8),
+               16: ('Q', 8)}
+_SHORT, _LONG, _RATIONAL, _LONG8 = 3, 4, 5, 16
+# Compression TIFF écrite
+_TIFF_COMPRESSIONS = {'none': 1, 'deflate': 8}
+# Mode -> (photométrie, composantes, bits, mode brut, composantes supplémentaires)
+_TIFF_LAYOUTS = {
+    '1': (1, 1, 1, '1', None),
+    'L': (1, 1, 8, 'L', None),
+    'LA': (1, 2, 8, 'LA', 2),
+    'I;16': (1, 1, 16, 'I;16', None),
+    'RGB': (2, 3, 8, 'RGB', None),
+    'RGBA': (2, 4, 8, 'RGBA', 2),
+    'CMYK': (5, 4, 8, 'CMYK', None),
+    'P': (3, 1, 8, 'P', None),
+}
+# Mode -> (type de couleur, bits, mode brut) d'un PNG écrit
+_PNG_LAYOUTS = {
+    '1': (0, 1, '1'),
+    'L': (0, 8, 'L'),
+    'LA': (4, 8, 'LA'),
+    'I;16': (0, 16, 'I;16B'),
+    'RGB': (2, 8, 'RGB'),
+    'RGBA': (6, 8, 'RGBA'),
+    'P': (3, 8, 'P'),
+}
+
+
+def _ifd_bytes(entries, offset, big=False, order='<'):
+    """
+    Sérialiser un répertoire TIFF
+
+    Args:
+        entries (list): (étiquette, type, valeurs) ; bytes pour les types octets
+        offset (int): Position du répertoire dans le fichier
+        big (bool): Répertoire BigTIFF
+        order (str): Ordre des octets ('<' petit-boutiste, '>' gros-boutiste)
+
+    Returns:
+        bytes: Répertoire suivi des valeurs qui ne tiennent pas dans les entrées
+    """
+    entry_size, inline, count_format = (20, 8, 'Q') if big else (12, 4, 'H')
+    header = struct.calcsize(count_format)
+    next_size = 8 if big else 4
+    data_offset = offset + header + entry_size * len(entries) + next_size
+    table, extra = [struct.pack(order + count_format, len(entries))], []
+    for tag, kind, values in sorted(entries, key=lambda entry: entry[0]):
+        fmt, size = _TIFF_TYPES[kind]
+        if isinstance(values, (bytes, bytearray)):
+            raw, count = bytes(values), len(values)
+        else:
+            values = values if isinstance(values, (list, tuple)) else (values,)
+            count = len(values) // len(fmt)
+            raw = struct.pack(f"{order}{len(values)}{fmt[0]}", *values)
+        if len(raw) <= inline:
+            value = raw.ljust(inline, b'\0')
+        else:
+            value = struct.pack(order + ('Q' if big else 'I'), data_offset)
+            padded = len(raw) + len(raw) % 2
+            extra.append(raw.ljust(padded, b'\0'))
+            data_offset += padded
+        table.append(struct.pack(order + ('HHQ' if big else 'HHI'), tag, kind, count) + value)
+    table.append(b'\0' * next_size)
+    return b''.join(table) + b''.join(extra)
+
+
+def _tiff_header(ifd_offset, big=False, order='<'):
+    """En-tête TIFF (II : petit-boutiste, MM : gros-boutiste)"""
+    prefix = b'II' if order == '<' else b'MM'
+    if big:
+        return prefix + struct.pack(order + 'HHHQ', 43, 8, 0, ifd_offset)
+    return prefix + struct.pack(order + 'HI', 42, ifd_offset)
+
+
+def _copy_tag(tags, tag):
+    """Entrée (étiquette, type, valeurs) reprise d'un TIFF source, None si absente"""
+    if tag not in tags:
+        return None
+    kind = tags.tagtype.get(tag, _SHORT)
+    value = tags[tag]
+    if kind in (1, 7):
+        raw = value if isinstance(value, bytes) else bytes(value if isinstance(value, tuple) else (value,))
+        return (tag, kind, raw)
+    values = value if isinstance(value, tuple) else (value,)
+    if kind in (5, 10):
+        values = [part for rational in values for part in (rational.numerator, rational.denominator)]
+    return (tag, kind, tuple(values))
+
+
+def _palette(img):
+    """Palette d'une image en mode P : (mode brut, octets), sans décoder l'image"""
+    if img.mode not in ('P', 'PA') or img.palette is None:
+        return None
+    if img.palette.rawmode:
+        return (img.palette.rawmode, bytes(img.palette.palette))
+    return (img.palette.mode, img.palette.tobytes())
+
+
+class BandReader:
+    """Lecture d'une image par bandes de lignes successives"""
+
+    def __init__(self, size, mode, info=None, palette=None):
+        self.size = size
+        self.mode = mode
+        self.info = info or {}
+        # (mode brut, octets) de la palette d'une image en mode P
+        self.palette = palette
+
+    def _new(self, height):
+        band = Image.new(self.mode, (self.size[0], height))
+        self._finish(band)
+        return band
+
+    def _finish(self, band):
+        """Attacher palette et transparence à une bande"""
+        if self.palette is not None and band.mode == 'P':
+            band.putpalette(self.palette[1], self.palette[0])
+        if 'transparency' in self.info:
+            band.info['transparency'] = self.info['transparency']
+        return band
+
+    def _blocks(self):
+        """Blocs décodés dans l'ordre, sur toute la largeur (à définir par les sous-classes)"""
+        raise NotImplementedError
+
+    def bands(self, rows):
+        """
+        Parcourir l'image par bandes
+
+        Args:
+            rows (int): Hauteur des bandes (la dernière peut être plus basse)
+
+        Yields:
+            tuple: (ligne de départ, Image de la bande)
+        """
+        width, height = self.size
+        # Lignes décodées pas encore renvoyées : pending, à partir de la ligne top
+        pending, top = None, 0
+        y = 0
+        for block in self._blocks():
+            if pending is None:
+                pending, top = block, 0
+            else:
+                # Seul le reste (moins d'une bande) est recopié : coût linéaire en nombre de bandes
+                rest = pending.height - top
+                merged = self._new(rest + block.height)
+                merged.paste(pending.crop((0, top, width, pending.height)), (0, 0))
+                merged.paste(block, (0, rest))
+                pending, top = merged, 0
+            while pending.height - top >= rows:
+                yield y, self._finish(pending.crop((0, top, width, top + rows)))
+                y += rows
+                top += rows
+            if top == pending.height:
+                pending = None
+            progress.report(min(y / height, 1.0))
+        if pending is not None:
+            yield y, self._finish(pending.crop((0, top, width, pending.height)))
+
+    def close(self):
+        pass
+
+
+class ImageBandReader(BandReader):
+    """Bandes d'une image déjà en mémoire"""
+
+    def __init__(self, img):
+        super().__init__(img.size, img.mode, dict(img.info), _palette(img))
+        self.image = img
+
+    def _blocks(self):
+        yield self.image
+
+
+class TiffBandReader(BandReader):
+    """Bandes d'un TIFF en bandes ou en tuiles, décodées bloc par bloc par libtiff"""
+
+    def __init__(self, path):
+        """
+        Ouvrir un TIFF (seul l'en-tête est lu)
+
+        Raises:
+            ValueError: Si l'organisation du fichier ne permet pas la lecture par bandes
+        """
+        # Sans Image.open : pas de contrôle de « bombe de décompression » sur la taille totale
+        src = TiffImagePlugin.TiffImageFile(path)
+        tags = src.tag_v2
+        if tags.get(_PLANAR, 1) != 1:
+            src.close()
+            raise ValueError("TIFF à plans de couleur séparés : lecture par bandes impossible")
+        if _TILE_OFFSETS in tags:
+            self._tile = (tags[_TILE_WIDTH], tags[_TILE_LENGTH])
+            offsets, counts = tags[_TILE_OFFSETS], tags[_TILE_COUNTS]
+        elif _STRIP_OFFSETS in tags:
+            self._tile = None
+            offsets, counts = tags[_STRIP_OFFSETS], tags[_STRIP_COUNTS]
+        else:
+            src.close()
+            raise ValueError("TIFF sans bandes ni tuiles")
+        info = {key: value for key, value in src.info.items() if key in ('dpi', 'icc_profile')}
+        super().__init__(src.size, src.mode, info, _palette(src))
+        self.path = path
+        self._tags = tags
+        self._offsets = tuple(offsets) if isinstance(offsets, tuple) else (offsets,)
+        self._counts = tuple(counts) if isinstance(counts, tuple) else (counts,)
+        self._rows_per_strip = min(tags.get(_ROWS_PER_STRIP, src.size[1]), src.size[1])
+        self._copied = [entry for entry in (_copy_tag(tags, tag) for tag in _BLOCK_TAGS) if entry]
+        # Les données des bandes sont recopiées telles quelles : le TIFF d'un bloc garde l'ordre des octets
+        with open(path, 'rb') as f:
+            self._order = '>' if f.read(2) == b'MM' else '<'
+        src.close()
+
+    def _block_tiff(self, height, parts):
+        """Construire un TIFF autour des données d'un bloc (liste d'octets par bande ou tuile)"""
+        if self._tile:
+            layout = [(_TILE_WIDTH, _LONG, self._tile[0]), (_TILE_LENGTH, _LONG, self._tile[1])]
+            offsets_tag, counts_tag = _TILE_OFFSETS, _TILE_COUNTS
+        else:
+            layout = [(_ROWS_PER_STRIP, _LONG, self._rows_per_strip)]
+            offsets_tag, counts_tag = _STRIP_OFFSETS, _STRIP_COUNTS
+        counts = tuple(len(part) for part in parts)
+
+        def entries(offsets):
+            return self._copied + layout + [
+                (_WIDTH, _LONG, self.size[0]), (_LENGTH, _LONG, height),
+                (offsets_tag, _LONG, offsets), (counts_tag, _LONG, counts),
+            ]
+
+        # Taille du répertoire indépendante des valeurs : une première passe donne la position des données
+        start = 8 + len(_ifd_bytes(entries((0,) * len(parts)), 8, order=self._order))
+        offsets, position = [], start
+        for part in parts:
+            offsets.append(position)
+            position += len(part)
+        return (_tiff_header(8, order=self._order) + _ifd_bytes(entries(tuple(offsets)), 8, order=self._order)
+                + b''.join(parts))
+
+    def _blocks(self):
+        width, height = self.size
+        if self._tile:
+            across = math.ceil(width / self._tile[0])
+            block_rows, per_block = self._tile[1], across
+        else:
+            strips = max(1, MIN_BLOCK_ROWS // self._rows_per_strip)
+            block_rows, per_block = self._rows_per_strip * strips, strips
+        with open(self.path, 'rb') as f:
+            for index, y in enumerate(range(0, height, block_rows)):
+                rows = min(block_rows, height - y)
+                first = index * per_block
+                parts = []
+                for offset, count in zip(self._offsets[first:first + per_block],
+                                         self._counts[first:first + per_block]):
+                    f.seek(offset)
+                    parts.append(f.read(count))
+                with tracing.span('TiffBandReader.decode', tracing.DECODE, y=y, rows=rows):
+                    block = TiffImagePlugin.TiffImageFile(io.BytesIO(self._block_tiff(rows, parts)))
+                    block.load()
+                yield block
+
+
+class PngBandReader(BandReader):
+    """Bandes d'un PNG non entrelacé, décompressé progressivement"""
+
+    def __init__(self, path):
+        """
+        Ouvrir un PNG (seul l'en-tête est lu)
+
+        Raises:
+            ValueError: Si le PNG est entrelacé ou en couleurs 16 bits
+        """
+        src = PngImagePlugin.PngImageFile(path)
+        try:
+            with open(path, 'rb') as f:
+                f.seek(16)
+                width, height, depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', f.read(13))
+            if interlace:
+                raise ValueError("PNG entrelacé : lecture par bandes impossible")
+            bits = depth * _PNG_CHANNELS[color_type]
+            self._pixel_bytes = max(1, bits // 8)
+            if self._pixel_bytes not in _PNG_BYTE_LAYOUT:
+                raise ValueError("PNG couleur 16 bits : lecture par bandes impossible")
+            self._row_bytes = (width * bits + 7) // 8
+            # Mode brut du décodeur de Pillow : (codec, zone, position, mode brut)
+            self._rawmode = src.tile[0][3]
+            palette = _palette(src)
+            info = {key: value for key, value in src.info.items()
+                    if key in ('dpi', 'transparency', 'icc_profile')}
+            super().__init__(src.size, src.mode, info, palette)
+        finally:
+            src.close()
+        self.path = path
+
+    def _idat(self, f):
+        """Contenu des segments IDAT, dans l'ordre"""
+        f.seek(len(_PNG_SIGNATURE))
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError("PNG tronqué")
+            length, kind = struct.unpack('>I4s', header)
+            if kind == b'IDAT':
+                yield f.read(length)
+                f.seek(4, os.SEEK_CUR)
+            elif kind == b'IEND':
+                return
+            else:
+                f.seek(length + 4, os.SEEK_CUR)
+
+    def _unfilter(self, context, filtered, rows):
+        """Défiltrer des lignes (octets bruts) en les décodant dans un PNG 8 bits de même pas"""
+        mode, color_type = _PNG_BYTE_LAYOUT[self._pixel_bytes]
+        width = self._row_bytes // self._pixel_bytes
+        if context is not None:
+            filtered = b'\0' + context + filtered
+            rows += 1
+        header = struct.pack('>IIBBBBB', width, rows, 8, color_type, 0, 0, 0)
+        stream = io.BytesIO()
+        stream.write(_PNG_SIGNATURE)
+        for kind, data in ((b'IHDR', header), (b'IDAT', zlib.compress(filtered, 0)), (b'IEND', b'')):
+            stream.write(struct.pack('>I', len(data)) + kind + data)
+            stream.write(struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+        stream.seek(0)
+        block = PngImagePlugin.PngImageFile(stream)
+        block.load()
+        raw = block.tobytes()
+        return raw[self._row_bytes:] if context is not None else raw
+
+    def _blocks(self):
+        width, height = self.size
+        line = self._row_bytes + 1
+        rows_per_block = max(MIN_BLOCK_ROWS, (4 * 1024 * 1024) // line)
+        decompressor = zlib.decompressobj()
+        buffer = bytearray()
+        context = None
+        y = 0
+        with open(self.path, 'rb') as f:
+            chunks = self._idat(f)
+            while y < height:
+                rows = min(rows_per_block, height - y)
+                needed = rows * line
+                while len(buffer) < needed:
+                    data = decompressor.unconsumed_tail or next(chunks, None)
+                    # Fin des segments : il peut rester des données retenues par le décompresseur
+                    output = decompressor.decompress(data or b'', needed - len(buffer))
+                    if data is None and not output:
+                        raise ValueError("Données PNG incomplètes")
+                    buffer += output
+                filtered = bytes(buffer[:needed])
+                del buffer[:needed]
+                with tracing.span('PngBandReader.decode', tracing.DECODE, y=y, rows=rows):
+                    raw = self._unfilter(context, filtered, rows)
+                    context = raw[-self._row_bytes:]
+                    block = Image.frombytes(self.mode, (width, rows), raw, 'raw', self._rawmode)
+                yield self._finish(block)
+                y += rows
+
+
+def open_reader(path):
+    """
+    Ouvrir une image TIFF ou PNG pour la lire par bandes
+
+    Raises:
+        ValueError: Si le format ou l'organisation du fichier ne s'y prête pas
+    """
+    with open(path, 'rb') as f:
+        magic = f.read(8)
+    if magic.startswith(_PNG_SIGNATURE):
+        return PngBandReader(path)
+    if magic[:4] in (b'II*\0', b'MM\0*', b'II+\0', b'MM\0+'):
+        return TiffBandReader(path)
+    raise ValueError("Lecture par bandes réservée aux images TIFF et PNG")
+
+
+def image_size(path):
+    """Taille d'une image TIFF ou PNG lue dans son en-tête (None pour un autre format)"""
+    try:
+        with open(path, 'rb') as f:
+            magic = f.read(8)
+        if magic.startswith(_PNG_SIGNATURE):
+            plugin = PngImagePlugin.PngImageFile
+        elif magic[:4] in (b'II*\0', b'MM\0*', b'II+\0', b'MM\0+'):
+            plugin = TiffImagePlugin.TiffImageFile
+        else:
+            return None
+        with plugin(path) as img:
+            return img.size
+    except Exception:
+        return None
+
+
+def needs_bands(path):
+    """Vérifier qu'une image est assez grande pour être traitée par bandes"""
+    size = image_size(path)
+    return size is not None and size[0] * size[1] > BAND_THRESHOLD_PIXELS
+
+
+def is_streamable(path):
+    """Vérifier qu'une image peut être lue par bandes"""
+    try:
+        open_reader(path).close()
+        return True
+    except Exception:
+        return False
+
+
+class _StreamWriter:
+    """Base des écrivains : compression en parallèle, écriture dans l'ordre"""
+
+    def __init__(self, output_path, workers=None):
+        self.output_path = str(output_path)
+        self._file = open(self.output_path, 'wb')
+        self._workers = max(1, workers or threads.thread_count())
+        self._pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix='ptitconvert-tiles')
+        # Fenêtre bornée de blocs compressés en attente d'écriture
+        self._pending = deque()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def _submit(self, function, *args):
+        self._pending.append(self._pool.submit(function, *args))
+        while len(self._pending) > 2 * self._workers:
+            self._store(self._pending.popleft().result())
+
+    def _drain(self):
+        while self._pending:
+            self._store(self._pending.popleft().result())
+
+    def _store(self, data):
+        raise NotImplementedError
+
+    def abort(self):
+        """Fermer et supprimer une sortie inachevée"""
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        self._pool.shutdown(wait=True)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            try:
+                os.remove(self.output_path)
+            except OSError:
+                pass
+
+
+def _prepare(band, layouts):
+    """Convertir une bande vers un mode que le format de sortie sait écrire"""
+    if band.mode in layouts:
+        return band
+    if band.mode in ('I;16B', 'I;16L'):
+        # Pillow ramène I;16B vers I;16 sur 8 bits : passage par I (32 bits)
+        band = band.convert('I')
+    if band.mode in ('I', 'F'):
+        return band.convert('I;16') if 'I;16' in layouts and band.mode != 'F' else band.convert('L')
+    if band.mode == 'PA':
+        return band.convert('RGBA')
+    return band.convert('RGBA' if 'A' in band.mode else 'RGB')
+
+
+class TiffStreamWriter(_StreamWriter):
+    """TIFF écrit au fil de l'eau, en tuiles ou en bandes ; le répertoire est écrit à la fin"""
+
+    def __init__(self, output_path, size, mode, tile_size=None, compression='deflate', dpi=None,
+                 palette=None, icc_profile=None, workers=None):
+        """
+        Ouvrir la sortie
+
+        Args:
+            output_path (str): Fichier TIFF à écrire
+            size (tuple): Taille de l'image
+            mode (str): Mode des bandes reçues (converties si le TIFF ne le prend pas en charge)
+            tile_size (int): Côté des tuiles (multiple de 16), None = TIFF en bandes
+            compression (str): 'deflate' ou 'none'
+            dpi (tuple): Résolution enregistrée
+            palette (tuple): (mode brut, octets) de la palette d'une image en mode P
+            icc_profile (bytes): Profil ICC enregistré
+            workers (int): Threads de compression (None = part des cœurs du processus)
+        """
+        if tile_size is not None and (tile_size <= 0 or tile_size % 16):
+            raise ValueError("La taille des tuiles doit être un multiple de 16")
+        if compression not in _TIFF_COMPRESSIONS:
+            raise ValueError(f"Compression TIFF inconnue: {compression}")
+        super().__init__(output_path, workers)
+        self.size = size
+        self.mode = mode if mode in _TIFF_LAYOUTS else _prepare(Image.new(mode, (1, 1)), _TIFF_LAYOUTS).mode
+        self.tile_size = tile_size
+        self.compression = compression
+        self.dpi = dpi
+        self.palette = palette if self.mode == 'P' else None
+        self.icc_profile = icc_profile
+        photometric, samples, bits, self._rawmode, _ = _TIFF_LAYOUTS[self.mode]
+        self.band_rows = tile_size or ROWS_PER_STRIP
+        # Les tuiles débordent de l'image : la taille écrite peut dépasser la taille de l'image
+        padded = (math.ceil(size[0] / self.band_rows) * self.band_rows if tile_size else size[0])
+        estimate = padded * (size[1] + self.band_rows) * samples * bits // 8
+        self._big = estimate > BIGTIFF_THRESHOLD
+        self._offsets = []
+        self._counts = []
+        self._rows_written = 0
+        self._file.write(_tiff_header(0, self._big))
+
+    def _encode(self, block):
+        raw = block.tobytes('raw', self._rawmode)
+        return zlib.compress(raw, 6) if self.compression == 'deflate' else raw
+
+    def _store(self, data):
+        self._offsets.append(self._file.tell())
+        self._counts.append(len(data))
+        self._file.write(data)
+        if len(data) % 2:
+            self._file.write(b'\0')
+
+    def write_band(self, band):
+        """
+        Ajouter la bande suivante (band_rows lignes, sauf la dernière)
+
+        Args:
+            band (Image): Bande sur toute la largeur de l'image
+        """
+        band = _prepare(band, _TIFF_LAYOUTS)
+        if band.mode != self.mode:
+            band = band.convert(self.mode)
+        with tracing.span('TiffStreamWriter.write_band', tracing.ENCODE, rows=band.height):
+            if self.tile_size:
+                tile = self.tile_size
+                for x in range(0, self.size[0], tile):
+                    # Tuiles complétées par des zéros au bord de l'image
+                    self._submit(self._encode, band.crop((x, 0, x + tile, tile)))
+            else:
+                self._submit(self._encode, band)
+        self._rows_written += band.height
+
+    def close(self):
+        """Écrire le répertoire de l'image et fermer le fichier"""
+        if self._file is None:
+            return
+        self._drain()
+        self._pool.shutdown(wait=True)
+        photometric, samples, bits, _, extra = _TIFF_LAYOUTS[self.mode]
+        offset_type = _LONG8 if self._big else _LONG
+        entries = [
+            (_WIDTH, _LONG, self.size[0]), (_LENGTH, _LONG, self.size[1]),
+            (_BITS, _SHORT, (bits,) * samples), (_COMPRESSION, _SHORT, _TIFF_COMPRESSIONS[self.compression]),
+            (_PHOTOMETRIC, _SHORT, photometric), (_SAMPLES, _SHORT, samples), (_PLANAR, _SHORT, 1),
+        ]
+        if self.tile_size:
+            entries += [(_TILE_WIDTH, _LONG, self.tile_size), (_TILE_LENGTH, _LONG, self.tile_size),
+                        (_TILE_OFFSETS, offset_type, tuple(self._offsets)),
+                        (_TILE_COUNTS, offset_type, tuple(self._counts))]
+        else:
+            entries += [(_ROWS_PER_STRIP, _LONG, ROWS_PER_STRIP),
+                        (_STRIP_OFFSETS, offset_type, tuple(self._offsets)),
+                        (_STRIP_COUNTS, offset_type, tuple(self._counts))]
+        if extra is not None:
+            entries.append((_EXTRA_SAMPLES, _SHORT, extra))
+        if self.dpi:
+            entries += [(_X_RESOLUTION, _RATIONAL, (round(self.dpi[0] * 100), 100)),
+                        (_Y_RESOLUTION, _RATIONAL, (round(self.dpi[1] * 100), 100)),
+                        (_RESOLUTION_UNIT, _SHORT, 2)]
+        if self.palette is not None:
+            palette = Image.new('P', (1, 1))
+            palette.putpalette(self.palette[1], self.palette[0])
+            rgb = (palette.getpalette('RGB') + [0] * 768)[:768]
+            # Palette TIFF : toutes les composantes rouges, puis vertes, puis bleues, sur 16 bits
+            entries.append((_COLORMAP, _SHORT, tuple(value * 257 for channel in range(3) for value in rgb[channel::3])))
+        if self.icc_profile:
+            entries.append((_ICC_PROFILE, 7, self.icc_profile))
+        ifd_offset = self._file.tell()
+        self._file.write(_ifd_bytes(entries, ifd_offset, self._big))
+        self._file.seek(0)
+        self._file.write(_tiff_header(ifd_offset, self._big))
+        self._file.close()
+        self._file = None
+
+
+class PngStreamWriter(_StreamWriter):
+    """PNG écrit au fil de l'eau (lignes non filtrées, un seul flux zlib)"""
+
+    def __init__(self, output_path, size, mode, dpi=None, palette=None, transparency=None, icc_profile=None):
+        """
+        Ouvrir la sortie
+
+        Args:
+            output_path (str): Fichier PNG à écrire
+            size (tuple): Taille de l'image
+            mode (str): Mode des bandes reçues (converties si le PNG ne le prend pas en charge)
+            dpi (tuple): Résolution enregistrée
+            palette (tuple): (mode brut, octets) de la palette d'une image en mode P
+            transparency: Transparence d'une image en mode P (index ou octets alpha)
+            icc_profile (bytes): Profil ICC enregistré
+        """
+        # Un seul flux zlib : la compression reste séquentielle
+        super().__init__(output_path, workers=1)
+        self.size = size
+        self.mode = mode if mode in _PNG_LAYOUTS else _prepare(Image.new(mode, (1, 1)), _PNG_LAYOUTS).mode
+        self.band_rows = ROWS_PER_STRIP
+        color_type, self._bits, self._rawmode = _PNG_LAYOUTS[self.mode]
+        self._row_bytes = (size[0] * self._bits * _PNG_CHANNELS[color_type] + 7) // 8
+        self._compressor = zlib.compressobj(6)
+        self._output = bytearray()
+        self._file.write(_PNG_SIGNATURE)
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', size[0], size[1], self._bits, color_type, 0, 0, 0))
+        if icc_profile:
+            self._chunk(b'iCCP', b'ICC Profile\0\0' + zlib.compress(icc_profile))
+        if dpi:
+            per_meter = [round(value / 0.0254) for value in dpi]
+            self._chunk(b'pHYs', struct.pack('>IIB', per_meter[0], per_meter[1], 1))
+        if self.mode == 'P' and palette is not None:
+            swatch = Image.new('P', (1, 1))
+            swatch.putpalette(palette[1], palette[0])
+            self._chunk(b'PLTE', bytes(swatch.getpalette('RGB')))
+            if isinstance(transparency, bytes):
+                self._chunk(b'tRNS', transparency)
+            elif isinstance(transparency, int):
+                self._chunk(b'tRNS', b'\xff' * transparency + b'\0')
+
+    def _chunk(self, kind, data):
+        self._file.write(struct.pack('>I', len(data)) + kind + data)
+        self._file.write(struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+    def _store(self, data):
+        self._output += data
+        while len(self._output) >= PNG_CHUNK_SIZE:
+            self._chunk(b'IDAT', bytes(self._output[:PNG_CHUNK_SIZE]))
+            del self._output[:PNG_CHUNK_SIZE]
+
+    def write_band(self, band):
+        """Ajouter les lignes suivantes de l'image"""
+        band = _prepare(band, _PNG_LAYOUTS)
+        if band.mode != self.mode:
+            band = band.convert(self.mode)
+        with tracing.span('PngStreamWriter.write_band', tracing.ENCODE, rows=band.height):
+            raw = band.tobytes('raw', self._rawmode)
+            size = self._row_bytes
+            # Filtre 0 (aucun) en tête de chaque ligne
+            lines = b''.join(b'\0' + raw[start:start + size] for start in range(0, len(raw), size))
+            self._store(self._compressor.compress(lines))
+
+    def close(self):
+        if self._file is None:
+            return
+        self._store(self._compressor.flush())
+        if self._output:
+            self._chunk(b'IDAT', bytes(self._output))
+        self._chunk(b'IEND', b'')
+        self._pool.shutdown(wait=True)
+        self._file.close()
+        self._file = None
+
+
+def open_writer(output_path, output_format, reader, tiled=False, workers=None):
+    """
+    Ouvrir l'écrivain d'un format de sortie pour les bandes d'un lecteur
+
+    Args:
+        output_path (str): Fichier à écrire
+        output_format (str): 'tiff' ou 'png'
+        reader (BandReader): Source des bandes (taille, mode, palette, résolution)
+        tiled (bool): TIFF en tuiles (sinon en bandes)
+        workers (int): Threads de compression du TIFF
+
+    Returns:
+        Écrivain (write_band(), close(), band_rows)
+    """
+    dpi, icc_profile = reader.info.get('dpi'), reader.info.get('icc_profile')
+    if output_format == 'png':
+        return PngStreamWriter(output_path, reader.size, reader.mode, dpi, reader.palette,
+                               reader.info.get('transparency'), icc_profile)
+    if output_format in ('tiff', 'tif'):
+        return TiffStreamWriter(output_path, reader.size, reader.mode,
+                                DEFAULT_TILE_SIZE if tiled else None, dpi=dpi, palette=reader.palette,
+                                icc_profile=icc_profile, workers=workers)
+    raise ValueError(f"Écriture par bandes impossible vers {output_format}")
+
+
+def convert(reader, output_path, output_format, tiled=False, workers=None):
+    """
+    Convertir bande par bande : la mémoire dépend de la largeur de l'image, pas de sa hauteur
+
+    Args:
+        reader (BandReader): Source des bandes
+        output_path (str): Fichier à écrire
+        output_format (str): 'tiff' ou 'png'
+        tiled (bool): TIFF en tuiles
+        workers (int): Threads de compression
+    """
+    with open_writer(output_path, output_format, reader, tiled, workers) as writer:
+        for _, band in reader.bands(writer.band_rows):
+            writer.write_band(band)
+
+
+def reduce(reader, factor):
+    """
+    Réduire une image d'un facteur entier, bande par bande (moyenne de blocs factor x factor)
+
+    Args:
+        reader (BandReader): Source des bandes
+        factor (int): Facteur de réduction
+
+    Returns:
+        Image: Image réduite, en mémoire
+    """
+    width, height = reader.size
+    result = None
+    rows = factor * max(1, MIN_BLOCK_ROWS // factor)
+    for y, band in reader.bands(rows):
+        with tracing.span('tiled_image.reduce', tracing.TRANSFORM, y=y, factor=factor):
+            if band.mode in ('1', 'P', 'PA'):
+                band = band.convert('RGBA' if 'transparency' in band.info or band.mode == 'PA' else 'RGB')
+            elif band.mode.startswith('I;16'):
+                band = band.convert('I')
+            small = band.reduce(factor) if factor > 1 else band
+        if result is None:
+            result = Image.new(small.mode, (math.ceil(width / factor), math.ceil(height / factor)))
+        result.paste(small, (0, y // factor))
+    result.info = {key: value for key, value in reader.info.items() if key != 'transparency'}
+    return result
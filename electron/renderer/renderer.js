@@ -159,6 +159,76 @@ async function startConvert() {
     return;
   }
 
+  followJob(job_id, outputDir);
+}
+
+function finishJob(j, outputDir) {
+  el('#progressBar').style.width = '100%';
+  el('#status').textContent = `Terminé: ${j.success} réussite(s), ${j.failed} échec(s)`;
+  lastOutputDir = outputDir;
+  loadHistory();
+}
+
+// Suivi en direct via Server-Sent Events ; repli sur l'interrogation périodique
+function followJob(job_id, outputDir) {
+  if (typeof EventSource === 'undefined') return pollJob(job_id, outputDir);
+
+  const es = new EventSource(`${API}/jobs/${job_id}/events`);
+  const inflight = new Map();   // fichier -> fraction accomplie
+  const finished = new Set();
+  let total = 0, processed = 0, errors = 0, closed = false;
+
+  const render = () => {
+    let partial = 0;
+    inflight.forEach((p) => { partial += p; });
+    const pct = total ? Math.round(((processed + partial) / total) * 100) : 0;
+    el('#progressBar').style.width = `${pct}%`;
+  };
+  const close = () => { closed = true; es.close(); };
+
+  es.addEventListener('job-status', (e) => {
+    const j = JSON.parse(e.data);
+    total = j.total; processed = j.processed;
+    (j.results || []).forEach((r) => finished.add(r.file));
+    el('#status').textContent = j.message || 'En cours...';
+    errors = 0;
+    render();
+  });
+  const onProgress = (e) => {
+    const ev = JSON.parse(e.data);
+    if (finished.has(ev.file)) return;
+    inflight.set(ev.file, ev.progress || 0);
+    if (ev.type === 'started') el('#status').textContent = `Conversion de ${ev.file.split(/[\\/]/).pop()} (${processed}/${total})`;
+    render();
+  };
+  es.addEventListener('file-started', onProgress);
+  es.addEventListener('file-progress', onProgress);
+  const onFileDone = (e) => {
+    const ev = JSON.parse(e.data);
+    finished.add(ev.file);
+    inflight.delete(ev.file);
+    processed = ev.processed; total = ev.total;
+    if (ev.type === 'error') console.warn('conversion error', ev.file, ev.error);
+    render();
+  };
+  es.addEventListener('file-finished', onFileDone);
+  es.addEventListener('file-error', onFileDone);
+  es.addEventListener('job-done', (e) => {
+    close();
+    finishJob(JSON.parse(e.data), outputDir);
+  });
+  es.onerror = () => {
+    if (closed) return;
+    // EventSource se reconnecte seul ; après plusieurs échecs, retour au polling
+    errors += 1;
+    if (errors >= 3) {
+      close();
+      pollJob(job_id, outputDir);
+    }
+  };
+}
+
+function pollJob(job_id, outputDir) {
   let failures = 0;
   const timer = setInterval(async () => {
     try {
@@ -170,9 +240,7 @@ async function startConvert() {
       el('#progressBar').style.width = `${pct}%`;
       if (j.done) {
         clearInterval(timer);
-        el('#status').textContent = `Terminé: ${j.success} réussite(s), ${j.failed} échec(s)`;
-        lastOutputDir = outputDir;
-        loadHistory();
+        finishJob(j, outputDir);
       }
       failures = 0;
     } catch (e) {
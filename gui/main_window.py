@@ -9,16 +9,12 @@ from pathlib import Path
 import threading
 from datetime import datetime
 
-from converters.image_converter import ImageConverter
-from converters.document_converter import DocumentConverter
-from converters.spreadsheet_converter import SpreadsheetConverter
-from converters.advanced_document_converter import AdvancedDocumentConverter
-from converters.archive_converter import ArchiveConverter
-from converters.media_converter import MediaConverter
+from converters import image_ops, registry
 from utils.file_handler import FileHandler
 from utils.validators import FileValidator
 from utils.config import ConfigManager
 from utils.history import ConversionHistory
+from utils.sync import parallel_scan
 
 class MainWindow:
     """Fenêtre principale de l'application"""
@@ -135,25 +131,20 @@ class MainWindow:
         self.files_listbox.bind('<<ListboxSelect>>', self.on_file_select)
         
     def setup_converters(self):
-        """Initialiser les convertisseurs"""
-        self.image_converter = ImageConverter()
-        self.document_converter = DocumentConverter()
-        self.spreadsheet_converter = SpreadsheetConverter()
-        self.advanced_document_converter = AdvancedDocumentConverter()
-        self.archive_converter = ArchiveConverter()
-        self.media_converter = MediaConverter()
+        """Initialiser les utilitaires (les convertisseurs sont fournis par le registre)"""
         self.file_handler = FileHandler()
         self.validator = FileValidator()
         
     def add_files(self):
         """Ajouter des fichiers à convertir"""
+        all_supported = ';'.join(f"*{ext}" for ext in sorted(registry.get_supported_extensions()))
         files = filedialog.askopenfilenames(
             title="Sélectionner les fichiers à convertir",
             filetypes=[
-                ("Tous les fichiers supportés", "*.png;*.jpg;*.jpeg;*.bmp;*.gif;*.tiff;*.webp;*.pdf;*.docx;*.txt;*.epub;*.odt;*.rtf;*.xlsx;*.csv;*.ods;*.zip;*.tar;*.rar;*.7z;*.mp3;*.mp4;*.avi;*.wav;*.flac"),
+                ("Tous les fichiers supportés", all_supported),
                 ("Images", "*.png;*.jpg;*.jpeg;*.bmp;*.gif;*.tiff;*.webp"),
                 ("Documents", "*.pdf;*.docx;*.txt;*.epub;*.odt;*.rtf"),
-                ("Feuilles de calcul", "*.xlsx;*.csv;*.ods"),
+                ("Feuilles de calcul", "*.xlsx;*.csv"),
                 ("Archives", "*.zip;*.tar;*.rar;*.7z"),
                 ("Média", "*.mp3;*.mp4;*.avi;*.wav;*.flac"),
                 ("Tous les fichiers", "*.*")
@@ -171,26 +162,13 @@ class MainWindow:
         """Ajouter tous les fichiers d'un dossier"""
         folder = filedialog.askdirectory(title="Sélectionner un dossier")
         if folder:
-            supported_extensions = {
-                # Images
-                '.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.webp',
-                # Documents
-                '.pdf', '.docx', '.txt', '.epub', '.odt', '.rtf',
-                # Feuilles de calcul
-                '.xlsx', '.csv', '.ods',
-                # Archives
-                '.zip', '.tar', '.rar', '.7z',
-                # Média
-                '.mp3', '.mp4', '.avi', '.wav', '.flac'
-            }
-            
-            for root, dirs, files in os.walk(folder):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    if Path(file_path).suffix.lower() in supported_extensions:
-                        if file_path not in self.files_to_convert:
-                            self.files_to_convert.append(file_path)
-                            self.files_listbox.insert(tk.END, os.path.basename(file_path))
+            already = set(self.files_to_convert)
+            for relative in sorted(parallel_scan(folder)):
+                file_path = os.path.join(folder, relative)
+                if registry.is_supported(file_path) and file_path not in already:
+                    already.add(file_path)
+                    self.files_to_convert.append(file_path)
+                    self.files_listbox.insert(tk.END, os.path.basename(file_path))
             
             self.update_ui_state()
             
@@ -205,36 +183,13 @@ class MainWindow:
         selection = self.files_listbox.curselection()
         if selection:
             file_path = self.files_to_convert[selection[0]]
-            file_ext = Path(file_path).suffix.lower()
             
             # Mettre à jour les formats de sortie disponibles
-            self.update_output_formats(file_ext)
+            self.update_output_formats(registry.get_extension(file_path))
             
     def update_output_formats(self, input_extension):
         """Mettre à jour les formats de sortie disponibles"""
-        formats = []
-        
-        # Images
-        if input_extension in ['.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.webp']:
-            formats = ['PNG', 'JPG', 'JPEG', 'BMP', 'GIF', 'TIFF', 'PDF']
-        # Documents standards
-        elif input_extension in ['.pdf', '.docx', '.txt']:
-            formats = ['PDF', 'DOCX', 'TXT']
-        # Documents avancés
-        elif input_extension in ['.epub', '.odt', '.rtf']:
-            formats = ['PDF', 'DOCX', 'TXT', 'EPUB', 'ODT', 'RTF']
-        # Feuilles de calcul
-        elif input_extension in ['.xlsx', '.csv', '.ods']:
-            formats = ['XLSX', 'CSV', 'ODS', 'PDF']
-        # Archives
-        elif input_extension in ['.zip', '.tar', '.rar', '.7z']:
-            formats = ['ZIP', 'TAR', '7Z']
-        # Média audio
-        elif input_extension in ['.mp3', '.wav', '.flac']:
-            formats = ['MP3', 'WAV', 'FLAC', 'OGG']
-        # Média vidéo
-        elif input_extension in ['.mp4', '.avi']:
-            formats = ['MP4', 'AVI', 'MKV', 'MOV']
+        formats = [fmt.upper() for fmt in registry.get_output_formats(input_extension)]
         
         self.output_format['values'] = formats
         if formats:
@@ -247,7 +202,7 @@ class MainWindow:
         
         if has_files:
             # Déterminer les formats communs
-            extensions = {Path(f).suffix.lower() for f in self.files_to_convert}
+            extensions = {registry.get_extension(f) for f in self.files_to_convert}
             if len(extensions) == 1:
                 self.update_output_formats(next(iter(extensions)))
             else:
@@ -299,43 +254,26 @@ class MainWindow:
         """Convertir les fichiers (exécuté dans un thread séparé)"""
         success_count = 0
         error_count = 0
+        # Réglages des images (taille maximale, métadonnées) appliqués à chaque conversion
+        ops = image_ops.config_ops(self.config_manager)
+        options = {'ops': ','.join(ops)} if ops else None
         
         for i, file_path in enumerate(files):
             start_time = datetime.now()
             success = False
             error_message = None
+            result = None
             
             try:
                 self.root.after(0, self.update_progress, i, f"Conversion de {os.path.basename(file_path)}...")
                 
-                # Déterminer le type de fichier et le convertisseur approprié
-                file_ext = Path(file_path).suffix.lower()
-                
-                # Images
-                if file_ext in ['.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.webp']:
-                    success = self.image_converter.convert(file_path, output_dir, output_format.lower())
-                # Documents standards
-                elif file_ext in ['.pdf', '.docx', '.txt']:
-                    success = self.document_converter.convert(file_path, output_dir, output_format.lower())
-                # Documents avancés
-                elif file_ext in ['.epub', '.odt', '.rtf']:
-                    success = self.advanced_document_converter.convert(file_path, output_dir, output_format.lower())
-                # Feuilles de calcul
-                elif file_ext in ['.xlsx', '.csv', '.ods']:
-                    success = self.spreadsheet_converter.convert(file_path, output_dir, output_format.lower())
-                # Archives
-                elif file_ext in ['.zip', '.tar', '.rar', '.7z']:
-                    success = self.archive_converter.convert(file_path, output_dir, output_format.lower())
-                # Média
-                elif file_ext in ['.mp3', '.mp4', '.avi', '.wav', '.flac']:
-                    success = self.media_converter.convert(file_path, output_dir, output_format.lower())
-                else:
-                    success = False
-                    error_message = f"Format {file_ext} non supporté"
+                result = registry.convert(file_path, output_dir, output_format.lower(), options=options)
+                success = result.success
                     
                 if success:
                     success_count += 1
                 else:
+                    error_message = result.error
                     error_count += 1
                     
             except Exception as e:
@@ -348,19 +286,24 @@ class MainWindow:
                 conversion_time = (datetime.now() - start_time).total_seconds()
                 file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
                 
-                # Générer le nom du fichier de sortie
-                input_name = Path(file_path).stem
-                output_file = os.path.join(output_dir, f"{input_name}.{output_format.lower()}")
+                # Fichier réellement produit, sinon le nom attendu
+                output_file = result.output if result is not None else None
+                if output_file is None:
+                    output_file = os.path.join(output_dir, f"{Path(file_path).stem}.{output_format.lower()}")
                 
                 self.history.add_conversion(
                     input_file=file_path,
-                    input_format=file_ext[1:],  # Sans le point
+                    input_format=registry.get_extension(file_path).lstrip('.'),
                     output_file=output_file,
                     output_format=output_format.lower(),
                     file_size=file_size,
-                    conversion_time=conversion_time,
+                    conversion_time=result.elapsed if result is not None else conversion_time,
                     success=success,
-                    error_message=error_message
+                    error_message=error_message,
+                    output_bytes=result.bytes_written if result is not None else None,
+                    peak_memory_mb=result.peak_memory_mb if result is not None else None,
+                    stage_timings=result.stages if result is not None else None,
+                    cached=result.cached if result is not None else False
                 )
             except Exception as e:
                 print(f"Erreur lors de l'enregistrement dans l'historique: {e}")
@@ -13,10 +13,14 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from gui.main_window import MainWindow
+from utils import logs
 
 def main():
     """Point d'entrée principal de l'application"""
     try:
+        # Journaux des convertisseurs (erreurs et avertissements) sur la console
+        logs.setup_logging()
+        
         # Créer la fenêtre principale
         root = tk.Tk()
         root.title("PtitConvert - Convertisseur de Fichiers")
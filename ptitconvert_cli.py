@@ -6,8 +6,11 @@ Permet l'utilisation du convertisseur via terminal
 
 import sys
 import os
+import time
+from concurrent.futures import as_completed
 from pathlib import Path
 import argparse
+import logging
 try:
     import click
     from colorama import init, Fore, Style
@@ -21,26 +24,102 @@ except ImportError:
 # Ajouter le répertoire racine au path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from converters.image_converter import ImageConverter
-from converters.document_converter import DocumentConverter
-from converters.spreadsheet_converter import SpreadsheetConverter
-from converters.advanced_document_converter import AdvancedDocumentConverter
+from converters import registry
 from converters.archive_converter import ArchiveConverter
-from converters.media_converter import MediaConverter
+from converters.result import ConversionResult
+from utils import logs, tracing
 from utils.validators import FileValidator
 
+# Titres affichés par la commande 'formats', par classe de convertisseur
+FORMAT_SECTIONS = {
+    'ImageConverter': "📷 IMAGES",
+    'DocumentConverter': "📄 DOCUMENTS",
+    'AdvancedDocumentConverter': "📚 DOCUMENTS AVANCÉS",
+    'SpreadsheetConverter': "📊 FEUILLES DE CALCUL",
+    'ArchiveConverter': "🗜️  ARCHIVES",
+    'MediaConverter': "🎵 AUDIO / 🎬 VIDÉO",
+}
+
+class BatchProgress:
+    """Barre de progression agrégée d'un lot (sur stderr, seulement dans un terminal)"""
+    
+    WIDTH = 30
+    # Intervalle minimal entre deux rafraîchissements (secondes)
+    REFRESH = 0.1
+    
+    def __init__(self, total, stream=None):
+        """
+        Initialiser la barre
+        
+        Args:
+            total (int): Nombre de fichiers du lot
+            stream: Flux d'affichage (None = sys.stderr)
+        """
+        self.total = total
+        self.stream = stream or sys.stderr
+        self.enabled = self.stream.isatty()
+        self.started = time.monotonic()
+        self.stats = {'success': 0, 'failed': 0, 'cancelled': 0}
+        self._last_draw = 0.0
+        self._visible = False
+        
+    def update(self, stats):
+        """Prendre en compte les compteurs du lot"""
+        self.stats = stats
+        
+    def _line(self):
+        done = self.stats['success'] + self.stats['failed'] + self.stats['cancelled']
+        fraction = done / self.total if self.total else 1.0
+        filled = int(self.WIDTH * fraction)
+        bar = '=' * filled + ('>' if filled < self.WIDTH else '') + ' ' * (self.WIDTH - filled - 1)
+        elapsed = time.monotonic() - self.started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = f" ETA {int((self.total - done) / rate)} s" if rate > 0 and done < self.total else ""
+        return (f"[{bar}] {done}/{self.total}  ✅ {self.stats['success']}  ❌ {self.stats['failed']}"
+                f"  {rate:.1f} fichiers/s{eta}")
+        
+    def draw(self, force=False):
+        """Redessiner la barre (au plus toutes les REFRESH secondes, sauf force)"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if not force and self._visible and now - self._last_draw < self.REFRESH:
+            return
+        self._last_draw = now
+        self.stream.write('\r\033[K' + self._line())
+        self.stream.flush()
+        self._visible = True
+        
+    def clear(self):
+        """Effacer la barre avant d'afficher une ligne de résultat"""
+        if self.enabled and self._visible:
+            self.stream.write('\r\033[K')
+            self.stream.flush()
+            self._visible = False
+            
+    def close(self):
+        """Afficher l'état final et passer à la ligne"""
+        if self.enabled:
+            self.draw(force=True)
+            self.stream.write('\n')
+            self.stream.flush()
+            self._visible = False
+
 class PtitConvertCLI:
     """Interface en ligne de commande pour PtitConvert"""
     
     def __init__(self):
         """Initialiser l'interface CLI"""
-        self.image_converter = ImageConverter()
-        self.document_converter = DocumentConverter()
-        self.spreadsheet_converter = SpreadsheetConverter()
-        self.advanced_doc_converter = AdvancedDocumentConverter()
-        self.archive_converter = ArchiveConverter()
-        self.media_converter = MediaConverter()
+        self.archive_converter = registry.get_converter(ArchiveConverter)
         self.validator = FileValidator()
+        # Mesure des étapes (--trace) : None, 'time' ou 'memory'
+        self.trace = None
+        self.trace_events = []
+        # Dossier des profils (--profile) ; les conversions profilées vont dans l'historique
+        self.profile_dir = None
+        # Options des convertisseurs (--ops et réglages des images de la configuration)
+        self.options = None
+        self._history = None
         
     def print_colored(self, text, color=None):
         """Afficher du texte coloré si colorama est disponible"""
@@ -77,6 +156,129 @@ class PtitConvertCLI:
         else:
             print(f"ℹ️  {text}")
             
+    def start_trace(self, memory=False):
+        """
+        Mesurer les étapes des conversions (dans ce processus et dans les processus de travail)
+        
+        Args:
+            memory (bool): Mesurer aussi les allocations de chaque étape
+        """
+        self.trace = 'memory' if memory else 'time'
+        self.trace_events = []
+        tracing.enable(memory)
+        
+    def set_image_options(self, spec=None, tiled=False, extract_frames=False):
+        """
+        Opérations appliquées aux images converties : celles demandées (--ops),
+        puis celles de la configuration (taille maximale, métadonnées)
+        
+        Args:
+            spec (str): Opérations séparées par des virgules ('resize:1024x1024,strip')
+            tiled (bool): Écrire les TIFF en tuiles (--tiled)
+            extract_frames (bool): Écrire chaque vue des images dans son propre fichier (--extract-frames)
+            
+        Raises:
+            ValueError: Si une opération est invalide
+        """
+        from converters import image_ops
+        
+        ops = [repr(op) for op in image_ops.parse_ops(spec)] + image_ops.config_ops()
+        options = {'ops': ','.join(ops)} if ops else {}
+        if tiled:
+            options['tiled'] = True
+        if extract_frames:
+            options['extract_frames'] = True
+        self.options = options or None
+        
+    def _collect_trace(self, task_id, events):
+        self.trace_events.extend(events)
+        
+    def finish_trace(self, output_path):
+        """
+        Écrire les étapes mesurées au format Chrome trace-event et en afficher le résumé
+        
+        Args:
+            output_path (str): Fichier JSON de sortie
+        """
+        self.trace_events.extend(tracing.disable())
+        self.trace = None
+        tracing.write_chrome_trace(output_path, self.trace_events, {'command': ' '.join(sys.argv[1:])})
+        summary = tracing.summarize(self.trace_events)
+        if summary:
+            self.print_info("Étapes les plus longues:")
+            for entry in [e for e in summary if e['category'] != tracing.TASK][:10]:
+                alloc = f"  alloc {entry['alloc_peak_kb'] / 1024:.1f} Mo" if 'alloc_peak_kb' in entry else ""
+                print(f"  {entry['name']:<40} {entry['count']:>5} x {entry['total_ms']:>10.1f} ms{alloc}")
+        self.print_info(f"Trace écrite dans {output_path} (chrome://tracing ou https://ui.perfetto.dev)")
+        
+    def _record_profile(self, report):
+        """Ajouter une conversion profilée à l'historique, avec le chemin de son profil"""
+        from utils.history import ConversionHistory
+        
+        if self._history is None:
+            self._history = ConversionHistory()
+        file_path = report['file_path']
+        output_format = report['output_format'].lower()
+        profile_path = report.get('pstats') or report.get('collapsed')
+        outputs = report.get('outputs')
+        self._history.add_conversion(
+            input_file=str(file_path),
+            input_format=registry.get_extension(str(file_path)).lstrip('.'),
+            output_file=outputs[0] if outputs else os.path.join(report['output_dir'], f"{Path(file_path).stem}.{output_format}"),
+            output_format=output_format,
+            file_size=os.path.getsize(file_path) if os.path.exists(file_path) else 0,
+            conversion_time=report['elapsed'],
+            success=report['success'],
+            error_message=report['error'],
+            profile_path=profile_path,
+            output_bytes=report.get('bytes_written'),
+            peak_memory_mb=report.get('peak_memory_mb'),
+            stage_timings=report.get('stages'),
+            cached=report.get('cached', False),
+        )
+        if profile_path:
+            self.print_info(f"Profil de {Path(file_path).name}: {profile_path}")
+        
+    def _on_profile(self, task_id, report):
+        try:
+            self._record_profile(report)
+        except Exception as e:
+            self.print_warning(f"Profil non enregistré dans l'historique: {e}")
+        
+    def _create_executor(self, jobs):
+        """Pool de processus de conversion (avec la mesure des étapes si --trace, le profilage si --profile)"""
+        # Import différé : le pool ne sert qu'aux lots
+        from utils.executor import ConversionExecutor
+        
+        options = {}
+        if self.trace is not None:
+            options.update(on_trace=self._collect_trace, trace=self.trace)
+        if self.profile_dir is not None:
+            options.update(on_profile=self._on_profile, profile_dir=self.profile_dir)
+        return ConversionExecutor(max_workers=jobs, **options)
+        
+    def _convert(self, input_path, output_dir, output_format, quality):
+        """Conversion dans ce processus, profilée si --profile"""
+        if self.profile_dir is None:
+            return registry.convert(input_path, output_dir, output_format, quality, self.options)
+        from utils.profiling import ConversionProfiler, profile_base
+        
+        start = time.perf_counter()
+        profiler = ConversionProfiler(profile_base(self.profile_dir, input_path))
+        result = None
+        try:
+            with profiler:
+                result = registry.convert(input_path, output_dir, output_format, quality, self.options)
+            return result
+        except Exception as e:
+            result = ConversionResult(False, error=str(e), elapsed=time.perf_counter() - start)
+            raise
+        finally:
+            self._on_profile(None, {
+                'file_path': input_path, 'output_format': output_format, 'output_dir': output_dir,
+                **result.to_dict(), **profiler.paths,
+            })
+        
     def convert_file(self, input_path, output_dir, output_format, quality='medium'):
         """
         Convertir un fichier
@@ -91,10 +293,26 @@ class PtitConvertCLI:
             bool: True si la conversion a réussi
         """
         try:
-            # Valider le fichier d'entrée
-            validation = self.validator.validate_file(input_path)
-            if not validation['is_valid']:
-                self.print_error(f"Fichier invalide: {', '.join(validation['errors'])}")
+            file_ext = registry.get_extension(input_path)
+            output_format = output_format.lower()
+            
+            if not registry.is_supported(input_path):
+                self.print_error(f"Type de fichier non supporté: {file_ext}")
+                return False
+                
+            # Valider le fichier d'entrée (le contenu n'est vérifié que pour
+            # les catégories connues du validateur)
+            if self.validator.is_supported_format(input_path)[0]:
+                validation = self.validator.validate_file(input_path)
+                if not validation['is_valid']:
+                    self.print_error(f"Fichier invalide: {', '.join(validation['errors'])}")
+                    return False
+            elif not Path(input_path).is_file():
+                self.print_error("Fichier invalide: Le fichier n'existe pas")
+                return False
+                
+            if not registry.can_convert(input_path, output_format):
+                self.print_error(f"Conversion non supportée: {file_ext} -> {output_format}")
                 return False
                 
             self.print_info(f"Conversion de {Path(input_path).name} vers {output_format.upper()}")
@@ -102,53 +320,29 @@ class PtitConvertCLI:
             # Créer le répertoire de sortie
             Path(output_dir).mkdir(parents=True, exist_ok=True)
             
-            # Déterminer le convertisseur approprié
-            file_ext = Path(input_path).suffix.lower()
-            category = validation['category']
-            
-            success = False
-            
-            if category == 'images':
-                success = self.image_converter.convert(input_path, output_dir, output_format)
-            elif category == 'documents':
-                if file_ext in ['.pdf', '.docx', '.txt']:
-                    success = self.document_converter.convert(input_path, output_dir, output_format)
-                else:
-                    success = self.advanced_doc_converter.convert(input_path, output_dir, output_format)
-            elif category == 'spreadsheets':
-                success = self.spreadsheet_converter.convert(input_path, output_dir, output_format)
-            elif file_ext in ArchiveConverter.SUPPORTED_FORMATS:
-                if output_format == 'extract':
-                    success = self.archive_converter.extract_archive(input_path, output_dir)
-                else:
-                    self.print_error("Les archives ne peuvent être que extraites")
-                    return False
-            elif file_ext in (MediaConverter.AUDIO_FORMATS | MediaConverter.VIDEO_FORMATS):
-                success = self.media_converter.convert(input_path, output_dir, output_format, quality)
-            else:
-                self.print_error(f"Type de fichier non supporté: {file_ext}")
-                return False
+            result = self._convert(input_path, output_dir, output_format, quality)
                 
-            if success:
+            if result:
                 self.print_success(f"Conversion réussie: {Path(input_path).name}")
                 return True
             else:
-                self.print_error(f"Échec de la conversion: {Path(input_path).name}")
+                self.print_error(f"Échec de la conversion: {Path(input_path).name} ({result.error})")
                 return False
                 
         except Exception as e:
             self.print_error(f"Erreur lors de la conversion: {str(e)}")
             return False
             
-    def batch_convert(self, input_paths, output_dir, output_format, quality='medium'):
+    def batch_convert(self, input_paths, output_dir, output_format, quality='medium', fail_fast=False):
         """
-        Convertir plusieurs fichiers
+        Convertir plusieurs fichiers, l'un après l'autre
         
         Args:
             input_paths (list): Liste des chemins de fichiers
             output_dir (str): Répertoire de sortie
             output_format (str): Format de sortie
             quality (str): Qualité de conversion
+            fail_fast (bool): S'arrêter au premier échec
             
         Returns:
             dict: Statistiques de conversion
@@ -164,6 +358,10 @@ class PtitConvertCLI:
                 stats['success'] += 1
             else:
                 stats['failed'] += 1
+                if fail_fast:
+                    stats['cancelled'] = stats['total'] - i
+                    self.print_warning("Échec : arrêt du lot (--fail-fast)")
+                    break
                 
         # Afficher les statistiques
         self.print_info(f"Conversion terminée:")
@@ -173,33 +371,284 @@ class PtitConvertCLI:
             
         return stats
         
-    def list_formats(self):
-        """Afficher les formats supportés"""
-        self.print_info("Formats supportés par PtitConvert:")
+    def _precheck(self, input_path, output_format):
+        """Vérifications rapides avant d'envoyer un fichier au pool (message d'erreur ou None)"""
+        file_ext = registry.get_extension(input_path)
+        if not registry.is_supported(input_path):
+            return f"Type de fichier non supporté: {file_ext}"
+        if not Path(input_path).is_file():
+            return "Le fichier n'existe pas"
+        if not registry.can_convert(input_path, output_format):
+            return f"Conversion non supportée: {file_ext} -> {output_format}"
+        return None
         
-        print("\n📷 IMAGES:")
-        print("  Entrée: PNG, JPG, JPEG, BMP, GIF, TIFF, WEBP")
-        print("  Sortie: PNG, JPG, JPEG, BMP, GIF, TIFF, PDF")
+    def parallel_batch_convert(self, input_paths, output_dir, output_format, quality='medium',
+                               jobs=None, ordered=False, fail_fast=False):
+        """
+        Convertir plusieurs fichiers sur un pool de processus
+        
+        Args:
+            input_paths (list): Liste des chemins de fichiers
+            output_dir (str): Répertoire de sortie
+            output_format (str): Format de sortie
+            quality (str): Qualité de conversion
+            jobs (int): Nombre de processus (None = un par cœur)
+            ordered (bool): Afficher les résultats dans l'ordre des fichiers
+                (sinon, dans l'ordre où ils se terminent)
+            fail_fast (bool): Annuler le reste du lot au premier échec
+            
+        Returns:
+            dict: Statistiques de conversion
+        """
+        from utils.executor import CANCELLED_MESSAGE
         
-        print("\n📄 DOCUMENTS:")
-        print("  Entrée: PDF, DOCX, TXT, EPUB, ODT, RTF")
-        print("  Sortie: PDF, DOCX, TXT, EPUB, ODT")
+        output_format = output_format.lower()
+        jobs = jobs or os.cpu_count() or 1
+        total = len(input_paths)
+        stats = {'success': 0, 'failed': 0, 'cancelled': 0, 'total': total}
+        self.print_info(f"Conversion par lots: {total} fichier(s) sur {jobs} processus")
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
         
-        print("\n📊 FEUILLES DE CALCUL:")
-        print("  Entrée: XLSX, CSV")
-        print("  Sortie: XLSX, CSV, PDF")
+        progress = BatchProgress(total)
+        results = [None] * total
+        next_to_print = 0
         
-        print("\n🗜️  ARCHIVES:")
-        print("  Entrée: ZIP, TAR, TAR.GZ, TAR.BZ2, RAR, 7Z")
-        print("  Sortie: extraction uniquement")
+        def show(index):
+            ok, error = results[index]
+            # Les fichiers annulés ne sont que comptés dans le bilan
+            if error != CANCELLED_MESSAGE:
+                self._print_result(input_paths[index], ok, error, progress)
         
-        print("\n🎵 AUDIO:")
-        print("  Entrée: MP3, WAV, FLAC, AAC, OGG, M4A")
-        print("  Sortie: MP3, WAV, FLAC, AAC, OGG")
+        def report(index, ok, error):
+            nonlocal next_to_print
+            results[index] = (ok, error)
+            if error == CANCELLED_MESSAGE:
+                stats['cancelled'] += 1
+            elif ok:
+                stats['success'] += 1
+            else:
+                stats['failed'] += 1
+            progress.update(stats)
+            if not ordered:
+                show(index)
+                return
+            # Ordre des fichiers : afficher tout le préfixe terminé
+            while next_to_print < total and results[next_to_print] is not None:
+                show(next_to_print)
+                next_to_print += 1
+            progress.draw()
         
-        print("\n🎬 VIDÉO:")
-        print("  Entrée: MP4, AVI, MKV, MOV, WMV, FLV, WEBM")
-        print("  Sortie: MP4, AVI, MKV, MOV, WEBM, MP3 (audio)")
+        executor = self._create_executor(jobs)
+        futures = {}
+        stopping = False
+        try:
+            for index, input_path in enumerate(input_paths):
+                error = self._precheck(input_path, output_format)
+                if error is None:
+                    future = executor.submit(input_path, output_format, output_dir,
+                                             task_id=index, quality=quality, options=self.options)
+                    futures[future] = index
+                    continue
+                report(index, False, error)
+                if fail_fast:
+                    stopping = True
+                    break
+            if stopping:
+                executor.cancel(lambda task_id: True)
+            for future in as_completed(futures):
+                result = future.result()
+                ok = result.success
+                report(futures[future], ok, result.error)
+                if fail_fast and not ok and not stopping:
+                    stopping = True
+                    progress.clear()
+                    self.print_warning("Échec : annulation des conversions restantes (--fail-fast)")
+                    executor.cancel(lambda task_id: True)
+        finally:
+            progress.close()
+            executor.shutdown(wait=False)
+        
+        # Fichiers jamais soumis (--fail-fast pendant les vérifications préalables)
+        stats['cancelled'] += sum(1 for r in results if r is None)
+        self.print_info("Conversion terminée:")
+        self.print_success(f"  Réussies: {stats['success']}")
+        if stats['failed'] > 0:
+            self.print_error(f"  Échouées: {stats['failed']}")
+        if stats['cancelled'] > 0:
+            self.print_warning(f"  Annulées: {stats['cancelled']}")
+        return stats
+        
+    def _print_result(self, input_path, ok, error, progress):
+        """Afficher le résultat d'un fichier du lot au-dessus de la barre de progression"""
+        progress.clear()
+        name = Path(input_path).name
+        if ok:
+            self.print_success(f"Conversion réussie: {name}")
+        elif error:
+            self.print_error(f"Échec de la conversion: {name} ({error})")
+        else:
+            self.print_error(f"Échec de la conversion: {name}")
+        progress.draw()
+        
+    def watch_folder(self, directory, output_dir, output_format, quality='medium', jobs=None,
+                     debounce=2.0, polling=False, interval=2.0, recursive=True):
+        """
+        Convertir en continu les fichiers nouveaux ou modifiés d'un dossier
+        
+        Args:
+            directory (str): Dossier surveillé
+            output_dir (str): Répertoire de sortie
+            output_format (str): Format de sortie
+            quality (str): Qualité de conversion
+            jobs (int): Nombre de processus de conversion (None = un par cœur)
+            debounce (float): Secondes sans écriture avant de convertir un fichier
+            polling (bool): Forcer la détection par balayage (sans inotify)
+            interval (float): Délai entre deux balayages
+            recursive (bool): Surveiller les sous-dossiers
+            
+        Returns:
+            bool: False si le dossier n'existe pas
+        """
+        from utils.watcher import FolderWatcher
+        
+        if not Path(directory).is_dir():
+            self.print_error(f"Dossier introuvable: {directory}")
+            return False
+        
+        def on_result(path, ok, error):
+            name = os.path.relpath(path, directory)
+            if ok:
+                self.print_success(f"Conversion réussie: {name}")
+            else:
+                self.print_error(f"Échec de la conversion: {name}" + (f" ({error})" if error else ""))
+        
+        executor = self._create_executor(jobs)
+        watcher = FolderWatcher(
+            directory, output_format, output_dir, executor,
+            recursive=recursive, debounce=debounce, polling=polling, interval=interval,
+            quality=quality, on_result=on_result, options=self.options,
+        )
+        self.print_info(f"Surveillance de {directory} -> {output_dir} ({output_format.upper()}), Ctrl+C pour arrêter")
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            self.print_info("Surveillance arrêtée")
+        finally:
+            watcher.stop()
+            executor.shutdown(wait=False)
+            watcher.store.close()
+        return True
+        
+    def sync_folder(self, source_dir, output_dir, output_format, quality='medium', jobs=None,
+                    delete_orphans=True, dry_run=False):
+        """
+        Mettre un dossier de sortie à jour : ne convertir que les fichiers nouveaux ou modifiés
+        
+        Args:
+            source_dir (str): Dossier source
+            output_dir (str): Dossier de sortie
+            output_format (str): Format de sortie
+            quality (str): Qualité de conversion
+            jobs (int): Nombre de processus de conversion (None = un par cœur)
+            delete_orphans (bool): Supprimer les sorties dont la source a disparu
+            dry_run (bool): Afficher ce qui serait fait sans rien modifier
+            
+        Returns:
+            dict: Statistiques de synchronisation (None si le dossier source n'existe pas)
+        """
+        from utils.sync import DirectorySync
+        
+        if not Path(source_dir).is_dir():
+            self.print_error(f"Dossier introuvable: {source_dir}")
+            return None
+        
+        def on_result(source, ok, error):
+            if ok:
+                self.print_success(f"Conversion réussie: {source}")
+            else:
+                self.print_error(f"Échec de la conversion: {source}" + (f" ({error})" if error else ""))
+        
+        executor = None
+        if not dry_run:
+            executor = self._create_executor(jobs)
+        syncer = DirectorySync(source_dir, output_dir, output_format, executor, quality,
+                               delete_orphans=delete_orphans, on_result=on_result, options=self.options)
+        start = time.monotonic()
+        try:
+            stats = syncer.run(dry_run=dry_run)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+        
+        if dry_run:
+            plan = stats.pop('plan')
+            for source, *_ in plan['convert']:
+                print(f"  à convertir : {source}")
+            for source in plan['orphans']:
+                print(f"  orphelin    : {source}")
+        self.print_info(f"Synchronisation terminée en {time.monotonic() - start:.1f} s:")
+        self.print_info(f"  À jour: {stats['up_to_date'] + stats['refreshed']}")
+        if dry_run:
+            self.print_info(f"  À convertir: {stats['to_convert']}")
+        else:
+            self.print_success(f"  Converties: {stats['converted']}")
+            if stats['failed']:
+                self.print_error(f"  Échouées: {stats['failed']}")
+        if stats['orphans']:
+            self.print_warning(f"  Sources disparues: {stats['orphans']} "
+                               f"({stats['removed_outputs']} sortie(s) supprimée(s))")
+        return stats
+        
+    def merge_to_pdf(self, input_paths, output_path, jobs=None):
+        """
+        Assembler des images, dans l'ordre, en un seul PDF
+        
+        Args:
+            input_paths (list): Images, dans l'ordre des pages
+            output_path (str): PDF à écrire
+            jobs (int): Pages préparées en parallèle (None = un par cœur)
+            
+        Returns:
+            bool: True si le PDF a été écrit
+        """
+        from converters.image_converter import ImageConverter
+        
+        missing = [path for path in input_paths if not Path(path).is_file()]
+        if missing:
+            self.print_error(f"Fichier introuvable: {missing[0]}")
+            return False
+        self.print_info(f"Assemblage de {len(input_paths)} image(s) dans {output_path}")
+        ops = (self.options or {}).get('ops')
+        converter = registry.get_converter(ImageConverter)
+        if self.profile_dir is None:
+            result = converter.merge_to_pdf(input_paths, output_path, ops, jobs)
+        else:
+            from utils.profiling import ConversionProfiler, profile_base
+            
+            profiler = ConversionProfiler(profile_base(self.profile_dir, output_path))
+            with profiler:
+                result = converter.merge_to_pdf(input_paths, output_path, ops, jobs)
+            for path in profiler.paths.values():
+                self.print_info(f"Profil: {path}")
+        if result:
+            self.print_success(f"PDF créé: {output_path} ({result.bytes_written / (1024 * 1024):.1f} Mo "
+                               f"en {result.elapsed:.1f} s)")
+            return True
+        self.print_error(f"Échec de l'assemblage: {result.error}")
+        return False
+        
+    def list_formats(self):
+        """Afficher les formats supportés"""
+        self.print_info("Formats supportés par PtitConvert:")
+        
+        for converter_class in registry.CONVERTER_CLASSES:
+            title = FORMAT_SECTIONS.get(converter_class.__name__, converter_class.__name__)
+            print(f"\n{title}:")
+            for input_formats, output_formats in registry.get_capabilities(converter_class):
+                inputs = ', '.join(sorted(ext.lstrip('.').upper() for ext in input_formats))
+                outputs = ', '.join(sorted(fmt.upper() for fmt in output_formats))
+                print(f"  Entrée: {inputs}")
+                print(f"  Sortie: {outputs}")
 
 def create_argument_parser():
     """Créer le parser d'arguments"""
@@ -208,14 +657,54 @@ def create_argument_parser():
         epilog="Exemples:\n"
                "  ptitconvert-cli convert image.png --output ./sortie --format jpg\n"
                "  ptitconvert-cli batch *.pdf --output ./sortie --format docx\n"
-               "  ptitconvert-cli extract archive.zip --output ./extraits",
+               "  ptitconvert-cli batch scans/*.png --output ./sortie --format pdf --jobs 8 --fail-fast\n"
+               "  ptitconvert-cli watch ./entrees --output ./sortie --format pdf\n"
+               "  ptitconvert-cli sync ./scans --output ./pdf --format pdf\n"
+               "  ptitconvert-cli convert rapport.pdf --output ./sortie --format docx --trace trace.json\n"
+               "  ptitconvert-cli batch scans/*.tiff --output ./sortie --format pdf --profile ./profils\n"
+               "  ptitconvert-cli batch photos/*.jpg --output ./web --format jpg --ops resize:1600x1600,strip\n"
+               "  ptitconvert-cli convert carte.png --output ./sortie --format tiff --tiled\n"
+               "  ptitconvert-cli convert animation.gif --output ./sortie --format webp\n"
+               "  ptitconvert-cli convert scan.tiff --output ./pages --format png --extract-frames\n"
+               "  ptitconvert-cli merge scans/*.jpg --output dossier.pdf\n"
+               "  ptitconvert-cli extract archive.zip --output ./extraits\n"
+               "  ptitconvert-cli bench --quick --output mesures.json --baseline reference.json",
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='Afficher le détail des conversions (journaux des convertisseurs)')
+    
     subparsers = parser.add_subparsers(dest='command', help='Commandes disponibles')
     
+    # Options de diagnostic communes aux commandes qui convertissent
+    diagnostic_options = argparse.ArgumentParser(add_help=False)
+    diagnostic_options.add_argument('--trace', metavar='FICHIER',
+                                    help='Mesurer les étapes des conversions (trace Chrome au format JSON)')
+    diagnostic_options.add_argument('--trace-memory', action='store_true',
+                                    help='Avec --trace : mesurer aussi les allocations de chaque étape (plus lent)')
+    diagnostic_options.add_argument('--profile', metavar='DOSSIER',
+                                    help='Profiler chaque conversion (cProfile et piles échantillonnées) ; '
+                                         'profils .pstats et .collapsed écrits dans ce dossier')
+    
+    # Opérations sur les images, communes aux commandes qui convertissent
+    image_options = argparse.ArgumentParser(add_help=False)
+    image_options.add_argument('--ops', metavar='OPÉRATIONS',
+                               help="Opérations appliquées aux images, dans l'ordre et en un seul décodage : "
+                                    "resize:LxH (ratio conservé, LxH! exact), crop:LxH+X+Y, rotate:DEGRÉS, "
+                                    "strip (sans métadonnées), convert:gray|rgb|rgba|cmyk|bw ; "
+                                    "ex. resize:1600x1600,strip")
+    
+    # Options d'écriture des images, communes aux commandes qui convertissent fichier par fichier
+    output_options = argparse.ArgumentParser(add_help=False)
+    output_options.add_argument('--tiled', action='store_true',
+                                help='Écrire les TIFF en tuiles de 256x256 (accès rapide à une zone des très grandes images)')
+    output_options.add_argument('--extract-frames', action='store_true',
+                                help="Écrire chaque page d'un TIFF ou image d'une animation dans son propre fichier "
+                                     "(nom_0001.png...)")
+    
     # Commande convert
-    convert_parser = subparsers.add_parser('convert', help='Convertir un fichier')
+    convert_parser = subparsers.add_parser('convert', parents=[diagnostic_options, image_options, output_options], help='Convertir un fichier')
     convert_parser.add_argument('input', help='Fichier à convertir')
     convert_parser.add_argument('--output', '-o', required=True, help='Répertoire de sortie')
     convert_parser.add_argument('--format', '-f', required=True, help='Format de sortie')
@@ -223,12 +712,58 @@ def create_argument_parser():
                                default='medium', help='Qualité de conversion')
     
     # Commande batch
-    batch_parser = subparsers.add_parser('batch', help='Conversion par lots')
+    batch_parser = subparsers.add_parser('batch', parents=[diagnostic_options, image_options, output_options], help='Conversion par lots')
     batch_parser.add_argument('inputs', nargs='+', help='Fichiers à convertir')
     batch_parser.add_argument('--output', '-o', required=True, help='Répertoire de sortie')
     batch_parser.add_argument('--format', '-f', required=True, help='Format de sortie')
     batch_parser.add_argument('--quality', '-q', choices=['low', 'medium', 'high'], 
                              default='medium', help='Qualité de conversion')
+    batch_parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                             help='Conversions en parallèle (défaut: nombre de cœurs ; 1 = séquentiel)')
+    batch_parser.add_argument('--ordered', action='store_true',
+                             help="Afficher les résultats dans l'ordre des fichiers plutôt qu'à la fin de chacun")
+    batch_parser.add_argument('--fail-fast', action='store_true',
+                             help='Arrêter le lot au premier échec')
+    
+    # Commande watch
+    watch_parser = subparsers.add_parser('watch', parents=[diagnostic_options, image_options, output_options], help='Convertir au fil de l\'eau les fichiers d\'un dossier')
+    watch_parser.add_argument('directory', help='Dossier à surveiller')
+    watch_parser.add_argument('--output', '-o', required=True, help='Répertoire de sortie')
+    watch_parser.add_argument('--format', '-f', required=True, help='Format de sortie')
+    watch_parser.add_argument('--quality', '-q', choices=['low', 'medium', 'high'],
+                             default='medium', help='Qualité de conversion')
+    watch_parser.add_argument('--jobs', '-j', type=int, default=None,
+                             help='Conversions en parallèle (défaut: nombre de cœurs)')
+    watch_parser.add_argument('--debounce', type=float, default=2.0,
+                             help='Secondes sans écriture avant de convertir un fichier (défaut: 2)')
+    watch_parser.add_argument('--poll', action='store_true',
+                             help='Détecter les changements par balayage plutôt que par inotify')
+    watch_parser.add_argument('--interval', type=float, default=2.0,
+                             help='Délai entre deux balayages avec --poll (défaut: 2 s)')
+    watch_parser.add_argument('--no-recursive', action='store_true',
+                             help='Ne pas surveiller les sous-dossiers')
+    
+    # Commande sync
+    sync_parser = subparsers.add_parser('sync', parents=[diagnostic_options, image_options, output_options], help='Convertir seulement les fichiers nouveaux ou modifiés d\'un dossier')
+    sync_parser.add_argument('directory', help='Dossier source')
+    sync_parser.add_argument('--output', '-o', required=True, help='Dossier de sortie')
+    sync_parser.add_argument('--format', '-f', required=True, help='Format de sortie')
+    sync_parser.add_argument('--quality', '-q', choices=['low', 'medium', 'high'],
+                            default='medium', help='Qualité de conversion')
+    sync_parser.add_argument('--jobs', '-j', type=int, default=None,
+                            help='Conversions en parallèle (défaut: nombre de cœurs)')
+    sync_parser.add_argument('--keep-orphans', action='store_true',
+                            help='Garder les sorties dont la source a disparu')
+    sync_parser.add_argument('--dry-run', '-n', action='store_true',
+                            help='Afficher ce qui serait converti ou supprimé, sans rien faire')
+    
+    # Commande merge
+    merge_parser = subparsers.add_parser('merge', parents=[diagnostic_options, image_options],
+                                         help='Assembler des images en un seul PDF (une page par image)')
+    merge_parser.add_argument('inputs', nargs='+', help='Images, dans l\'ordre des pages')
+    merge_parser.add_argument('--output', '-o', required=True, help='PDF à écrire')
+    merge_parser.add_argument('--jobs', '-j', type=int, default=None,
+                             help='Pages préparées en parallèle (défaut: nombre de cœurs)')
     
     # Commande extract
     extract_parser = subparsers.add_parser('extract', help='Extraire une archive')
@@ -238,18 +773,36 @@ def create_argument_parser():
     # Commande formats
     subparsers.add_parser('formats', help='Lister les formats supportés')
     
+    # Commande bench (options transmises telles quelles à benchmarks/run.py)
+    subparsers.add_parser('bench', add_help=False,
+                          help='Mesurer les performances de toutes les conversions (voir bench --help)')
+    
     return parser
 
 def main():
     """Point d'entrée principal du CLI"""
     parser = create_argument_parser()
-    args = parser.parse_args()
+    args, extra = parser.parse_known_args()
+    if extra and args.command != 'bench':
+        parser.error(f"arguments non reconnus: {' '.join(extra)}")
     
     if not args.command:
         parser.print_help()
         return 1
         
+    # Journaux écrits par un thread dédié : la console ne ralentit pas les conversions
+    logs.setup_logging(logging.INFO if args.verbose else logging.WARNING, fmt='%(levelname)s: %(message)s')
     cli = PtitConvertCLI()
+    if args.command in ('convert', 'batch', 'watch', 'sync', 'merge'):
+        try:
+            cli.set_image_options(args.ops, getattr(args, 'tiled', False), getattr(args, 'extract_frames', False))
+        except ValueError as e:
+            parser.error(str(e))
+    trace_path = getattr(args, 'trace', None)
+    if trace_path:
+        cli.start_trace(memory=args.trace_memory)
+    if getattr(args, 'profile', None):
+        cli.profile_dir = os.path.abspath(args.profile)
     
     try:
         if args.command == 'convert':
@@ -257,8 +810,33 @@ def main():
             return 0 if success else 1
             
         elif args.command == 'batch':
-            stats = cli.batch_convert(args.inputs, args.output, args.format, args.quality)
-            return 0 if stats['failed'] == 0 else 1
+            if args.jobs > 1:
+                stats = cli.parallel_batch_convert(
+                    args.inputs, args.output, args.format, args.quality,
+                    jobs=args.jobs, ordered=args.ordered, fail_fast=args.fail_fast,
+                )
+            else:
+                stats = cli.batch_convert(args.inputs, args.output, args.format, args.quality,
+                                          fail_fast=args.fail_fast)
+            return 0 if stats['failed'] == 0 and not stats.get('cancelled') else 1
+            
+        elif args.command == 'watch':
+            ok = cli.watch_folder(
+                args.directory, args.output, args.format, args.quality, jobs=args.jobs,
+                debounce=args.debounce, polling=args.poll, interval=args.interval,
+                recursive=not args.no_recursive,
+            )
+            return 0 if ok else 1
+            
+        elif args.command == 'sync':
+            stats = cli.sync_folder(
+                args.directory, args.output, args.format, args.quality, jobs=args.jobs,
+                delete_orphans=not args.keep_orphans, dry_run=args.dry_run,
+            )
+            return 0 if stats is not None and stats['failed'] == 0 else 1
+            
+        elif args.command == 'merge':
+            return 0 if cli.merge_to_pdf(args.inputs, args.output, jobs=args.jobs) else 1
             
         elif args.command == 'extract':
             success = cli.archive_converter.extract_archive(args.archive, args.output)
@@ -273,12 +851,19 @@ def main():
             cli.list_formats()
             return 0
             
+        elif args.command == 'bench':
+            from benchmarks import run as bench
+            return bench.main(extra)
+            
     except KeyboardInterrupt:
         cli.print_warning("Opération interrompue par l'utilisateur")
         return 1
     except Exception as e:
         cli.print_error(f"Erreur inattendue: {str(e)}")
         return 1
+    finally:
+        if trace_path:
+            cli.finish_trace(trace_path)
 
 if __name__ == "__main__":
     sys.exit(main())
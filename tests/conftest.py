@@ -0,0 +1,32 @@
+"""
+Configuration commune des tests de PtitConvert
+Le dossier personnel est redirigé vers un dossier temporaire : configuration,
+cache, historique et spool du backend ne touchent pas ~/.ptitconvert.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+_HOME = None
+
+
+def pytest_configure(config):
+    global _HOME
+    _HOME = tempfile.mkdtemp(prefix='ptitconvert-tests-')
+    # Hérité par les processus de travail de l'exécuteur
+    os.environ['HOME'] = _HOME
+    os.environ['USERPROFILE'] = _HOME
+    for name in ('PTITCONVERT_SPOOL', 'PTITCONVERT_PROFILE'):
+        os.environ.pop(name, None)
+
+
+def pytest_unconfigure(config):
+    if _HOME is not None:
+        shutil.rmtree(_HOME, ignore_errors=True)
@@ -0,0 +1,228 @@
+"""Tests des routes d'envoi et de téléchargement du backend"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+from PIL import Image
+
+pytest.importorskip('httpx')
+from fastapi.testclient import TestClient  # noqa: E402
+
+from backend import server  # noqa: E402
+from converters.result import ConversionResult  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def client():
+    # Le pool de processus est partagé par tout le module : un seul démarrage, un seul arrêt
+    with TestClient(server.app) as client:
+        yield client
+
+
+def png_bytes(tmp_path, name='image.png', size=(64, 48)):
+    path = tmp_path / name
+    Image.new('RGB', size, 'green').save(path)
+    return path.read_bytes()
+
+
+def wait_done(client, job_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = client.get(f'/jobs/{job_id}').json()
+        if status['done']:
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} non terminé")
+
+
+def test_upload_convert_list_and_download(client, tmp_path):
+    response = client.post('/convert/upload', data={'output_format': 'bmp'}, files=[
+        ('files', ('a.png', png_bytes(tmp_path), 'image/png')),
+        ('files', ('b.png', png_bytes(tmp_path), 'image/png')),
+    ])
+    assert response.status_code == 200, response.text
+    job = response.json()
+    assert job['files'] == ['a.png', 'b.png']
+    status = wait_done(client, job['job_id'])
+    assert (status['success'], status['failed']) == (2, 0)
+
+    outputs = client.get(f"/jobs/{job['job_id']}/outputs").json()['outputs']
+    assert [item['name'] for item in outputs] == ['a.bmp', 'b.bmp']
+    full = client.get(f"/jobs/{job['job_id']}/outputs/a.bmp")
+    assert full.status_code == 200
+    assert full.content[:2] == b'BM'
+    assert len(full.content) == outputs[0]['size']
+
+
+def test_download_supports_range_requests(client, tmp_path):
+    job_id = client.post('/convert/upload?output_format=bmp', files=[
+        ('files', ('c.png', png_bytes(tmp_path), 'image/png')),
+    ]).json()['job_id']
+    wait_done(client, job_id)
+    url = f'/jobs/{job_id}/outputs/c.bmp'
+    full = client.get(url).content
+
+    part = client.get(url, headers={'Range': 'bytes=10-19'})
+    assert part.status_code == 206
+    assert part.content == full[10:20]
+    assert part.headers['content-range'] == f'bytes 10-19/{len(full)}'
+    tail = client.get(url, headers={'Range': 'bytes=-4'})
+    assert tail.content == full[-4:]
+
+
+def test_download_rejects_other_paths(client, tmp_path):
+    job_id = client.post('/convert/upload?output_format=bmp', files=[
+        ('files', ('d.png', png_bytes(tmp_path), 'image/png')),
+    ]).json()['job_id']
+    wait_done(client, job_id)
+    assert client.get(f'/jobs/{job_id}/outputs/..%2Fin%2Fd.png').status_code == 404
+    assert client.get(f'/jobs/{job_id}/outputs/absent.bmp').status_code == 404
+    assert client.get('/jobs/inconnu/outputs').status_code == 404
+
+
+def test_outputs_of_a_path_job_are_not_downloadable(client, tmp_path):
+    source = tmp_path / 'local.png'
+    source.write_bytes(png_bytes(tmp_path))
+    job_id = client.post('/convert', json={
+        'files': [str(source)], 'output_format': 'bmp', 'output_dir': str(tmp_path / 'out'),
+    }).json()['job_id']
+    wait_done(client, job_id)
+    assert (tmp_path / 'out' / 'local.bmp').is_file()
+    assert client.get(f'/jobs/{job_id}/outputs').status_code == 404
+
+
+def test_upload_errors(client, tmp_path, monkeypatch):
+    image = png_bytes(tmp_path)
+    missing_format = client.post('/convert/upload', files=[('files', ('e.png', image, 'image/png'))])
+    assert missing_format.status_code == 400
+    no_file = client.post('/convert/upload', data={'output_format': 'bmp'}, files=[('other', ('', b'', ''))])
+    assert no_file.status_code == 400
+
+    spooled = set(server.SPOOL_ROOT.iterdir()) if server.SPOOL_ROOT.is_dir() else set()
+    get = server.CONFIG.get
+    monkeypatch.setattr(server.CONFIG, 'get', lambda key, default=None:
+                        1 / 1024 if key == 'advanced.max_file_size_mb' else get(key, default))
+    too_large = client.post('/convert/upload?output_format=bmp', files=[
+        ('files', ('f.png', b'x' * 4096, 'image/png')),
+    ])
+    assert too_large.status_code == 413
+    # Rien ne reste dans le spool
+    assert set(server.SPOOL_ROOT.iterdir()) == spooled
+
+
+def sse_events(client, job_id):
+    with client.stream('GET', f'/jobs/{job_id}/events') as response:
+        assert response.status_code == 200
+        return [line.split(': ', 1)[1] for line in response.iter_lines() if line.startswith('event: ')]
+
+
+def test_event_stream_of_a_running_and_a_finished_job(client, tmp_path):
+    sources = []
+    for index in range(3):
+        path = tmp_path / f'sse{index}.png'
+        Image.effect_noise((800, 800), 32).save(path)
+        sources.append(str(path))
+    job_id = client.post('/convert', json={
+        'files': sources, 'output_format': 'bmp', 'output_dir': str(tmp_path / 'out'),
+    }).json()['job_id']
+
+    events = sse_events(client, job_id)
+    assert events[0] == 'job-status'
+    assert events[-1] == 'job-done'
+    assert events.count('file-finished') + events.count('file-error') <= 3
+    # Job terminé : l'état puis la fin, sans attente
+    assert sse_events(client, job_id) == ['job-status', 'job-done']
+    assert client.get('/jobs/inconnu/events').status_code == 404
+
+
+def test_finished_files_are_recorded_by_the_store_writer(client, tmp_path, monkeypatch):
+    threads = []
+    add_conversion = server.HISTORY.add_conversion
+
+    def recording(*args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return add_conversion(*args, **kwargs)
+
+    monkeypatch.setattr(server.HISTORY, 'add_conversion', recording)
+    image = png_bytes(tmp_path, size=(30, 20))
+    job_id = client.post('/convert/upload?output_format=bmp', files=[
+        ('files', ('historique.png', image, 'image/png')),
+    ]).json()['job_id']
+    wait_done(client, job_id)
+
+    deadline = time.monotonic() + 10
+    while (server.JOB_STORE.get_job(job_id)['finished'] is None
+           or (server.SPOOL_ROOT / job_id / 'in').exists()) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    record = server.JOB_STORE.get_job(job_id)
+    assert record['finished'] is not None
+    assert [f['state'] for f in record['files']] == ['done']
+    assert threads == ['ptitconvert-store']
+    row = next(item for item in client.get('/history/recent').json()['items']
+               if item['input_file'].endswith('historique.png'))
+    # Taille lue avant la suppression des fichiers envoyés
+    assert row['file_size'] == len(image)
+    assert row['input_format'] == 'png'
+    assert not (server.SPOOL_ROOT / job_id / 'in').exists()
+
+
+def test_cancelled_job_reads_the_same_after_eviction(client, tmp_path):
+    sources = []
+    for index in range(4):
+        path = tmp_path / f'annule{index}.png'
+        Image.effect_noise((800, 800), 32).save(path)
+        sources.append(str(path))
+    job_id = client.post('/convert', json={
+        'files': sources, 'output_format': 'bmp', 'output_dir': str(tmp_path / 'out'),
+    }).json()['job_id']
+    assert client.delete(f'/jobs/{job_id}').status_code == 200
+    live = wait_done(client, job_id)
+    deadline = time.monotonic() + 10
+    while server.JOB_STORE.get_job(job_id)['finished'] is None and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    # Job sorti de la mémoire (expiration ou redémarrage) : relu depuis la base
+    with server.JOBS_LOCK:
+        server.JOBS.pop(job_id)
+        server.JOB_FINISHED_AT.pop(job_id, None)
+    stored = client.get(f'/jobs/{job_id}').json()
+
+    assert live['cancelled'] and stored['cancelled']
+    assert stored['message'] == live['message'] == "Conversion annulée"
+    assert 'Cancelled' in [result['error_type'] for result in stored['results']]
+    # En mémoire, les fichiers sont dans l'ordre où ils ont fini ; dans la base, dans celui du job
+    fields = ('file', 'success', 'error', 'error_type')
+    assert (sorted(tuple(result[key] for key in fields) for result in stored['results'])
+            == sorted(tuple(result[key] for key in fields) for result in live['results']))
+
+
+def test_progress_after_a_file_result_is_dropped():
+    job_id = 'ordre-des-evenements'
+    loop = asyncio.new_event_loop()
+    with server.JOBS_LOCK:
+        server.JOBS[job_id] = server.JobStatus(job_id=job_id, total=2, processed=0, success=0, failed=0)
+    events = server.EVENTS.subscribe(job_id, loop)
+    try:
+        future = Future()
+        future.set_result(ConversionResult(True, ['/sortie/a.bmp']))
+        server._on_worker_event((job_id, 0, '/a.png'), 'started', None)
+        server._on_file_done(job_id, 0, '/a.png', 'bmp', '/sortie', future)
+        # Progression du fichier terminé arrivée en retard (autre thread) : ignorée
+        server._on_worker_event((job_id, 0, '/a.png'), 'progress', 0.9)
+        server._on_worker_event((job_id, 1, '/b.png'), 'started', None)
+        loop.run_until_complete(asyncio.sleep(0))
+
+        received = []
+        while not events.empty():
+            event = events.get_nowait()
+            received.append((event['type'], event['file']))
+        assert received == [('started', '/a.png'), ('finished', '/a.png'), ('started', '/b.png')]
+    finally:
+        server.EVENTS.unsubscribe(job_id, events)
+        with server.JOBS_LOCK:
+            server.JOBS.pop(job_id, None)
+            server.FINISHED_FILES.pop(job_id, None)
+        loop.close()
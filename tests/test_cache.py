@@ -0,0 +1,124 @@
+"""Tests du cache de résultats de conversion"""
+
+import os
+import stat
+
+import pytest
+from PIL import Image
+
+from utils import executor
+from utils.cache import ConversionCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ConversionCache(tmp_path / 'cache', max_size_mb=1)
+
+
+def write(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_key_depends_on_content_format_options_and_version(cache, tmp_path):
+    source = write(tmp_path / 'a.txt', b'contenu')
+    copy = write(tmp_path / 'b.txt', b'contenu')
+    key = cache.make_key(source, 'pdf', 'DocumentConverter=1')
+    # Même contenu sous un autre nom : même résultat
+    assert cache.make_key(copy, 'PDF', 'DocumentConverter=1') == key
+    assert len({
+        key,
+        cache.make_key(source, 'docx', 'DocumentConverter=1'),
+        cache.make_key(source, 'pdf', 'DocumentConverter=2'),
+        cache.make_key(source, 'pdf', 'DocumentConverter=1', quality='high'),
+        cache.make_key(source, 'pdf', 'DocumentConverter=1', options={'ops': 'strip'}),
+    }) == 5
+    assert cache.make_key(str(tmp_path / 'absent.txt'), 'pdf', 'DocumentConverter=1') is None
+
+
+def test_fetch_materializes_an_independent_copy(cache, tmp_path):
+    produced = write(tmp_path / 'produced.pdf', b'%PDF resultat')
+    assert cache.store('k1', produced)
+
+    output = tmp_path / 'out' / 'sortie.pdf'
+    assert cache.fetch('k1', output)
+    assert output.read_bytes() == b'%PDF resultat'
+    info = output.stat()
+    # Ni lien physique vers l'objet du cache, ni lecture seule
+    assert info.st_nlink == 1
+    assert info.st_mode & stat.S_IWUSR
+    output.write_bytes(b'modifie')
+    assert cache.fetch('k1', tmp_path / 'again.pdf')
+    assert (tmp_path / 'again.pdf').read_bytes() == b'%PDF resultat'
+    assert not list((tmp_path / 'out').glob('.*tmp'))
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (2, 0, 1)
+
+
+def test_missing_object_is_a_miss_and_drops_the_entry(cache, tmp_path):
+    cache.store('k1', write(tmp_path / 'produced.png', b'png'))
+    object_path = cache._object_path('k1', '.png')
+    os.chmod(object_path, 0o644)
+    object_path.unlink()
+    assert not cache.fetch('k1', tmp_path / 'out.png')
+    assert not cache.fetch('absent', tmp_path / 'out.png')
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (0, 2, 0)
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = ConversionCache(tmp_path / 'cache', max_size_mb=250 / (1024 * 1024))
+    for name in ('a', 'b'):
+        cache.store(name, write(tmp_path / f'{name}.bin', b'x' * 100))
+    # 'a' relu : 'b' devient le moins récemment utilisé
+    assert cache.fetch('a', tmp_path / 'a.out')
+    cache.store('c', write(tmp_path / 'c.bin', b'x' * 100))
+
+    assert cache.fetch('a', tmp_path / 'a2.out')
+    assert cache.fetch('c', tmp_path / 'c.out')
+    assert not cache.fetch('b', tmp_path / 'b.out')
+    assert not cache._object_path('b', '.bin').exists()
+    stats = cache.get_stats()
+    assert (stats['evictions'], stats['entries'], stats['size_bytes']) == (1, 2, 200)
+
+
+def test_result_larger_than_the_cache_is_not_stored(tmp_path):
+    cache = ConversionCache(tmp_path / 'cache', max_size_mb=10 / (1024 * 1024))
+    assert not cache.store('big', write(tmp_path / 'big.bin', b'x' * 100))
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_second_conversion_is_served_from_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(executor, '_CACHE', ConversionCache(tmp_path / 'cache'))
+    monkeypatch.setattr(executor, '_CACHE_LOADED', True)
+    source = tmp_path / 'photo.png'
+    Image.new('RGB', (32, 32), 'red').save(source)
+    for name in ('un', 'deux', 'trois'):
+        (tmp_path / name).mkdir()
+
+    first = executor.convert_file_task(str(source), 'jpg', str(tmp_path / 'un'))
+    second = executor.convert_file_task(str(source), 'jpg', str(tmp_path / 'deux'))
+    assert first.success and not first.cached
+    assert second.success and second.cached
+    assert (tmp_path / 'deux' / 'photo.jpg').read_bytes() == (tmp_path / 'un' / 'photo.jpg').read_bytes()
+    # D'autres opérations donnent un autre résultat
+    other = executor.convert_file_task(str(source), 'jpg', str(tmp_path / 'trois'), options={'ops': 'rotate:90'})
+    assert other.success and not other.cached
+
+
+def test_extracted_frames_bypass_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(executor, '_CACHE', ConversionCache(tmp_path / 'cache'))
+    monkeypatch.setattr(executor, '_CACHE_LOADED', True)
+    source = tmp_path / 'photo.png'
+    Image.new('RGB', (32, 32), 'red').save(source)
+    for name in ('un', 'deux'):
+        (tmp_path / name).mkdir()
+
+    for name in ('un', 'deux'):
+        result = executor.convert_file_task(str(source), 'png', str(tmp_path / name),
+                                            options={'extract_frames': True})
+        assert result.success and not result.cached
+        assert result.outputs == [str(tmp_path / name / 'photo_0001.png')]
+        assert sorted(path.name for path in (tmp_path / name).iterdir()) == ['photo_0001.png']
+    assert executor._CACHE.get_stats()['entries'] == 0
@@ -0,0 +1,89 @@
+"""Tests du modèle de coût des conversions"""
+
+import sqlite3
+
+import pytest
+
+from utils.cost_model import CostModel
+from utils.history import ConversionHistory
+
+MB = 1024 * 1024
+ROUTE = ('png', 'jpg', 'ImageConverter')
+
+
+def test_route_of_uses_registry_extensions():
+    assert CostModel.route_of('photo.PNG', 'JPG') == ROUTE
+    assert CostModel.route_of('sauvegarde.tar.gz', 'zip') == ('tar.gz', 'zip', 'ArchiveConverter')
+    assert CostModel.route_of('photo.png', 'xlsx')[2] == 'none'
+
+
+def test_linear_fit_over_file_size():
+    model = CostModel()
+    assert model.estimate(ROUTE, MB) is None
+    for size_mb in (1, 2, 4, 8):
+        model.observe(ROUTE, size_mb * MB, 0.5 + 0.25 * size_mb)
+    assert model.estimate(ROUTE, 16 * MB) == pytest.approx(4.5)
+    assert model.estimate(ROUTE, 0) == pytest.approx(0.5)
+
+
+def test_identical_sizes_predict_a_proportional_duration():
+    model = CostModel()
+    for _ in range(3):
+        model.observe(ROUTE, 2 * MB, 1.0)
+    assert model.estimate(ROUTE, 4 * MB) == pytest.approx(2.0)
+
+
+def test_invalid_measures_are_ignored_and_converter_stats_are_a_fallback():
+    model = CostModel()
+    model.observe(ROUTE, MB, 0)
+    model.observe(ROUTE, None, 1.0)
+    assert model.estimate(ROUTE, MB) is None
+    model.observe(ROUTE, MB, 2.0)
+    # Autre route du même convertisseur, jamais mesurée
+    assert model.estimate(('bmp', 'png', 'ImageConverter'), MB) == pytest.approx(2.0)
+    assert model.estimate(('txt', 'pdf', 'DocumentConverter'), MB) is None
+
+
+def test_recent_measures_weigh_more():
+    model = CostModel()
+    for _ in range(50):
+        model.observe(ROUTE, MB, 1.0)
+    for _ in range(50):
+        model.observe(ROUTE, MB, 3.0)
+    assert model.estimate(ROUTE, MB) > 2.0
+
+
+def test_load_history_skips_failures_and_cache_hits(tmp_path):
+    history = ConversionHistory(str(tmp_path / 'history.db'))
+    history.add_conversion('a.png', 'png', 'a.jpg', 'jpg', file_size=MB, conversion_time=2.0)
+    history.add_conversion('b.png', 'png', 'b.jpg', 'jpg', file_size=MB, conversion_time=0.01, cached=True)
+    history.add_conversion('c.png', 'png', 'c.jpg', 'jpg', file_size=MB, conversion_time=9.0, success=False)
+    history.add_conversion('d.tar.gz', 'tar.gz', 'd.zip', 'zip', file_size=MB, conversion_time=3.0)
+
+    model = CostModel()
+    assert model.load_history(history.db_path) == 2
+    assert model.estimate(ROUTE, MB) == pytest.approx(2.0)
+    assert model.estimate(('tar.gz', 'zip', 'ArchiveConverter'), MB) == pytest.approx(3.0)
+    assert model.load_history(str(tmp_path / 'absent.db')) == 0
+
+
+def test_load_history_reads_databases_without_the_cached_column(tmp_path):
+    db_path = str(tmp_path / 'old.db')
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('''
+            CREATE TABLE conversion_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, input_file TEXT,
+                input_format TEXT, output_file TEXT, output_format TEXT, file_size INTEGER,
+                conversion_time REAL, success BOOLEAN, error_message TEXT, quality TEXT
+            )
+        ''')
+        conn.execute("INSERT INTO conversion_history (input_format, output_format, file_size, "
+                     "conversion_time, success) VALUES ('png', 'jpg', ?, 1.5, 1)", (MB,))
+    model = CostModel()
+    assert model.load_history(db_path) == 1
+    assert model.estimate(ROUTE, MB) == pytest.approx(1.5)
+    # La migration ajoute la colonne aux anciennes bases
+    ConversionHistory(db_path)
+    with sqlite3.connect(db_path) as conn:
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(conversion_history)')}
+    assert 'cached' in columns
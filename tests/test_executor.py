@@ -0,0 +1,121 @@
+"""Tests du pool de processus de conversion : limites, annulation, plantages"""
+
+import os
+import signal
+import sys
+import threading
+
+import pytest
+from PIL import Image
+
+from converters.result import CANCELLED, TIMEOUT, WORKER_CRASHED
+from utils.cost_model import CostModel
+from utils.executor import ConversionExecutor
+
+# Conversion lente : une image bruitée tournée plusieurs fois
+SLOW_OPS = ','.join(['rotate:1'] * 12)
+
+
+@pytest.fixture(scope='module')
+def slow_image(tmp_path_factory):
+    path = tmp_path_factory.mktemp('slow') / 'bruit.png'
+    Image.effect_noise((2500, 2500), 64).save(path, compress_level=1)
+    return str(path)
+
+
+@pytest.fixture
+def small_image(tmp_path):
+    path = tmp_path / 'petit.png'
+    Image.new('RGB', (16, 16), 'blue').save(path)
+    return str(path)
+
+
+@pytest.fixture
+def make_executor():
+    executors = []
+
+    def make(**kwargs):
+        started = threading.Event()
+
+        def on_event(task_id, kind, value):
+            if kind == 'started':
+                started.set()
+
+        kwargs.setdefault('max_workers', 1)
+        kwargs.setdefault('timeout', 0)
+        kwargs.setdefault('memory_limit_mb', 0)
+        executor = ConversionExecutor(on_event=on_event, cost_model=CostModel(), **kwargs)
+        executor.started = started
+        executors.append(executor)
+        return executor
+
+    yield make
+    for executor in executors:
+        executor.shutdown(wait=False)
+
+
+def convert_slow(executor, slow_image, tmp_path, task_id='lent'):
+    return executor.submit(slow_image, 'png', str(tmp_path), task_id=task_id, options={'ops': SLOW_OPS})
+
+
+def test_conversion_succeeds(make_executor, small_image, tmp_path):
+    # Le délai ne court qu'à partir de l'accusé de réception : le démarrage du processus n'en prend rien
+    executor = make_executor(timeout=1)
+    result = executor.submit(small_image, 'jpg', str(tmp_path)).result(60)
+    assert result.success, result.error
+    assert os.path.isfile(tmp_path / 'petit.jpg')
+
+
+def test_timeout_kills_the_worker_and_the_pool_continues(make_executor, slow_image, small_image, tmp_path):
+    executor = make_executor(timeout=0.1)
+    result = convert_slow(executor, slow_image, tmp_path).result(60)
+    assert not result.success
+    assert result.error_type == TIMEOUT
+    assert result.error == "Délai dépassé (0.1 s)"
+    assert not os.path.exists(tmp_path / 'bruit.png')
+    # Un nouveau processus prend la suite
+    executor.timeout = 0
+    assert executor.submit(small_image, 'jpg', str(tmp_path)).result(60).success
+
+
+def test_cancel_running_and_pending_tasks(make_executor, slow_image, small_image, tmp_path):
+    executor = make_executor()
+    running = convert_slow(executor, slow_image, tmp_path, task_id=('job', 0))
+    pending = executor.submit(small_image, 'jpg', str(tmp_path), task_id=('job', 1))
+    assert executor.started.wait(60)
+    assert executor.cancel(lambda task_id: task_id[0] == 'job') == 1
+    for future in (running, pending):
+        result = future.result(60)
+        assert not result.success
+        assert result.error_type == CANCELLED
+    assert executor.stats()['queued'] == 0
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="SIGKILL n'existe pas sous Windows")
+def test_crashed_worker_fails_only_its_task(make_executor, slow_image, small_image, tmp_path):
+    executor = make_executor()
+    future = convert_slow(executor, slow_image, tmp_path)
+    assert executor.started.wait(60)
+    os.kill(executor._workers[0].process.pid, signal.SIGKILL)
+    result = future.result(60)
+    assert not result.success
+    assert result.error_type == WORKER_CRASHED
+    assert executor.submit(small_image, 'jpg', str(tmp_path)).result(60).success
+
+
+def test_spawn_failure_fails_the_task_and_keeps_the_supervisor(make_executor, small_image, tmp_path, monkeypatch):
+    executor = make_executor()
+    spawn = executor._spawn_worker
+    calls = []
+
+    def failing_once():
+        calls.append(None)
+        if len(calls) == 1:
+            raise OSError("fork impossible")
+        return spawn()
+
+    monkeypatch.setattr(executor, '_spawn_worker', failing_once)
+    first = executor.submit(small_image, 'jpg', str(tmp_path)).result(60)
+    assert not first.success
+    assert first.error_type == WORKER_CRASHED
+    assert executor.submit(small_image, 'jpg', str(tmp_path)).result(60).success
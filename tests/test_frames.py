@@ -0,0 +1,171 @@
+"""Tests de la conversion des images à plusieurs vues (pages d'un TIFF, animations)"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from PIL import Image
+
+from converters import frames
+from converters.image_converter import ImageConverter
+from converters.result import UNSUPPORTED_FORMAT
+
+PyPDF2 = pytest.importorskip('PyPDF2')
+
+
+@pytest.fixture
+def multipage(tmp_path):
+    """TIFF de trois pages : RGB, palette, puis niveaux de gris (après la palette)"""
+    path = tmp_path / 'scan.tiff'
+    indexed = Image.new('P', (40, 30))
+    indexed.putpalette([0, 0, 0, 255, 0, 0] + [0] * 762)
+    indexed.paste(1, (0, 0, 20, 30))
+    pages = [Image.new('RGB', (60, 40), 'blue'), indexed, Image.new('L', (50, 70), 128)]
+    pages[0].save(path, save_all=True, append_images=pages[1:])
+    return path
+
+
+@pytest.fixture
+def animation(tmp_path):
+    path = tmp_path / 'clip.gif'
+    views = [Image.new('RGB', (32, 32), color) for color in ('red', 'green', 'blue')]
+    views[0].save(path, save_all=True, append_images=views[1:], duration=[70, 120, 250], loop=3)
+    return path
+
+
+@pytest.fixture
+def out_dir(tmp_path):
+    path = tmp_path / 'out'
+    path.mkdir()
+    return path
+
+
+def read_views(path):
+    with Image.open(path) as img:
+        return [(frame.mode, frame.size, frame.info.get('duration')) for _, frame in frames.iter_frames(img)]
+
+
+def test_iter_frames_keeps_page_modes(multipage):
+    with Image.open(multipage) as img:
+        assert frames.frame_count(img) == 3
+        modes = [(frame.mode, frame.size) for _, frame in frames.iter_frames(img)]
+    assert modes == [('RGB', (60, 40)), ('P', (40, 30)), ('L', (50, 70))]
+
+
+def test_multipage_tiff_to_tiff_keeps_every_page(multipage, out_dir):
+    result = ImageConverter().convert(multipage, out_dir, 'tiff')
+
+    assert result.success
+    assert result.outputs == [str(out_dir / 'scan.tiff')]
+    assert [(mode, size) for mode, size, _ in read_views(out_dir / 'scan.tiff')] == [
+        ('RGB', (60, 40)), ('P', (40, 30)), ('L', (50, 70))]
+    with Image.open(out_dir / 'scan.tiff') as img:
+        img.seek(2)
+        assert img.getpixel((0, 0)) == 128
+
+
+def test_multipage_tiff_to_pdf_has_one_page_per_view(multipage, out_dir):
+    result = ImageConverter().convert(multipage, out_dir, 'pdf')
+
+    assert result.success
+    reader = PyPDF2.PdfReader(str(out_dir / 'scan.pdf'))
+    assert len(reader.pages) == 3
+
+
+def test_extract_frames_names_files_by_index(multipage, out_dir):
+    result = ImageConverter().convert(multipage, out_dir, 'png', ops='resize:20x20', extract_frames=True)
+
+    expected = [out_dir / f'scan_{index:04d}.png' for index in (1, 2, 3)]
+    assert result.success
+    assert result.outputs == [str(path) for path in expected]
+    for path in expected:
+        with Image.open(path) as img:
+            assert max(img.size) == 20
+
+
+def test_animation_keeps_durations_and_loop(animation, out_dir):
+    result = ImageConverter().convert(animation, out_dir, 'webp')
+
+    assert result.success
+    output = out_dir / 'clip.webp'
+    assert [duration for _, _, duration in read_views(output)] == [70, 120, 250]
+    with Image.open(output) as img:
+        assert img.n_frames == 3
+        assert img.info.get('loop') == 3
+
+
+def test_single_frame_format_converts_the_first_view(animation, out_dir):
+    result = ImageConverter().convert(animation, out_dir, 'png')
+
+    assert result.success
+    with Image.open(out_dir / 'clip.png') as img:
+        assert not getattr(img, 'is_animated', False)
+        assert img.convert('RGB').getpixel((0, 0)) == (255, 0, 0)
+
+
+def test_tiled_multipage_tiff_is_refused(multipage, out_dir):
+    result = ImageConverter().convert(multipage, out_dir, 'tiff', tiled=True)
+
+    assert not result.success
+    assert result.error_type == UNSUPPORTED_FORMAT
+    assert 'extract_frames' in result.error
+    assert list(out_dir.iterdir()) == []
+
+
+def test_source_is_opened_once(multipage, out_dir, monkeypatch):
+    opened = []
+    original = Image.open
+
+    def counting_open(fp, *args, **kwargs):
+        if str(fp) == str(multipage):
+            opened.append(fp)
+        return original(fp, *args, **kwargs)
+
+    monkeypatch.setattr(Image, 'open', counting_open)
+
+    assert ImageConverter().convert(multipage, out_dir, 'tiff').success
+    assert len(opened) == 1
+
+
+def test_failed_conversion_leaves_no_file(multipage, out_dir, monkeypatch):
+    def fail(*args, **kwargs):
+        raise OSError("disque plein")
+
+    monkeypatch.setattr(ImageConverter, '_save', fail)
+
+    result = ImageConverter().convert(multipage, out_dir, 'png', extract_frames=True)
+
+    assert not result.success
+    assert list(out_dir.iterdir()) == []
+
+
+def test_map_ordered_keeps_order_within_window():
+    read = []
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def items():
+        for index in range(12):
+            read.append(index)
+            yield index
+
+    def work(index):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        # Les premiers éléments finissent les derniers
+        time.sleep(0.002 * (12 - index))
+        with lock:
+            running[0] -= 1
+        return index * 10
+
+    results = []
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        for result in frames.map_ordered(pool, work, items(), window=3):
+            # La lecture n'a pas plus de window éléments d'avance
+            assert len(read) - len(results) <= 3
+            results.append(result)
+
+    assert results == [index * 10 for index in range(12)]
+    assert peak[0] <= 3
@@ -0,0 +1,108 @@
+"""Tests de l'écriture de PDF d'images page après page"""
+
+import zlib
+
+import pytest
+from PIL import Image
+
+from converters import image_ops
+from converters.image_converter import ImageConverter
+from converters.pdf_writer import PdfImage, StreamingPdfWriter
+
+PyPDF2 = pytest.importorskip('PyPDF2')
+
+
+def save(path, mode='RGB', size=(120, 80), color='red', **kwargs):
+    Image.new(mode, size, color).save(path, **kwargs)
+    return str(path)
+
+
+def page_size(page):
+    box = page.mediabox
+    return float(box.width), float(box.height)
+
+
+def image_object(page):
+    xobjects = page['/Resources']['/XObject']
+    return xobjects[next(iter(xobjects))].get_object()
+
+
+def test_pages_follow_image_sizes_and_resolutions(tmp_path):
+    output = tmp_path / 'pages.pdf'
+    with StreamingPdfWriter(output) as writer:
+        writer.add_image_page(PdfImage.from_file(save(tmp_path / 'a.png', dpi=(144, 144))))
+        writer.add_image_page(PdfImage.from_file(save(tmp_path / 'b.png', 'L', (96, 192))))
+        assert writer.page_count == 2
+
+    reader = PyPDF2.PdfReader(str(output))
+    assert len(reader.pages) == 2
+    assert page_size(reader.pages[0]) == pytest.approx((60, 40), rel=1e-3)
+    # Sans résolution déclarée : 96 dpi
+    assert page_size(reader.pages[1]) == pytest.approx((72, 144))
+    assert image_object(reader.pages[1])['/ColorSpace'] == '/DeviceGray'
+
+
+def test_jpeg_is_copied_without_decoding(tmp_path):
+    source = save(tmp_path / 'photo.jpg', quality=80)
+    image = PdfImage.from_file(source)
+    assert (image.filter, image.path) == ('/DCTDecode', source)
+
+    output = tmp_path / 'photo.pdf'
+    with StreamingPdfWriter(output) as writer:
+        writer.add_image_page(image)
+    data = image_object(PyPDF2.PdfReader(str(output)).pages[0])._data
+    with open(source, 'rb') as f:
+        assert data == f.read()
+
+
+def test_exif_orientation_rotates_the_page(tmp_path):
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    image = PdfImage.from_file(save(tmp_path / 'tourne.jpg', exif=exif.tobytes()))
+    assert image.rotate == 90
+
+
+def test_transparency_and_operations(tmp_path):
+    source = save(tmp_path / 'alpha.png', 'RGBA', (200, 100), (255, 0, 0, 0), dpi=(200, 200))
+    pipeline = image_ops.ImagePipeline('resize:100x100')
+    image = PdfImage.from_file(source, pipeline)
+    assert (image.width, image.height, image.colorspace) == (100, 50, '/DeviceRGB')
+    # Même taille de page qu'avant le redimensionnement
+    assert image.dpi == pytest.approx((100, 100), rel=1e-3)
+    # Transparence posée sur fond blanc
+    with Image.open(source) as img:
+        flat = PdfImage.from_image(img)
+    assert zlib.decompress(flat.data)[:3] == b'\xff\xff\xff'
+
+
+def test_abort_removes_the_partial_file(tmp_path):
+    output = tmp_path / 'inacheve.pdf'
+    with pytest.raises(RuntimeError):
+        with StreamingPdfWriter(output) as writer:
+            writer.add_image_page(PdfImage.from_file(save(tmp_path / 'a.png')))
+            raise RuntimeError('interrompu')
+    assert not output.exists()
+
+
+def test_merge_to_pdf_keeps_the_order(tmp_path):
+    colors = ['red', 'green', 'blue', 'white', 'black']
+    paths = [save(tmp_path / f'{index}.png', color=color, size=(10 + index, 10))
+             for index, color in enumerate(colors)]
+    output = tmp_path / 'assemblage.pdf'
+    result = ImageConverter().merge_to_pdf(paths, output, workers=2)
+    assert result.success, result.error
+    assert result.outputs == [str(output)]
+    widths = [int(image_object(page)['/Width']) for page in PyPDF2.PdfReader(str(output)).pages]
+    assert widths == [10, 11, 12, 13, 14]
+
+
+def test_merge_to_pdf_failure_leaves_nothing(tmp_path):
+    good = save(tmp_path / 'ok.png')
+    broken = tmp_path / 'casse.png'
+    broken.write_bytes(b'pas une image')
+    output = tmp_path / 'assemblage.pdf'
+    result = ImageConverter().merge_to_pdf([good, str(broken)], output)
+    assert not result.success
+    assert 'casse.png' in result.error
+    assert not output.exists()
+    assert not ImageConverter().merge_to_pdf([], output).success
@@ -0,0 +1,114 @@
+"""Tests du planificateur de conversions en plusieurs étapes"""
+
+from converters import registry
+from converters.planner import ConversionPlanner
+
+
+class FakeDocument:
+    """Documents : décode en texte, écrit du texte"""
+    PAYLOAD_TYPE = 'text'
+
+    def decode(self, path):
+        return path.read_text()
+
+    def encode(self, payload, output_path, output_format):
+        output_path.write_text(f"{output_format}:{payload}")
+        return True
+
+
+class FakeSheet:
+    """Tableurs : décode en lignes, écrit des lignes"""
+    PAYLOAD_TYPE = 'table'
+
+    def decode(self, path):
+        return [line.split(',') for line in path.read_text().splitlines()]
+
+    def encode(self, payload, output_path, output_format):
+        output_path.write_text('\n'.join('|'.join(row) for row in payload))
+        return True
+
+
+class FakeImage:
+    """Images : pas de contenu échangeable en mémoire"""
+
+
+ROUTES = {
+    ('.docx', 'txt'): FakeDocument,
+    ('.txt', 'txt'): FakeDocument,
+    ('.txt', 'docx'): FakeDocument,
+    ('.docx', 'pdf'): FakeDocument,
+    ('.csv', 'xlsx'): FakeSheet,
+    ('.xlsx', 'csv'): FakeSheet,
+    ('.png', 'jpg'): FakeImage,
+    ('.png', 'pdf'): FakeImage,
+}
+
+
+def make_planner():
+    instances = {}
+    return ConversionPlanner(ROUTES, lambda cls: instances.setdefault(cls, cls()))
+
+
+def test_direct_route_is_a_single_step():
+    steps = make_planner().plan('.png', 'jpg')
+    assert [(s.source, s.target, s.converter_class) for s in steps] == [('png', 'jpg', FakeImage)]
+
+
+def test_multi_hop_route_goes_through_in_memory_adapters():
+    steps = make_planner().plan('docx', 'xlsx')
+    assert [repr(step) for step in steps] == [
+        'docx->txt (FakeDocument)', 'txt->csv (adapter)', 'csv->xlsx (FakeSheet)',
+    ]
+
+
+def test_no_route_without_in_memory_payload():
+    planner = make_planner()
+    # Une image ne produit pas de contenu que les autres convertisseurs sauraient lire
+    assert planner.plan('png', 'xlsx') is None
+    assert 'xlsx' not in planner.reachable_formats('png')
+    assert planner.reachable_formats('txt') >= {'docx', 'xlsx'}
+
+
+def test_measured_costs_update_the_estimate_and_the_cached_plans():
+    planner = make_planner()
+    key = ('FakeSheet', 'csv', 'xlsx')
+    assert planner.plan('txt', 'xlsx') is planner.plan('txt', 'xlsx')
+    first = planner.plan('txt', 'xlsx')
+    planner.record_timing(key, 2.0)
+    planner.record_timing(key, 4.0)
+    step = planner.plan('txt', 'xlsx')[-1]
+    assert step.key == key
+    assert planner.step_cost(step) == 2.0 + ConversionPlanner.SMOOTHING * 2.0
+    assert planner.plan('txt', 'xlsx') is not first
+
+
+def test_close_measurements_keep_the_cached_plans():
+    planner = make_planner()
+    key = ('FakeSheet', 'csv', 'xlsx')
+    planner.record_timing(key, 1.0)
+    first = planner.plan('txt', 'xlsx')
+    # Durées proches d'une conversion à l'autre : le plan en cache reste valable
+    for seconds in (1.2, 0.9, 1.1, 1.3):
+        planner.record_timing(key, seconds)
+        assert planner.plan('txt', 'xlsx') is first
+    # Étape devenue nettement plus lente : le plan est recalculé
+    for _ in range(5):
+        planner.record_timing(key, 10.0)
+    assert planner.plan('txt', 'xlsx') is not first
+
+
+def test_execute_chains_decode_adapters_and_encode(tmp_path):
+    planner = make_planner()
+    source = tmp_path / 'rapport.txt'
+    source.write_text('a,b\nc,d\n')
+    result = planner.execute(planner.plan('txt', 'xlsx'), source, tmp_path)
+    assert result.success
+    assert result.outputs == [str(tmp_path / 'rapport.xlsx')]
+    assert (tmp_path / 'rapport.xlsx').read_text() == 'a|b\nc|d'
+
+
+def test_registry_routes_through_the_planner():
+    assert registry.can_convert('notes.txt', 'xlsx')
+    assert not registry.can_convert('photo.png', 'xlsx')
+    assert registry.get_converter_name('rapport.docx', 'xlsx') == 'DocumentConverter+SpreadsheetConverter'
+    assert registry.get_extension('Sauvegarde.TAR.GZ') == '.tar.gz'
@@ -0,0 +1,161 @@
+"""Tests de la lecture et de l'écriture par bandes et par tuiles (TIFF, PNG)"""
+
+import numpy as np
+import pytest
+from PIL import Image, TiffImagePlugin
+
+from converters import tiled_image
+from converters.image_converter import ImageConverter
+
+# Hauteur non multiple des bandes ni des tuiles : la dernière bande est plus basse
+SIZE = (300, 217)
+
+
+def sample(mode, size=SIZE):
+    """Image de test dont chaque pixel diffère de ses voisins"""
+    width, height = size
+    values = (np.arange(width * height, dtype=np.uint32).reshape(height, width) * 7919)
+    if mode == 'I;16':
+        img = Image.frombytes('I;16', size, (values % 65536).astype('<u2').tobytes())
+    elif mode in ('L', 'P'):
+        img = Image.fromarray((values % 251).astype(np.uint8))
+        if mode == 'P':
+            img = img.convert('P')
+            img.putpalette([channel for i in range(256) for channel in (i, 255 - i, (i * 3) % 256)])
+    else:
+        channels = [(values >> shift) % 256 for shift in (0, 3, 7, 11)[:len(mode)]]
+        img = Image.fromarray(np.stack(channels, axis=-1).astype(np.uint8))
+    return img
+
+
+def pixels(path_or_img):
+    img = Image.open(path_or_img) if not isinstance(path_or_img, Image.Image) else path_or_img
+    with img:
+        img.load()
+        if img.mode == 'P':
+            return img.mode, np.asarray(img), img.getpalette()
+        return img.mode, np.asarray(img), None
+
+
+def assert_same(output, source):
+    out_mode, out_pixels, out_palette = pixels(output)
+    src_mode, src_pixels, src_palette = pixels(source)
+    assert out_mode == src_mode
+    assert np.array_equal(out_pixels, src_pixels)
+    if src_palette is not None:
+        assert out_palette[:len(src_palette)] == src_palette
+
+
+@pytest.mark.parametrize('mode', ['RGB', 'RGBA', 'L', 'P', 'I;16'])
+@pytest.mark.parametrize('output_format, tiled', [('tiff', False), ('tiff', True), ('png', False)])
+def test_band_round_trip_keeps_pixels(tmp_path, mode, output_format, tiled):
+    source = tmp_path / 'source.tiff'
+    sample(mode).save(source, compression='tiff_deflate')
+    output = tmp_path / f'out.{output_format}'
+
+    reader = tiled_image.open_reader(str(source))
+    try:
+        tiled_image.convert(reader, str(output), output_format, tiled=tiled, workers=2)
+    finally:
+        reader.close()
+
+    assert_same(output, source)
+
+
+def test_tiled_output_is_tiled(tmp_path):
+    source = tmp_path / 'source.png'
+    sample('RGB').save(source)
+    output = tmp_path / 'out.tiff'
+
+    reader = tiled_image.open_reader(str(source))
+    tiled_image.convert(reader, str(output), 'tiff', tiled=True)
+
+    with TiffImagePlugin.TiffImageFile(str(output)) as img:
+        assert img.tag_v2[322] == tiled_image.DEFAULT_TILE_SIZE
+        assert img.tag_v2[323] == tiled_image.DEFAULT_TILE_SIZE
+        assert 273 not in img.tag_v2
+    # Le TIFF en tuiles se relit par bandes lui aussi
+    again = tmp_path / 'again.png'
+    tiled_image.convert(tiled_image.open_reader(str(output)), str(again), 'png')
+    assert_same(again, source)
+
+
+@pytest.mark.parametrize('rows_per_strip', [16, SIZE[1]])
+def test_big_endian_source_is_read_in_its_byte_order(tmp_path, rows_per_strip):
+    source = tmp_path / 'motorola.tiff'
+    values = np.asarray(sample('I;16')).astype(np.uint16)
+    # Pillow écrit les 16 bits gros-boutistes non compressés dans un TIFF « MM »
+    Image.frombytes('I;16B', SIZE, values.astype('>u2').tobytes()).save(source, tiffinfo={278: rows_per_strip})
+    with open(source, 'rb') as f:
+        assert f.read(2) == b'MM'
+
+    output = tmp_path / 'out.tiff'
+    reader = tiled_image.TiffBandReader(str(source))
+    tiled_image.convert(reader, str(output), 'tiff', tiled=True)
+
+    with Image.open(output) as result:
+        assert np.array_equal(np.asarray(result).astype(np.uint16), values)
+
+
+@pytest.mark.parametrize('rows', [1, 50, 64, 500])
+def test_bands_cover_the_image_in_order(tmp_path, rows):
+    source = tmp_path / 'source.tiff'
+    img = sample('L')
+    img.save(source, tiffinfo={278: 16})
+
+    reader = tiled_image.TiffBandReader(str(source))
+    top = 0
+    for y, band in reader.bands(rows):
+        assert y == top
+        assert band.width == SIZE[0]
+        assert band.height == min(rows, SIZE[1] - y)
+        assert np.array_equal(np.asarray(band), np.asarray(img)[y:y + band.height])
+        top += band.height
+    assert top == SIZE[1]
+
+
+def test_reduce_averages_blocks(tmp_path):
+    source = tmp_path / 'source.png'
+    img = sample('RGB')
+    img.save(source)
+
+    small = tiled_image.reduce(tiled_image.open_reader(str(source)), 2)
+
+    assert small.size == ((SIZE[0] + 1) // 2, (SIZE[1] + 1) // 2)
+    assert np.array_equal(np.asarray(small), np.asarray(img.reduce(2)))
+
+
+def test_unsupported_sources(tmp_path):
+    jpeg = tmp_path / 'photo.jpg'
+    sample('RGB').save(jpeg)
+    planar = tmp_path / 'planar.tiff'
+    sample('RGB').save(planar, tiffinfo={284: 2})
+
+    with pytest.raises(ValueError):
+        tiled_image.open_reader(str(jpeg))
+    assert tiled_image.image_size(str(jpeg)) is None
+    assert not tiled_image.needs_bands(str(jpeg))
+    assert not tiled_image.is_streamable(str(planar))
+
+
+def test_large_images_go_through_bands(tmp_path, monkeypatch):
+    source = tmp_path / 'large.png'
+    sample('RGB').save(source, dpi=(300, 300))
+    assert not tiled_image.needs_bands(str(source))
+    monkeypatch.setattr(tiled_image, 'BAND_THRESHOLD_PIXELS', 1000)
+    assert tiled_image.needs_bands(str(source))
+    out_dir = tmp_path / 'out'
+    out_dir.mkdir()
+    opened = []
+    monkeypatch.setattr(tiled_image, 'open_reader',
+                        lambda path, original=tiled_image.open_reader: opened.append(path) or original(path))
+
+    result = ImageConverter().convert(source, out_dir, 'tiff', tiled=True)
+
+    assert result.success
+    assert opened == [source]
+    output = out_dir / 'large.tiff'
+    assert_same(output, source)
+    with Image.open(output) as img:
+        assert img.tag_v2[322] == tiled_image.DEFAULT_TILE_SIZE
+        assert img.info['dpi'] == pytest.approx((300, 300), rel=1e-3)
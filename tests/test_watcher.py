@@ -0,0 +1,76 @@
+"""Tests de la reprise des conversions par la surveillance de dossier"""
+
+from concurrent.futures import Future
+
+import pytest
+from PIL import Image
+
+from converters.result import CANCELLED, ConversionResult
+from utils.watcher import FolderWatcher, ProcessedStore
+
+
+class FakeExecutor:
+    """Exécuteur dont les conversions sont terminées à la main par le test"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, path, output_format, output_dir, **kwargs):
+        future = Future()
+        self.submitted.append((path, future))
+        return future
+
+
+@pytest.fixture
+def setup(tmp_path):
+    source_dir = tmp_path / 'source'
+    source_dir.mkdir()
+    source = source_dir / 'photo.png'
+    Image.new('RGB', (8, 8), 'red').save(source)
+    store = ProcessedStore(tmp_path / 'watch.db')
+    yield str(source), source_dir, tmp_path / 'out', store
+    store.close()
+
+
+def start(source_dir, out_dir, store):
+    """Nouvelle surveillance (redémarrage) sur la même base"""
+    executor = FakeExecutor()
+    return FolderWatcher(str(source_dir), 'jpg', str(out_dir), executor, store=store), executor
+
+
+@pytest.mark.parametrize('outcome', [
+    ConversionResult(False, error="Conversion annulée", error_type=CANCELLED),
+    ConversionResult(False, error="Fichier illisible"),
+])
+def test_interrupted_or_failed_conversion_is_retried_after_restart(setup, outcome):
+    source, source_dir, out_dir, store = setup
+    watcher, executor = start(source_dir, out_dir, store)
+    watcher._process(source)
+    executor.submitted[0][1].set_result(outcome)
+
+    watcher, executor = start(source_dir, out_dir, store)
+    watcher._process(source)
+
+    assert [path for path, _ in executor.submitted] == [source]
+
+
+def test_cancelled_future_is_not_recorded(setup):
+    source, source_dir, out_dir, store = setup
+    watcher, executor = start(source_dir, out_dir, store)
+    watcher._process(source)
+    executor.submitted[0][1].cancel()
+
+    assert store.get(source, 'jpg', str(out_dir)) is None
+
+
+def test_converted_file_is_not_converted_again(setup):
+    source, source_dir, out_dir, store = setup
+    watcher, executor = start(source_dir, out_dir, store)
+    watcher._process(source)
+    executor.submitted[0][1].set_result(ConversionResult(True, [str(out_dir / 'photo.jpg')]))
+
+    watcher, executor = start(source_dir, out_dir, store)
+    watcher._process(source)
+
+    assert executor.submitted == []
+    assert store.get(source, 'jpg', str(out_dir))['success']
@@ -0,0 +1,284 @@
+"""
+Cache de résultats de conversion pour PtitConvert
+Les sorties sont indexées par le contenu du fichier source, le format de
+sortie, les options et la version des convertisseurs. Un résultat déjà
+produit est servi par clonage (reflink) ou copie : la sortie est toujours un
+fichier indépendant de l'objet du cache.
+"""
+
+import hashlib
+import logging
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from utils.file_handler import FileHandler
+
+logger = logging.getLogger(__name__)
+
+# ioctl Linux de clonage copy-on-write (btrfs, xfs, ...)
+FICLONE = 0x40049409
+
+
+def _reflink(source, destination):
+    """
+    Cloner un fichier sans copier ses données (copy-on-write)
+
+    Returns:
+        bool: True si le système de fichiers a pris en charge le clonage
+    """
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        try:
+            os.unlink(destination)
+        except OSError:
+            pass
+        return False
+
+
+class ConversionCache:
+    """Cache disque des résultats de conversion, borné en taille (éviction LRU)"""
+
+    def __init__(self, cache_dir=None, max_size_mb=1024):
+        """
+        Initialiser le cache
+
+        Args:
+            cache_dir (str): Répertoire du cache (None = ~/.ptitconvert/cache)
+            max_size_mb (int): Taille maximale du cache en Mo
+        """
+        if cache_dir is None:
+            cache_dir = Path.home() / '.ptitconvert' / 'cache'
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / 'objects'
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = str(self.cache_dir / 'index.db')
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.file_handler = FileHandler()
+        self.init_database()
+
+    def _connect(self):
+        """Ouvrir une connexion à l'index (partagé entre processus)"""
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_database(self):
+        """Initialiser l'index du cache"""
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_lru ON cache_entries(last_access)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            conn.executemany(
+                'INSERT OR IGNORE INTO cache_counters (name, value) VALUES (?, 0)',
+                [('hits',), ('misses',), ('evictions',)]
+            )
+
+    def make_key(self, file_path, output_format, converter_version, quality='medium', options=None):
+        """
+        Calculer la clé de cache d'une conversion
+
+        Args:
+            file_path (str): Chemin du fichier source
+            output_format (str): Format de sortie
+            converter_version (str): Version des convertisseurs impliqués
+            quality (str): Qualité de conversion
+            options (dict): Options supplémentaires de conversion
+
+        Returns:
+            str: Clé hexadécimale ou None si le fichier est illisible
+        """
+        content_hash = self.file_handler.get_file_hash(file_path, 'sha256')
+        if content_hash is None:
+            return None
+        parts = [
+            content_hash,
+            output_format.lower(),
+            quality or '',
+            json.dumps(options or {}, sort_keys=True, default=str),
+            converter_version or '',
+        ]
+        return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+    def _object_path(self, key, suffix):
+        """Chemin de stockage d'un résultat (répartition sur deux caractères)"""
+        return self.objects_dir / key[:2] / f"{key}{suffix}"
+
+    def _increment(self, conn, name, amount=1):
+        conn.execute('UPDATE cache_counters SET value = value + ? WHERE name = ?', (amount, name))
+
+    def fetch(self, key, output_path):
+        """
+        Servir un résultat en cache vers le chemin de sortie
+
+        Args:
+            key (str): Clé retournée par make_key()
+            output_path (str): Fichier de sortie à produire
+
+        Returns:
+            bool: True en cas de succès (hit), False sinon (miss)
+        """
+        with self._connect() as conn:
+            row = conn.execute('SELECT path FROM cache_entries WHERE key = ?', (key,)).fetchone()
+            if row is not None and Path(row[0]).is_file():
+                try:
+                    self._materialize(Path(row[0]), Path(output_path))
+                except OSError:
+                    row = None
+                else:
+                    conn.execute('UPDATE cache_entries SET last_access = ? WHERE key = ?',
+                                 (time.time(), key))
+                    self._increment(conn, 'hits')
+                    return True
+            elif row is not None:
+                # Objet supprimé hors du cache : entrée orpheline
+                conn.execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+            self._increment(conn, 'misses')
+            return False
+
+    def _materialize(self, cached_path, output_path):
+        """
+        Produire la sortie par clonage ou, à défaut, copie
+
+        Jamais de lien physique : la sortie serait en lecture seule, la modifier
+        modifierait le cache et l'éviction ne libérerait pas l'espace disque.
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = output_path.with_name(f".{output_path.name}.ptitconvert-tmp")
+        if temp_path.exists():
+            temp_path.unlink()
+        if not _reflink(cached_path, temp_path):
+            shutil.copyfile(cached_path, temp_path)
+        os.replace(temp_path, output_path)
+
+    def store(self, key, produced_path):
+        """
+        Ajouter un résultat au cache puis appliquer la limite de taille
+
+        Args:
+            key (str): Clé retournée par make_key()
+            produced_path (str): Fichier produit par la conversion
+
+        Returns:
+            bool: True si le résultat a été mis en cache
+        """
+        produced_path = Path(produced_path)
+        size = produced_path.stat().st_size
+        if size > self.max_size:
+            return False
+
+        object_path = self._object_path(key, produced_path.suffix)
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = object_path.with_name(f".{object_path.name}.{os.getpid()}.tmp")
+        # Copie indépendante : la sortie de l'utilisateur reste modifiable
+        if not _reflink(produced_path, temp_path):
+            shutil.copyfile(produced_path, temp_path)
+        os.chmod(temp_path, 0o444)
+        os.replace(temp_path, object_path)
+
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO cache_entries (key, path, size, created, last_access)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (key, str(object_path), size, now, now))
+        self.evict()
+        return True
+
+    def evict(self):
+        """Supprimer les résultats les moins récemment utilisés au-delà de la limite"""
+        with self._connect() as conn:
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache_entries').fetchone()[0]
+            if total <= self.max_size:
+                return 0
+            removed = 0
+            cursor = conn.execute('SELECT key, path, size FROM cache_entries ORDER BY last_access')
+            for key, path, size in cursor.fetchall():
+                if total <= self.max_size:
+                    break
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+                conn.execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+                total -= size
+                removed += 1
+            self._increment(conn, 'evictions', removed)
+            return removed
+
+    def get_stats(self):
+        """
+        Obtenir les statistiques du cache
+
+        Returns:
+            dict: Succès, échecs, taux de succès, nombre d'entrées et taille
+        """
+        with self._connect() as conn:
+            counters = dict(conn.execute('SELECT name, value FROM cache_counters').fetchall())
+            entries, size = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries'
+            ).fetchone()
+        hits = counters.get('hits', 0)
+        misses = counters.get('misses', 0)
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / lookups if lookups else 0.0,
+            'evictions': counters.get('evictions', 0),
+            'entries': entries,
+            'size_bytes': size,
+            'max_size_bytes': self.max_size,
+        }
+
+    def clear(self):
+        """Vider le cache et remettre les compteurs à zéro"""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM cache_entries')
+            conn.execute('UPDATE cache_counters SET value = 0')
+        shutil.rmtree(self.objects_dir, ignore_errors=True)
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+
+
+def create_cache(config_manager=None):
+    """
+    Créer le cache selon la configuration ('advanced.cache_*')
+
+    Returns:
+        ConversionCache: Cache ou None s'il est désactivé ou inutilisable
+    """
+    try:
+        if config_manager is None:
+            from utils.config import ConfigManager
+            config_manager = ConfigManager()
+        if not config_manager.get('advanced.cache_enabled', True):
+            return None
+        return ConversionCache(max_size_mb=config_manager.get('advanced.cache_max_size_mb', 1024))
+    except Exception as e:
+        logger.warning("Cache de conversion indisponible: %s", e)
+        return None
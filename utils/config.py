@@ -4,9 +4,12 @@ Gère les paramètres de qualité et les préférences utilisateur
 """
 
 import json
+import logging
 import os
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 class ConfigManager:
     """Gestionnaire de configuration et paramètres de qualité"""
     
@@ -68,11 +71,16 @@ class ConfigManager:
         },
         'advanced': {
             'max_file_size_mb': 500,
-            'concurrent_conversions': 1,
+            'concurrent_conversions': 0,  # 0 = un processus par cœur
+            'max_bulk_conversions': 0,  # Vidéo/audio simultanés ; 0 = tous les processus sauf un
+            'file_timeout_seconds': 0,  # 0 = pas de limite
+            'file_memory_limit_mb': 0,  # 0 = pas de limite
             'temp_directory': None,
             'keep_temp_files': False,
             'backup_original': False,
-            'auto_update_check': True
+            'auto_update_check': True,
+            'cache_enabled': True,
+            'cache_max_size_mb': 1024
         },
         'history': {
             'enabled': True,
@@ -115,7 +123,7 @@ class ConfigManager:
                 return self.DEFAULT_CONFIG.copy()
                 
         except Exception as e:
-            print(f"Erreur lors du chargement de la configuration: {e}")
+            logger.error("Erreur lors du chargement de la configuration: %s", e)
             return self.DEFAULT_CONFIG.copy()
             
     def save_config(self, config=None):
@@ -136,7 +144,7 @@ class ConfigManager:
                 json.dump(config, f, indent=2, ensure_ascii=False)
                 
         except Exception as e:
-            print(f"Erreur lors de la sauvegarde de la configuration: {e}")
+            logger.error("Erreur lors de la sauvegarde de la configuration: %s", e)
             
     def _merge_configs(self, base_config, user_config):
         """Fusionner la configuration utilisateur avec la configuration de base"""
@@ -202,7 +210,7 @@ class ConfigManager:
                 self.save_config()
                 
         except Exception as e:
-            print(f"Erreur lors de la définition de la configuration: {e}")
+            logger.error("Erreur lors de la définition de la configuration: %s", e)
             
     def get_quality_settings(self, media_type, quality_level='medium'):
         """
@@ -307,9 +315,9 @@ class ConfigManager:
         try:
             with open(output_path, 'w', encoding='utf-8') as f:
                 json.dump(self.config, f, indent=2, ensure_ascii=False)
-            print(f"Configuration exportée vers: {output_path}")
+            logger.info("Configuration exportée vers: %s", output_path)
         except Exception as e:
-            print(f"Erreur lors de l'export de configuration: {e}")
+            logger.error("Erreur lors de l'export de configuration: %s", e)
             
     def import_config(self, input_path):
         """
@@ -325,10 +333,10 @@ class ConfigManager:
             # Fusionner avec la configuration actuelle
             self.config = self._merge_configs(self.DEFAULT_CONFIG.copy(), imported_config)
             self.save_config()
-            print(f"Configuration importée depuis: {input_path}")
+            logger.info("Configuration importée depuis: %s", input_path)
             
         except Exception as e:
-            print(f"Erreur lors de l'import de configuration: {e}")
+            logger.error("Erreur lors de l'import de configuration: %s", e)
             
     def validate_config(self):
         """
@@ -403,4 +411,4 @@ class ConfigManager:
             self.save_config()
             
         except Exception as e:
-            print(f"Erreur lors de la mise à jour de la configuration: {e}")
+            logger.error("Erreur lors de la mise à jour de la configuration: %s", e)
@@ -0,0 +1,220 @@
+"""
+Modèle de coût des conversions pour PtitConvert
+Apprend, pour chaque route (format source, format cible, convertisseur),
+la durée de conversion en fonction de la taille du fichier à partir de
+l'historique, puis se met à jour à chaque conversion terminée.
+"""
+
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+
+from converters import registry
+
+logger = logging.getLogger(__name__)
+
+# Poids conservé par les anciennes mesures à chaque nouvelle mesure : le
+# modèle suit les changements de machine ou de convertisseur
+DECAY = 0.98
+# Nombre de conversions de l'historique lues au démarrage
+HISTORY_ROWS = 5000
+# Écart-type minimal des tailles (Mo) pour estimer une pente
+MIN_SIZE_SPREAD = 0.05
+
+_MB = 1024 * 1024
+
+
+class _RouteStats:
+    """Statistiques suffisantes (pondérées) d'une régression durée = a + b * taille"""
+
+    __slots__ = ('weight', 'sum_x', 'sum_y', 'sum_xx', 'sum_xy')
+
+    def __init__(self):
+        self.weight = 0.0
+        self.sum_x = 0.0
+        self.sum_y = 0.0
+        self.sum_xx = 0.0
+        self.sum_xy = 0.0
+
+    def add(self, size_mb, seconds):
+        """Ajouter une mesure après avoir atténué les précédentes"""
+        self.weight = self.weight * DECAY + 1.0
+        self.sum_x = self.sum_x * DECAY + size_mb
+        self.sum_y = self.sum_y * DECAY + seconds
+        self.sum_xx = self.sum_xx * DECAY + size_mb * size_mb
+        self.sum_xy = self.sum_xy * DECAY + size_mb * seconds
+
+    def predict(self, size_mb):
+        """Durée prévue pour un fichier de size_mb Mo"""
+        mean_x = self.sum_x / self.weight
+        mean_y = self.sum_y / self.weight
+        variance = self.sum_xx / self.weight - mean_x * mean_x
+        if variance < MIN_SIZE_SPREAD ** 2:
+            # Tailles trop semblables pour une pente : durée proportionnelle à la taille
+            if mean_x > 0:
+                return mean_y * size_mb / mean_x if size_mb > 0 else mean_y
+            return mean_y
+        slope = max((self.sum_xy / self.weight - mean_x * mean_y) / variance, 0.0)
+        intercept = max(mean_y - slope * mean_x, 0.0)
+        return intercept + slope * size_mb
+
+    def describe(self):
+        mean_x = self.sum_x / self.weight
+        mean_y = self.sum_y / self.weight
+        return {
+            'samples': round(self.weight, 1),
+            'mean_size_mb': round(mean_x, 3),
+            'mean_seconds': round(mean_y, 3),
+            'throughput_mb_s': round(mean_x / mean_y, 3) if mean_y > 0 else None,
+        }
+
+
+class CostModel:
+    """Prévision des durées de conversion, par route puis par convertisseur"""
+
+    def __init__(self):
+        self._routes = {}
+        self._converters = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def route_of(file_path, output_format):
+        """
+        Identifier la route d'une conversion
+
+        Returns:
+            tuple: (format source, format cible, convertisseur)
+        """
+        input_format = registry.get_extension(file_path).lstrip('.')
+        output_format = output_format.lower()
+        try:
+            converter = registry.get_converter_name(file_path, output_format)
+        except Exception:
+            converter = 'none'
+        return input_format, output_format, converter
+
+    def observe(self, route, file_size, seconds):
+        """
+        Intégrer la durée d'une conversion réussie
+
+        Args:
+            route (tuple): (format source, format cible, convertisseur)
+            file_size (int): Taille du fichier source en octets
+            seconds (float): Durée de la conversion
+        """
+        if seconds is None or seconds <= 0 or file_size is None or file_size < 0:
+            return
+        size_mb = file_size / _MB
+        with self._lock:
+            for table, key in ((self._routes, route), (self._converters, route[2])):
+                stats = table.get(key)
+                if stats is None:
+                    stats = table[key] = _RouteStats()
+                stats.add(size_mb, seconds)
+
+    def estimate(self, route, file_size):
+        """
+        Prévoir la durée d'une conversion
+
+        Args:
+            route (tuple): (format source, format cible, convertisseur)
+            file_size (int): Taille du fichier source en octets
+
+        Returns:
+            float: Durée prévue en secondes, ou None sans mesure pour la route
+                ni pour son convertisseur
+        """
+        size_mb = max(file_size or 0, 0) / _MB
+        with self._lock:
+            stats = self._routes.get(route) or self._converters.get(route[2])
+            return stats.predict(size_mb) if stats is not None else None
+
+    def estimate_file(self, file_path, output_format):
+        """
+        Prévoir la durée de conversion d'un fichier existant
+
+        Returns:
+            float: Durée prévue en secondes, ou None sans mesure
+        """
+        try:
+            size = Path(file_path).stat().st_size
+        except OSError:
+            size = 0
+        return self.estimate(self.route_of(file_path, output_format), size)
+
+    def load_history(self, db_path, limit=HISTORY_ROWS):
+        """
+        Entraîner le modèle sur les conversions réussies de l'historique
+
+        Args:
+            db_path (str): Base SQLite de l'historique (table conversion_history)
+            limit (int): Nombre maximal de conversions lues (les plus récentes)
+
+        Returns:
+            int: Nombre de conversions intégrées
+        """
+        if not Path(db_path).is_file():
+            return 0
+        try:
+            with sqlite3.connect(db_path) as conn:
+                # Les résultats servis par le cache ne mesurent pas la conversion
+                # (colonne absente des bases qui n'ont pas encore été migrées)
+                columns = {row[1] for row in conn.execute('PRAGMA table_info(conversion_history)')}
+                not_cached = 'AND NOT cached' if 'cached' in columns else ''
+                rows = conn.execute(f'''
+                    SELECT input_format, output_format, file_size, conversion_time
+                    FROM (SELECT * FROM conversion_history
+                          WHERE success {not_cached} AND conversion_time > 0
+                          ORDER BY id DESC LIMIT ?)
+                    ORDER BY id
+                ''', (limit,)).fetchall()
+        except sqlite3.Error as e:
+            logger.error("Impossible de lire l'historique pour le modèle de coût: %s", e)
+            return 0
+        routes = {}
+        for input_format, output_format, file_size, seconds in rows:
+            key = (input_format, output_format)
+            if key not in routes:
+                extension = registry.normalize_extension(input_format)
+                routes[key] = self.route_of(f"x{extension}", output_format)
+            self.observe(routes[key], file_size or 0, seconds)
+        return len(rows)
+
+    def describe(self):
+        """
+        Résumer le modèle (pour l'API et le débogage)
+
+        Returns:
+            dict: {'src->dst (convertisseur)': statistiques}
+        """
+        with self._lock:
+            return {
+                f"{src}->{dst} ({converter})": stats.describe()
+                for (src, dst, converter), stats in sorted(self._routes.items())
+            }
+
+
+_DEFAULT_MODEL = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def get_cost_model(history_db=None):
+    """
+    Obtenir le modèle partagé par le processus (entraîné sur l'historique au premier appel)
+
+    Args:
+        history_db (str): Base d'historique (None = ~/.ptitconvert/history.db)
+
+    Returns:
+        CostModel: Modèle de coût
+    """
+    global _DEFAULT_MODEL
+    with _DEFAULT_LOCK:
+        if _DEFAULT_MODEL is None:
+            if history_db is None:
+                history_db = Path.home() / '.ptitconvert' / 'history.db'
+            model = CostModel()
+            model.load_history(str(history_db))
+            _DEFAULT_MODEL = model
+        return _DEFAULT_MODEL
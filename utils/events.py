@@ -0,0 +1,69 @@
+"""
+Diffusion des événements de conversion pour PtitConvert
+Relaie les événements publiés depuis n'importe quel thread vers les
+abonnés asyncio (flux SSE du backend), job par job.
+"""
+
+import asyncio
+import threading
+
+
+class JobEventBroker:
+    """Distribution des événements de jobs aux abonnés asyncio"""
+
+    # Événements en attente par abonné ; au-delà, les plus anciens sont abandonnés
+    MAX_PENDING = 1000
+
+    def __init__(self):
+        """Initialiser le diffuseur"""
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, job_id, loop=None):
+        """
+        S'abonner aux événements d'un job
+
+        Args:
+            job_id (str): Identifiant du job
+            loop (AbstractEventLoop): Boucle asyncio qui lit la file (None = boucle courante)
+
+        Returns:
+            asyncio.Queue: File recevant les événements
+        """
+        loop = loop or asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.MAX_PENDING)
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append((loop, queue))
+        return queue
+
+    def unsubscribe(self, job_id, queue):
+        """Se désabonner des événements d'un job"""
+        with self._lock:
+            subscribers = self._subscribers.get(job_id, [])
+            self._subscribers[job_id] = [(l, q) for l, q in subscribers if q is not queue]
+            if not self._subscribers[job_id]:
+                del self._subscribers[job_id]
+
+    def publish(self, job_id, event):
+        """
+        Publier un événement (appelable depuis n'importe quel thread)
+
+        Args:
+            job_id (str): Identifiant du job
+            event (dict): Événement ('type' + données)
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(job_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # Boucle fermée : l'abonné a disparu
+                self.unsubscribe(job_id, queue)
+
+    @staticmethod
+    def _offer(queue, event):
+        """Déposer un événement sans bloquer, en abandonnant le plus ancien si besoin"""
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
@@ -0,0 +1,771 @@
+"""
+Exécuteur de conversions pour PtitConvert
+Répartit les fichiers à convertir sur un pool de processus supervisés :
+un processus bloqué, trop gourmand en mémoire ou annulé est tué puis
+remplacé sans interrompre les autres conversions. Les conversions en attente
+passent par une file à priorités et à partage équitable entre clients
+(voir utils/scheduler.py).
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+from pathlib import Path
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+from converters import registry
+from converters.result import (CANCELLED, MEMORY_LIMIT, TIMEOUT, WORKER_CRASHED,
+                                ConversionResult)
+from utils import logs, metrics, progress, threads, tracing
+from utils.cache import create_cache
+from utils.config import ConfigManager
+from utils.cost_model import CostModel, get_cost_model
+from utils.profiling import ConversionProfiler, profile_base
+from utils.scheduler import BULK, INTERACTIVE, NORMAL, PRIORITIES, FairShareQueue, classify
+
+logger = logging.getLogger(__name__)
+
+# Cache de résultats du processus courant (None = pas encore ouvert)
+_CACHE = None
+_CACHE_LOADED = False
+# File d'événements vers le processus parent (installée par _init_worker)
+_EVENT_QUEUE = None
+
+
+# Message des tâches interrompues par une annulation
+CANCELLED_MESSAGE = "Conversion annulée"
+# Classe d'erreur des tâches interrompues par le superviseur, selon le motif
+ERROR_TYPES = {'cancelled': CANCELLED, 'timeout': TIMEOUT, 'memory': MEMORY_LIMIT,
+               'crashed': WORKER_CRASHED}
+
+# Durée supposée d'une conversion (secondes) tant que le modèle de coût ne connaît
+# ni sa route ni son convertisseur
+DEFAULT_DURATIONS = {INTERACTIVE: 1.0, NORMAL: 5.0, BULK: 60.0}
+
+CONVERSION_SECONDS = metrics.histogram(
+    'ptitconvert_conversion_duration_seconds',
+    "Durée des conversions par convertisseur, formats et issue",
+    ('converter', 'route', 'outcome'),
+)
+
+
+def _init_worker(event_queue, memory_limit_mb=0, log_level=logging.WARNING, processes=1):
+    """
+    Initialiser un processus de travail
+
+    Args:
+        event_queue: File d'événements vers le processus parent (ou None)
+        memory_limit_mb (int): Limite mémoire appliquée par le système quand
+            psutil n'est pas disponible pour la surveiller depuis le parent
+        log_level (int): Niveau des journaux du processus parent
+        processes (int): Taille du pool, pour la part des cœurs de chaque processus
+    """
+    global _EVENT_QUEUE
+    _EVENT_QUEUE = event_queue
+    logs.setup_logging(log_level)
+    threads.set_process_count(processes)
+    if memory_limit_mb and not PSUTIL_AVAILABLE and RESOURCE_AVAILABLE:
+        limit = int(memory_limit_mb) * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError):
+            pass
+
+
+def _worker_main(conn, event_queue, memory_limit_mb, log_level=logging.WARNING, processes=1):
+    """Boucle d'un processus de travail : une tâche reçue, un résultat renvoyé"""
+    _init_worker(event_queue, memory_limit_mb, log_level, processes)
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError, KeyboardInterrupt):
+            break
+        if message is None:
+            break
+        number, args, options = message
+        # Accusé de réception : le délai de la tâche court à partir d'ici
+        try:
+            conn.send((number, None, None))
+        except (OSError, KeyboardInterrupt):
+            break
+        trace, profile = options.get('trace'), options.get('profile')
+        extras = {}
+        if trace:
+            tracing.enable(memory=trace == 'memory')
+        try:
+            if profile:
+                profiler = ConversionProfiler(profile)
+                with profiler:
+                    result = convert_file_task(*args)
+                extras['profile'] = profiler.paths
+            else:
+                result = convert_file_task(*args)
+        finally:
+            if trace:
+                extras['trace'] = tracing.disable()
+        try:
+            conn.send((number, result, extras))
+        except (OSError, KeyboardInterrupt):
+            break
+
+
+def _emit(task_id, kind, value=None):
+    """Envoyer un événement de tâche au processus parent (si quelqu'un écoute)"""
+    if _EVENT_QUEUE is not None and task_id is not None:
+        try:
+            _EVENT_QUEUE.put_nowait((task_id, kind, value))
+        except Exception:
+            pass
+
+
+def get_cache():
+    """Obtenir le cache de résultats du processus (ouvert au premier usage)"""
+    global _CACHE, _CACHE_LOADED
+    if not _CACHE_LOADED:
+        _CACHE = create_cache()
+        _CACHE_LOADED = True
+    return _CACHE
+
+
+def convert_file_task(file_path, output_format, output_dir, quality='medium', task_id=None, options=None):
+    """
+    Convertir un fichier (exécuté dans un processus de travail)
+
+    Un résultat déjà produit pour le même contenu et les mêmes options est
+    servi depuis le cache sans relancer la conversion.
+
+    Args:
+        file_path (str): Chemin du fichier source
+        output_format (str): Format de sortie
+        output_dir (str): Répertoire de sortie
+        quality (str): Qualité de conversion
+        task_id: Identifiant repris dans les événements 'started' / 'progress'
+        options (dict): Options propres au convertisseur (voir registry.convert)
+
+    Returns:
+        ConversionResult: Résultat de la conversion (durée de la tâche complète)
+    """
+    start = time.perf_counter()
+    with tracing.span(Path(file_path).name, tracing.TASK, output_format=output_format) as task_span:
+        result = _convert_file(file_path, output_format, output_dir, quality, task_id, options)
+        task_span.set(success=result.success)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _convert_file(file_path, output_format, output_dir, quality, task_id, options=None):
+    """Corps de convert_file_task"""
+    _emit(task_id, 'started')
+    progress.set_reporter(lambda fraction: _emit(task_id, 'progress', fraction))
+    try:
+        output_format = output_format.lower()
+        # Seules les options appliquées distinguent deux résultats en cache
+        options = registry.route_options(file_path, output_format, options)
+        # Vues extraites : le nom des fichiers produits ne se déduit pas du nom de la source
+        cacheable = output_format != 'extract' and not options.get('extract_frames')
+        cache = get_cache() if cacheable else None
+        key = None
+        if cache is not None:
+            version = registry.get_converter_version(file_path, output_format)
+            if version is not None:
+                key = cache.make_key(file_path, output_format, version, quality, options)
+        output_path = Path(output_dir) / f"{Path(file_path).stem}.{output_format}"
+        if key is not None:
+            with tracing.span('cache.fetch', tracing.CACHE) as cache_span:
+                hit = cache.fetch(key, output_path)
+                cache_span.set(hit=hit)
+            if hit:
+                result = ConversionResult(True, [output_path], cached=True)
+                result.measure_outputs()
+                return result
+
+        result = registry.convert(file_path, output_dir, output_format, quality, options)
+        # Le cache ne conserve que les conversions produisant un seul fichier
+        if result and key is not None and len(result.outputs) == 1 and os.path.isfile(result.output):
+            try:
+                cache.store(key, result.output)
+            except OSError as e:
+                logger.warning("Mise en cache impossible pour %s: %s", file_path, e)
+        return result
+    except MemoryError:
+        return ConversionResult(False, error="Limite mémoire dépassée", error_type=MEMORY_LIMIT)
+    except Exception as e:
+        return ConversionResult.from_exception(e)
+    finally:
+        progress.set_reporter(None)
+
+
+def get_worker_count(config_manager=None):
+    """
+    Déterminer le nombre de processus de conversion
+
+    Utilise 'advanced.concurrent_conversions' ; une valeur nulle ou négative
+    signifie un processus par cœur disponible.
+
+    Args:
+        config_manager (ConfigManager): Gestionnaire de configuration (optionnel)
+
+    Returns:
+        int: Nombre de processus de travail
+    """
+    try:
+        if config_manager is None:
+            config_manager = ConfigManager()
+        workers = int(config_manager.get('advanced.concurrent_conversions', 0) or 0)
+    except Exception:
+        workers = 0
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def get_file_limits(config_manager=None):
+    """
+    Lire les limites appliquées à chaque fichier
+
+    Returns:
+        tuple: (délai en secondes, mémoire en Mo) ; 0 = pas de limite
+    """
+    try:
+        if config_manager is None:
+            config_manager = ConfigManager()
+        timeout = float(config_manager.get('advanced.file_timeout_seconds', 0) or 0)
+        memory = int(config_manager.get('advanced.file_memory_limit_mb', 0) or 0)
+    except Exception:
+        timeout, memory = 0, 0
+    return max(timeout, 0), max(memory, 0)
+
+
+def get_bulk_limit(max_workers, config_manager=None):
+    """
+    Déterminer combien de conversions coûteuses (vidéo, audio) peuvent tourner à la fois
+
+    Utilise 'advanced.max_bulk_conversions' ; une valeur nulle ou négative
+    laisse un processus libre pour les conversions rapides (si le pool en a plusieurs).
+
+    Args:
+        max_workers (int): Taille du pool de processus
+        config_manager (ConfigManager): Gestionnaire de configuration (optionnel)
+
+    Returns:
+        int: Nombre maximal de conversions BULK simultanées
+    """
+    try:
+        if config_manager is None:
+            config_manager = ConfigManager()
+        limit = int(config_manager.get('advanced.max_bulk_conversions', 0) or 0)
+    except Exception:
+        limit = 0
+    if limit <= 0:
+        limit = max_workers - 1
+    return max(1, min(limit, max_workers))
+
+
+def _kill_process_tree(process):
+    """Tuer un processus de travail et les programmes qu'il a lancés (ffmpeg, ...)"""
+    if PSUTIL_AVAILABLE:
+        try:
+            for child in psutil.Process(process.pid).children(recursive=True):
+                child.kill()
+        except psutil.Error:
+            pass
+    process.kill()
+    process.join(5)
+
+
+def _tree_memory_mb(pid):
+    """Mémoire résidente d'un processus et de ses descendants, en Mo"""
+    try:
+        parent = psutil.Process(pid)
+        total = parent.memory_info().rss
+        for child in parent.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / (1024 * 1024)
+    except psutil.Error:
+        return 0
+
+
+class _Task:
+    """Conversion en attente ou en cours"""
+
+    __slots__ = ('number', 'future', 'args', 'task_id', 'priority', 'client', 'route', 'size',
+                 'cost', 'trace', 'profile', 'started', 'deadline')
+
+    def __init__(self, number, future, args, task_id, priority, client, route, size, cost,
+                 trace=None, profile=None):
+        self.number = number
+        self.future = future
+        self.args = args
+        self.task_id = task_id
+        self.priority = priority
+        self.client = client
+        # (format source, format cible, convertisseur), taille en octets et durée prévue
+        self.route = route
+        self.size = size
+        self.cost = cost
+        # None, 'time' ou 'memory' : étapes à mesurer dans le processus de travail
+        self.trace = trace
+        # Chemin des fichiers de profil sans extension (None = pas de profilage)
+        self.profile = profile
+        self.started = None
+        self.deadline = None
+
+
+class _Worker:
+    """Processus de travail et tâche qu'il exécute"""
+
+    __slots__ = ('process', 'conn', 'task')
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.task = None
+
+
+class ConversionExecutor:
+    """Pool de processus supervisés partagé par toutes les conversions en cours"""
+
+    # Intervalle de vérification des limites (secondes)
+    CHECK_INTERVAL = 0.5
+
+    def __init__(self, max_workers=None, on_event=None, timeout=None, memory_limit_mb=None,
+                 bulk_limit=None, cost_model=None, on_trace=None, trace=None, on_profile=None,
+                 profile_dir=None):
+        """
+        Initialiser l'exécuteur
+
+        Args:
+            max_workers (int): Nombre de processus, plafond global des conversions
+                simultanées (None = configuration)
+            on_event (callable): Reçoit (task_id, type, valeur) pour les événements
+                'started' et 'progress' émis par les processus de travail
+            timeout (float): Durée maximale par fichier en secondes (None = configuration, 0 = aucune)
+            memory_limit_mb (int): Mémoire maximale par fichier (None = configuration, 0 = aucune)
+            bulk_limit (int): Conversions BULK simultanées au plus (None = configuration)
+            cost_model (CostModel): Prévision des durées (None = modèle partagé,
+                entraîné sur l'historique)
+            on_trace (callable): Reçoit (task_id, étapes) pour les tâches soumises
+                avec trace (voir utils/tracing.py), avant la publication du résultat
+            trace (str): Mesure des étapes par défaut des tâches soumises (voir submit)
+            on_profile (callable): Reçoit (task_id, rapport) pour les tâches profilées ;
+                le rapport reprend le fichier, le format, le dossier de sortie, les champs
+                du ConversionResult et les chemins 'pstats' / 'collapsed'
+            profile_dir (str): Dossier des profils par défaut des tâches soumises (voir submit)
+        """
+        config_timeout, config_memory = get_file_limits()
+        self.max_workers = max_workers or get_worker_count()
+        self.bulk_limit = bulk_limit or get_bulk_limit(self.max_workers)
+        self.timeout = config_timeout if timeout is None else timeout
+        self.memory_limit_mb = config_memory if memory_limit_mb is None else memory_limit_mb
+        self.on_event = on_event
+        self.on_trace = on_trace
+        self.trace = trace
+        self.on_profile = on_profile
+        self.profile_dir = profile_dir
+        self._context = multiprocessing.get_context('spawn')
+
+        self._lock = threading.Lock()
+        self.cost_model = cost_model if cost_model is not None else get_cost_model()
+        self._pending = FairShareQueue()
+        self._cancel_requests = []
+        self._counter = 0
+        self._closing = False
+        self._wake_pending = False
+        self._supervisor = None
+        self._events = None
+        self._listener = None
+        self._wakeup_reader, self._wakeup_writer = self._context.Pipe(duplex=False)
+        # Réservés au thread superviseur
+        self._workers = []
+
+    def _start(self):
+        """Démarrer le superviseur (et le relais d'événements) au premier usage"""
+        if self._supervisor is not None:
+            return
+        if self.on_event is not None:
+            self._events = self._context.Queue()
+            self._listener = threading.Thread(
+                target=self._listen, name='ptitconvert-events', daemon=True
+            )
+            self._listener.start()
+        self._supervisor = threading.Thread(
+            target=self._supervise, name='ptitconvert-supervisor', daemon=True
+        )
+        self._supervisor.start()
+
+    def _wake(self):
+        """Réveiller le superviseur (appelé sous self._lock, un seul signal en attente)"""
+        if self._wake_pending:
+            return
+        self._wake_pending = True
+        try:
+            self._wakeup_writer.send(None)
+        except OSError:
+            pass
+
+    def _listen(self):
+        """Relayer les événements des processus de travail (thread dédié)"""
+        while True:
+            item = self._events.get()
+            if item is None:
+                break
+            try:
+                self.on_event(*item)
+            except Exception as e:
+                logger.error("Erreur lors du traitement d'un événement de conversion: %s", e)
+
+    def submit(self, file_path, output_format, output_dir, task_id=None, priority=None, client=None,
+               quality='medium', trace=None, profile_dir=None, options=None):
+        """
+        Soumettre la conversion d'un fichier au pool
+
+        Args:
+            file_path (str): Chemin du fichier source
+            output_format (str): Format de sortie
+            output_dir (str): Répertoire de sortie
+            task_id: Identifiant (picklable) transmis à on_event et à cancel()
+            priority (str): Classe de priorité (None = déduite du convertisseur)
+            client (str): Client à l'origine de la demande, pour le partage équitable
+            quality (str): Qualité de conversion
+            trace (str): Mesurer les étapes de la conversion : 'time' (durées) ou
+                'memory' (durées et allocations) ; elles sont remises à on_trace
+                (None = réglage de l'exécuteur)
+            profile_dir (str): Exécuter la conversion sous cProfile et un échantillonneur
+                de piles, profils écrits dans ce dossier (None = réglage de l'exécuteur)
+            options (dict): Options propres au convertisseur, ex. {'ops': 'resize:1024x1024'}
+                (voir registry.convert)
+
+        Returns:
+            concurrent.futures.Future: ConversionResult à venir
+        """
+        future = Future()
+        args = (file_path, output_format, output_dir, quality, task_id, options)
+        trace = trace or self.trace
+        profile_dir = profile_dir or self.profile_dir
+        if priority is None:
+            priority = classify(file_path, output_format)
+        elif priority not in PRIORITIES:
+            raise ValueError(f"Priorité inconnue: {priority}")
+        route = CostModel.route_of(file_path, output_format)
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            size = 0
+        cost = self.cost_model.estimate(route, size)
+        with self._lock:
+            if self._closing:
+                raise RuntimeError("L'exécuteur de conversions est arrêté")
+            self._start()
+            self._counter += 1
+            profile = profile_base(profile_dir, file_path, self._counter) if profile_dir else None
+            self._pending.append(
+                _Task(self._counter, future, args, task_id, priority, client, route, size, cost,
+                      trace, profile)
+            )
+            self._wake()
+        return future
+
+    def cancel(self, predicate):
+        """
+        Annuler les conversions dont l'identifiant satisfait predicate
+
+        Les tâches en attente sont retirées ; celles en cours sont interrompues
+        en tuant leur processus ; elles échouent avec CANCELLED_MESSAGE.
+
+        Args:
+            predicate (callable): Reçoit le task_id d'une tâche
+
+        Returns:
+            int: Nombre de tâches en attente retirées
+        """
+        with self._lock:
+            removed = self._pending.remove(lambda task: predicate(task.task_id))
+            self._cancel_requests.append(predicate)
+            self._wake()
+        for task in removed:
+            if task.future.set_running_or_notify_cancel():
+                self._resolve(task, ConversionResult(False, error=CANCELLED_MESSAGE, error_type=CANCELLED), 'cancelled')
+        return len(removed)
+
+    def stats(self):
+        """
+        Obtenir l'état du pool
+
+        Returns:
+            dict: Tâches en attente (au total et par classe), tâches en cours
+                et processus lancés
+        """
+        with self._lock:
+            queued = len(self._pending)
+            by_priority = self._pending.counts()
+        workers = list(self._workers)
+        return {
+            'queued': queued,
+            'queued_by_priority': by_priority,
+            'active': sum(1 for w in workers if w.task is not None),
+            'workers': len(workers),
+        }
+
+    def estimate_duration(self, task):
+        """Durée attendue d'une tâche : prévision du modèle de coût, sinon valeur par classe"""
+        duration = self.cost_model.estimate(task.route, task.size)
+        return duration if duration is not None else DEFAULT_DURATIONS[task.priority]
+
+    def queue_info(self, predicate):
+        """
+        Situer dans la file les tâches dont l'identifiant satisfait predicate
+
+        Args:
+            predicate (callable): Reçoit le task_id d'une tâche
+
+        Returns:
+            dict: 'position' (tâches servies avant la première concernée, None si
+                aucune n'attend) et 'eta' (secondes estimées avant la fin de la
+                dernière, None si aucune n'attend ni ne tourne)
+        """
+        with self._lock:
+            ordered = self._pending.ordered()
+        now = time.monotonic()
+        running = [w.task for w in list(self._workers) if w.task is not None]
+        remaining = {
+            task.number: max(self.estimate_duration(task) - (now - (task.started or now)), 0.0)
+            for task in running
+        }
+        mine = [index for index, task in enumerate(ordered) if predicate(task.task_id)]
+        if mine:
+            # Travail à écouler avant la fin de la dernière tâche, réparti sur le pool
+            ahead = sum(remaining.values()) + sum(
+                self.estimate_duration(task) for task in ordered[:mine[-1] + 1]
+            )
+            return {'position': mine[0], 'eta': ahead / self.max_workers}
+        own = [remaining[task.number] for task in running if predicate(task.task_id)]
+        return {'position': None, 'eta': max(own) if own else None}
+
+    def _resolve(self, task, result, outcome, extras=None):
+        """Publier le résultat d'une tâche, sa durée dans les métriques et le modèle de coût"""
+        source, target, converter = task.route
+        CONVERSION_SECONDS.observe((converter, f"{source or '?'}->{target}", outcome), result.elapsed)
+        if outcome == 'success' and not result.cached:
+            # Un résultat servi par le cache ne renseigne pas sur le coût de la route
+            self.cost_model.observe(task.route, task.size, result.elapsed)
+        extras = extras or {}
+        try:
+            if extras.get('trace') and self.on_trace is not None:
+                self.on_trace(task.task_id, extras['trace'])
+            if extras.get('profile') and self.on_profile is not None:
+                file_path, output_format, output_dir = task.args[:3]
+                self.on_profile(task.task_id, {
+                    'file_path': file_path, 'output_format': output_format, 'output_dir': output_dir,
+                    **result.to_dict(),
+                    **extras['profile'],
+                })
+        except Exception as e:
+            logger.error("Erreur lors du traitement des mesures d'une conversion: %s", e)
+        task.future.set_result(result)
+
+    def _spawn_worker(self):
+        """Lancer un nouveau processus de travail"""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self._events, self.memory_limit_mb, logging.getLogger().getEffectiveLevel(),
+                  self.max_workers),
+            name='ptitconvert-worker',
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        self._workers.append(worker)
+        return worker
+
+    def _retire(self, worker, kill=False):
+        """Retirer un processus du pool (en le tuant si nécessaire)"""
+        if kill:
+            _kill_process_tree(worker.process)
+        worker.conn.close()
+        try:
+            worker.process.close()
+        except ValueError:
+            pass  # Toujours en vie : libéré par le ramasse-miettes
+        self._workers.remove(worker)
+
+    def _dispatch(self):
+        """Confier les tâches en attente aux processus libres (par priorité puis par client)"""
+        while True:
+            idle = next((w for w in self._workers if w.task is None), None)
+            if idle is None and len(self._workers) >= self.max_workers:
+                return
+            bulk = sum(1 for w in self._workers if w.task is not None and w.task.priority == BULK)
+            # Au plafond, les conversions coûteuses attendent : les rapides passent devant
+            blocked = (BULK,) if bulk >= self.bulk_limit else ()
+            with self._lock:
+                task = self._pending.popleft(blocked)
+            if task is None:
+                return
+            if not task.future.set_running_or_notify_cancel():
+                continue
+            try:
+                worker = idle or self._spawn_worker()
+            except Exception as e:
+                logger.error("Impossible de lancer un processus de conversion: %s", e)
+                self._resolve(task, ConversionResult(False, error="Processus de conversion indisponible",
+                                                     error_type=WORKER_CRASHED), 'crashed')
+                continue
+            # Le délai ne court qu'à l'accusé de réception du processus (voir _supervise_once)
+            task.started = time.monotonic()
+            worker.task = task
+            try:
+                worker.conn.send((task.number, task.args, {'trace': task.trace, 'profile': task.profile}))
+            except Exception as e:
+                logger.error("Tâche %s non transmise au processus de conversion: %s", task.task_id, e)
+                worker.task = None
+                self._retire(worker, kill=True)
+                self._resolve(task, ConversionResult(False, error="Processus de conversion indisponible",
+                                                     error_type=WORKER_CRASHED), 'crashed')
+
+    def _finish(self, worker, result, extras=None):
+        """Terminer la tâche d'un processus et le libérer"""
+        task, worker.task = worker.task, None
+        if task is not None:
+            self._resolve(task, result, 'success' if result.success else 'failure', extras)
+
+    def _fail(self, worker, message, outcome):
+        """Tuer un processus, échouer sa tâche puis le retirer du pool"""
+        task, worker.task = worker.task, None
+        self._retire(worker, kill=True)
+        if task is not None:
+            self._resolve(task, ConversionResult(False, error=message, error_type=ERROR_TYPES.get(outcome),
+                                                 elapsed=time.monotonic() - task.started), outcome)
+
+    def _enforce_limits(self):
+        """Interrompre les tâches annulées, trop longues ou trop gourmandes en mémoire"""
+        with self._lock:
+            requests, self._cancel_requests = self._cancel_requests, []
+        now = time.monotonic()
+        for worker in list(self._workers):
+            task = worker.task
+            if task is None:
+                continue
+            if any(predicate(task.task_id) for predicate in requests):
+                self._fail(worker, CANCELLED_MESSAGE, 'cancelled')
+            elif task.deadline is not None and now >= task.deadline:
+                self._fail(worker, f"Délai dépassé ({self.timeout:g} s)", 'timeout')
+            elif (self.memory_limit_mb and PSUTIL_AVAILABLE
+                    and _tree_memory_mb(worker.process.pid) > self.memory_limit_mb):
+                self._fail(worker, f"Limite mémoire dépassée ({self.memory_limit_mb} Mo)", 'memory')
+
+    def _supervise(self):
+        """Boucle du superviseur : répartition, résultats et limites"""
+        while True:
+            with self._lock:
+                closing = self._closing
+            if closing:
+                break
+            try:
+                self._supervise_once()
+            except Exception:
+                # Le superviseur ne doit pas s'arrêter : les tâches suivantes resteraient en attente
+                logger.exception("Erreur du superviseur de conversion")
+                time.sleep(self.CHECK_INTERVAL)
+
+    def _supervise_once(self):
+        """Un tour du superviseur : répartir les tâches, attendre un événement, vérifier les limites"""
+        self._dispatch()
+
+        busy = [w for w in self._workers if w.task is not None]
+        waitables = [self._wakeup_reader]
+        for worker in self._workers:
+            waitables.extend((worker.conn, worker.process.sentinel))
+        timeout = self.CHECK_INTERVAL if busy else None
+        for obj in wait(waitables, timeout):
+            if obj is self._wakeup_reader:
+                with self._lock:
+                    self._wake_pending = False
+                while self._wakeup_reader.poll():
+                    self._wakeup_reader.recv()
+                continue
+            worker = next((w for w in self._workers
+                           if obj is w.conn or obj == w.process.sentinel), None)
+            if worker is None:
+                continue
+            if obj is worker.conn:
+                try:
+                    number, result, extras = worker.conn.recv()
+                except (EOFError, OSError):
+                    continue  # Processus mort : traité via sa sentinelle
+                if worker.task is None or worker.task.number != number:
+                    continue
+                if result is None:
+                    # Accusé de réception : le processus commence la conversion
+                    worker.task.started = time.monotonic()
+                    if self.timeout:
+                        worker.task.deadline = worker.task.started + self.timeout
+                else:
+                    self._finish(worker, result, extras)
+            elif not worker.conn.poll():
+                # Processus terminé sans répondre (plantage, signal, limite système)
+                worker.process.join(1)
+                self._fail(worker, f"Processus de conversion arrêté (code {worker.process.exitcode})",
+                           'crashed')
+        self._enforce_limits()
+
+    def shutdown(self, wait=True):
+        """
+        Arrêter le pool de processus
+
+        Args:
+            wait (bool): Attendre la fin des conversions en cours (sinon, elles sont
+                interrompues et les conversions en attente sont annulées)
+        """
+        if wait:
+            # Laisser le superviseur vider la file avant l'arrêt
+            while True:
+                with self._lock:
+                    drained = not self._pending
+                if drained and not any(w.task is not None for w in list(self._workers)):
+                    break
+                time.sleep(0.05)
+        with self._lock:
+            self._closing = True
+            pending = self._pending.clear()
+            supervisor, self._supervisor = self._supervisor, None
+            self._wake()
+        for task in pending:
+            if task.future.set_running_or_notify_cancel():
+                self._resolve(task, ConversionResult(False, error=CANCELLED_MESSAGE, error_type=CANCELLED), 'cancelled')
+        if supervisor is not None:
+            supervisor.join()
+        for worker in list(self._workers):
+            if worker.task is not None:
+                self._fail(worker, CANCELLED_MESSAGE, 'cancelled')
+            else:
+                try:
+                    worker.conn.send(None)
+                except OSError:
+                    pass
+                worker.process.join(1)
+                if worker.process.is_alive():
+                    _kill_process_tree(worker.process)
+                self._retire(worker)
+        if self._events is not None:
+            self._events.put(None)
+            self._events = None
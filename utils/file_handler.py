@@ -3,12 +3,15 @@ Gestionnaire de fichiers pour PtitConvert
 Utilitaires pour la manipulation et gestion des fichiers
 """
 
+import logging
 import os
 import shutil
 from pathlib import Path
 import hashlib
 import mimetypes
 
+logger = logging.getLogger(__name__)
+
 class FileHandler:
     """Gestionnaire de fichiers avec utilitaires de manipulation"""
     
@@ -64,13 +67,13 @@ class FileHandler:
             hash_algo = hashlib.new(algorithm)
             
             with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b""):
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
                     hash_algo.update(chunk)
                     
             return hash_algo.hexdigest()
             
         except Exception as e:
-            print(f"Erreur lors du calcul du hash: {e}")
+            logger.error("Erreur lors du calcul du hash: %s", e)
             return None
             
     def get_mime_type(self, file_path):
@@ -133,11 +136,11 @@ class FileHandler:
                 
             shutil.copy2(source_path, backup_file)
             
-            print(f"Sauvegarde créée: {backup_file}")
+            logger.info("Sauvegarde créée: %s", backup_file)
             return str(backup_file)
             
         except Exception as e:
-            print(f"Erreur lors de la création de la sauvegarde: {e}")
+            logger.error("Erreur lors de la création de la sauvegarde: %s", e)
             return None
             
     def clean_filename(self, filename):
@@ -225,7 +228,7 @@ class FileHandler:
             return True
             
         except Exception as e:
-            print(f"Erreur lors de la copie: {e}")
+            logger.error("Erreur lors de la copie: %s", e)
             return False
             
     def get_directory_size(self, directory_path):
@@ -283,5 +286,5 @@ class FileHandler:
             return [str(f) for f in files if f.is_file()]
             
         except Exception as e:
-            print(f"Erreur lors de la recherche de fichiers: {e}")
+            logger.error("Erreur lors de la recherche de fichiers: %s", e)
             return []
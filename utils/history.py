@@ -4,11 +4,14 @@ Stocke et gère l'historique des conversions
 """
 
 import json
+import logging
 import sqlite3
 from datetime import datetime
 from pathlib import Path
 import os
 
+logger = logging.getLogger(__name__)
+
 class ConversionHistory:
     """Gestionnaire de l'historique des conversions"""
     
@@ -48,10 +51,23 @@ class ConversionHistory:
                         conversion_time REAL,
                         success BOOLEAN NOT NULL,
                         error_message TEXT,
-                        quality TEXT DEFAULT 'medium'
+                        quality TEXT DEFAULT 'medium',
+                        profile_path TEXT,
+                        output_bytes INTEGER,
+                        peak_memory_mb REAL,
+                        stage_timings TEXT,
+                        cached BOOLEAN DEFAULT 0
                     )
                 ''')
                 
+                # Bases créées avant le profilage, la mesure des conversions et le cache
+                columns = {row[1] for row in cursor.execute('PRAGMA table_info(conversion_history)')}
+                for column, column_type in (('profile_path', 'TEXT'), ('output_bytes', 'INTEGER'),
+                                            ('peak_memory_mb', 'REAL'), ('stage_timings', 'TEXT'),
+                                            ('cached', 'BOOLEAN DEFAULT 0')):
+                    if column not in columns:
+                        cursor.execute(f'ALTER TABLE conversion_history ADD COLUMN {column} {column_type}')
+                
                 # Créer la table des statistiques
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS conversion_stats (
@@ -67,10 +83,12 @@ class ConversionHistory:
                 conn.commit()
                 
         except Exception as e:
-            print(f"Erreur lors de l'initialisation de la base de données: {e}")
+            logger.error("Erreur lors de l'initialisation de la base de données: %s", e)
             
     def add_conversion(self, input_file, input_format, output_file, output_format, 
-                      file_size=0, conversion_time=0, success=True, error_message=None, quality='medium'):
+                      file_size=0, conversion_time=0, success=True, error_message=None, quality='medium',
+                      profile_path=None, output_bytes=None, peak_memory_mb=None, stage_timings=None,
+                      cached=False):
         """
         Ajouter une conversion à l'historique
         
@@ -84,6 +102,11 @@ class ConversionHistory:
             success (bool): Succès de la conversion
             error_message (str): Message d'erreur si échec
             quality (str): Qualité de conversion
+            profile_path (str): Profil de la conversion (fichier pstats), si elle a été profilée
+            output_bytes (int): Taille totale des fichiers produits
+            peak_memory_mb (float): Pic de mémoire résidente pendant la conversion
+            stage_timings (dict): Secondes passées par étape (décodage, encodage...)
+            cached (bool): Résultat servi par le cache, sans conversion
         """
         try:
             timestamp = datetime.now().isoformat()
@@ -94,10 +117,13 @@ class ConversionHistory:
                 cursor.execute('''
                     INSERT INTO conversion_history 
                     (timestamp, input_file, input_format, output_file, output_format,
-                     file_size, conversion_time, success, error_message, quality)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     file_size, conversion_time, success, error_message, quality, profile_path,
+                     output_bytes, peak_memory_mb, stage_timings, cached)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (timestamp, input_file, input_format, output_file, output_format,
-                      file_size, conversion_time, success, error_message, quality))
+                      file_size, conversion_time, success, error_message, quality, profile_path,
+                      output_bytes, peak_memory_mb, json.dumps(stage_timings) if stage_timings else None,
+                      bool(cached)))
                 
                 conn.commit()
                 
@@ -105,7 +131,7 @@ class ConversionHistory:
             self.update_daily_stats(success, file_size)
             
         except Exception as e:
-            print(f"Erreur lors de l'ajout à l'historique: {e}")
+            logger.error("Erreur lors de l'ajout à l'historique: %s", e)
             
     def update_daily_stats(self, success, file_size):
         """Mettre à jour les statistiques quotidiennes"""
@@ -140,7 +166,7 @@ class ConversionHistory:
                 conn.commit()
                 
         except Exception as e:
-            print(f"Erreur lors de la mise à jour des statistiques: {e}")
+            logger.error("Erreur lors de la mise à jour des statistiques: %s", e)
             
     def get_recent_conversions(self, limit=50):
         """
@@ -158,7 +184,8 @@ class ConversionHistory:
                 
                 cursor.execute('''
                     SELECT timestamp, input_file, input_format, output_file, output_format,
-                           file_size, conversion_time, success, error_message, quality
+                           file_size, conversion_time, success, error_message, quality, profile_path,
+                           output_bytes, peak_memory_mb, stage_timings, cached
                     FROM conversion_history 
                     ORDER BY timestamp DESC 
                     LIMIT ?
@@ -178,13 +205,18 @@ class ConversionHistory:
                         'conversion_time': row[6],
                         'success': bool(row[7]),
                         'error_message': row[8],
-                        'quality': row[9]
+                        'quality': row[9],
+                        'profile_path': row[10],
+                        'output_bytes': row[11],
+                        'peak_memory_mb': row[12],
+                        'stage_timings': json.loads(row[13]) if row[13] else {},
+                        'cached': bool(row[14])
                     })
                     
                 return conversions
                 
         except Exception as e:
-            print(f"Erreur lors de la récupération de l'historique: {e}")
+            logger.error("Erreur lors de la récupération de l'historique: %s", e)
             return []
             
     def get_conversion_stats(self, days=30):
@@ -250,7 +282,7 @@ class ConversionHistory:
                 }
                 
         except Exception as e:
-            print(f"Erreur lors de la récupération des statistiques: {e}")
+            logger.error("Erreur lors de la récupération des statistiques: %s", e)
             return {
                 'global': {'total_conversions': 0, 'successful_conversions': 0, 
                           'failed_conversions': 0, 'total_size_processed': 0, 
@@ -276,7 +308,8 @@ class ConversionHistory:
                 
                 cursor.execute('''
                     SELECT timestamp, input_file, input_format, output_file, output_format,
-                           file_size, conversion_time, success, error_message, quality
+                           file_size, conversion_time, success, error_message, quality, profile_path,
+                           output_bytes, peak_memory_mb, stage_timings, cached
                     FROM conversion_history 
                     WHERE input_file LIKE ? OR output_file LIKE ? OR input_format LIKE ? OR output_format LIKE ?
                     ORDER BY timestamp DESC 
@@ -297,13 +330,18 @@ class ConversionHistory:
                         'conversion_time': row[6],
                         'success': bool(row[7]),
                         'error_message': row[8],
-                        'quality': row[9]
+                        'quality': row[9],
+                        'profile_path': row[10],
+                        'output_bytes': row[11],
+                        'peak_memory_mb': row[12],
+                        'stage_timings': json.loads(row[13]) if row[13] else {},
+                        'cached': bool(row[14])
                     })
                     
                 return conversions
                 
         except Exception as e:
-            print(f"Erreur lors de la recherche: {e}")
+            logger.error("Erreur lors de la recherche: %s", e)
             return []
             
     def clear_history(self, older_than_days=None):
@@ -336,7 +374,7 @@ class ConversionHistory:
                 conn.commit()
                 
         except Exception as e:
-            print(f"Erreur lors de l'effacement de l'historique: {e}")
+            logger.error("Erreur lors de l'effacement de l'historique: %s", e)
             
     def export_history(self, output_file, format='json'):
         """
@@ -361,7 +399,7 @@ class ConversionHistory:
                         writer.writeheader()
                         writer.writerows(conversions)
                         
-            print(f"Historique exporté vers: {output_file}")
+            logger.info("Historique exporté vers: %s", output_file)
             
         except Exception as e:
-            print(f"Erreur lors de l'export: {e}")
+            logger.error("Erreur lors de l'export: %s", e)
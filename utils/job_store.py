@@ -0,0 +1,212 @@
+"""
+Stockage persistant des jobs de conversion pour PtitConvert
+Enregistre l'état de chaque fichier d'un job pour reprendre après un
+redémarrage sans reconvertir les fichiers déjà traités.
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+# États d'un fichier dans un job
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class JobStore:
+    """Table SQLite des jobs et de l'état de leurs fichiers"""
+
+    def __init__(self, db_path=None):
+        """
+        Initialiser le stockage des jobs
+
+        Args:
+            db_path (str): Chemin vers la base SQLite (None = ~/.ptitconvert/jobs.db)
+        """
+        if db_path is None:
+            # À côté de la base d'historique
+            app_dir = Path.home() / '.ptitconvert'
+            app_dir.mkdir(exist_ok=True)
+            db_path = app_dir / 'jobs.db'
+
+        self.db_path = str(db_path)
+        self.init_database()
+
+    def _connect(self):
+        """Ouvrir une connexion (appelée depuis plusieurs threads)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        # WAL + NORMAL : une validation par fichier reste peu coûteuse
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def init_database(self):
+        """Initialiser la base de données"""
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    output_format TEXT NOT NULL,
+                    output_dir TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    finished REAL,
+                    priority TEXT,
+                    client TEXT,
+                    options TEXT,
+                    cancelled BOOLEAN DEFAULT 0
+                )
+            ''')
+            # Bases créées avant l'ordonnancement par priorité, les options de conversion et l'annulation
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(jobs)')}
+            for column in ('priority', 'client', 'options'):
+                if column not in columns:
+                    conn.execute(f'ALTER TABLE jobs ADD COLUMN {column} TEXT')
+            if 'cancelled' not in columns:
+                conn.execute('ALTER TABLE jobs ADD COLUMN cancelled BOOLEAN DEFAULT 0')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS job_files (
+                    job_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    file_path TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    error_message TEXT,
+                    error_type TEXT,
+                    PRIMARY KEY (job_id, position)
+                )
+            ''')
+            if 'error_type' not in {row[1] for row in conn.execute('PRAGMA table_info(job_files)')}:
+                conn.execute('ALTER TABLE job_files ADD COLUMN error_type TEXT')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs(finished)')
+
+    def create_job(self, job_id, files, output_format, output_dir, priority=None, client=None,
+                   options=None):
+        """
+        Enregistrer un nouveau job et ses fichiers (tous en attente)
+
+        Args:
+            job_id (str): Identifiant du job
+            files (list): Chemins des fichiers à convertir
+            output_format (str): Format de sortie
+            output_dir (str): Répertoire de sortie
+            priority (str): Classe de priorité demandée (None = déduite par fichier)
+            client (str): Client à l'origine du job
+            options (dict): Options des convertisseurs (reprises avec le job)
+        """
+        with self._connect() as conn:
+            conn.execute('''
+                INSERT INTO jobs (job_id, output_format, output_dir, created, priority, client, options)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (job_id, output_format, output_dir, time.time(), priority, client,
+                  json.dumps(options) if options else None))
+            conn.executemany(
+                'INSERT INTO job_files (job_id, position, file_path) VALUES (?, ?, ?)',
+                [(job_id, position, path) for position, path in enumerate(files)]
+            )
+
+    def mark_file(self, job_id, position, success, error_message=None, error_type=None):
+        """
+        Enregistrer le résultat de la conversion d'un fichier
+
+        Args:
+            job_id (str): Identifiant du job
+            position (int): Rang du fichier dans le job
+            success (bool): Conversion réussie
+            error_message (str): Message d'erreur éventuel
+            error_type (str): Classe de l'erreur (Timeout, MemoryLimit, Cancelled...)
+        """
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE job_files SET state = ?, error_message = ?, error_type = ? '
+                'WHERE job_id = ? AND position = ?',
+                (DONE if success else FAILED, error_message, error_type, job_id, position)
+            )
+
+    def mark_cancelled(self, job_id):
+        """Noter l'annulation d'un job (ses fichiers en cours finissent en échec)"""
+        with self._connect() as conn:
+            conn.execute('UPDATE jobs SET cancelled = 1 WHERE job_id = ?', (job_id,))
+
+    def cancel_pending(self, job_id, error_message="Conversion annulée", error_type=None):
+        """Annuler un job et marquer en échec ses fichiers encore en attente"""
+        with self._connect() as conn:
+            conn.execute('UPDATE jobs SET cancelled = 1 WHERE job_id = ?', (job_id,))
+            conn.execute(
+                'UPDATE job_files SET state = ?, error_message = ?, error_type = ? '
+                'WHERE job_id = ? AND state = ?',
+                (FAILED, error_message, error_type, job_id, PENDING)
+            )
+
+    def finish_job(self, job_id):
+        """Marquer un job comme terminé"""
+        with self._connect() as conn:
+            conn.execute('UPDATE jobs SET finished = ? WHERE job_id = ?', (time.time(), job_id))
+
+    def _load(self, conn, row):
+        """Construire la description complète d'un job à partir de sa ligne"""
+        job_id, output_format, output_dir, created, finished, priority, client, options, cancelled = row
+        files = conn.execute('''
+            SELECT position, file_path, state, error_message, error_type FROM job_files
+            WHERE job_id = ? ORDER BY position
+        ''', (job_id,)).fetchall()
+        return {
+            'job_id': job_id,
+            'output_format': output_format,
+            'output_dir': output_dir,
+            'created': created,
+            'finished': finished,
+            'priority': priority,
+            'client': client,
+            'options': json.loads(options) if options else None,
+            'cancelled': bool(cancelled),
+            'files': [
+                {'position': position, 'file': path, 'state': state, 'error': error, 'error_type': error_type}
+                for position, path, state, error, error_type in files
+            ],
+        }
+
+    def get_job(self, job_id):
+        """
+        Obtenir un job et l'état de ses fichiers
+
+        Returns:
+            dict: Description du job ou None s'il est inconnu
+        """
+        with self._connect() as conn:
+            row = conn.execute('''
+                SELECT job_id, output_format, output_dir, created, finished, priority, client, options, cancelled
+                FROM jobs WHERE job_id = ?
+            ''', (job_id,)).fetchone()
+            return self._load(conn, row) if row else None
+
+    def get_unfinished_jobs(self):
+        """
+        Lister les jobs interrompus (à reprendre au démarrage)
+
+        Returns:
+            list: Descriptions des jobs non terminés, du plus ancien au plus récent
+        """
+        with self._connect() as conn:
+            rows = conn.execute('''
+                SELECT job_id, output_format, output_dir, created, finished, priority, client, options, cancelled
+                FROM jobs WHERE finished IS NULL ORDER BY created
+            ''').fetchall()
+            return [self._load(conn, row) for row in rows]
+
+    def purge_finished(self, max_age_days=7):
+        """
+        Supprimer les jobs terminés depuis plus de max_age_days jours
+
+        Returns:
+            int: Nombre de jobs supprimés
+        """
+        cutoff = time.time() - max_age_days * 86400
+        with self._connect() as conn:
+            conn.execute('''
+                DELETE FROM job_files WHERE job_id IN
+                    (SELECT job_id FROM jobs WHERE finished IS NOT NULL AND finished < ?)
+            ''', (cutoff,))
+            return conn.execute(
+                'DELETE FROM jobs WHERE finished IS NOT NULL AND finished < ?', (cutoff,)
+            ).rowcount
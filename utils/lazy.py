@@ -0,0 +1,90 @@
+"""
+Imports différés pour PtitConvert
+Les bibliothèques lourdes (pandas, reportlab, moviepy, ...) ne sont chargées
+qu'au premier usage : l'import des convertisseurs reste quasi instantané.
+"""
+
+import importlib
+import importlib.machinery
+import importlib.util
+import sys
+import threading
+
+
+class LazyModule:
+    """Module importé au premier accès à l'un de ses attributs"""
+
+    def __init__(self, name):
+        """
+        Initialiser le module différé
+
+        Args:
+            name (str): Nom complet du module ('reportlab.lib.pagesizes')
+        """
+        self.__dict__['_lazy_name'] = name
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = importlib.import_module(self.__dict__['_lazy_name'])
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self._load(), attribute, value)
+
+    def __repr__(self):
+        state = 'chargé' if self.__dict__['_lazy_module'] is not None else 'différé'
+        return f"<module {self.__dict__['_lazy_name']} ({state})>"
+
+
+def is_available(name):
+    """
+    Vérifier qu'un module est installé sans l'importer
+
+    Les sous-modules sont cherchés dans les répertoires du paquet parent,
+    sans exécuter son __init__ (contrairement à importlib.util.find_spec).
+
+    Args:
+        name (str): Nom complet du module
+
+    Returns:
+        bool: True si le module est trouvé
+    """
+    if name in sys.modules:
+        return True
+    parts = name.split('.')
+    try:
+        spec = importlib.util.find_spec(parts[0])
+        for index in range(1, len(parts)):
+            if spec is None or not spec.submodule_search_locations:
+                return False
+            spec = importlib.machinery.PathFinder.find_spec(
+                '.'.join(parts[:index + 1]), spec.submodule_search_locations
+            )
+        return spec is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def lazy_import(name):
+    """
+    Obtenir un module chargé au premier usage
+
+    Args:
+        name (str): Nom complet du module
+
+    Returns:
+        LazyModule: Module différé, ou None si le paquet n'est pas installé
+    """
+    if not is_available(name):
+        return None
+    return LazyModule(name)
@@ -0,0 +1,122 @@
+"""
+Journalisation de PtitConvert
+Les modules écrivent dans des loggers standard (logging.getLogger(__name__)) ;
+setup_logging() les relie à une file d'attente : l'écriture sur la console se
+fait dans un thread dédié, sans bloquer les conversions. capture() recueille
+les avertissements et erreurs émis par un thread pendant une conversion, pour
+les joindre à son résultat.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+
+DEFAULT_FORMAT = '%(levelname)s %(name)s: %(message)s'
+# Logger dont capture() recueille les messages (et ses descendants)
+CAPTURED_LOGGER = 'converters'
+
+_listener = None
+_setup_lock = threading.Lock()
+_capture_handler = None
+
+
+def setup_logging(level=logging.WARNING, stream=None, fmt=DEFAULT_FORMAT):
+    """
+    Router les journaux du processus vers une file vidée par un thread dédié
+
+    Un second appel ne change que le niveau.
+
+    Args:
+        level (int): Niveau minimal des messages affichés
+        stream: Flux de sortie (défaut : sys.stderr)
+        fmt (str): Format des messages (logging.Formatter)
+
+    Returns:
+        logging.handlers.QueueListener: Thread d'écriture des messages
+    """
+    global _listener
+    root = logging.getLogger()
+    root.setLevel(level)
+    with _setup_lock:
+        if _listener is None:
+            records = queue.SimpleQueue()
+            output = logging.StreamHandler(stream or sys.stderr)
+            output.setFormatter(logging.Formatter(fmt))
+            _listener = logging.handlers.QueueListener(records, output)
+            _listener.start()
+            root.addHandler(logging.handlers.QueueHandler(records))
+            atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Écrire les messages en attente puis arrêter le thread d'écriture"""
+    global _listener
+    with _setup_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in logging.getLogger().handlers[:]:
+            if isinstance(handler, logging.handlers.QueueHandler) and handler.queue is listener.queue:
+                logging.getLogger().removeHandler(handler)
+
+
+class _ThreadCapture(logging.Handler):
+    """Recueille les messages émis par les threads qui ont ouvert une capture"""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self._local = threading.local()
+
+    def emit(self, record):
+        messages = getattr(self._local, 'messages', None)
+        if messages is not None:
+            # Appelé dans le bloc except éventuel : l'exception en cours est celle du message
+            messages.append((record.levelno, record.getMessage(), sys.exc_info()[0]))
+
+
+class _Capture:
+    """Bloc capture() en cours"""
+
+    __slots__ = ('messages', '_previous')
+
+    def __init__(self):
+        self.messages = []
+        self._previous = None
+
+    def __enter__(self):
+        local = _capture_handler._local
+        self._previous = getattr(local, 'messages', None)
+        local.messages = self.messages
+        return self.messages
+
+    def __exit__(self, exc_type, exc, tb):
+        _capture_handler._local.messages = self._previous
+        if self._previous is not None:
+            self._previous.extend(self.messages)
+        return False
+
+
+def capture():
+    """
+    Recueillir les avertissements et erreurs émis par le thread courant
+
+    Usage:
+        with logs.capture() as messages:
+            ...
+        # messages : liste de (niveau, message, classe de l'exception en cours ou None)
+
+    Returns:
+        Gestionnaire de contexte donnant la liste des messages
+    """
+    global _capture_handler
+    if _capture_handler is None:
+        with _setup_lock:
+            if _capture_handler is None:
+                handler = _ThreadCapture()
+                logging.getLogger(CAPTURED_LOGGER).addHandler(handler)
+                _capture_handler = handler
+    return _Capture()
@@ -0,0 +1,63 @@
+"""
+Mesure de la mémoire du processus pour PtitConvert
+Pic de mémoire résidente (high-water mark) du processus courant. Sous Linux,
+le pic peut être remis à zéro avant une conversion pour mesurer celle-ci
+seulement ; ailleurs, c'est le pic depuis le démarrage du processus.
+"""
+
+import sys
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+# False dès qu'une remise à zéro a échoué (noyau ancien, /proc en lecture seule)
+_can_reset = sys.platform.startswith('linux')
+
+
+def peak_rss_mb():
+    """
+    Pic de mémoire résidente du processus courant
+
+    Returns:
+        float: Pic en Mo (None si aucune mesure n'est disponible)
+    """
+    # Sous Linux, ru_maxrss hérite du pic du processus parent : VmHWM est propre au processus
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if RESOURCE_AVAILABLE:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Ko sous Linux, octets sous macOS
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+def reset_peak_rss():
+    """
+    Remettre le pic de mémoire résidente à la mémoire actuelle (Linux 4.0+)
+
+    Returns:
+        bool: True si le pic a été remis à zéro
+    """
+    global _can_reset
+    if not _can_reset:
+        return False
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        _can_reset = False
+        return False
@@ -0,0 +1,244 @@
+"""
+Métriques internes de PtitConvert (format texte Prometheus)
+Chaque thread écrit dans ses propres compteurs, sans verrou ; les valeurs
+ne sont fusionnées qu'au moment de l'export.
+"""
+
+import logging
+import threading
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+# Bornes (secondes) des histogrammes de durée
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def _escape(value):
+    """Échapper une valeur de label pour l'exposition texte"""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _ShardedMetric:
+    """Base des métriques agrégées par thread"""
+
+    TYPE = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        """
+        Initialiser la métrique
+
+        Args:
+            name (str): Nom Prometheus de la métrique
+            documentation (str): Description (ligne HELP)
+            labelnames (tuple): Noms des labels, dans l'ordre des valeurs passées
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self):
+        """Valeurs du thread courant (créées et enregistrées au premier usage)"""
+        shard = getattr(self._local, 'values', None)
+        if shard is None:
+            shard = {}
+            self._local.values = shard
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _snapshots(self):
+        """Copies des valeurs de chaque thread (dict.copy est atomique sous le GIL)"""
+        with self._shards_lock:
+            shards = list(self._shards)
+        return [shard.copy() for shard in shards]
+
+
+class Counter(_ShardedMetric):
+    """Compteur cumulatif"""
+
+    TYPE = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        """Incrémenter le compteur pour une combinaison de labels"""
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def collect(self):
+        """Retourner {labels: valeur} pour tous les threads"""
+        merged = {}
+        for shard in self._snapshots():
+            for labels, value in shard.items():
+                merged[labels] = merged.get(labels, 0) + value
+        return merged
+
+    def render(self):
+        lines = []
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_ShardedMetric):
+    """Histogramme de durées"""
+
+    TYPE = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labels, value):
+        """
+        Enregistrer une observation
+
+        Args:
+            labels (tuple): Valeurs des labels
+            value (float): Valeur observée (secondes)
+        """
+        shard = self._shard()
+        entry = shard.get(labels)
+        if entry is None:
+            # [compte par intervalle (dernier = au-delà de la plus grande borne), somme]
+            entry = [[0] * (len(self.buckets) + 1), 0.0]
+            shard[labels] = entry
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def collect(self):
+        """Retourner {labels: (comptes par intervalle, somme)} pour tous les threads"""
+        merged = {}
+        for shard in self._snapshots():
+            for labels, (counts, total) in shard.items():
+                counts = list(counts)
+                current = merged.get(labels)
+                if current is None:
+                    merged[labels] = [counts, total]
+                else:
+                    current[0] = [a + b for a, b in zip(current[0], counts)]
+                    current[1] += total
+        return merged
+
+    def render(self):
+        lines = []
+        for labels, (counts, total) in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Valeur instantanée calculée au moment de l'export"""
+
+    TYPE = 'gauge'
+
+    def __init__(self, name, documentation, callback, labelnames=(), metric_type='gauge'):
+        """
+        Initialiser la jauge
+
+        Args:
+            name (str): Nom Prometheus de la métrique
+            documentation (str): Description (ligne HELP)
+            callback (callable): Retourne une valeur, ou {labels: valeur} si labelnames
+            labelnames (tuple): Noms des labels
+            metric_type (str): Type exposé ('gauge' ou 'counter' pour un total lu ailleurs)
+        """
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.labelnames = tuple(labelnames)
+        self.TYPE = metric_type
+
+    def render(self):
+        value = self.callback()
+        if value is None:
+            return []
+        if not self.labelnames:
+            return [f"{self.name} {_format_value(value)}"]
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}"
+            for labels, v in sorted(value.items())
+        ]
+
+
+class MetricsRegistry:
+    """Ensemble des métriques exportées"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Enregistrer une métrique (ou retrouver celle du même nom)"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def unregister(self, name):
+        """Retirer une métrique"""
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def render(self):
+        """
+        Produire l'exposition texte de toutes les métriques
+
+        Returns:
+            str: Document au format texte Prometheus 0.0.4
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                samples = metric.render()
+            except Exception as e:
+                logger.error("Erreur lors du calcul de la métrique %s: %s", metric.name, e)
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+# Registre partagé par le processus
+REGISTRY = MetricsRegistry()
+
+
+def counter(name, documentation, labelnames=()):
+    """Créer (ou retrouver) un compteur dans le registre partagé"""
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    """Créer (ou retrouver) un histogramme dans le registre partagé"""
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def gauge(name, documentation, callback, labelnames=(), metric_type='gauge'):
+    """Créer (ou remplacer) une jauge dans le registre partagé"""
+    REGISTRY.unregister(name)
+    return REGISTRY.register(Gauge(name, documentation, callback, labelnames, metric_type))
@@ -0,0 +1,140 @@
+"""
+Profilage des conversions pour PtitConvert
+Une conversion lente en production se diagnostique sans la reproduire :
+elle s'exécute sous cProfile (statistiques pstats) et sous un échantillonneur
+de piles (format « collapsed » de flamegraph.pl, speedscope, inferno).
+"""
+
+import cProfile
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Intervalle d'échantillonnage des piles (secondes)
+DEFAULT_INTERVAL = 0.005
+
+
+def _frame_label(code):
+    """Libellé d'une fonction : nom (dossier/fichier.py:ligne)"""
+    directory, filename = os.path.split(code.co_filename)
+    return f"{code.co_name} ({os.path.basename(directory)}/{filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Relève périodiquement la pile d'un thread depuis un thread dédié"""
+
+    def __init__(self, interval=DEFAULT_INTERVAL, thread_id=None):
+        """
+        Initialiser l'échantillonneur
+
+        Args:
+            interval (float): Délai entre deux relevés (secondes)
+            thread_id (int): Thread observé (None = thread courant)
+        """
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.counts = Counter()
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = _frame_label(code)
+        return label
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                stack.reverse()
+                self.counts[';'.join(stack)] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='ptitconvert-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def write_collapsed(self, path):
+        """Écrire les piles relevées : une ligne « appelant;...;appelé nombre » par pile"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ConversionProfiler:
+    """Gestionnaire de contexte : profile le bloc et écrit <base>.pstats et <base>.collapsed"""
+
+    def __init__(self, output_base, interval=DEFAULT_INTERVAL):
+        """
+        Initialiser le profileur
+
+        Args:
+            output_base (str): Chemin des fichiers de profil, sans extension
+            interval (float): Intervalle d'échantillonnage des piles (secondes)
+        """
+        self.output_base = str(output_base)
+        self.interval = interval
+        self.paths = {}
+        self._profile = None
+        self._sampler = None
+
+    def __enter__(self):
+        self._sampler = StackSampler(self.interval)
+        self._sampler.start()
+        self._profile = cProfile.Profile()
+        try:
+            self._profile.enable()
+        except ValueError:
+            # Un autre profileur est déjà actif : l'échantillonnage suffit
+            self._profile = None
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profile is not None:
+            self._profile.disable()
+        self._sampler.stop()
+        try:
+            os.makedirs(os.path.dirname(self.output_base) or '.', exist_ok=True)
+            if self._profile is not None:
+                self.paths['pstats'] = f"{self.output_base}.pstats"
+                self._profile.dump_stats(self.paths['pstats'])
+            self.paths['collapsed'] = f"{self.output_base}.collapsed"
+            self._sampler.write_collapsed(self.paths['collapsed'])
+        except OSError as e:
+            logger.error("Impossible d'écrire le profil %s: %s", self.output_base, e)
+        return False
+
+
+def profile_base(directory, file_path, number=None):
+    """
+    Chemin (sans extension) des fichiers de profil d'une conversion
+
+    Args:
+        directory (str): Dossier des profils
+        file_path (str): Fichier converti
+        number (int): Numéro distinguant les conversions d'une même seconde
+
+    Returns:
+        str: <dossier>/<date>-<numéro>-<nom du fichier>
+    """
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    prefix = time.strftime('%Y%m%d-%H%M%S')
+    if number is not None:
+        prefix = f"{prefix}-{number}"
+    return os.path.join(str(directory), f"{prefix}-{stem}")
@@ -0,0 +1,34 @@
+"""
+Remontée de la progression des conversions pour PtitConvert
+Les convertisseurs signalent leur avancement sans savoir qui l'écoute ;
+le processus de travail installe un rapporteur qui relaie vers le serveur.
+"""
+
+_reporter = None
+
+
+def set_reporter(callback):
+    """
+    Installer le rapporteur de progression du processus courant
+
+    Args:
+        callback (callable): Reçoit la fraction accomplie (0.0 à 1.0), ou None pour désactiver
+    """
+    global _reporter
+    _reporter = callback
+
+
+def report(fraction):
+    """
+    Signaler l'avancement de la conversion en cours
+
+    Args:
+        fraction (float): Fraction accomplie, entre 0.0 et 1.0
+    """
+    if _reporter is None:
+        return
+    try:
+        _reporter(max(0.0, min(1.0, float(fraction))))
+    except Exception:
+        # La progression ne doit jamais faire échouer une conversion
+        pass
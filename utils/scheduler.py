@@ -0,0 +1,177 @@
+"""
+Ordonnancement des conversions en attente pour PtitConvert
+Les conversions sont rangées par classe de priorité puis, dans une même
+classe, servies à tour de rôle entre clients : un gros lot vidéo ne bloque
+ni les petits jobs d'image ni les autres utilisateurs. Chaque client voit
+ses fichiers servis du plus court au plus long (durée prévue).
+"""
+
+import heapq
+from collections import OrderedDict
+from itertools import count
+
+from converters import registry
+
+# Classes de priorité, de la plus prioritaire à la moins prioritaire
+INTERACTIVE = 'interactive'
+NORMAL = 'normal'
+BULK = 'bulk'
+PRIORITIES = (INTERACTIVE, NORMAL, BULK)
+
+# Convertisseurs rapides (servis en premier) et coûteux (limités en parallèle)
+LIGHT_CONVERTERS = {'ImageConverter'}
+HEAVY_CONVERTERS = {'MediaConverter'}
+LIGHT_FORMATS = {'txt'}
+
+
+def classify(file_path, output_format):
+    """
+    Déterminer la classe de priorité d'une conversion d'après son convertisseur
+
+    Args:
+        file_path (str): Chemin du fichier source
+        output_format (str): Format de sortie
+
+    Returns:
+        str: INTERACTIVE, NORMAL ou BULK
+    """
+    try:
+        names = set(registry.get_converter_name(file_path, output_format).split('+'))
+    except Exception:
+        return NORMAL
+    if names & HEAVY_CONVERTERS:
+        return BULK
+    if names <= LIGHT_CONVERTERS or registry.get_extension(file_path).lstrip('.') in LIGHT_FORMATS:
+        return INTERACTIVE
+    return NORMAL
+
+
+class FairShareQueue:
+    """
+    File d'attente à priorités strictes et partage équitable entre clients
+
+    Chaque classe garde une file par client ; les clients d'une même classe
+    sont servis chacun leur tour (un fichier par tour). Les fichiers d'un
+    client sortent par durée prévue croissante, puis par ordre d'arrivée.
+    Les éléments doivent exposer les attributs 'priority', 'client' et
+    'cost' (secondes, None = inconnue). Non thread-safe : l'appelant tient
+    son verrou.
+    """
+
+    def __init__(self):
+        # {classe: OrderedDict {client: tas de (coût, rang d'arrivée, élément)}} ;
+        # l'ordre des clients est celui du tourniquet (le prochain servi en tête)
+        self._classes = {priority: OrderedDict() for priority in PRIORITIES}
+        self._arrivals = count()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __iter__(self):
+        """Parcourir les éléments dans l'ordre où ils seront servis"""
+        return iter(self.ordered())
+
+    def append(self, item):
+        """Ajouter un élément à la file de son client"""
+        clients = self._classes[item.priority]
+        queue = clients.get(item.client)
+        if queue is None:
+            queue = clients[item.client] = []
+        # Durée inconnue : après les fichiers dont la durée est connue
+        cost = item.cost if item.cost is not None else float('inf')
+        heapq.heappush(queue, (cost, next(self._arrivals), item))
+        self._size += 1
+
+    def popleft(self, blocked=()):
+        """
+        Retirer le prochain élément à servir
+
+        Args:
+            blocked (iterable): Classes à ne pas servir pour l'instant (plafond atteint)
+
+        Returns:
+            Élément retiré, ou None si aucune classe autorisée n'a d'élément
+        """
+        for priority in PRIORITIES:
+            clients = self._classes[priority]
+            if not clients or priority in blocked:
+                continue
+            client, queue = next(iter(clients.items()))
+            item = heapq.heappop(queue)[2]
+            if queue:
+                clients.move_to_end(client)
+            else:
+                del clients[client]
+            self._size -= 1
+            return item
+        return None
+
+    def remove(self, predicate):
+        """
+        Retirer les éléments qui satisfont predicate
+
+        Returns:
+            list: Éléments retirés
+        """
+        removed = []
+        for clients in self._classes.values():
+            for client in list(clients):
+                kept = []
+                for entry in clients[client]:
+                    (removed if predicate(entry[2]) else kept).append(entry)
+                if kept:
+                    heapq.heapify(kept)
+                    clients[client] = kept
+                else:
+                    del clients[client]
+        self._size -= len(removed)
+        return [entry[2] for entry in sorted(removed)]
+
+    def clear(self):
+        """
+        Vider la file
+
+        Returns:
+            list: Éléments retirés, dans l'ordre où ils auraient été servis
+        """
+        items = self.ordered()
+        for clients in self._classes.values():
+            clients.clear()
+        self._size = 0
+        return items
+
+    def ordered(self):
+        """
+        Simuler le service de la file sans la modifier
+
+        Returns:
+            list: Éléments dans l'ordre où ils seront servis (hors plafonds)
+        """
+        items = []
+        for priority in PRIORITIES:
+            queues = [iter(sorted(queue)) for queue in self._classes[priority].values()]
+            while queues:
+                next_round = []
+                for queue in queues:
+                    entry = next(queue, None)
+                    if entry is not None:
+                        items.append(entry[2])
+                        next_round.append(queue)
+                queues = next_round
+        return items
+
+    def counts(self):
+        """
+        Compter les éléments en attente par classe
+
+        Returns:
+            dict: {classe: nombre d'éléments}
+        """
+        return {
+            priority: sum(len(queue) for queue in clients.values())
+            for priority, clients in self._classes.items()
+        }
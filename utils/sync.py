@@ -0,0 +1,343 @@
+"""
+Synchronisation incrémentale d'un dossier pour PtitConvert
+Convertit seulement les fichiers dont la sortie manque ou est périmée,
+à la manière de make : un manifeste placé dans le dossier de sortie garde,
+pour chaque source, sa taille, sa date de modification, son empreinte et
+les sorties produites. Les sorties dont la source a disparu sont supprimées.
+"""
+
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+from converters import registry
+from utils.file_handler import FileHandler
+
+logger = logging.getLogger(__name__)
+
+# Manifeste de la synchronisation (dans le dossier de sortie)
+MANIFEST_NAME = '.ptitconvert-sync.db'
+# Résultats enregistrés par transaction pendant la conversion
+COMMIT_EVERY = 200
+
+
+def parallel_scan(root, workers=8, exclude=None, recursive=True):
+    """
+    Parcourir une arborescence avec plusieurs threads os.scandir
+
+    Chaque dossier est lu par un thread du pool : sur un disque réseau ou
+    un SSD, les appels système se recouvrent au lieu de s'enchaîner.
+
+    Args:
+        root (str): Dossier à parcourir
+        workers (int): Nombre de threads
+        exclude (str): Dossier à ignorer (chemin absolu)
+        recursive (bool): Descendre dans les sous-dossiers
+
+    Returns:
+        dict: {chemin relatif à root: (taille, mtime en ns)} des fichiers non cachés
+    """
+    root = os.path.abspath(root)
+
+    def scan(directory):
+        files, subdirs = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.path != exclude:
+                                subdirs.append(entry.path)
+                        elif entry.is_file():
+                            st = entry.stat()
+                            files.append((entry.path, st.st_size, st.st_mtime_ns))
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return files, subdirs
+
+    found = {}
+    prefix = len(root) + 1
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='ptitconvert-scan') as pool:
+        running = {pool.submit(scan, root)}
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = future.result()
+                for path, size, mtime_ns in files:
+                    found[path[prefix:]] = (size, mtime_ns)
+                if recursive:
+                    running.update(pool.submit(scan, d) for d in subdirs)
+    return found
+
+
+class SyncManifest:
+    """Manifeste SQLite des sources converties et de leurs sorties"""
+
+    def __init__(self, output_dir):
+        """
+        Ouvrir (ou créer) le manifeste d'un dossier de sortie
+
+        Args:
+            output_dir (str): Dossier de sortie de la synchronisation
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.db_path = os.path.join(output_dir, MANIFEST_NAME)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS sync_entries (
+                    source TEXT NOT NULL,
+                    output_format TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    outputs TEXT NOT NULL,
+                    success BOOLEAN NOT NULL,
+                    synced_at REAL NOT NULL,
+                    PRIMARY KEY (source, output_format)
+                )
+            ''')
+
+    def load(self, output_format):
+        """
+        Lire les entrées d'un format de sortie
+
+        Returns:
+            dict: {source relative: {size, mtime_ns, content_hash, outputs, success}}
+        """
+        rows = self._conn.execute('''
+            SELECT source, size, mtime_ns, content_hash, outputs, success
+            FROM sync_entries WHERE output_format = ?
+        ''', (output_format,)).fetchall()
+        return {
+            source: {
+                'size': size, 'mtime_ns': mtime_ns, 'content_hash': content_hash,
+                'outputs': outputs.split('\n') if outputs else [], 'success': bool(success),
+            }
+            for source, size, mtime_ns, content_hash, outputs, success in rows
+        }
+
+    def save(self, output_format, entries):
+        """
+        Enregistrer des entrées en une transaction
+
+        Args:
+            output_format (str): Format de sortie
+            entries (list): Tuples (source, taille, mtime_ns, empreinte, sorties, succès)
+        """
+        now = time.time()
+        with self._conn:
+            self._conn.executemany('''
+                INSERT OR REPLACE INTO sync_entries
+                (source, output_format, size, mtime_ns, content_hash, outputs, success, synced_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (source, output_format, size, mtime_ns, content_hash, '\n'.join(outputs), success, now)
+                for source, size, mtime_ns, content_hash, outputs, success in entries
+            ])
+
+    def remove(self, output_format, sources):
+        """Supprimer les entrées de sources disparues"""
+        with self._conn:
+            self._conn.executemany(
+                'DELETE FROM sync_entries WHERE source = ? AND output_format = ?',
+                [(source, output_format) for source in sources]
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+class DirectorySync:
+    """Met un dossier de sortie à jour par rapport à un dossier source"""
+
+    def __init__(self, source_dir, output_dir, output_format, executor=None, quality='medium',
+                 delete_orphans=True, scan_workers=8, on_result=None, options=None):
+        """
+        Initialiser la synchronisation
+
+        Args:
+            source_dir (str): Dossier source
+            output_dir (str): Dossier de sortie (l'arborescence source y est reproduite)
+            output_format (str): Format de sortie
+            executor (ConversionExecutor): Pool de conversion (None = simulation seule)
+            quality (str): Qualité de conversion
+            delete_orphans (bool): Supprimer les sorties dont la source a disparu
+            scan_workers (int): Threads du parcours des dossiers et du calcul des empreintes
+            on_result (callable): Reçoit (source relative, succès, erreur) après chaque conversion
+            options (dict): Options propres au convertisseur (voir registry.convert)
+        """
+        self.source_dir = os.path.abspath(source_dir)
+        self.output_dir = os.path.abspath(output_dir)
+        self.output_format = output_format.lower()
+        self.executor = executor
+        self.quality = quality
+        self.delete_orphans = delete_orphans
+        self.scan_workers = scan_workers
+        self.on_result = on_result
+        self.options = options
+        self._file_handler = FileHandler()
+
+    def _output_for(self, source):
+        """Sortie attendue d'une source relative (même emplacement relatif, nouvelle extension)"""
+        stem = os.path.splitext(source)[0]
+        return f"{stem}.{self.output_format}"
+
+    def _hash(self, source):
+        return self._file_handler.get_file_hash(os.path.join(self.source_dir, source), 'sha256')
+
+    def plan(self, known):
+        """
+        Comparer l'arborescence source au manifeste
+
+        Args:
+            known (dict): Entrées du manifeste pour le format de sortie (SyncManifest.load)
+
+        Returns:
+            dict: 'convert' (sources à convertir avec leur état), 'refresh' (sources
+                touchées mais au contenu inchangé), 'orphans' (sources disparues),
+                'up_to_date' (nombre de sources à jour)
+        """
+        exclude = self.output_dir if self.output_dir.startswith(self.source_dir + os.sep) else None
+        sources = {
+            source: state
+            for source, state in parallel_scan(self.source_dir, self.scan_workers, exclude).items()
+            if registry.can_convert(source, self.output_format)
+        }
+
+        stale, up_to_date = [], 0
+        for source, (size, mtime_ns) in sources.items():
+            entry = known.get(source)
+            outputs_present = entry is not None and entry['success'] and all(
+                os.path.exists(os.path.join(self.output_dir, output)) for output in entry['outputs']
+            )
+            if outputs_present and (entry['size'], entry['mtime_ns']) == (size, mtime_ns):
+                up_to_date += 1
+            else:
+                stale.append(source)
+
+        # Empreintes seulement pour les fichiers dont la date ou la taille a changé
+        convert, refresh = [], []
+        with ThreadPoolExecutor(max_workers=max(1, self.scan_workers)) as pool:
+            hashes = dict(zip(stale, pool.map(self._hash, stale)))
+        for source in stale:
+            size, mtime_ns = sources[source]
+            content_hash = hashes[source]
+            if content_hash is None:
+                continue
+            entry = known.get(source)
+            if (entry is not None and entry['success'] and entry['content_hash'] == content_hash
+                    and all(os.path.exists(os.path.join(self.output_dir, o)) for o in entry['outputs'])):
+                refresh.append((source, size, mtime_ns, content_hash, entry['outputs'], True))
+            else:
+                convert.append((source, size, mtime_ns, content_hash))
+
+        orphans = sorted(set(known) - set(sources))
+        return {'convert': convert, 'refresh': refresh, 'orphans': orphans, 'up_to_date': up_to_date}
+
+    def _remove_orphans(self, manifest, orphans, known):
+        """Supprimer les sorties des sources disparues puis leurs entrées"""
+        removed = 0
+        for source in orphans:
+            for output in known[source]['outputs']:
+                path = os.path.join(self.output_dir, output)
+                try:
+                    if os.path.isdir(path):
+                        # Sortie d'une extraction d'archive
+                        shutil.rmtree(path)
+                    else:
+                        os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning("Impossible de supprimer %s: %s", path, e)
+                    continue
+                # Dossiers devenus vides
+                parent = os.path.dirname(path)
+                while parent != self.output_dir and parent.startswith(self.output_dir + os.sep):
+                    try:
+                        os.rmdir(parent)
+                    except OSError:
+                        break
+                    parent = os.path.dirname(parent)
+        manifest.remove(self.output_format, orphans)
+        return removed
+
+    def run(self, dry_run=False):
+        """
+        Synchroniser le dossier de sortie
+
+        Args:
+            dry_run (bool): Calculer le plan sans rien convertir ni supprimer
+
+        Returns:
+            dict: Statistiques (up_to_date, refreshed, converted, failed, orphans, removed_outputs)
+        """
+        manifest = SyncManifest(self.output_dir)
+        try:
+            known = manifest.load(self.output_format)
+            plan = self.plan(known)
+            stats = {
+                'up_to_date': plan['up_to_date'],
+                'refreshed': len(plan['refresh']),
+                'to_convert': len(plan['convert']),
+                'converted': 0,
+                'failed': 0,
+                'orphans': len(plan['orphans']),
+                'removed_outputs': 0,
+            }
+            if dry_run:
+                stats['plan'] = plan
+                return stats
+
+            manifest.save(self.output_format, plan['refresh'])
+            if self.delete_orphans and plan['orphans']:
+                stats['removed_outputs'] = self._remove_orphans(manifest, plan['orphans'], known)
+            if plan['convert'] and self.executor is not None:
+                self._convert(manifest, plan['convert'], stats)
+            return stats
+        finally:
+            manifest.close()
+
+    def _convert(self, manifest, items, stats):
+        """Convertir les sources périmées et enregistrer les résultats au fil de l'eau"""
+        futures = {}
+        for source, size, mtime_ns, content_hash in items:
+            target_dir = os.path.join(self.output_dir, os.path.dirname(source))
+            os.makedirs(target_dir, exist_ok=True)
+            future = self.executor.submit(
+                os.path.join(self.source_dir, source), self.output_format, target_dir,
+                task_id=source, quality=self.quality, options=self.options,
+            )
+            futures[future] = (source, size, mtime_ns, content_hash)
+
+        batch = []
+        for future in as_completed(futures):
+            source, size, mtime_ns, content_hash = futures[future]
+            try:
+                result = future.result()
+                ok, error = result.success, result.error
+            except Exception as e:
+                ok, error, result = False, str(e), None
+            stats['converted' if ok else 'failed'] += 1
+            if ok and result.outputs:
+                outputs = [os.path.relpath(output, self.output_dir) for output in result.outputs]
+            else:
+                outputs = [self._output_for(source)]
+            batch.append((source, size, mtime_ns, content_hash, outputs, ok))
+            if len(batch) >= COMMIT_EVERY:
+                manifest.save(self.output_format, batch)
+                batch = []
+            if self.on_result is not None:
+                self.on_result(source, ok, error)
+        if batch:
+            manifest.save(self.output_format, batch)
@@ -0,0 +1,32 @@
+"""
+Threads de calcul pour PtitConvert
+Les processus de travail de l'exécuteur se partagent les cœurs : les pools de
+threads d'une conversion (vues, pages d'un PDF, tuiles) n'en prennent que leur
+part, pour ne pas lancer un thread par cœur dans chaque processus.
+"""
+
+import os
+
+# Processus de conversion qui tournent en même temps (fixé par l'exécuteur dans ses processus)
+_processes = 1
+
+
+def set_process_count(count):
+    """
+    Indiquer le nombre de processus de conversion qui se partagent les cœurs
+
+    Args:
+        count (int): Nombre de processus de travail (1 hors de l'exécuteur)
+    """
+    global _processes
+    _processes = max(1, int(count or 1))
+
+
+def thread_count():
+    """
+    Nombre de threads de calcul d'une conversion
+
+    Returns:
+        int: Part des cœurs revenant au processus courant (au moins 1)
+    """
+    return max(1, (os.cpu_count() or 1) // _processes)
@@ -0,0 +1,343 @@
+"""
+Mesure des étapes des conversions pour PtitConvert
+Les convertisseurs découpent leur travail en étapes (décodage, transformation,
+encodage) avec span() ; tant qu'aucun traceur n'est installé, span() ne coûte
+qu'un test et renvoie un objet partagé qui ne fait rien. Les étapes
+enregistrées s'exportent au format Chrome trace-event (chrome://tracing,
+https://ui.perfetto.dev).
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# Catégories des étapes
+TASK = 'task'
+CONVERT = 'convert'
+DECODE = 'decode'
+TRANSFORM = 'transform'
+ENCODE = 'encode'
+CACHE = 'cache'
+
+_tracer = None
+# Traceurs temporaires installés par recording() (protégés par _recording_lock)
+_recording_lock = threading.Lock()
+_recording_count = 0
+# Python 3.9+ ; sans lui, le pic d'une étape inclut celui des étapes précédentes
+_reset_peak = getattr(tracemalloc, 'reset_peak', None)
+
+
+class _NullSpan:
+    """Étape ignorée (aucun traceur installé)"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Étape en cours de mesure"""
+
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        if self.tracer.memory:
+            self.tracer._push_memory()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter_ns() - self.start
+        if self.tracer.memory:
+            self.args['alloc_peak_kb'] = round(self.tracer._pop_memory() / 1024, 1)
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.record(self.name, self.category, self.start, duration, self.args)
+        return False
+
+    def set(self, **args):
+        """Compléter les informations de l'étape (taille, nombre de pages...)"""
+        self.args.update(args)
+
+
+class Tracer:
+    """Collecte les étapes mesurées dans le processus courant"""
+
+    def __init__(self, memory=False):
+        """
+        Initialiser le traceur
+
+        Args:
+            memory (bool): Mesurer aussi le pic d'allocations Python de chaque étape
+                (tracemalloc : les conversions sont nettement ralenties)
+        """
+        self.memory = memory
+        self.events = []
+        self._local = threading.local()
+        self._started_tracemalloc = False
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def stop(self):
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _push_memory(self):
+        """Entrée dans une étape : mémoriser le pic vu par l'étape englobante"""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        if _reset_peak is not None:
+            _reset_peak()
+        stack.append([current, current])
+
+    def _pop_memory(self):
+        """Sortie d'une étape : pic d'allocations au-delà de l'état d'entrée (octets)"""
+        stack = self._local.stack
+        base, seen = stack.pop()
+        peak = max(seen, tracemalloc.get_traced_memory()[1])
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        return peak - base
+
+    def record(self, name, category, start_ns, duration_ns, args=None):
+        """Ajouter une étape terminée (horloge time.perf_counter_ns)"""
+        self.events.append({
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': start_ns / 1000,
+            'dur': duration_ns / 1000,
+            'pid': os.getpid(),
+            'tid': threading.get_native_id(),
+            'args': args or {},
+        })
+
+
+def span(name, category=TRANSFORM, **args):
+    """
+    Mesurer une étape de conversion
+
+    Usage:
+        with tracing.span('DocumentConverter.decode', tracing.DECODE, format='pdf'):
+            ...
+
+    Args:
+        name (str): Nom de l'étape
+        category (str): DECODE, TRANSFORM, ENCODE...
+        **args: Informations jointes à l'étape (valeurs sérialisables en JSON)
+
+    Returns:
+        Gestionnaire de contexte (sans effet si aucun traceur n'est installé)
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, category, args)
+
+
+def enable(memory=False):
+    """
+    Installer un traceur dans le processus courant
+
+    Args:
+        memory (bool): Mesurer aussi les allocations de chaque étape
+
+    Returns:
+        Tracer: Traceur installé
+    """
+    global _tracer
+    tracer = Tracer(memory)
+    tracer.start()
+    _tracer = tracer
+    return tracer
+
+
+def disable():
+    """
+    Retirer le traceur du processus courant
+
+    Returns:
+        list: Étapes enregistrées depuis enable() (vide si aucun traceur)
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is None:
+        return []
+    tracer.stop()
+    return tracer.events
+
+
+def is_enabled():
+    return _tracer is not None
+
+
+class _Recording:
+    """Étapes enregistrées par un bloc recording()"""
+
+    __slots__ = ('tracer', 'first', 'tid', 'events', 'temporary')
+
+    def __init__(self):
+        self.tracer = None
+        self.first = 0
+        self.tid = threading.get_native_id()
+        self.events = []
+        self.temporary = False
+
+    def __enter__(self):
+        global _tracer, _recording_count
+        with _recording_lock:
+            if _tracer is None:
+                _tracer = Tracer()
+                self.temporary = True
+            if self.temporary or _recording_count:
+                _recording_count += 1
+                self.temporary = True
+            self.tracer = _tracer
+            self.first = len(self.tracer.events)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _tracer, _recording_count
+        events = self.tracer.events[self.first:]
+        self.events = [event for event in events if event['tid'] == self.tid]
+        if self.temporary:
+            with _recording_lock:
+                _recording_count -= 1
+                if _recording_count == 0 and _tracer is self.tracer:
+                    _tracer = None
+        return False
+
+
+def recording():
+    """
+    Enregistrer les étapes exécutées par le thread courant dans un bloc
+
+    Sans traceur installé (enable()), un traceur temporaire est installé le
+    temps du bloc et retiré ensuite ; sinon les étapes restent aussi dans le
+    traceur existant.
+
+    Usage:
+        with tracing.recording() as rec:
+            ...
+        tracing.stage_times(rec.events)
+
+    Returns:
+        Gestionnaire de contexte dont l'attribut events contient les étapes à la sortie
+    """
+    return _Recording()
+
+
+def stage_times(events):
+    """
+    Temps propre de chaque catégorie d'étapes (hors étapes imbriquées)
+
+    Le temps d'une étape CONVERT non couvert par ses sous-étapes est compté
+    dans 'other' ; les étapes TASK sont ignorées.
+
+    Args:
+        events (list): Étapes d'un même thread
+
+    Returns:
+        dict: Secondes par catégorie
+    """
+    spans = sorted((e for e in events if e.get('ph') == 'X' and e['cat'] != TASK),
+                   key=lambda e: (e['ts'], -e['dur']))
+    own = [e['dur'] for e in spans]
+    stack = []
+    for index, event in enumerate(spans):
+        # Dépiler les étapes terminées avant le début de celle-ci
+        while stack and spans[stack[-1]]['ts'] + spans[stack[-1]]['dur'] <= event['ts']:
+            stack.pop()
+        if stack:
+            own[stack[-1]] -= event['dur']
+        stack.append(index)
+    times = {}
+    for event, duration in zip(spans, own):
+        category = 'other' if event['cat'] == CONVERT else event['cat']
+        times[category] = times.get(category, 0.0) + max(duration, 0.0) / 1e6
+    return {category: round(seconds, 6) for category, seconds in times.items()}
+
+
+def summarize(events):
+    """
+    Agréger des étapes par catégorie et par nom
+
+    Returns:
+        list: Dictionnaires (category, name, count, total_ms, max_ms et, si mesuré,
+            alloc_peak_kb), du plus long au plus court
+    """
+    totals = {}
+    for event in events:
+        if event.get('ph') != 'X':
+            continue
+        key = (event['cat'], event['name'])
+        entry = totals.get(key)
+        if entry is None:
+            entry = totals[key] = {'category': key[0], 'name': key[1], 'count': 0,
+                                   'total_ms': 0.0, 'max_ms': 0.0}
+        duration = event['dur'] / 1000
+        entry['count'] += 1
+        entry['total_ms'] += duration
+        entry['max_ms'] = max(entry['max_ms'], duration)
+        alloc = event['args'].get('alloc_peak_kb')
+        if alloc is not None:
+            entry['alloc_peak_kb'] = max(entry.get('alloc_peak_kb', 0.0), alloc)
+    summary = sorted(totals.values(), key=lambda e: e['total_ms'], reverse=True)
+    for entry in summary:
+        entry['total_ms'] = round(entry['total_ms'], 3)
+        entry['max_ms'] = round(entry['max_ms'], 3)
+    return summary
+
+
+def chrome_trace(events, metadata=None):
+    """
+    Construire un document Chrome trace-event
+
+    Args:
+        events (list): Étapes enregistrées (éventuellement de plusieurs processus)
+        metadata (dict): Informations ajoutées à otherData
+
+    Returns:
+        dict: Document JSON (traceEvents, displayTimeUnit, otherData avec le résumé)
+    """
+    names = [
+        {'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+         'args': {'name': f"PtitConvert {pid}"}}
+        for pid in sorted({event['pid'] for event in events})
+    ]
+    other = dict(metadata or {})
+    other['summary'] = summarize(events)
+    return {'traceEvents': names + list(events), 'displayTimeUnit': 'ms', 'otherData': other}
+
+
+def write_chrome_trace(path, events, metadata=None):
+    """Écrire des étapes dans un fichier Chrome trace-event"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(chrome_trace(events, metadata), f)
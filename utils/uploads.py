@@ -0,0 +1,170 @@
+"""
+Réception des fichiers envoyés au backend de PtitConvert
+Découpe un corps multipart/form-data au fil de l'eau et écrit chaque
+fichier directement dans un répertoire de spool, sans le garder en mémoire.
+"""
+
+import re
+from pathlib import Path
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+    MULTIPART_AVAILABLE = True
+except ImportError:
+    try:
+        from multipart.multipart import MultipartParser, parse_options_header
+        MULTIPART_AVAILABLE = True
+    except ImportError:
+        MULTIPART_AVAILABLE = False
+
+
+class UploadError(ValueError):
+    """Corps de requête invalide"""
+
+
+class UploadTooLarge(UploadError):
+    """Fichier envoyé au-delà de la taille autorisée"""
+
+
+# Taille maximale d'un champ texte (hors fichiers)
+MAX_FIELD_SIZE = 64 * 1024
+
+
+def safe_filename(filename, index):
+    """
+    Réduire un nom de fichier fourni par le client à un nom local sûr
+
+    Args:
+        filename (str): Nom envoyé par le client (chemin éventuel compris)
+        index (int): Rang du fichier, pour nommer les fichiers anonymes
+
+    Returns:
+        str: Nom sans répertoire ni caractère problématique
+    """
+    name = filename.replace('\\', '/').rsplit('/', 1)[-1]
+    name = re.sub(r'[\x00-\x1f<>:"|?*]', '_', name).strip().lstrip('.')
+    return name or f"fichier-{index}"
+
+
+class MultipartSpooler:
+    """Écriture en flux des fichiers d'un corps multipart/form-data"""
+
+    def __init__(self, content_type, spool_dir, max_file_size=None):
+        """
+        Initialiser la réception
+
+        Args:
+            content_type (str): En-tête Content-Type de la requête
+            spool_dir (str): Répertoire où écrire les fichiers reçus
+            max_file_size (int): Taille maximale d'un fichier en octets (None = aucune)
+
+        Raises:
+            UploadError: Si la requête n'est pas un multipart/form-data exploitable
+        """
+        if not MULTIPART_AVAILABLE:
+            raise UploadError("python-multipart n'est pas installé")
+        mime, params = parse_options_header(content_type or '')
+        boundary = params.get(b'boundary')
+        if mime != b'multipart/form-data' or not boundary:
+            raise UploadError("Corps multipart/form-data attendu")
+
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.max_file_size = max_file_size
+        self.files = []
+        self.fields = {}
+
+        self._headers = {}
+        self._header_field = b''
+        self._header_value = b''
+        self._name = None
+        self._file = None
+        self._size = 0
+        self._buffer = None
+        self._parser = MultipartParser(boundary, {
+            'on_part_begin': self._on_part_begin,
+            'on_header_field': self._on_header_field,
+            'on_header_value': self._on_header_value,
+            'on_header_end': self._on_header_end,
+            'on_headers_finished': self._on_headers_finished,
+            'on_part_data': self._on_part_data,
+            'on_part_end': self._on_part_end,
+        })
+
+    def feed(self, chunk):
+        """
+        Traiter un morceau du corps de la requête
+
+        Args:
+            chunk (bytes): Données reçues
+        """
+        try:
+            self._parser.write(chunk)
+        except UploadError:
+            raise
+        except Exception as e:
+            raise UploadError(f"Corps multipart invalide: {e}") from e
+
+    def finish(self):
+        """Terminer la réception (le dernier fichier doit être complet)"""
+        self._parser.finalize()
+        if self._file is not None:
+            self.close()
+            raise UploadError("Corps multipart tronqué")
+
+    def close(self):
+        """Fermer le fichier en cours d'écriture (en cas d'abandon)"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._name = None
+        self._size = 0
+        self._buffer = None
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b''
+        self._header_value = b''
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b'content-disposition', b''))
+        self._name = options.get(b'name', b'').decode('utf-8', 'replace')
+        filename = options.get(b'filename')
+        if filename is None:
+            self._buffer = bytearray()
+            return
+        name = safe_filename(filename.decode('utf-8', 'replace'), len(self.files) + 1)
+        path = self.spool_dir / name
+        if path.exists():
+            # Deux fichiers du même nom : le second est préfixé par son rang
+            path = self.spool_dir / f"{len(self.files) + 1}-{name}"
+        self._file = open(path, 'wb')
+        self.files.append(path)
+
+    def _on_part_data(self, data, start, end):
+        self._size += end - start
+        if self._file is not None:
+            if self.max_file_size is not None and self._size > self.max_file_size:
+                self.close()
+                raise UploadTooLarge(f"Fichier trop volumineux: {self.files[-1].name}")
+            self._file.write(data[start:end])
+        elif self._buffer is not None:
+            if self._size > MAX_FIELD_SIZE:
+                raise UploadError(f"Champ trop volumineux: {self._name}")
+            self._buffer += data[start:end]
+
+    def _on_part_end(self):
+        if self._file is not None:
+            self.close()
+        elif self._buffer is not None:
+            self.fields[self._name] = self._buffer.decode('utf-8', 'replace')
+            self._buffer = None
@@ -3,15 +3,24 @@ Validateurs de fichiers pour PtitConvert
 Utilitaires pour valider les fichiers et formats
 """
 
+import logging
 import os
 from pathlib import Path
 import mimetypes
-from PIL import Image
-import PyPDF2
-from docx import Document
-import openpyxl
 import csv
 
+from converters import tiled_image
+from utils.cost_model import get_cost_model
+from utils.lazy import LazyModule
+
+logger = logging.getLogger(__name__)
+
+# Chargés au premier usage
+Image = LazyModule('PIL.Image')
+PyPDF2 = LazyModule('PyPDF2')
+docx = LazyModule('docx')
+openpyxl = LazyModule('openpyxl')
+
 class FileValidator:
     """Validateur de fichiers et formats"""
     
@@ -28,6 +37,8 @@ class FileValidator:
         'documents': 50 * 1024 * 1024,   # 50 MB
         'spreadsheets': 25 * 1024 * 1024  # 25 MB
     }
+    # Images TIFF / PNG lues par bandes : la mémoire ne dépend pas de la taille du fichier
+    MAX_STREAMED_IMAGE_SIZE = 4 * 1024 * 1024 * 1024  # 4 GB
     
     def __init__(self):
         """Initialiser le validateur"""
@@ -105,6 +116,8 @@ class FileValidator:
             result['file_size'] = file_size
             
             max_size = self.MAX_FILE_SIZES.get(category, 10 * 1024 * 1024)  # 10MB par défaut
+            if category == 'images' and file_size > max_size and tiled_image.is_streamable(file_path):
+                max_size = self.MAX_STREAMED_IMAGE_SIZE
             if file_size > max_size:
                 result['errors'].append(f"Fichier trop volumineux: {file_size} > {max_size} octets")
                 return result
@@ -146,12 +159,16 @@ class FileValidator:
                 return False
                 
         except Exception as e:
-            print(f"Erreur lors de la validation du contenu: {e}")
+            logger.error("Erreur lors de la validation du contenu: %s", e)
             return False
             
     def _validate_image_content(self, file_path):
         """Valider le contenu d'une image"""
         try:
+            # Trop grande pour être décodée entière (ni vérifiée par Pillow) : lue par bandes à la conversion
+            if tiled_image.needs_bands(file_path):
+                return tiled_image.is_streamable(file_path)
+                
             with Image.open(file_path) as img:
                 # Vérifier que l'image peut être ouverte
                 img.verify()
@@ -184,7 +201,7 @@ class FileValidator:
                         return False
                         
             elif file_ext == '.docx':
-                doc = Document(file_path)
+                doc = docx.Document(file_path)
                 # Le document peut être vide, c'est valide
                 
             elif file_ext == '.txt':
@@ -251,7 +268,7 @@ class FileValidator:
             
             # Règles de conversion par catégorie
             conversion_rules = {
-                'images': {'png', 'jpg', 'jpeg', 'bmp', 'gif', 'tiff', 'pdf'},
+                'images': {'png', 'jpg', 'jpeg', 'bmp', 'gif', 'tiff', 'webp', 'pdf'},
                 'documents': {'pdf', 'docx', 'txt'},
                 'spreadsheets': {'xlsx', 'csv', 'pdf'}
             }
@@ -295,7 +312,7 @@ class FileValidator:
                 return []
                 
             conversion_options = {
-                'images': ['PNG', 'JPG', 'JPEG', 'BMP', 'GIF', 'TIFF', 'PDF'],
+                'images': ['PNG', 'JPG', 'JPEG', 'BMP', 'GIF', 'TIFF', 'WEBP', 'PDF'],
                 'documents': ['PDF', 'DOCX', 'TXT'],
                 'spreadsheets': ['XLSX', 'CSV', 'PDF']
             }
@@ -307,7 +324,10 @@ class FileValidator:
             
     def estimate_conversion_time(self, file_path, output_format):
         """
-        Estimer le temps de conversion (approximatif)
+        Estimer le temps de conversion
+        
+        Utilise le modèle de coût appris sur l'historique ; sans mesure pour
+        cette conversion, retombe sur une estimation d'après la taille.
         
         Args:
             file_path (str): Chemin du fichier
@@ -316,6 +336,13 @@ class FileValidator:
         Returns:
             float: Temps estimé en secondes
         """
+        try:
+            estimated_time = get_cost_model().estimate_file(file_path, output_format)
+            if estimated_time is not None:
+                return estimated_time
+        except Exception:
+            pass
+        
         try:
             file_size = Path(file_path).stat().st_size
             category = self.get_file_category(file_path)
@@ -0,0 +1,484 @@
+"""
+Surveillance de dossier pour PtitConvert
+Convertit au fil de l'eau les fichiers créés ou modifiés dans un dossier :
+détection par inotify (Linux) ou par balayage périodique, attente de la
+fin des écritures, et mémoire SQLite des contenus déjà convertis pour ne
+rien reconvertir après un redémarrage.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import sqlite3
+import struct
+import threading
+import time
+from concurrent.futures import CancelledError
+from pathlib import Path
+
+from converters import registry
+from converters.result import CANCELLED
+from utils.file_handler import FileHandler
+
+logger = logging.getLogger(__name__)
+
+# Masques inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct('iIII')
+
+# Fichiers en cours d'écriture par d'autres programmes (téléchargements, éditeurs)
+TEMPORARY_SUFFIXES = ('.part', '.partial', '.crdownload', '.download', '.tmp', '.swp', '~')
+
+
+def is_candidate(path):
+    """Fichier à considérer (ni caché, ni temporaire)"""
+    name = os.path.basename(path)
+    return not name.startswith('.') and not name.lower().endswith(TEMPORARY_SUFFIXES)
+
+
+def scan_files(root, recursive=True, exclude=None):
+    """
+    Lister les fichiers candidats d'un dossier
+
+    Args:
+        root (str): Dossier à parcourir
+        recursive (bool): Descendre dans les sous-dossiers
+        exclude (str): Dossier à ignorer (sortie placée dans le dossier surveillé)
+
+    Returns:
+        dict: {chemin: (taille, mtime en ns)}
+    """
+    found = {}
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive and entry.path != exclude:
+                                stack.append(entry.path)
+                        elif entry.is_file() and is_candidate(entry.path):
+                            st = entry.stat()
+                            found[entry.path] = (st.st_size, st.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return found
+
+
+class InotifySource:
+    """Changements signalés par le noyau (Linux)"""
+
+    def __init__(self, root, recursive=True, exclude=None):
+        """
+        Installer les surveillances inotify
+
+        Args:
+            root (str): Dossier surveillé
+            recursive (bool): Surveiller aussi les sous-dossiers
+            exclude (str): Dossier à ignorer
+
+        Raises:
+            OSError: inotify indisponible (autre système, limite de surveillances atteinte)
+        """
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise OSError("inotify non disponible")
+        self.recursive = recursive
+        self.exclude = exclude
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 a échoué")
+        self._dirs = {}
+        try:
+            self._add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"Surveillance impossible: {directory}")
+        self._dirs[wd] = directory
+
+    def _add_tree(self, root):
+        """Surveiller un dossier et, si récursif, ses sous-dossiers"""
+        self._add_watch(root)
+        if not self.recursive:
+            return
+        for directory, subdirs, _ in os.walk(root):
+            subdirs[:] = [d for d in subdirs if not d.startswith('.')
+                          and os.path.join(directory, d) != self.exclude]
+            for name in subdirs:
+                self._add_watch(os.path.join(directory, name))
+
+    def wait(self, timeout):
+        """
+        Attendre des changements
+
+        Args:
+            timeout (float): Attente maximale en secondes
+
+        Returns:
+            tuple: (chemins modifiés, True si un balayage complet est nécessaire)
+        """
+        changed = set()
+        rescan = False
+        ready, _, _ = select.select([self._fd], [], [], max(timeout, 0))
+        if not ready:
+            return changed, rescan
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    rescan = True
+                    continue
+                directory = self._dirs.get(wd)
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, name)
+                if mask & IN_ISDIR:
+                    if self.recursive and mask & (IN_CREATE | IN_MOVED_TO) and path != self.exclude:
+                        try:
+                            self._add_tree(path)
+                        except OSError:
+                            rescan = True
+                        # Fichiers écrits avant que la surveillance soit en place
+                        changed.update(scan_files(path, True, self.exclude))
+                elif mask & (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE):
+                    changed.add(path)
+        return changed, rescan
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingSource:
+    """Changements détectés en comparant des balayages successifs"""
+
+    def __init__(self, root, recursive=True, exclude=None, interval=2.0):
+        """
+        Args:
+            root (str): Dossier surveillé
+            recursive (bool): Parcourir aussi les sous-dossiers
+            exclude (str): Dossier à ignorer
+            interval (float): Délai entre deux balayages (secondes)
+        """
+        self.root = root
+        self.recursive = recursive
+        self.exclude = exclude
+        self.interval = interval
+        self._snapshot = scan_files(root, recursive, exclude)
+        self._next_scan = time.monotonic() + interval
+
+    def wait(self, timeout):
+        delay = self._next_scan - time.monotonic()
+        if delay > timeout:
+            time.sleep(max(timeout, 0))
+            return set(), False
+        time.sleep(max(delay, 0))
+        self._next_scan = time.monotonic() + self.interval
+        snapshot = scan_files(self.root, self.recursive, self.exclude)
+        changed = {path for path, state in snapshot.items() if self._snapshot.get(path) != state}
+        self._snapshot = snapshot
+        return changed, False
+
+    def close(self):
+        pass
+
+
+def create_source(root, recursive=True, exclude=None, polling=False, interval=2.0):
+    """
+    Choisir le mécanisme de détection : inotify si possible, sinon balayage
+
+    Returns:
+        InotifySource ou PollingSource
+    """
+    if not polling:
+        try:
+            return InotifySource(root, recursive, exclude)
+        except (OSError, AttributeError) as e:
+            logger.warning("inotify indisponible (%s), surveillance par balayage toutes les %s s", e, interval)
+    return PollingSource(root, recursive, exclude, interval)
+
+
+class Debouncer:
+    """Attend qu'un fichier ne change plus pendant un délai avant de le traiter"""
+
+    def __init__(self, quiet_seconds=2.0):
+        self.quiet_seconds = quiet_seconds
+        # {chemin: (dernier changement, (taille, mtime))}
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._pending)
+
+    @staticmethod
+    def _state(path):
+        try:
+            st = os.stat(path)
+            return st.st_size, st.st_mtime_ns
+        except OSError:
+            return None
+
+    def touch(self, path):
+        """Signaler un changement (repousse le traitement du fichier)"""
+        self._pending[path] = (time.monotonic(), self._state(path))
+
+    def next_delay(self):
+        """Secondes avant qu'un fichier puisse être prêt (None s'il n'y en a aucun)"""
+        if not self._pending:
+            return None
+        oldest = min(changed for changed, _ in self._pending.values())
+        return max(oldest + self.quiet_seconds - time.monotonic(), 0)
+
+    def ready(self):
+        """
+        Retirer les fichiers stables depuis quiet_seconds
+
+        Returns:
+            list: Chemins prêts à convertir (les fichiers disparus sont oubliés)
+        """
+        now = time.monotonic()
+        ready = []
+        for path, (changed, state) in list(self._pending.items()):
+            if now - changed < self.quiet_seconds:
+                continue
+            current = self._state(path)
+            if current is None:
+                del self._pending[path]
+            elif current != state:
+                # Écriture sans événement (balayage, système de fichiers réseau)
+                self._pending[path] = (now, current)
+            else:
+                del self._pending[path]
+                ready.append(path)
+        return ready
+
+
+class ProcessedStore:
+    """Contenus déjà convertis par la surveillance de dossier (SQLite)"""
+
+    def __init__(self, db_path=None):
+        """
+        Args:
+            db_path (str): Base SQLite (None = ~/.ptitconvert/watch.db)
+        """
+        if db_path is None:
+            app_dir = Path.home() / '.ptitconvert'
+            app_dir.mkdir(exist_ok=True)
+            db_path = app_dir / 'watch.db'
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS watch_processed (
+                    source_path TEXT NOT NULL,
+                    output_format TEXT NOT NULL,
+                    output_dir TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    success BOOLEAN NOT NULL,
+                    processed_at REAL NOT NULL,
+                    PRIMARY KEY (source_path, output_format, output_dir)
+                )
+            ''')
+
+    def get(self, source_path, output_format, output_dir):
+        """
+        Obtenir le dernier traitement d'un fichier
+
+        Returns:
+            dict: content_hash, size, mtime_ns, success ; None si jamais traité
+        """
+        with self._lock:
+            row = self._conn.execute('''
+                SELECT content_hash, size, mtime_ns, success FROM watch_processed
+                WHERE source_path = ? AND output_format = ? AND output_dir = ?
+            ''', (source_path, output_format, output_dir)).fetchone()
+        if row is None:
+            return None
+        return {'content_hash': row[0], 'size': row[1], 'mtime_ns': row[2], 'success': bool(row[3])}
+
+    def record(self, source_path, output_format, output_dir, content_hash, size, mtime_ns, success):
+        """Enregistrer le traitement d'un contenu"""
+        with self._lock, self._conn:
+            self._conn.execute('''
+                INSERT OR REPLACE INTO watch_processed
+                (source_path, output_format, output_dir, content_hash, size, mtime_ns, success, processed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (source_path, output_format, output_dir, content_hash, size, mtime_ns, success, time.time()))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class FolderWatcher:
+    """Convertit les fichiers nouveaux ou modifiés d'un dossier"""
+
+    def __init__(self, directory, output_format, output_dir, executor, store=None,
+                 recursive=True, debounce=2.0, polling=False, interval=2.0,
+                 quality='medium', on_result=None, options=None):
+        """
+        Initialiser la surveillance
+
+        Args:
+            directory (str): Dossier surveillé
+            output_format (str): Format de sortie
+            output_dir (str): Répertoire de sortie (l'arborescence du dossier y est reproduite)
+            executor (ConversionExecutor): Pool qui exécute les conversions
+            store (ProcessedStore): Contenus déjà convertis (None = base par défaut)
+            recursive (bool): Surveiller les sous-dossiers
+            debounce (float): Secondes sans changement avant de convertir un fichier
+            polling (bool): Forcer la détection par balayage
+            interval (float): Délai entre deux balayages
+            quality (str): Qualité de conversion
+            on_result (callable): Reçoit (chemin, succès, erreur) après chaque conversion
+            options (dict): Options propres au convertisseur (voir registry.convert)
+        """
+        self.directory = os.path.abspath(directory)
+        self.output_format = output_format.lower()
+        self.output_dir = os.path.abspath(output_dir)
+        self.executor = executor
+        self.store = store or ProcessedStore()
+        self.recursive = recursive
+        self.polling = polling
+        self.interval = interval
+        self.quality = quality
+        self.on_result = on_result
+        self.options = options
+        self.debouncer = Debouncer(debounce)
+        self._file_handler = FileHandler()
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _target_dir(self, path):
+        relative = os.path.relpath(os.path.dirname(path), self.directory)
+        return os.path.normpath(os.path.join(self.output_dir, relative))
+
+    def _wanted(self, path):
+        if not is_candidate(path) or path.startswith(self.output_dir + os.sep):
+            return False
+        return registry.can_convert(path, self.output_format)
+
+    def _process(self, path):
+        """Convertir un fichier stable si son contenu n'a pas déjà été converti"""
+        with self._lock:
+            if path in self._in_flight:
+                # Modifié pendant sa conversion : reconsidéré une fois celle-ci terminée
+                self.debouncer.touch(path)
+                return
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        target_dir = self._target_dir(path)
+        previous = self.store.get(path, self.output_format, target_dir)
+        # Un échec est retenté (au démarrage ou au prochain changement) même si le fichier n'a pas bougé
+        if previous and not previous['success']:
+            previous = None
+        if previous and (previous['size'], previous['mtime_ns']) == (st.st_size, st.st_mtime_ns):
+            return
+        content_hash = self._file_handler.get_file_hash(path, 'sha256')
+        if content_hash is None:
+            return
+        if previous and previous['content_hash'] == content_hash:
+            # Même contenu (fichier touché, recopié) : mémoriser seulement les nouveaux attributs
+            self.store.record(path, self.output_format, target_dir, content_hash,
+                              st.st_size, st.st_mtime_ns, True)
+            return
+        os.makedirs(target_dir, exist_ok=True)
+        with self._lock:
+            self._in_flight.add(path)
+        future = self.executor.submit(path, self.output_format, target_dir, task_id=path,
+                                      quality=self.quality, options=self.options)
+        future.add_done_callback(
+            lambda fut: self._on_done(path, target_dir, content_hash, st, fut)
+        )
+
+    def _on_done(self, path, target_dir, content_hash, st, future):
+        try:
+            result = future.result()
+            ok, error, error_type = result.success, result.error, result.error_type
+        except CancelledError:
+            ok, error, error_type = False, None, CANCELLED
+        except Exception as e:
+            ok, error, error_type = False, str(e), None
+        # Conversion annulée (arrêt de la surveillance) : le fichier sera repris au prochain démarrage
+        if error_type != CANCELLED:
+            self.store.record(path, self.output_format, target_dir, content_hash,
+                              st.st_size, st.st_mtime_ns, ok)
+        with self._lock:
+            self._in_flight.discard(path)
+        if self.on_result is not None:
+            self.on_result(path, ok, error)
+
+    def _enqueue(self, paths):
+        for path in paths:
+            if self._wanted(path):
+                self.debouncer.touch(path)
+
+    def run(self):
+        """Surveiller le dossier jusqu'à stop() (traite d'abord les fichiers déjà présents)"""
+        exclude = self.output_dir if self.output_dir.startswith(self.directory + os.sep) else None
+        source = create_source(self.directory, self.recursive, exclude, self.polling, self.interval)
+        try:
+            # Rattrapage : ce qui a changé pendant que la surveillance était arrêtée
+            for path in scan_files(self.directory, self.recursive, exclude):
+                if self._wanted(path):
+                    self._process(path)
+            while not self._stop.is_set():
+                delay = self.debouncer.next_delay()
+                timeout = 1.0 if delay is None else min(delay, 1.0)
+                changed, rescan = source.wait(timeout)
+                if rescan:
+                    changed |= set(scan_files(self.directory, self.recursive, exclude))
+                self._enqueue(changed)
+                for path in self.debouncer.ready():
+                    self._process(path)
+        finally:
+            source.close()
+
+    def stop(self):
+        """Arrêter la surveillance (run() se termine au plus tard une seconde après)"""
+        self._stop.set()